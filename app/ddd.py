@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Sequence, Tuple, Union, Dict
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple, Union, Dict
+
+if TYPE_CHECKING:  # 주석 전용(런타임 numpy는 함수 내부에서 지연 import)
+    import numpy as np
 
 # PySide6 의존성은 선택적 — 필요 시 내부에서 import
 QImageLike = Union["QImage", "QPixmap"]
@@ -99,14 +102,12 @@ def _qimage_from_path(path: str) -> Optional[QImage]:
     except Exception:
         pass
     try:
-        import cv2, numpy as np
+        import cv2
+        from app.utils import qimage_bridge as QB
         bgr = cv2.imread(path, cv2.IMREAD_COLOR)
         if bgr is None:
             return None
-        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-        h, w = rgb.shape[:2]
-        qimg = QImage(rgb.data, w, h, 3*w, QImage.Format.Format_RGB888)
-        return qimg.copy()
+        return QB.to_qimage(bgr, "BGR")  # BGR888로 감싸 색변환 없이 복사 1회
     except Exception:
         return None
 
@@ -129,19 +130,53 @@ def save_jpg(img: QImage, path: str, quality: int = 100) -> bool:
         return True
     # 2차: OpenCV 폴백
     try:
-        import numpy as np, cv2
-        q = img.convertToFormat(QImage.Format.Format_RGB888)
-        h, w = q.height(), q.width()
-        bpl = q.bytesPerLine()
-        ptr = q.bits()
-        buf = ptr.tobytes() if hasattr(ptr, "tobytes") else bytes(ptr)
-        arr = np.frombuffer(buf, dtype=np.uint8).reshape((h, bpl // 3, 3))
-        arr = arr[:, :w, :]
-        ok2 = cv2.imwrite(path, cv2.cvtColor(arr, cv2.COLOR_RGB2BGR), [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
+        import cv2
+        from app.utils import qimage_bridge as QB
+        bgr = QB.to_ndarray(img, "BGR")
+        ok2 = cv2.imwrite(path, bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
         return bool(ok2)
     except Exception:
         return False
 
+# 파일경로 → BGR ndarray(파이프라인 입력)
+def _bgr_from_path(path: str):
+    """cv2 로더 우선, 실패 시 QImage 로더 후 1패스 변환. 실패 시 None."""
+    try:
+        import cv2
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if bgr is not None:
+            return bgr
+    except Exception:
+        pass
+    qi = _qimage_from_path(path)
+    if qi is None or qi.isNull():
+        return None
+    try:
+        from app.utils import qimage_bridge as QB
+        return QB.to_ndarray(qi, "BGR")
+    except Exception:
+        return None
+
+# BGR ndarray → JPEG 저장(품질 100 기본), 실패 시 QImage 저장 폴백
+def _save_jpg_bgr(bgr, path: str, quality: int = 100) -> bool:
+    """cv2.imwrite 우선, 실패 시 save_jpg(QImage) 폴백."""
+    import os
+    try:
+        import cv2
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if cv2.imwrite(path, bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]):
+            return True
+    except Exception:
+        pass
+    try:
+        from app.utils import qimage_bridge as QB
+        return save_jpg(QB.to_qimage(bgr, "BGR"), path, quality)
+    except Exception:
+        return False
+
+# 결과 캐시 키에 포함되는 파이프라인 버전(출력이 달라지는 변경 시 올린다)
+PIPELINE_VERSION = "1.11"
+
 # 파일 단위 파이프라인(one-shot)
 # - 역할: in_path 로드 → 파이프라인 적용 → out_path(JPG 100) 저장
 # - 수정로그: v1.3 신설
@@ -161,11 +196,23 @@ def process_file(
     - 역할: in_path 로드 → 파이프라인 적용 → out_path(JPG 100) 저장
     - 정책: 어떤 경우에도 out_path 생성을 최대한 보장(최후에는 원본 복사)
     - 수정로그: v1.6 — 실패 시 원본 복사 폴백, 저장 보장 로직 강화
+    - 수정로그: v1.9 — 내용 주소 디스크 캐시(retouch_cache) 적중 시 파이프라인 생략
+    - 수정로그: v1.11 — 로드/파이프라인/저장 모두 BGR ndarray(QImage 왕복 없음)
     """
-    import os, shutil
-    # 입력 로드
-    src = _qimage_from_path(in_path)
-    if src is None or (hasattr(src, 'isNull') and src.isNull()):
+    import os, shutil, time
+    from app.utils import retouch_cache
+    # 캐시 조회(입력 내용 + 파라미터 + 버전)
+    t0 = time.perf_counter()
+    params = {
+        "target_ratio": target_ratio, "spec_profile": spec_profile, "background_color": background_color,
+        "eye_strength": eye_strength, "shoulder_mode": shoulder_mode, "anti_glare": anti_glare,
+    }
+    key = retouch_cache.make_key("ddd", in_path, params, PIPELINE_VERSION) if retouch_cache.enabled() else None
+    if key and retouch_cache.fetch(key, out_path):
+        return True
+    # 입력 로드(BGR ndarray, 실패 시 QImage 로더 폴백)
+    src = _bgr_from_path(in_path)
+    if src is None:
         # 입력 로드 실패라도 출력 보장 시도(원본 파일이 있으면 복사)
         try:
             os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
@@ -176,10 +223,10 @@ def process_file(
         except Exception:
             return False
 
-    # 파이프라인 적용
+    # 파이프라인 적용(단계 간 ndarray 전달, QImage 변환 없음)
     try:
         pipe = RetouchPipeline()
-        qi = pipe.apply(
+        out = pipe.apply_array(
             src,
             eye_strength=eye_strength,
             shoulder_mode=shoulder_mode,
@@ -188,7 +235,9 @@ def process_file(
             background_color=background_color,
             anti_glare=anti_glare,
         )
-        if save_jpg(qi, out_path, 100):
+        if _save_jpg_bgr(out, out_path, 100):
+            if key:
+                retouch_cache.store(key, out_path, time.perf_counter() - t0)
             return True
     except Exception as e:
         print("[retouch] pipeline error:", e)
@@ -230,6 +279,10 @@ class EyeSizeAdjuster:
             raise ValueError("Invalid image input for EyeSizeAdjuster.adjust")
         return qi
 
+    def adjust_array(self, bgr: "np.ndarray", strength: float = 0.0) -> "np.ndarray":
+        """adjust의 ndarray(BGR) 버전 — 현재는 No-Op 패스스루."""
+        return bgr
+
 
 # ShoulderHeightDetector.detect(image) → 좌/우 어깨 포인트/기울기
 class ShoulderHeightDetector:
@@ -255,6 +308,10 @@ class ShoulderHeightAdjuster:
             raise ValueError("Invalid image input for ShoulderHeightAdjuster.adjust")
         return qi
 
+    def adjust_array(self, bgr: "np.ndarray", mode: str = "auto") -> "np.ndarray":
+        """adjust의 ndarray(BGR) 버전 — 현재는 No-Op 패스스루."""
+        return bgr
+
 
 #─────────────────────────────────────────────
 #  신규: 포즈/크롭 정규화, 배경 정리, 조명/색 보정 (No-Op 스캐폴드)
@@ -270,7 +327,7 @@ class PoseAligner:
 
     # 정렬/크롭(Tasks FaceLandmarker 사용, 실패 시 패스스루)
     # - 세션 비율(target_ratio)에 맞게 roll 보정 후 크롭
-    # - 모델은 model_asset_buffer 로딩(경로 이슈 회피)
+    # - 모델은 model_asset_buffer 로딩(경로 이슈 회피), 프로세스 풀에서 재사용
     def align_and_crop(
         self,
         image: Union[QImageLike, str],
@@ -283,91 +340,61 @@ class PoseAligner:
         - 수정로그:
           - v1.2: MediaPipe Tasks 연동, 회전 + 크롭 구현
           - v1.7: 머리 윗여백 0.06 강제(가능 범위 내) + 가로/세로 경계 핏 보정
+          - v1.8: 모델 바이트/FaceLandmarker를 landmarker_pool에서 재사용(이미지마다 재생성 제거)
+          - v1.10: 랜드마크 검출은 축소 프록시(landmarker_pool.detection_proxy)에서, 회전/크롭은 원본 해상도에서
         """
         # 지연 임포트(실행 환경에 mediapipe/cv2 없는 경우 대비)
+        try:
+            from app.utils import qimage_bridge as QB
+        except Exception:
+            QB = None
+        qi = _to_qimage(image)
+        if qi is None:
+            raise ValueError("Invalid image input for PoseAligner.align_and_crop")
+        if QB is None:
+            return qi
+        out = self.align_and_crop_array(QB.to_ndarray(qi, "BGR"), target_ratio=target_ratio,
+                                        spec_profile=spec_profile)
+        return QB.to_qimage(out, "BGR")
+
+    def align_and_crop_array(
+        self,
+        bgr: "np.ndarray",
+        target_ratio: Tuple[int, int] = (3, 4),
+        spec_profile: str = "AUTO",
+    ) -> "np.ndarray":
+        """
+        - 역할: align_and_crop의 ndarray(BGR) 버전. 결과는 회전 결과의 크롭 view(복사 없음)
+        - 실패 시: 입력 배열을 그대로 반환(No-Op)
+        - 수정로그: v1.11 — QImage 왕복 없이 BGR 배열로 처리(검출용 RGB 변환은 프록시에서만)
+        """
         try:
             import numpy as np
             import cv2
             import mediapipe as mp
-            from mediapipe.tasks import python as mp_python
-            from mediapipe.tasks.python import vision as mp_vision
+            from app.utils import landmarker_pool
         except Exception:
-            qi = _to_qimage(image)
-            if qi is None:
-                raise ValueError("Invalid image input for PoseAligner.align_and_crop")
-            return qi
-
-        # --- QImage/경로 → RGB ndarray ---
-        def to_rgb_nd(img_in) -> Tuple[np.ndarray, Tuple[int,int]]:
-            if isinstance(img_in, str):
-                bgr = cv2.imread(img_in, cv2.IMREAD_COLOR)
-                if bgr is None:
-                    raise ValueError("Image path read failed")
-                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                return rgb, (bgr.shape[1], bgr.shape[0])
-            qi = _to_qimage(img_in)
-            if qi is None:
-                raise ValueError("Invalid image type")
-            qi = qi.convertToFormat(QImage.Format.Format_RGBA8888)
-            w, h = qi.width(), qi.height()
-            bpl = qi.bytesPerLine()  # 라인 패딩 고려
-            ptr = qi.bits()
-            buf = ptr.tobytes() if hasattr(ptr, "tobytes") else bytes(ptr)
-            arr = np.frombuffer(buf, dtype=np.uint8).reshape((h, bpl // 4, 4))
-            arr = arr[:, :w, :]  # 패딩 제거
-            rgb = cv2.cvtColor(arr, cv2.COLOR_RGBA2RGB)
-            return rgb, (w, h)
-
-        # --- RGB ndarray → QImage ---
-        def to_qimage(rgb: "np.ndarray") -> QImage:
-            h, w = rgb.shape[:2]
-            rgb8 = rgb.astype(np.uint8, copy=False)
-            qimg = QImage(rgb8.data, w, h, 3*w, QImage.Format.Format_RGB888)
-            return qimg.copy()  # 메모리 소유권 분리
-
-        # --- FaceLandmarker 모델 바이트 로딩 ---
-        def load_model_bytes() -> Optional[bytes]:
-            import os
-            base = os.getcwd()                            # 실행 기준 루트
-            mod_dir = os.path.dirname(__file__)           # app/utils
-            cand = [
-                os.path.join(base, "face_landmarker.task"),
-                os.path.join(base, "models", "face_landmarker.task"),
-                os.path.join(base, "app", "utils", "models", "face_landmarker.task"),
-                os.path.join(mod_dir, "face_landmarker.task"),
-                os.path.join(mod_dir, "models", "face_landmarker.task"),
-            ]
-            for p in cand:
-                try:
-                    if os.path.exists(p) and os.path.getsize(p) > 100*1024:
-                        with open(p, "rb") as f:
-                            return f.read()
-                except Exception:
-                    continue
-            return None
+            return bgr
 
         EYE_LINE_Y = 0.42
         HEAD_TOP = 0.06
 
-        rgb, (W, H) = to_rgb_nd(image)
-        model_bytes = load_model_bytes()
-        if not model_bytes:
-            return to_qimage(rgb)  # 모델 없으면 패스스루
+        H, W = bgr.shape[:2]
+        # 모델 바이트/인스턴스는 프로세스 풀에서 1회 생성 후 재사용
+        if not landmarker_pool.load_model_bytes("face_landmarker.task"):
+            return bgr  # 모델 없으면 패스스루
 
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-        opts = mp_vision.FaceLandmarkerOptions(
-            base_options=mp_python.BaseOptions(model_asset_buffer=model_bytes),
-            num_faces=1,
-            running_mode=mp_vision.RunningMode.IMAGE,
-        )
+        # 검출은 축소 프록시에서(정규화 좌표이므로 W/H를 곱하면 원본 좌표)
+        rgb_small = cv2.cvtColor(landmarker_pool.detection_proxy(bgr), cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_small)
         try:
-            landmarker = mp_vision.FaceLandmarker.create_from_options(opts)
-            result = landmarker.detect(mp_image)
+            with landmarker_pool.lease("face_landmarker", num_faces=1, running_mode="IMAGE") as landmarker:
+                result = landmarker.detect(mp_image)
         except Exception:
-            return to_qimage(rgb)
+            return bgr
 
         if not result.face_landmarks:
-            return to_qimage(rgb)
+            return bgr
         lm = result.face_landmarks[0]
 
         # --- roll 계산 (눈꼬리 33, 263) ---
@@ -380,7 +407,7 @@ class PoseAligner:
         # --- 회전 보정 (눈 중점 기준) ---
         cx, cy = (lx + rx) / 2.0, (ly + ry) / 2.0
         M = cv2.getRotationMatrix2D((cx, cy), -roll_deg, 1.0)
-        rgb_rot = cv2.warpAffine(rgb, M, (W, H), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+        bgr_rot = cv2.warpAffine(bgr, M, (W, H), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
 
         # --- 회전 후 좌표 계산 ---
         pts = np.array([[[lx, ly]], [[rx, ry]]], dtype=np.float32)
@@ -417,14 +444,11 @@ class PoseAligner:
         top = max(0, min(H - int(crop_h), top))
 
         x, y, w, h = left, top, int(round(crop_w)), int(round(crop_h))
-        crop = rgb_rot[y:y+h, x:x+w]
+        crop = bgr_rot[y:y+h, x:x+w]
         if crop.size == 0:
-            return to_qimage(rgb_rot)
-        return to_qimage(crop)
-        if crop.size == 0:
-            return to_qimage(rgb_rot)
+            return bgr_rot
+        return crop
 
-        return to_qimage(crop)
 
 class BackgroundCleaner:
     """인물/배경 분리 후 배경 단색 치환 및 벽면 그림자 완화."""
@@ -447,55 +471,77 @@ class BackgroundCleaner:
         if qi is None:
             raise ValueError("Invalid image input for BackgroundCleaner.clean")
         try:
-            import cv2, numpy as np
-            # QImage->BGR
-            qi2 = qi.convertToFormat(QImage.Format.Format_RGBA8888)
-            w, h = qi2.width(), qi2.height()
-            bpl = qi2.bytesPerLine()
-            ptr = qi2.bits()
-            buf = ptr.tobytes() if hasattr(ptr, "tobytes") else bytes(ptr)
-            arr = np.frombuffer(buf, dtype=np.uint8).reshape((h, bpl // 4, 4))
-            arr = arr[:, :w, :]
-            bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+            from app.utils import qimage_bridge as QB
+            bgr = QB.to_ndarray(qi, "BGR")
+            out = self.clean_array(bgr, color=color, feather_px=feather_px,
+                                   shadow_reduction=shadow_reduction, tol=tol)
+            return qi if out is bgr else QB.to_qimage(out, "BGR")
+        except Exception:
+            return qi
 
+    def clean_array(
+        self,
+        bgr: "np.ndarray",
+        *,
+        color: str = "white",
+        feather_px: int = 10,
+        shadow_reduction: float = 0.35,
+        tol: int = 32,
+    ) -> "np.ndarray":
+        """
+        - 역할: clean의 ndarray(BGR) 버전. 입력은 수정하지 않으며, 스킵/오류 시 입력 배열을 그대로 반환
+        - 수정로그: v1.11 — QImage 왕복 제거, floodFill MASK_ONLY(작업 복사본 제거), 배경색은 브로드캐스트
+        - 수정로그: v1.12 — floodFill 이후 feather/그림자/합성은 스트립 병렬(strip_exec, halo=feather 반경), 직렬과 비트 동일
+        """
+        try:
+            import cv2, numpy as np
+            from app.utils import strip_exec as SX
             H, W = bgr.shape[:2]
             mask = np.zeros((H+2, W+2), np.uint8)
-            flags = 4 | (255 << 8)  # 4-conn, newMaskVal=255
+            flags = 4 | (255 << 8) | cv2.FLOODFILL_MASK_ONLY  # 4-conn, newMaskVal=255, 이미지 무변경
             lo = (tol, tol, tol); up = (tol, tol, tol)
             seeds = [(1,1), (W-2,1), (1,H-2), (W-2,H-2)]
-            tmp = bgr.copy()
+            src = np.ascontiguousarray(bgr)
             for sx, sy in seeds:
                 try:
-                    cv2.floodFill(tmp, mask, (int(sx), int(sy)), (0,0,0), lo, up, flags)
+                    cv2.floodFill(src, mask, (int(sx), int(sy)), (0,0,0), lo, up, flags)
                 except Exception:
                     pass
-            m = (mask[1:-1,1:-1] > 0).astype(np.float32)
-            if m.mean() < 0.01:
-                return qi  # 배경으로 추정되는 영역이 너무 작으면 스킵
-            # feather
+            inner = mask[1:-1,1:-1]
+            if cv2.countNonZero(inner) < 0.01 * H * W:
+                return bgr  # 배경으로 추정되는 영역이 너무 작으면 스킵
             k = max(1, int(feather_px // 2) * 2 + 1)
-            m = cv2.GaussianBlur(m, (k, k), 0)
-            m3 = np.dstack([m, m, m])
-            # 배경색 생성
-            if color == "white":
-                bg = np.full_like(bgr, 255)
-            elif color == "light-gray":
-                bg = np.full_like(bgr, 235)
+            # 배경색(BGR)
+            if color == "light-gray":
+                bg = np.array((235, 235, 235), np.uint8)
             elif color == "light-blue":
-                bg = np.full_like(bgr, (240, 248, 255))
+                bg = np.array((240, 248, 255), np.uint8)
             else:
-                bg = np.full_like(bgr, 255)
-            # 그림자 완화
-            if shadow_reduction > 0:
-                lift = (m3 * shadow_reduction * 255).astype(np.uint8)
-                bgr = cv2.add(bgr, lift, mask=(m*255).astype(np.uint8))
-            out = (m3 * bg + (1.0 - m3) * bgr).astype(np.uint8)
-            # BGR->QImage
-            rgb = cv2.cvtColor(out, cv2.COLOR_BGR2RGB)
-            qout = QImage(rgb.data, W, H, 3*W, QImage.Format.Format_RGB888)
-            return qout.copy()
+                bg = np.array((255, 255, 255), np.uint8)
+            out = np.empty_like(src)
+
+            def body(y0: int, y1: int, e0: int, e1: int) -> None:
+                # feather: halo 포함 구간에서 블러 후 자기 행만 사용
+                m = SX.scratch("bg_m", (e1 - e0, W), np.float32)
+                np.copyto(m, inner[e0:e1] > 0)
+                m = cv2.GaussianBlur(m, (k, k), 0)[y0 - e0:y1 - e0]
+                m3 = m[..., None]
+                s = src[y0:y1]
+                # 그림자 완화
+                if shadow_reduction > 0:
+                    lift = cv2.cvtColor((m * shadow_reduction * 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+                    s = cv2.add(s, lift, mask=(m*255).astype(np.uint8))
+                # 합성: m3*bg + (1-m3)*s (float32, 직렬 식과 같은 연산 순서)
+                n = y1 - y0
+                f = np.multiply(m3, bg, out=SX.scratch("bg_f", (n, W, 3), np.float32))
+                g = np.subtract(1.0, m3, out=SX.scratch("bg_g", (n, W, 1), np.float32))
+                f += np.multiply(g, s, out=SX.scratch("bg_f2", (n, W, 3), np.float32))
+                np.copyto(out[y0:y1], f, casting="unsafe")
+
+            SX.run_strips(H, body, halo=k // 2)
+            return out
         except Exception:
-            return qi
+            return bgr
 
 
 class IlluminationNormalizer:
@@ -518,47 +564,78 @@ class IlluminationNormalizer:
         qi = _to_qimage(image)
         if qi is None:
             raise ValueError("Invalid image input for IlluminationNormalizer.normalize")
+        try:
+            from app.utils import qimage_bridge as QB
+            bgr = QB.to_ndarray(qi, "BGR")
+            out = self.normalize_array(bgr, anti_glare=anti_glare, wb=wb, gamma=gamma,
+                                       clip_limit=clip_limit, unsharp_amount=unsharp_amount)
+            return qi if out is bgr else QB.to_qimage(out, "BGR")
+        except Exception:
+            return qi
+
+    def normalize_array(
+        self,
+        bgr: "np.ndarray",
+        *,
+        anti_glare: bool = True,
+        wb: str = "auto",
+        gamma: float = 1.05,
+        clip_limit: float = 3.0,
+        unsharp_amount: float = 0.3,
+    ) -> "np.ndarray":
+        """
+        - 역할: normalize의 ndarray(BGR) 버전. 입력은 수정하지 않고, 중간 버퍼는 제자리 갱신
+        - 수정로그: v1.11 — QImage 왕복 제거, 난반사/감마/언샤프를 작업 버퍼에 제자리 기록
+        - 수정로그: v1.12 — CLAHE 이후 난반사/감마/언샤프는 스트립 병렬(halo=두 블러 반경 합), 직렬과 비트 동일
+        """
         try:
             import cv2, numpy as np
-            # QImage -> BGR
-            qi2 = qi.convertToFormat(QImage.Format.Format_RGBA8888)
-            w, h = qi2.width(), qi2.height()
-            bpl = qi2.bytesPerLine()
-            ptr = qi2.bits()
-            buf = ptr.tobytes() if hasattr(ptr, "tobytes") else bytes(ptr)
-            arr = np.frombuffer(buf, dtype=np.uint8).reshape((h, bpl // 4, 4))
-            arr = arr[:, :w, :]
-            bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+            from app.utils import strip_exec as SX
             # LAB CLAHE
             lab = cv2.cvtColor(bgr, cv2.COLOR_BGR2LAB)
             l, a, b = cv2.split(lab)
             clahe = cv2.createCLAHE(clipLimit=float(clip_limit), tileGridSize=(8,8))
             l2 = clahe.apply(l)
-            lab2 = cv2.merge([l2, a, b])
-            bgr2 = cv2.cvtColor(lab2, cv2.COLOR_LAB2BGR)
-            # Anti-glare: 매우 밝은 영역 톤다운
+            cv2.merge([l2, a, b], dst=lab)
+            bgr2 = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+            H = bgr2.shape[0]
+            # 전역 판단(난반사 적용 여부/감마 테이블)은 스트립 전에 한 번
+            glare = None
             if anti_glare:
                 gray = cv2.cvtColor(bgr2, cv2.COLOR_BGR2GRAY)
-                mask = (gray > 235).astype(np.uint8) * 255
-                if mask.mean() > 1:
-                    blur = cv2.GaussianBlur(bgr2, (0,0), 3)
-                    bgr2 = np.where(mask[...,None]==255, (bgr2*0.85 + blur*0.15).astype(np.uint8), bgr2)
-            # 감마 옵션
+                glare = gray > 235
+                if np.count_nonzero(glare) * 255 <= glare.size:
+                    glare = None
+            table = None
             if abs(gamma - 1.0) > 1e-3:
                 inv = 1.0 / max(1e-6, gamma)
                 table = (np.linspace(0,1,256)**inv * 255).astype(np.uint8)
-                bgr2 = cv2.LUT(bgr2, table)
-            # Unsharp mask (약하게)
-            if unsharp_amount > 0:
-                blur = cv2.GaussianBlur(bgr2, (0,0), 1.2)
-                sharp = cv2.addWeighted(bgr2, 1 + unsharp_amount, blur, -unsharp_amount, 0)
-                bgr2 = sharp
-            # BGR->QImage
-            rgb = cv2.cvtColor(bgr2, cv2.COLOR_BGR2RGB)
-            qout = QImage(rgb.data, w, h, 3*w, QImage.Format.Format_RGB888)
-            return qout.copy()
+            halo = (SX.gaussian_halo(3) if glare is not None else 0) + (SX.gaussian_halo(1.2) if unsharp_amount > 0 else 0)
+            out = np.empty_like(bgr2)
+
+            def body(y0: int, y1: int, e0: int, e1: int) -> None:
+                s = bgr2[e0:e1]
+                t = SX.scratch("ill_u8", s.shape, np.uint8)
+                np.copyto(t, s)
+                # Anti-glare: 매우 밝은 영역 톤다운
+                if glare is not None:
+                    blur = cv2.GaussianBlur(s, (0,0), 3)
+                    f = np.multiply(s, 0.85, out=SX.scratch("ill_f", s.shape, np.float64))
+                    f += np.multiply(blur, 0.15, out=SX.scratch("ill_f2", s.shape, np.float64))
+                    np.copyto(t, f, casting="unsafe", where=glare[e0:e1, :, None])
+                # 감마 옵션
+                if table is not None:
+                    t = cv2.LUT(t, table, dst=t)
+                # Unsharp mask (약하게)
+                if unsharp_amount > 0:
+                    blur = cv2.GaussianBlur(t, (0,0), 1.2)
+                    t = cv2.addWeighted(t, 1 + unsharp_amount, blur, -unsharp_amount, 0, dst=t)
+                out[y0:y1] = t[y0 - e0:y1 - e0]
+
+            SX.run_strips(H, body, halo=halo)
+            return out
         except Exception:
-            return qi
+            return bgr
 
 
 #─────────────────────────────────────────────
@@ -622,28 +699,62 @@ class RetouchPipeline:
         """검출→보정 순서. 현재는 각 단계가 No-Op이므로 입력 그대로 흐른다."""
         # 역할: 일괄 보정 엔트리포인트
         # 수정로그:
+        # - v1.11: 단계 간 BGR ndarray 전달(apply_array), QImage 변환은 입/출구 1회씩
         # - v1.1: 포즈정렬/배경/조명 스텝 추가, 파라미터 확장
         # - v1.0: 초판 — No-Op 파이프라인
         qi = _to_qimage(image)
         if qi is None:
             raise ValueError("Invalid image input for RetouchPipeline.apply")
+        from app.utils import qimage_bridge as QB
+        out = self.apply_array(
+            QB.to_ndarray(qi, "BGR"),
+            eye_strength=eye_strength,
+            shoulder_mode=shoulder_mode,
+            target_ratio=target_ratio,
+            spec_profile=spec_profile,
+            background_color=background_color,
+            anti_glare=anti_glare,
+        )
+        return QB.to_qimage(out, "BGR")
 
-        # 1) 포즈/크롭 정규화
-        qi = self.pose_aligner.align_and_crop(qi, target_ratio=target_ratio, spec_profile=spec_profile)
+    def apply_array(
+        self,
+        bgr: "np.ndarray",
+        *,
+        eye_strength: float = 0.0,
+        shoulder_mode: str = "auto",
+        target_ratio: Tuple[int, int] = (3, 4),
+        spec_profile: str = "ID_35x45",
+        background_color: str = "white",
+        anti_glare: bool = True,
+    ) -> "np.ndarray":
+        """apply의 ndarray(BGR) 버전. 단계 사이에 QImage 변환 없이 같은 배열 흐름을 넘긴다."""
+        # 1) 포즈/크롭 정규화(크롭은 view)
+        bgr = self.pose_aligner.align_and_crop_array(bgr, target_ratio=target_ratio, spec_profile=spec_profile)
         # 2) 배경 치환/정리
-        qi = self.bg_cleaner.clean(qi, color=background_color, feather_px=10, shadow_reduction=0.35, tol=32)
+        bgr = self.bg_cleaner.clean_array(bgr, color=background_color, feather_px=10, shadow_reduction=0.35, tol=32)
         # 3) 조명/색 보정(난반사 억제 포함)
-        qi = self.illum.normalize(qi, anti_glare=anti_glare, gamma=1.05, clip_limit=3.0, unsharp_amount=0.3)
+        bgr = self.illum.normalize_array(bgr, anti_glare=anti_glare, gamma=1.05, clip_limit=3.0, unsharp_amount=0.3)
         # 4) (선택) 눈/어깨 보정 — 현재는 패스스루
-        qi = self.eye_adjuster.adjust(qi, strength=eye_strength)
-        qi = self.shoulder_adjuster.adjust(qi, mode=shoulder_mode)
-        return qi
+        bgr = self.eye_adjuster.adjust_array(bgr, strength=eye_strength)
+        bgr = self.shoulder_adjuster.adjust_array(bgr, mode=shoulder_mode)
+        return bgr
 
 
 #─────────────────────────────────────────────
 #  수정 로그
 #─────────────────────────────────────────────
 """
+- v1.12 — BackgroundCleaner/IlluminationNormalizer: 픽셀 단위 단계를 `strip_exec` 스트립 병렬로(halo로 블러 경계 보존, 스레드별 scratch 재사용). 직렬 결과와 비트 동일, 스레드 수는 `AI_STRIP_WORKERS`
+
+- v1.11 — RetouchPipeline.apply_array: 단계 간 BGR ndarray 전달(각 단계 *_array), QImage 변환은 apply 입/출구 1회씩. process_file은 ndarray로 로드/저장
+
+- v1.10 — PoseAligner: 랜드마크 검출을 긴 변 `AI_PROXY_EDGE`(기본 1280px) 프록시에서 수행, 회전/크롭만 원본 해상도
+
+- v1.9 — process_file: 내용 주소 디스크 캐시(`retouch_cache`) 조회/저장. 폴백(원본 복사) 결과는 캐시하지 않음
+
+- v1.8 — PoseAligner: FaceLandmarker 모델 바이트/인스턴스를 `landmarker_pool`로 공유(프로세스당 1회 생성)
+
 - v1.5 — PoseAligner: 회전 보간을 INTER_CUBIC으로 상향(미세각 스냅 없음)
 
 - v1.4 — BackgroundCleaner: 코너 floodFill 기반 단색 치환 / IlluminationNormalizer: LAB-CLAHE + 하이라이트 억제 / PoseAligner: 회전 후 눈높이로 크롭 개선 / 기본 ratio=(3,4)
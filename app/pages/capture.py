@@ -276,7 +276,7 @@ class CapturePage(BasePage):
 
         self._ai_rate_ms = 500; self._ai_last_ms = 0; self._ema: Dict[str, float] = {}
         self.guide = Guidance(rate_ms=500)
-        # Guidance 입력 최신 프레임 버퍼(ndarray)와 처리 주기(10~15Hz)
+        # Guidance 입력 최신 프레임(QImage, 자체 버퍼 소유)과 처리 주기(10~15Hz)
         self._rgb_latest = None
         self._rgb_lock = threading.Lock()
         self._ai_timer = QTimer(self)
@@ -1467,6 +1467,7 @@ class CapturePage(BasePage):
         self.set_prev_mode("enabled"); self.set_prev_enabled(True)
         if success:
             self.set_next_enabled(True); self.set_next_mode("lit")
+            self._schedule_ai_prefetch()
         else:
             self.set_next_enabled(False); self.set_next_mode("disabled")
         self._overlay_from_button = False
@@ -1475,6 +1476,22 @@ class CapturePage(BasePage):
         except Exception:
             pass
 
+    def _schedule_ai_prefetch(self):
+        """촬영 종료 직후 raw_XX.jpg 전체를 백그라운드에서 미리 AI 보정한다(선택 전 추측 실행)."""
+        try:
+            raw_dir = Path(r"C:\PhotoBox\raw")
+            names = [n for n in (self.session.get("raw_captures") or []) if n]
+            paths = [str(raw_dir / n) for n in names]
+            params = {"ratio": self.ratio_tuple()}
+            from app.utils import retouch_prefetch
+            # 파일 해시 계산이 있으므로 GUI 스레드 밖에서 등록
+            threading.Thread(target=retouch_prefetch.schedule, args=(paths, params),
+                             name="retouch-prefetch-schedule", daemon=True).start()
+            _log.info("[CAPTURE] ai prefetch scheduled n=%d ratio=%s", len(paths), self.get_ratio())
+        except Exception as e:
+            try: _log.info("[CAPTURE] ai prefetch skip: %s", e)
+            except Exception: pass
+
     def _sync_preview_label_geom(self):
         try:
             r = self.preview_box.contentsRect()
@@ -1746,7 +1763,7 @@ class CapturePage(BasePage):
             return False
 
     def _on_frame_bytes(self, data: bytes, ts_ms: int, meta: dict):
-        # 단일 디코딩: bytes -> ndarray RGB, 미리보기는 얕은 래핑 후 copy(), 분석은 동일 ndarray 사용
+        # 단일 디코딩: bytes -> BGR -> QImage 소유 버퍼에 RGB 직접 기록(복사 1회), 미리보기/분석이 같은 QImage 공유
         try:
             import numpy as np, cv2
             arr = np.frombuffer(data, dtype=np.uint8)
@@ -1773,11 +1790,12 @@ class CapturePage(BasePage):
                 except Exception:
                     pass
                 return
-            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-            h_, w_, _ = rgb.shape
+            from app.utils import qimage_bridge as QB
+            h_, w_ = bgr.shape[:2]
+            qi, dst = QB.new_image(w_, h_, "RGB")
+            cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=dst)
             with self._rgb_lock:
-                self._rgb_latest = rgb
-            qi = QImage(rgb.data, w_, h_, 3*w_, QImage.Format_RGB888).copy()
+                self._rgb_latest = qi
         except Exception:
             return
         try:
@@ -1794,15 +1812,10 @@ class CapturePage(BasePage):
                 return
             if not hasattr(self, 'guide'):
                 return
-            rgb = None
             with self._rgb_lock:
-                rgb = self._rgb_latest
-            if rgb is None:
-                return
-            h_, w_, _ = getattr(rgb, 'shape', (0, 0, 0))
-            if w_ <= 0 or h_ <= 0:
+                qimg = self._rgb_latest
+            if qimg is None or qimg.isNull():
                 return
-            qimg = QImage(rgb.data, w_, h_, 3*w_, QImage.Format_RGB888)
             ts_ai = int(time.time() * 1000)
             try:
                 if hasattr(self.guide, 'set_input_source'):
@@ -1,7 +1,7 @@
 ﻿# app/pages/email_send.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import os, re, shutil, logging
+import os, re, shutil, hashlib, logging
 from datetime import datetime
 from typing import List, Tuple, Optional
 
@@ -13,7 +13,7 @@ from PySide6.QtCore import Qt, QTimer
 
 from app.ui.base_page import BasePage
 from app.pages.setting import SETTINGS
-from app.utils import emailer  # settings.json의 [email] 사용
+from app.utils import emailer, outbox, attach_encoder  # settings.json의 [email] 사용
 
 try:
     from app.components.footer_bar import TriButton  # type: ignore
@@ -92,6 +92,21 @@ def _prepare_named_copy_to_jpg_dir(session: dict) -> Optional[str]:
     except Exception:
         return None
 
+def _file_sha1(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except Exception:
+        return os.path.basename(path)
+
+def _attachment_budget(cfg: dict) -> int:
+    """고객 첨부 용량 예산(바이트). settings email.customer.attachment_max_kb, 없으면 attach_encoder 기본값."""
+    try:
+        kb = float((cfg.get("customer", {}) or {}).get("attachment_max_kb") or 0)
+    except Exception:
+        kb = 0
+    return int(kb * 1024) if kb > 0 else attach_encoder.DEFAULT_MAX_BYTES
+
 def _load_email_config() -> dict:
     return emailer.load_email_config()
 
@@ -189,6 +204,7 @@ class EmailSendPage(BasePage):
                 self.footer.set_prev_mode(TriButton.MODE_HIDDEN)
         except Exception:
             pass
+        emailer.prewarm_smtp()  # 주소 입력하는 동안 SMTP 연결/로그인을 미리(백그라운드)
 
     def resizeEvent(self, e):
         super().resizeEvent(e)
@@ -326,7 +342,7 @@ QProgressBar::chunk{{background:{p}; border-radius:{r}px;}}
 
     # ───────────── email send
     def _on_send_email(self):
-        """첨부를 C:\\PhotoBox\\JPG에 저장 후 발송. 성공 시 자동 이동."""
+        """첨부를 C:\\PhotoBox\\JPG에 저장 후 아웃박스에 등록. 등록되면 자동 이동(발송은 백그라운드)."""
         def ui_update(text=None, pct=None):
             if text is not None:
                 self.msg_email.setText(str(text))
@@ -364,28 +380,30 @@ QProgressBar::chunk{{background:{p}; border-radius:{r}px;}}
         cfg = _load_email_config()
         subj, body = _format_subject_body(cfg, self.session, _today_yymmdd())
 
-        # 발송
+        # 발송: 아웃박스(스풀)에 넣고 바로 반환 → SMTP 지연/오프라인이어도 화면이 멈추지 않음
+        #  - 같은 사진/수신자/제목은 한 통(dedup_key) → 연속 터치 중복 방지
         ok_all, first_err = True, None
+        digest = _file_sha1(attach_path)
+        mids = []
+        budget = _attachment_budget(cfg)
         n = len(recips)
         for i, to in enumerate(recips, 1):
-            ui_update(f"메일 발송 중… ({i}/{n})", 40 + int(55 * i / n))
+            ui_update(f"메일 발송 요청 중… ({i}/{n})", 40 + int(55 * i / n))
             try:
-                # emailer.send_email(to=…, subject=…, body=…, attachments=[…], config=…)
-                emailer.send_email(
-                    to=to,
-                    subject=subj,
-                    body=body,
-                    attachments=[attach_path],
-                    config=cfg,
-                )
+                mids.append(outbox.enqueue(
+                    to, subj, body, [attach_path],
+                    config=cfg, dedup_key=f"customer|{digest}|{to}|{subj}", tag="customer",
+                    attachment_max_bytes=budget,
+                ))
             except Exception as e:
                 ok_all = False
                 if first_err is None:
                     first_err = str(e)
+        self.session["email_message_ids"] = mids
 
         # 결과 및 내비게이션
         if ok_all:
-            ui_update(f"성공: {attach_label} 발송 완료", 100)
+            ui_update(f"성공: {attach_label} 발송 요청 완료", 100)
             # 이벤트 루프 한 틱 후 내비게이션
             QTimer.singleShot(120, self._navigate_enhance)
         else:
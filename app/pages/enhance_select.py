@@ -25,7 +25,7 @@ from PySide6.QtWidgets import (
 
 from app.ui.base_page import BasePage
 from app.pages.setting import SETTINGS
-from app.utils import storage, emailer
+from app.utils import storage, emailer, finish_queue, outbox, raster_print, job_catalog
 from app.components.footer_bar import TriButton
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -35,6 +35,10 @@ TEXT_DARK = "#333333"
 ROOT_DIR = r"C:\\PhotoBox"
 EDITED_JPG = os.path.join(ROOT_DIR, "edited_photo.jpg")   # 인화 소스 고정(edited)
 ORIGIN_JPG = os.path.join(ROOT_DIR, "origin_photo.jpg")   # 보정 소스 고정(origin)
+# 인쇄 경로: "raster" = 4×6 페이지 래스터를 QPrinter로 직접 → 실패 시 Sumatra/Qt PDF
+#            "pdf"    = 기존 PDF 경로만(Sumatra → QPdfDocument)
+#   보관/메일 PDF는 어느 쪽이든 storage.PDF_WRITER(기본 dct) — 래스터는 메모리에만 둔다.
+PRINT_PATH = str(os.environ.get("PRINT_PATH", "raster")).strip().lower()
 
 # ────────────────────────────────────────────────────────────────────────────────
 # 로깅
@@ -238,6 +242,12 @@ def _print_with_qt(pdf_path: str, printer_name: str) -> bool:
         _log(f"Print:Qt exception err={e}")
         return False
 
+def _print_with_raster(page: QImage, printer_name: str) -> bool:
+    _log(f"Print:Raster start printer='{printer_name}' size={page.width()}x{page.height()}")
+    ok = raster_print.print_image(page, printer_name)
+    _log(f"Print:Raster result={ok}")
+    return ok
+
 def _try_print_to_named_printer(pdf_path: str, printer_name: str) -> bool:
     _log(f"Print:try printer='{printer_name}' pdf='{pdf_path}'")
     if _print_with_sumatra(pdf_path, printer_name):
@@ -321,15 +331,17 @@ def _finalize_pdf_to_photobox(pdf_tmp_path: str, session: dict) -> str:
         _log(f"FinalizePDF:exception fallback -> {pdf_tmp_path} err={e}")
         return pdf_tmp_path
 
-def _prepare_origin_copy_to_photobox(session: dict) -> Optional[str]:
-    if not os.path.isfile(ORIGIN_JPG):
+def _prepare_origin_copy_to_photobox(session: dict, src: str = ORIGIN_JPG) -> Optional[str]:
+    if not src or not os.path.isfile(src):
         _log("OriginCopy:missing origin_photo.jpg")
         return None
     jpg_dir = _ensure_dir(os.path.join(ROOT_DIR, "JPG"))
     dst = os.path.join(jpg_dir, _target_origin_basename(session))
     try:
-        shutil.copyfile(ORIGIN_JPG, dst)
+        shutil.copyfile(src, dst)
         _log(f"OriginCopy:copied to {dst}")
+        name, number = job_catalog.session_keys(session)
+        job_catalog.record_artifact("origin_jpg", dst, name=name, number=number)
         return dst
     except Exception as e:
         _log(f"OriginCopy:failed err={e}")
@@ -378,6 +390,179 @@ def _send_email_compat(to_addr: str, subject: str, body: str, attachments: List[
         _log(f"EmailCompat:error {e}")
         raise
 
+# ────────────────────────────────────────────────────────────────────────────────
+# 마무리 작업 단계(finish_queue 워커 스레드에서 실행, 입력은 작업 디렉터리 스냅숏)
+# ────────────────────────────────────────────────────────────────────────────────
+_JOB_SESSION_KEYS = ("name", "phone", "number", "ratio", "size_key", "photo_mm")
+
+def _photo_printer_name(cfg_all: dict) -> str:
+    cfg_name = (((cfg_all.get("printer") or {}).get("photo") or {}).get("name")) \
+               or ((cfg_all.get("photo_printer") or {}).get("name")) or ""
+    printer_name = "Canon G500 series"
+    if cfg_name and ("canon" in cfg_name.lower()) and ("g500" in cfg_name.lower()):
+        printer_name = cfg_name
+    _log(f"Print:using printer='{printer_name}' (cfg='{cfg_name}')")
+    return printer_name
+
+def _send_to_recipients(label: str, recipients: List[str], subject: str, body: str,
+                        attachments: List[str], out: dict, job_id: Optional[str] = None) -> None:
+    """남은 수신자 전체를 한 통(SMTP 트랜잭션 하나, RCPT 여러 개)으로 아웃박스에 등록. 실패 시 수신자별 직접 발송.
+    성공한 수신자는 out["sent"]에 남겨 재시도 때 다시 보내지 않는다."""
+    email_cfg = emailer.load_email_config()  # 정규화된 이메일 설정
+    sent = out.setdefault("sent", [])
+    mids = out.setdefault("message_ids", {})
+    errors = []
+    pending = [to for to in recipients if to not in sent]
+    _log(f"Email:{label} recipients={recipients} pending={pending} subj={subject!r}")
+    if not pending:
+        return
+    try:
+        mid = outbox.enqueue(pending, subject, body, attachments, config=email_cfg, tag=label,
+                             dedup_key=f"{job_id}|{label}|{','.join(pending)}" if job_id else None)
+        _log(f"Email:{label} to={pending} queued id={mid}")
+        for to in pending:
+            mids[to] = mid
+            sent.append(to)
+        return
+    except Exception as e:
+        _log(f"Email:{label} outbox failed -> direct err={e}")
+    for to in pending:
+        try:
+            res = _send_email_compat(to_addr=to, subject=subject, body=body,
+                                     attachments=attachments, email_cfg=email_cfg)
+            ok = getattr(res, "ok", True)
+            _log(f"Email:{label} to={to} result={ok}")
+            if ok:
+                sent.append(to)
+            else:
+                errors.append(f"{to}: {getattr(res, 'error', 'failed')}")
+        except Exception as e:
+            _log(f"Email:{label} to={to} exception err={e}")
+            errors.append(f"{to}: {e}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+def _load_print_source(job: dict) -> Tuple[dict, QImage, str, str, tuple]:
+    """(세션 사본, 편집본 이미지, 경로, size_key, photo_mm)."""
+    session = dict(job["payload"].get("session") or {})
+    src = job["files"].get("edited")
+    if not src:
+        _log("LoadImage:edited_photo.jpg not found")
+        raise FileNotFoundError("edited_photo.jpg")
+    img = QImage(src)
+    _log(f"LoadImage path={src} isNull={img.isNull()}")
+    if img.isNull():
+        raise RuntimeError(f"image load failed: {src}")
+    size_key = session.get("size_key") or "ID_30x40"
+    photo_mm = tuple(session.get("photo_mm") or storage.SIZES_MM.get(size_key, (30, 40)))
+    return session, img, src, size_key, photo_mm
+
+def _step_build_pdf(job: dict, out: dict) -> None:
+    session, img, src, size_key, photo_mm = _load_print_source(job)
+    _log(f"BuildPDF call size_key={size_key} photo_mm={photo_mm} path={PRINT_PATH}")
+    tmp_pdf = storage.build_tiled_pdf(
+        image=img,
+        session=session,
+        size_key=size_key,
+        photo_mm=photo_mm,
+        source_path=src,
+        print_page=(PRINT_PATH == "raster"),
+    )
+    final_pdf_path = _finalize_pdf_to_photobox(tmp_pdf, session)
+    job_catalog.move_artifact(tmp_pdf, final_pdf_path)
+    pb = session.get("pdf_build") or {}
+    _log(f"BuildPDF done tmp={tmp_pdf} -> final={final_pdf_path} "
+         f"ms={pb.get('ms')} cache={pb.get('cache')} key={pb.get('key')} "
+         f"writer={pb.get('writer')} bytes={pb.get('bytes')}")
+    out.update(pdf_path=final_pdf_path, pdf_build=pb, print_page=session.get("print_page"))
+
+def _print_page(job: dict) -> QImage:
+    """build_pdf 단계가 만든 페이지 래스터(메모리) → 없으면(재시작 등) 편집본에서 다시 그림."""
+    key = ((job["results"].get("build_pdf") or {}).get("print_page") or {}).get("key")
+    page = storage.cached_print_page(key)
+    if page is None:
+        session, img, src, _, photo_mm = _load_print_source(job)
+        page = storage.render_print_page(img, session, photo_mm=photo_mm, source_path=src)
+    return page
+
+def _step_print(job: dict, out: dict) -> None:
+    pdf_path = job["results"]["build_pdf"]["pdf_path"]
+    printer_name = _photo_printer_name(_load_settings())
+    ok_print = False
+    if PRINT_PATH == "raster":
+        try:
+            ok_print = _print_with_raster(_print_page(job), printer_name)
+        except Exception as e:
+            _log(f"Print:Raster exception err={e}")
+        out["via"] = "raster" if ok_print else "pdf"
+    ok_print = ok_print or _try_print_to_named_printer(pdf_path, printer_name)
+    _log(f"Print:result ok={ok_print}")
+    if not ok_print:
+        raise RuntimeError(f"print failed printer='{printer_name}'")
+    out["printer"] = printer_name
+
+def _step_notify_print(job: dict, out: dict) -> None:
+    cfg_all = _load_settings()
+    rec_p = _recips_printer(cfg_all)
+    if not rec_p:
+        out["recipients"] = []
+        return
+    pdf_path = job["results"]["build_pdf"]["pdf_path"]
+    session = job["payload"].get("session") or {}
+    pm_cfg = ((cfg_all.get("email") or {}).get("print_manager") or {})
+    tokens = dict(job["payload"].get("tokens") or {})
+    tokens["filename"] = os.path.basename(pdf_path)
+    subj_fallback, body_fallback = _render_printer_mail_default(session, pdf_path)
+    subj_p, body_p = _render_with_settings(pm_cfg, tokens, (subj_fallback, body_fallback))
+    out["recipients"] = rec_p
+    _send_to_recipients("printer", rec_p, subj_p, body_p, [pdf_path], out, job.get("id"))
+
+def _step_notify_retouch(job: dict, out: dict) -> None:
+    session = job["payload"].get("session") or {}
+    jpg_path = out.get("jpg_path") or _prepare_origin_copy_to_photobox(session, job["files"].get("origin", ""))
+    if not jpg_path:
+        raise FileNotFoundError("origin_photo.jpg")
+    out["jpg_path"] = jpg_path
+    cfg_all = _load_settings()
+    rec_r = _recips_retouch(cfg_all)
+    if not rec_r:
+        out["recipients"] = []
+        return
+    rm_cfg = ((cfg_all.get("email") or {}).get("retouch_manager") or {})
+    tokens = dict(job["payload"].get("tokens") or {})
+    tokens["filename"] = os.path.basename(jpg_path)
+    subj_fallback, body_fallback = _render_retouch_mail_default(session, jpg_path)
+    subj_r, body_r = _render_with_settings(rm_cfg, tokens, (subj_fallback, body_fallback))
+    out["recipients"] = rec_r
+    _send_to_recipients("retouch", rec_r, subj_r, body_r, [jpg_path], out, job.get("id"))
+
+_FINISH_STEPS = [
+    finish_queue.Step("build_pdf", _step_build_pdf, attempts=2),
+    finish_queue.Step("print", _step_print, attempts=2, requires=("build_pdf",)),
+    finish_queue.Step("notify_print", _step_notify_print, attempts=5, requires=("build_pdf",)),
+    finish_queue.Step("notify_retouch", _step_notify_retouch, attempts=5),
+]
+finish_queue.register("finish", _FINISH_STEPS)
+
+def _run_finish_inline(payload: dict, steps: List[str], update) -> Tuple[bool, str]:
+    """큐를 쓸 수 없을 때의 폴백: 같은 단계를 원본 파일로 순서대로 한 번씩 실행."""
+    job = {"payload": payload, "files": {"edited": EDITED_JPG, "origin": ORIGIN_JPG}, "results": {}}
+    defs = {s.name: s for s in _FINISH_STEPS}
+    failed = []
+    for i, name in enumerate(steps):
+        step = defs[name]
+        if any(r in failed for r in step.requires):
+            failed.append(name)
+            continue
+        update(f"{name}…", int(100 * i / max(1, len(steps))))
+        try:
+            step.fn(job, job["results"].setdefault(name, {}))
+        except Exception as e:
+            _log(f"Finish:inline step={name} failed err={e}")
+            failed.append(name)
+    update("정리 중…", 100)
+    return (not failed), ("OK" if not failed else f"failed={failed}")
+
 # ────────────────────────────────────────────────────────────────────────────────
 # UI 페이지
 # ────────────────────────────────────────────────────────────────────────────────
@@ -499,6 +684,7 @@ class EnhanceSelectPage(BasePage):
             self.footer.set_next_mode(TriButton.MODE_HIDDEN)
         except Exception:
             pass
+        emailer.prewarm_smtp()  # 인화/보정 알림 메일용 SMTP 연결을 미리(백그라운드)
 
     # ────────────────────────────────────────────────────────────────────────
     # 진행 다이얼로그
@@ -537,118 +723,30 @@ class EnhanceSelectPage(BasePage):
         if not self.chk_print.isChecked() and not self.chk_pro.isChecked():
             return self._go_outro()
 
-        def work(update):
-            cfg_all = _load_settings()
-            email_cfg = emailer.load_email_config()  # 정규화된 이메일 설정
-
-            # 공통 토큰
-            name  = (self.session.get("name") or "noname").strip()
-            size_key = self.session.get("size_key") or "ID_30x40"
-            tokens_base = {
-                "name": name,
-                "size_key": size_key,
+        # 마무리 작업은 백그라운드 큐에 넣고 바로 아웃트로로 이동(PDF/인화/메일은 finish_queue 워커가 처리)
+        steps: List[str] = []
+        if self.chk_print.isChecked():
+            steps += ["build_pdf", "print", "notify_print"]
+        if self.chk_pro.isChecked():
+            steps += ["notify_retouch"]
+        payload = {
+            "session": {k: self.session.get(k) for k in _JOB_SESSION_KEYS if self.session.get(k) is not None},
+            "tokens": {
+                "name": (self.session.get("name") or "noname").strip(),
+                "size_key": self.session.get("size_key") or "ID_30x40",
                 "date": _today(),
                 "timestamp": _now_stamp(),
-            }
-
-            # 1) 인화(출력담당)
-            if self.chk_print.isChecked():
-                update("인화: 소스 이미지 여는 중…", 5)
-                if not os.path.isfile(EDITED_JPG):
-                    _log("LoadImage:edited_photo.jpg not found")
-                    update("edited_photo.jpg 없음. 인화 작업 생략.", 25)
-                else:
-                    img = QImage(EDITED_JPG)
-                    _log(f"LoadImage path={EDITED_JPG} isNull={img.isNull()}")
-                    if img.isNull():
-                        update("이미지 로드 실패. 인화 작업 생략.", 25)
-                    else:
-                        update("타일 PDF 생성 중…", 35)
-                        photo_mm = tuple(self.session.get("photo_mm") or storage.SIZES_MM.get(size_key, (30, 40)))
-                        _log(f"BuildPDF call size_key={size_key} photo_mm={photo_mm}")
-                        tmp_pdf = storage.build_tiled_pdf(
-                            image=img,
-                            session=self.session,
-                            size_key=size_key,
-                            photo_mm=photo_mm,
-                        )
-                        final_pdf_path = _finalize_pdf_to_photobox(tmp_pdf, self.session)
-                        self.session["pdf_path"] = final_pdf_path
-                        _log(f"BuildPDF done tmp={tmp_pdf} -> final={final_pdf_path}")
-                        update("PDF 저장 완료", 55)
-
-                        # 인쇄(선택)
-                        cfg_name = (((cfg_all.get("printer") or {}).get("photo") or {}).get("name")) \
-                                   or ((cfg_all.get("photo_printer") or {}).get("name")) or ""
-                        printer_name = "Canon G500 series"
-                        if cfg_name and ("canon" in cfg_name.lower()) and ("g500" in cfg_name.lower()):
-                            printer_name = cfg_name
-                        _log(f"Print:using printer='{printer_name}' (cfg='{cfg_name}')")
-                        update("인쇄 중…", 70)
-                        ok_print = _try_print_to_named_printer(final_pdf_path, printer_name)
-                        _log(f"Print:result ok={ok_print}")
-                        update("인쇄 완료", 75)
-
-                        # 출력담당 메일
-                        rec_p = _recips_printer(cfg_all)
-                        if rec_p:
-                            update("출력담당 메일 발송 중…", 85)
-                            pm_cfg = ((cfg_all.get("email") or {}).get("print_manager") or {})
-                            tokens = dict(tokens_base)
-                            tokens["filename"] = os.path.basename(final_pdf_path)
-
-                            subj_fallback, body_fallback = _render_printer_mail_default(self.session, final_pdf_path)
-                            subj_p, body_p = _render_with_settings(pm_cfg, tokens, (subj_fallback, body_fallback))
-
-                            _log(f"Email:printer recipients={rec_p} subj={subj_p!r}")
-                            for to in rec_p:
-                                try:
-                                    res = _send_email_compat(
-                                        to_addr=to,
-                                        subject=subj_p,
-                                        body=body_p,
-                                        attachments=[final_pdf_path],
-                                        email_cfg=email_cfg,
-                                    )
-                                    _log(f"Email:printer to={to} result={getattr(res, 'ok', True)}")
-                                except Exception as e:
-                                    _log(f"Email:printer to={to} exception err={e}")
-                        update("인화 작업 완료", 90)
-
-            # 2) 전문가 보정(보정담당)
-            if self.chk_pro.isChecked():
-                update("보정: 원본 준비 중…", 92)
-                jpg_path = _prepare_origin_copy_to_photobox(self.session)
-                if jpg_path:
-                    rec_r = _recips_retouch(cfg_all)
-                    if rec_r:
-                        update("보정담당 메일 발송 중…", 95)
-                        rm_cfg = ((cfg_all.get("email") or {}).get("retouch_manager") or {})
-                        tokens = dict(tokens_base)
-                        tokens["filename"] = os.path.basename(jpg_path)
-
-                        subj_fallback, body_fallback = _render_retouch_mail_default(self.session, jpg_path)
-                        subj_r, body_r = _render_with_settings(rm_cfg, tokens, (subj_fallback, body_fallback))
-
-                        _log(f"Email:retouch recipients={rec_r} subj={subj_r!r}")
-                        for to in rec_r:
-                            try:
-                                res = _send_email_compat(
-                                    to_addr=to,
-                                    subject=subj_r,
-                                    body=body_r,
-                                    attachments=[jpg_path],
-                                    email_cfg=email_cfg,
-                                )
-                                _log(f"Email:retouch to={to} result={getattr(res, 'ok', True)}")
-                            except Exception as e:
-                                _log(f"Email:retouch to={to} exception err={e}")
-                        update("보정 작업 완료", 98)
-
-            update("정리 중…", 100)
-            return True, "OK"
-
-        self._run_with_progress(work)
+            },
+        }
+        try:
+            job_id = finish_queue.enqueue("finish", payload, files={"edited": EDITED_JPG, "origin": ORIGIN_JPG},
+                                          steps=steps)
+            self.session["finish_job_id"] = job_id
+            _log(f"Finish:enqueued job={job_id} steps={steps}")
+        except Exception as e:
+            # 저널을 쓸 수 없으면(디스크 오류 등) 같은 단계를 이 자리에서 동기 실행
+            _log(f"Finish:enqueue failed -> inline err={e}")
+            self._run_with_progress(lambda update: _run_finish_inline(payload, steps, update))
         return self._go_outro()
 
     # ────────────────────────────────────────────────────────────────────────
@@ -207,6 +207,11 @@ class OutroPage(QWidget):
         except Exception:
             pass
         _safe_rmtree(job_dir)
+        try:
+            from app.utils import retouch_prefetch
+            retouch_prefetch.reset()
+        except Exception:
+            pass
         _safe_unlink(os.path.join(PHOTOBOX_ROOT, "origin_photo.jpg"))
         _safe_unlink(os.path.join(PHOTOBOX_ROOT, "edited_photo.jpg"))
 
@@ -241,6 +241,13 @@ class PickPhotoPage(BasePage):
             self.session["selected_origin_path"] = os.path.join(PHOTOBOX_ROOT, "origin_photo.jpg")
         except Exception:
             pass
+        # 선택한 사진의 추측 AI 보정을 먼저 처리하도록 올린다
+        try:
+            from app.utils import retouch_prefetch
+            raw_dir = self.session.get("raw_dir") or os.path.join(PHOTOBOX_ROOT, "raw")
+            retouch_prefetch.promote(os.path.join(raw_dir, self.session.get("selected_raw_name", "")))
+        except Exception:
+            pass
 
     def reset_selection(self) -> None:
         self.selected_idx = None
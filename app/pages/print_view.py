@@ -524,13 +524,49 @@ class _PSActionWorker(QObject):
 # ─────── AI 전처리 워커(비동기) ───────
 class _AIWorker(QObject):
     finished = Signal(bool, str)  # ok, message
+    progress = Signal(str, int)   # stage, pct
+    PREFETCH_WAIT_S = 60.0        # 진행 중인 추측 보정 대기 상한
 
-    def __init__(self, origin_path: str, ai_out_path: str, ratio_code: str, eye_strength: float = 0.4):
+    def __init__(self, origin_path: str, ai_out_path: str, ratio_code: str, eye_strength: float | None = None,
+                 use_process: bool = True, graph_params: dict | None = None, lookup_only: bool = False):
         super().__init__()
         self.origin_path = origin_path
         self.ai_out_path = ai_out_path
         self.ratio_code = ratio_code  # "3040" / "3545"
-        self.eye_strength = float(eye_strength)
+        self.eye_strength = None if eye_strength is None else float(eye_strength)  # None = 파이프라인 기본(AI_EYE_STRENGTH)
+        self.use_process = bool(use_process)  # 별도 워커 프로세스 사용(크래시 격리)
+        self.graph_params = graph_params      # 조정 재렌더(retouch_graph) 파라미터, None이면 최초 보정
+        self.lookup_only = bool(lookup_only)  # 프리페치/디스크 캐시만 즉시 조회(기다리지 않고, 미적중이면 "miss")
+
+    def _params(self, ratio) -> dict:
+        """리터치 파라미터(eye_strength 는 지정했을 때만 → 프리페치/디스크 캐시 키와 같은 기본값)."""
+        params = {"ratio": ratio}
+        if self.eye_strength is not None:
+            params["eye_strength"] = self.eye_strength
+        return params
+
+    def _run_in_process(self, ratio) -> bool | None:
+        """리터치 워커 프로세스에서 실행한다. 워커를 띄울 수 없으면 None(인프로세스 폴백)."""
+        from app.utils import retouch_worker as RW
+        res = RW.run_file(self.origin_path, self.ai_out_path, params=self._params(ratio),
+                          progress=lambda stage, pct: self.progress.emit(stage, pct))
+        if not res.ok and res.message == "worker unavailable":
+            return None
+        _log(f"_AIWorker worker-process ok={res.ok} msg={res.message} {res.elapsed_ms:.0f}ms")
+        return bool(res.ok)
+
+    def _run_graph(self, ratio) -> tuple[bool, str]:
+        """조정 재렌더: 워커(또는 인프로세스)의 retouch_graph 메모를 재사용해 바뀐 단계만 다시 계산한다."""
+        params = dict(self.graph_params or {}, **self._params(ratio))
+        emit = lambda stage, pct: self.progress.emit(stage, pct)
+        if self.use_process:
+            from app.utils import retouch_worker as RW
+            res = RW.run_graph(self.origin_path, self.ai_out_path, params, progress=emit)
+            if res.message != "worker unavailable":
+                _log(f"_AIWorker graph ok={res.ok} msg={res.message} {res.elapsed_ms:.0f}ms")
+                return bool(res.ok), f"graph {res.message}"
+        from app.utils import retouch_graph as RG
+        return RG.render_file(self.origin_path, self.ai_out_path, params, progress=emit), "graph in-process"
 
     def run(self):
         import os, shutil, importlib
@@ -547,17 +583,57 @@ class _AIWorker(QObject):
             # 세션 ratio 코드 → (3,4)/(7,9)
             ratio = (3, 4) if str(self.ratio_code).strip() == "3040" else (7, 9)
 
+            # 조정 재렌더는 프리페치/디스크 캐시 대신 증분 그래프로
+            if self.graph_params is not None:
+                ok, msg = self._run_graph(ratio)
+                self.finished.emit(bool(ok and os.path.exists(self.ai_out_path)), msg)
+                return
+
+            # 촬영 직후 추측 보정 결과가 있으면 그대로 사용(진입 조회는 즉시, 원본 해상도 렌더는 진행 중이면 완료까지 대기)
+            try:
+                from app.utils import retouch_prefetch
+                wait_s = 0.0 if self.lookup_only else self.PREFETCH_WAIT_S
+                hit = retouch_prefetch.claim(self.origin_path, self._params(ratio), timeout=wait_s)
+                if hit:
+                    os.makedirs(os.path.dirname(self.ai_out_path) or ".", exist_ok=True)
+                    shutil.copy2(hit, self.ai_out_path)
+                    self.finished.emit(True, "prefetch hit")
+                    return
+            except Exception as e:
+                _log(f"_AIWorker prefetch err: {e}")
+
+            # 진입 조회: 디스크 캐시(같은 원본/파라미터의 이전 결과)까지만 보고 계산은 미리보기 이후로 미룬다
+            if self.lookup_only:
+                try:
+                    if AIR.fetch_cached(self.origin_path, self.ai_out_path, ratio=ratio, eye_strength=self.eye_strength):
+                        self.finished.emit(True, "cache hit")
+                        return
+                except Exception as e:
+                    _log(f"_AIWorker cache err: {e}")
+                self.finished.emit(False, "miss")
+                return
+
+            # 워커 프로세스 우선(실패/크래시 시 원본 복사 폴백), 워커 기동 불가 시에만 인프로세스
+            ok = None
+            if self.use_process:
+                try:
+                    ok = self._run_in_process(ratio)
+                except Exception as e:
+                    _log(f"_AIWorker worker-process err: {e}")
+                    ok = None
+
             # ? 고정 시그니처 호출(구버전 호환 인자 없음)
-            ok = False
             try:
-                ok = bool(AIR.process_file(
-                    self.origin_path,
-                    self.ai_out_path,
-                    ratio=ratio,
-                    face_align_mode="local",
-                    shoulder_strength=1.0,
-                    eye_balance=False,
-                ))
+                if ok is None:
+                    ok = bool(AIR.process_file(
+                        self.origin_path,
+                        self.ai_out_path,
+                        ratio=ratio,
+                        face_align_mode="local",
+                        shoulder_strength=1.0,
+                        eye_balance=False,
+                        eye_strength=self.eye_strength,
+                    ))
             except Exception as e:
                 _log(f"_AIWorker process_file err: {e}")
                 ok = False
@@ -577,6 +653,42 @@ class _AIWorker(QObject):
             self.finished.emit(False, f"worker error: {e}")
 
 
+# ─────── AI 미리보기 워커(화면 크기 프록시, 비동기) ───────
+class _AIPreviewWorker(QObject):
+    finished = Signal(object, int, float)  # QImage|None, seq, ms
+
+    def __init__(self, origin_path: str, params: dict, seq: int, use_process: bool = True):
+        super().__init__()
+        self.origin_path = origin_path
+        self.params = dict(params)  # ratio/eye_strength
+        self.seq = int(seq)
+        self.use_process = bool(use_process)  # 랜드마크 검출은 워커 프로세스에서(GUI 프로세스 GIL/네이티브 크래시 격리)
+
+    def _render(self):
+        """프록시 BGR. 워커 우선, 워커를 띄울 수 없을 때만 인프로세스."""
+        if self.use_process:
+            from app.utils import retouch_worker as RW
+            res = RW.run_preview(self.origin_path, self.params)
+            if res.message != "worker unavailable":
+                if not res.ok:
+                    _log(f"_AIPreviewWorker worker msg={res.message}")
+                return res.pixels if res.ok else None
+        from app.utils import retouch_graph as RG
+        return RG.render_preview(self.origin_path, self.params)
+
+    def run(self):
+        t0 = time.perf_counter()
+        qi = None
+        try:
+            from app.utils import qimage_bridge as QB
+            bgr = self._render()
+            if bgr is not None:
+                qi = QB.to_qimage(bgr, "BGR")  # 자체 버퍼 소유 → 시그널로 GUI 스레드 전달 안전
+        except Exception as e:
+            _log(f"_AIPreviewWorker err: {e}")
+        self.finished.emit(qi, self.seq, (time.perf_counter() - t0) * 1000.0)
+
+
 
 
 
@@ -708,6 +820,18 @@ class PrintViewPage(BasePage):
         self._act_worker: _PSActionWorker|None = None
         self._ai_thread: QThread|None = None
         self._ai_worker: _AIWorker|None = None
+        self._ai_graph: dict = {}                 # 조정 재렌더 파라미터(eye_strength), 진입마다 초기화
+        self._ai_graph_pending = False            # 재렌더 중 들어온 조정(완료 후 1회 재실행)
+        self._ai_graph_dirty = False              # 최초 보정 이후 파라미터가 바뀌었는지(원본 해상도도 그래프로)
+        self._ai_preview_thread: QThread|None = None
+        self._ai_preview_seq = 0
+        self._ai_preview_pending = False
+        self._ai_full_after_lookup = False        # 진입 조회 미적중: 조회 스레드가 끝나면 원본 해상도 렌더
+        self._preview_image = None                # 프록시 미리보기 QImage(리사이즈 재표시용)
+        # 조정 이후 원본 해상도 렌더는 파라미터가 안정된 뒤(또는 적용 시) 시작
+        self._ai_full_timer = QTimer(self); self._ai_full_timer.setSingleShot(True)
+        self._ai_full_timer.setInterval(int(_deep_get(self.config, "ai.full_render_settle_ms", 1200)))
+        self._ai_full_timer.timeout.connect(self._start_full_render)
 
         # UI
         root = QWidget(self)
@@ -730,6 +854,9 @@ class PrintViewPage(BasePage):
         self._btn_original.pressed.connect(lambda: self._show_original(True))
         self._btn_original.released.connect(lambda: self._show_original(False))
         mb.addWidget(self._btn_original, 0, Qt.AlignRight)
+        self._btn_eye = QPushButton("눈 보정", mid); self._btn_eye.setObjectName("midbtn"); self._btn_eye.setCheckable(True); self._btn_eye.setChecked(True)
+        self._btn_eye.toggled.connect(lambda on: self.rerender_ai(eye_strength=None if on else 0.0))
+        mb.addWidget(self._btn_eye, 0, Qt.AlignRight)
         self._btn_apply = QPushButton("적용하기", mid); self._btn_apply.setObjectName("midbtn"); self._btn_apply.clicked.connect(self.on_apply); mb.addWidget(self._btn_apply, 0, Qt.AlignRight)
         v.addWidget(mid, 0, Qt.AlignRight)
 
@@ -891,7 +1018,7 @@ class PrintViewPage(BasePage):
             font-size: {fs_btn}px;
         }}
         QPushButton#midbtn:hover {{ background: {hov}; color: {c}; }}
-        QPushButton#midbtn:pressed {{ background: {c}; color: #FFFFFF; }}
+        QPushButton#midbtn:pressed, QPushButton#midbtn:checked {{ background: {c}; color: #FFFFFF; }}
         QWidget#retouchUI {{}}
         """
 
@@ -971,15 +1098,17 @@ class PrintViewPage(BasePage):
                     if os.path.exists(self.AI_ORIGIN):
                         try: self._ai_entry_timer.stop()
                         except Exception: pass
-                        self._set_preview(self.AI_ORIGIN)
+                        if not self._ai_graph_dirty:  # 조정 이후면 재렌더 완료 때 교체
+                            self._set_preview(self.AI_ORIGIN)
                         self._overlay_hide_if_free()
                 except Exception:
                     pass
             self._ai_entry_timer.timeout.connect(_tick)
             self._ai_entry_timer.start()
 
-            # 동시에 생성 작업 시작
-            self._start_ai_origin_build()
+            # 프리페치/디스크 캐시 즉시 조회와 프록시 미리보기를 함께 시작(적중하면 원본 해상도 결과가 프록시를 대신한다)
+            self._start_ai_origin_build(lookup_only=True)
+            self._start_ai_preview()
         except Exception:
             pass
 
@@ -987,20 +1116,30 @@ class PrintViewPage(BasePage):
     # ───────── Photoshop 종료 유틸 끝 ─────────
 
     #── AI 전처리 시작(비동기) ──
-    def _start_ai_origin_build(self):
+    def _start_ai_origin_build(self, rerender: bool = False, lookup_only: bool = False):
         try:
             # 중복 방지
             if self._ai_thread and isinstance(self._ai_thread, QThread) and self._ai_thread.isRunning():
+                if rerender:
+                    self._ai_graph_pending = True
                 _log("ai_origin: thread busy → skip"); return
-            ratio_code = self._ratio_code_from_session(self.session)  # "3040"/"3545"
-            eye = float(_deep_get(self.config, "ai.eye_strength", 0.4))
+            ratio_code, eye = self._ai_params()
+            use_proc = bool(_deep_get(self.config, "ai.worker_process", True))
+            graph_params = {} if rerender else None
             th = QThread(self)
-            wk = _AIWorker(self.ORIGIN_PATH, self.AI_ORIGIN, ratio_code, eye_strength=eye)
+            wk = _AIWorker(self.ORIGIN_PATH, self.AI_ORIGIN, ratio_code, eye_strength=eye, use_process=use_proc,
+                           graph_params=graph_params, lookup_only=lookup_only)
             wk.moveToThread(th)
             def _finished(ok: bool, msg: str):
                 _log(f"ai_origin: finished ok={ok} msg={msg}")
             th.started.connect(wk.run)
             wk.finished.connect(_finished)
+            if rerender:
+                wk.finished.connect(self._on_ai_rerendered)  # 바운드 메서드 → GUI 스레드
+            if lookup_only:
+                wk.finished.connect(self._on_ai_lookup)
+            th.finished.connect(self._on_ai_thread_done)
+            wk.progress.connect(self._on_ai_progress)  # 바운드 메서드 → GUI 스레드로 큐 전달
             wk.finished.connect(th.quit)
             th.finished.connect(wk.deleteLater)
             th.finished.connect(th.deleteLater)
@@ -1010,6 +1149,132 @@ class PrintViewPage(BasePage):
         except Exception as e:
             _log(f"ai_origin: start error {e}")
 
+    def _ai_params(self) -> tuple[str, float | None]:
+        """현재 AI 보정 파라미터 (ratio_code, eye_strength). eye_strength None = 파이프라인 기본값."""
+        ratio_code = self._ratio_code_from_session(self.session)  # "3040"/"3545"
+        return ratio_code, self._ai_graph.get("eye_strength")
+
+    def _reset_ai_state(self) -> None:
+        """세션 진입마다 이전 고객의 조정/미리보기 상태를 버린다(페이지는 라우터에 상주)."""
+        self._ai_graph = {}
+        self._ai_graph_dirty = False
+        self._ai_graph_pending = False
+        self._ai_preview_pending = False
+        self._ai_full_after_lookup = False
+        self._ai_preview_seq += 1  # 실행 중인 이전 미리보기 결과 무시
+        self._preview_image = None
+        self._ai_full_timer.stop()
+        timer = getattr(self, "_ai_entry_timer", None)
+        if timer is not None:
+            timer.stop()
+        self._ai_entry_watch_started = False
+        self._btn_eye.blockSignals(True); self._btn_eye.setChecked(True); self._btn_eye.blockSignals(False)
+
+    #── 파라미터 조정 재렌더(증분) ──
+    def rerender_ai(self, *, eye_strength: float | None) -> None:
+        """눈 보정 강도 조정(None = 기본값, 0 = 끔): 프록시 미리보기는 즉시, 원본 해상도는 조정이 멈춘 뒤 다시 만든다."""
+        if eye_strength is None:
+            self._ai_graph.pop("eye_strength", None)
+        else:
+            self._ai_graph["eye_strength"] = float(eye_strength)
+        self._ai_graph_dirty = True
+        self._start_ai_preview()
+        self._ai_full_timer.start()  # 재시작 = 디바운스
+
+    def _start_full_render(self):
+        """원본 해상도 렌더 시작(최초는 프리페치/디스크 캐시 경로, 조정 이후는 증분 그래프)."""
+        self._ai_full_timer.stop()
+        self._start_ai_origin_build(rerender=self._ai_graph_dirty)
+
+    def _flush_full_render(self):
+        """적용/다음 진입 시: 대기 중인 원본 해상도 렌더를 바로 시작한다."""
+        if self._ai_full_timer.isActive() or self._ai_full_after_lookup:
+            self._ai_full_after_lookup = False
+            self._start_full_render()
+
+    def _on_ai_lookup(self, ok: bool, msg: str):
+        """진입 조회 결과: 적중이면 바로 표시, 미적중이면 조회 스레드 종료 뒤 원본 해상도 렌더(조정이 있었으면 이미 예약됨).
+
+        원본 해상도 렌더는 진행 중인 추측 보정을 기다렸다가 그 결과를 쓰고, 파일이 생기면 진입 감시가 프록시와 교체한다.
+        미리보기는 별도 워커 레인이라 이 렌더 뒤에 줄 서지 않는다.
+        """
+        if ok:
+            if not self._ai_graph_dirty and self._set_preview(self.AI_ORIGIN):
+                self._overlay_hide_if_free()
+            return
+        if not self._ai_graph_dirty:
+            self._ai_full_after_lookup = True  # 조회 스레드가 아직 실행 중 → _on_ai_thread_done 에서 시작
+
+    def _on_ai_rerendered(self, ok: bool, msg: str):
+        """재렌더 완료: 미리보기 갱신(그 사이 조정이 또 들어왔으면 프록시 미리보기를 유지)."""
+        if ok and not self._ai_graph_pending and not self._ai_full_timer.isActive():
+            self._set_preview(self.AI_ORIGIN)
+
+    #── 프록시 미리보기(비동기) ──
+    def _start_ai_preview(self):
+        """현재 파라미터로 화면 크기 프록시 결과를 만든다(실행 중이면 끝난 뒤 최신 파라미터로 1회 더)."""
+        try:
+            if self._ai_preview_thread is not None and self._ai_preview_thread.isRunning():
+                self._ai_preview_pending = True
+                return
+            ratio_code, eye = self._ai_params()
+            params = {"ratio": (3, 4) if ratio_code == "3040" else (7, 9)}
+            if eye is not None:
+                params["eye_strength"] = eye
+            self._ai_preview_seq += 1
+            th = QThread(self)
+            wk = _AIPreviewWorker(self.ORIGIN_PATH, params, self._ai_preview_seq,
+                                  use_process=bool(_deep_get(self.config, "ai.worker_process", True)))
+            wk.moveToThread(th)
+            th.started.connect(wk.run)
+            wk.finished.connect(self._on_ai_preview)  # 바운드 메서드 → GUI 스레드
+            wk.finished.connect(th.quit)
+            th.finished.connect(wk.deleteLater)
+            th.finished.connect(th.deleteLater)
+            th.finished.connect(self._on_ai_preview_thread_done)
+            self._ai_preview_thread = th
+            self._ai_preview_worker = wk
+            th.start()
+        except Exception as e:
+            _log(f"ai_preview: start error {e}")
+
+    def _on_ai_preview(self, qi, seq: int, ms: float):
+        """프록시 결과 표시. 원본 해상도 결과가 이미 최신이면(조정 없음) 덮어쓰지 않는다."""
+        _log(f"ai_preview: seq={seq} {ms:.0f}ms ok={qi is not None}")
+        if seq != self._ai_preview_seq or qi is None:
+            return
+        if getattr(self, "_preview_current", None) == self.AI_ORIGIN and not self._ai_full_timer.isActive():
+            return
+        if self._set_preview_image(qi):
+            self._overlay_hide_if_free()
+
+    def _on_ai_preview_thread_done(self):
+        self._ai_preview_thread = None
+        self._ai_preview_worker = None
+        if self._ai_preview_pending:
+            self._ai_preview_pending = False
+            self._start_ai_preview()
+
+    def _on_ai_thread_done(self):
+        """AI 스레드 종료: 진행 중 들어온 조정이 있으면 1회 재실행."""
+        self._ai_thread = None
+        self._ai_worker = None
+        if self._ai_graph_pending:
+            self._ai_graph_pending = False
+            self._start_ai_origin_build(rerender=True)
+        elif self._ai_full_after_lookup:
+            self._ai_full_after_lookup = False
+            if not self._ai_graph_dirty and not self._ai_full_timer.isActive():
+                self._start_full_render()
+
+    def _on_ai_progress(self, stage: str, pct: int):
+        """AI 전처리 진행률을 오버레이 문구에 반영한다."""
+        try:
+            if self._overlay.isVisible() and not self._overlay_hold:
+                self._overlay.setText(f"AI 전처리 작업중... {int(pct)}%")
+        except Exception:
+            pass
+
     # ==== DoAction용 ENTER 펄스 + 파일감시/TopMost 관리 ====
     def _drop_topmost_for_enter(self):
         if self._enter_topmost_dropped: return
@@ -1268,6 +1533,8 @@ class PrintViewPage(BasePage):
 
     #── Apply 파이프라인 ──
     def on_apply(self):
+        # 확정: 대기 중인 원본 해상도 AI 렌더를 바로 시작
+        self._flush_full_render()
         # 파이프라인 전구간 오버레이 ON
         self._overlay_pipeline_start("포토샵 보정중...")
         QApplication.processEvents()
@@ -1319,7 +1586,17 @@ class PrintViewPage(BasePage):
             if pm.isNull(): return False
             r = self.preview.contentsRect()
             pix = pm.scaled(r.width(), r.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.preview_img.setGeometry(self.preview.contentsRect()); self.preview_img.setPixmap(pix); self.preview_img.show(); self._preview_current = path; return True
+            self.preview_img.setGeometry(self.preview.contentsRect()); self.preview_img.setPixmap(pix); self.preview_img.show(); self._preview_current = path; self._preview_image = None; return True
+        except Exception:
+            return False
+
+    def _set_preview_image(self, qi) -> bool:
+        """메모리 이미지(프록시 미리보기 QImage)를 표시한다."""
+        try:
+            if qi is None or qi.isNull(): return False
+            r = self.preview.contentsRect()
+            pix = QPixmap.fromImage(qi).scaled(r.width(), r.height(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.preview_img.setGeometry(r); self.preview_img.setPixmap(pix); self.preview_img.show(); self._preview_current = None; self._preview_image = qi; return True
         except Exception:
             return False
 
@@ -1344,6 +1621,7 @@ class PrintViewPage(BasePage):
         if self._overlay.isVisible(): self._overlay.setGeometry(self.rect())
         cur = getattr(self, "_preview_current", None)
         if cur: self._set_preview(cur)
+        elif self._preview_image is not None: self._set_preview_image(self._preview_image)
 
     def _toast(self, text: str, ms: int = 1200) -> None:
         try:
@@ -1370,6 +1648,7 @@ class PrintViewPage(BasePage):
 
     def before_enter(self, session) -> bool:
         self.session = session or {}
+        self._reset_ai_state()
         try:
             # 처음 진입: 이전/다음 모두 비활성
             self.set_prev_enabled(False)
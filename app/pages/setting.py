@@ -6,12 +6,13 @@ import os
 from copy import deepcopy
 from typing import Dict, Any, Optional
 
-from PySide6.QtCore import Qt, QRect, QPoint, Signal, QObject
+from PySide6.QtCore import Qt, QRect, QPoint, Signal, QObject, QTimer
 from PySide6.QtWidgets import (
     QWidget, QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QGridLayout,
     QListWidget, QListWidgetItem, QStackedWidget, QLabel, QLineEdit, QTextEdit,
     QSpinBox, QCheckBox, QPushButton, QFileDialog, QGroupBox,
-    QAbstractSpinBox, QScrollArea, QFrame, QMessageBox, QColorDialog, QSizePolicy
+    QAbstractSpinBox, QScrollArea, QFrame, QMessageBox, QColorDialog, QSizePolicy,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
 )
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QColor
@@ -134,7 +135,7 @@ class SettingDialog(QDialog):
 
         # 좌측 내비
         self.nav = QListWidget(self.panel)
-        for name in ("프로그램 정보", "경로 & 저장", "색 / 테마", "정보 입력", "포토샵 보정", "이메일 설정"):
+        for name in ("프로그램 정보", "경로 & 저장", "색 / 테마", "정보 입력", "포토샵 보정", "이메일 설정", "후처리 작업"):
             QListWidgetItem(name, self.nav)
         self.nav.setCurrentRow(0)
         self.nav.setFixedWidth(nav_w)
@@ -171,6 +172,7 @@ class SettingDialog(QDialog):
         self.stack.addWidget(self._page_input())                   # 3
         self.stack.addWidget(self._wrap_scroll(self._page_ps_retouch()))  # 4
         self.stack.addWidget(self._wrap_scroll(self._page_email()))       # 5
+        self.stack.addWidget(self._page_jobs())                    # 6
 
     # ── 포토샵 보정(= AI 라벨 + 포토샵 설정 통합) ──
     def _page_ps_retouch(self) -> QWidget:
@@ -456,6 +458,76 @@ class SettingDialog(QDialog):
         v.addWidget(g_sender); v.addWidget(box_c); v.addWidget(box_p); v.addWidget(box_r); v.addStretch(1)
         return w
 
+    # 후처리 작업(finish_queue) 상태 — 보이는 동안 주기 갱신
+    _JOB_STATE_KO = {"queued": "대기", "running": "진행 중", "done": "완료", "failed": "실패"}
+    _STEP_MARK = {"pending": "…", "running": "▶", "done": "✓", "failed": "✗", "skipped": "–"}
+
+    def _page_jobs(self) -> QWidget:
+        w = QWidget(); v = QVBoxLayout(w); v.setContentsMargins(12,12,12,12); v.setSpacing(12)
+        self.lb_jobs = QLabel("")
+        self.tbl_jobs = QTableWidget(0, 5)
+        self.tbl_jobs.setHorizontalHeaderLabels(["작업", "상태", "경과", "소요", "단계"])
+        self.tbl_jobs.verticalHeader().setVisible(False)
+        self.tbl_jobs.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tbl_jobs.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tbl_jobs.setSelectionMode(QAbstractItemView.SingleSelection)
+        hh = self.tbl_jobs.horizontalHeader()
+        for c in range(4):
+            hh.setSectionResizeMode(c, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(4, QHeaderView.Stretch)
+
+        row = QHBoxLayout(); row.setSpacing(12); row.addWidget(self.lb_jobs, 1)
+        self.chk_jobs_active = QCheckBox("진행 중만"); self.chk_jobs_active.toggled.connect(self._refresh_jobs)
+        self.btn_job_retry = QPushButton("실패 재시도"); self.btn_job_retry.clicked.connect(self._retry_job)
+        btn_refresh = QPushButton("새로고침"); btn_refresh.clicked.connect(self._refresh_jobs)
+        row.addWidget(self.chk_jobs_active); row.addWidget(self.btn_job_retry); row.addWidget(btn_refresh)
+        v.addLayout(row); v.addWidget(self.tbl_jobs, 1)
+
+        self._jobs_timer = QTimer(self); self._jobs_timer.setInterval(2000)
+        self._jobs_timer.timeout.connect(self._refresh_jobs)
+        self.nav.currentRowChanged.connect(self._on_nav_jobs)
+        return w
+
+    def _on_nav_jobs(self, row: int) -> None:
+        if self.stack.widget(row) is self.tbl_jobs.parentWidget():
+            self._refresh_jobs(); self._jobs_timer.start()
+        else:
+            self._jobs_timer.stop()
+
+    def _refresh_jobs(self, *_):
+        try:
+            from app.utils import finish_queue
+            jobs = finish_queue.status(limit=50, active_only=self.chk_jobs_active.isChecked())
+        except Exception as e:
+            self.lb_jobs.setText(f"작업 상태를 읽지 못했습니다: {e}")
+            return
+        fmt = lambda s: "-" if s is None else (f"{s:.1f}초" if s < 60 else f"{int(s // 60)}분 {int(s % 60)}초")
+        self.tbl_jobs.setRowCount(len(jobs))
+        for r, j in enumerate(jobs):
+            steps = "  ".join(f"{self._STEP_MARK.get(st, st)}{name}" + (f"({att}회)" if att > 1 else "")
+                              + (f" {ms}ms" if ms else "") for name, st, att, ms, _err in j["steps"])
+            errs = [f"{name}: {err}" for name, st, _a, _m, err in j["steps"] if err and st in ("failed", "pending", "skipped")]
+            cells = [j["id"], self._JOB_STATE_KO.get(j["state"], j["state"]), fmt(j["age_s"]), fmt(j["latency_s"]), steps]
+            for c, text in enumerate(cells):
+                it = QTableWidgetItem(str(text))
+                if errs:
+                    it.setToolTip("\n".join(errs))
+                self.tbl_jobs.setItem(r, c, it)
+        lat = sorted(j["latency_s"] for j in jobs if j["latency_s"] is not None)
+        active = sum(1 for j in jobs if j["state"] in ("queued", "running"))
+        failed = sum(1 for j in jobs if j["state"] == "failed")
+        self.lb_jobs.setText(f"진행 중 {active} · 실패 {failed}" + (f" · 소요 중앙값 {fmt(lat[len(lat) // 2])}" if lat else ""))
+
+    def _retry_job(self):
+        r = self.tbl_jobs.currentRow()
+        it = self.tbl_jobs.item(r, 0) if r >= 0 else None
+        if it is None:
+            return
+        from app.utils import finish_queue
+        if not finish_queue.retry(it.text()):
+            QMessageBox.information(self, "재시도", "실패한 작업만 다시 시도할 수 있습니다.")
+        self._refresh_jobs()
+
     # 저장
     def _on_save(self):
         d = deepcopy(SETTINGS.data)
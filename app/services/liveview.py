@@ -157,12 +157,11 @@ class _LiveViewThread(QThread):
                     if img.isNull():
                         try:
                             import numpy as np, cv2
+                            from app.utils import qimage_bridge as QB
                             arr = np.frombuffer(data, dtype=np.uint8)
                             bgr = cv2.imdecode(arr, cv2.IMREAD_COLOR)
                             if bgr is not None:
-                                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                                h_, w_, _ = rgb.shape
-                                img = QImage(rgb.data, w_, h_, 3*w_, QImage.Format_RGB888).copy()
+                                img = QB.to_qimage(bgr, "BGR")  # 색변환 없이 복사 1회
                         except Exception:
                             img = QImage()
                     if not img.isNull():
@@ -6,17 +6,26 @@
 """
 
 from __future__ import annotations
-import os, math, logging
+import os, math, time, logging
 from typing import Tuple
 import cv2
 import numpy as np
 
+from app.utils import landmarker_pool
+from app.utils import retouch_cache
+
 logger = logging.getLogger(__name__)
 
 # ?섍꼍 ?ㅼ쐞移??쒕떇媛?(湲곕낯媛??좎? 媛??
 _MAX_ROLL_DEG = float(os.environ.get("AI_MAX_ROLL_DEG", "2.0") or 2.0)   # ?쇨뎬 ?뚯쟾 理쒕? 媛곷룄(?덈?媛?
 _CROWN_ALPHA  = float(os.environ.get("AI_CROWN_ALPHA", "0.42") or 0.42)  # p10 湲곕컲 ?뺤닔由??ㅽ봽??鍮꾩쑉
 _ROLL_FLIP    = str(os.environ.get("AI_ROLL_FLIP", "0")).strip().lower() in ("1","true","yes")
+# 작은 눈 확대 강도 기본값(process_array/process_file/retouch_graph 공통, 0 이하 = 생략)
+EYE_STRENGTH  = float(os.environ.get("AI_EYE_STRENGTH", "0.45") or 0.0)
+# 결과 캐시/프리페치 키에 포함되는 파이프라인 버전(출력이 달라지는 변경 시 올린다)
+PIPELINE_VERSION = "1.3"
+
+_FUSED_WARP   = str(os.environ.get("AI_FUSED_WARP", "1")).strip().lower() in ("1","true","yes")  # 회전+어깨+크롭 1회 리샘플
 
 
 # -----------------------
@@ -43,14 +52,19 @@ def save_jpg_bgr(bgr: np.ndarray, path: str, quality: int = 100) -> bool:
 # -----------------------
 # Face/pose 異붿젙 (mediapipe 媛꾩씠 ?ъ슜)
 # -----------------------
-def _mp_face_mesh(bgr: np.ndarray):
+def _detect_rgb(bgr: np.ndarray) -> np.ndarray:
+    """검출 입력: 축소 프록시(긴 변 AI_PROXY_EDGE)에서만 RGB 변환한다. 좌표는 정규화라 원본에 그대로 쓴다."""
+    return cv2.cvtColor(landmarker_pool.detection_proxy(bgr), cv2.COLOR_BGR2RGB)
+
+
+def _mp_face_mesh(bgr: np.ndarray, rgb: np.ndarray | None = None):
     """(?깃났) landmark list 諛섑솚, ?ㅽ뙣 ??None.
     10(?대쭏 ?곷?), 152(?깅걹), 33/263(?덇?) ?ъ슜.
     """
     try:
-        import mediapipe as mp
-        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-        with mp.solutions.face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=True) as fm:
+        if rgb is None:
+            rgb = _detect_rgb(bgr)
+        with landmarker_pool.lease("face_mesh", max_num_faces=1, refine_landmarks=True) as fm:
             res = fm.process(rgb)
         if res.multi_face_landmarks:
             return res.multi_face_landmarks[0].landmark
@@ -59,11 +73,11 @@ def _mp_face_mesh(bgr: np.ndarray):
     return None
 
 
-def _mp_pose(bgr: np.ndarray):
+def _mp_pose(bgr: np.ndarray, rgb: np.ndarray | None = None):
     try:
-        import mediapipe as mp
-        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-        with mp.solutions.pose.Pose(static_image_mode=True) as pose:
+        if rgb is None:
+            rgb = _detect_rgb(bgr)
+        with landmarker_pool.lease("pose") as pose:
             res = pose.process(rgb)
         if res.pose_landmarks:
             return res.pose_landmarks.landmark
@@ -92,13 +106,18 @@ def _head_profile_for_ratio(ratio: object | None) -> Tuple[float, float]:
 
 
 def _edge_penalty(bgr: np.ndarray, x_center: int, y_cand: int) -> float:
-    """?곷떒 ?ㅽ듃?쇱씠???먯? ?鍮꾨줈 ?꾨낫 ?믪씠???⑤꼸?곕? 怨꾩궛?쒕떎."""
-    H, W = bgr.shape[:2]
-    x0 = max(0, x_center - int(0.04 * W)); x1 = min(W, x_center + int(0.04 * W))
-    if x1 <= x0:
-        return 0.0
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY).astype('float32')
-    stripe = gray[:, x0:x1]
+    """?곷떒 ?ㅽ듃?쇱씠???먯? ?鍮꾨줈 ?꾨낫 ?믪씠???⑤꼸?곕? 怨꾩궛?쒕떎."""
+    return float(_EdgeContext(bgr).penalty(x_center, np.array([y_cand]))[0])
+
+
+def _edge_stripe_span(x_center: int, W: int) -> Tuple[int, int]:
+    """에지 검사용 세로 스트라이프의 열 범위 [x0, x1)를 반환한다."""
+    return max(0, x_center - int(0.04 * W)), min(W, x_center + int(0.04 * W))
+
+
+def _stripe_edge_y(stripe: np.ndarray) -> int | None:
+    """그레이(float32) 스트라이프에서 상단 배경이 끝나는 첫 행(머리 윤곽). 없으면 None. 후보 높이와 무관."""
+    H = stripe.shape[0]
     top_band = max(2, int(0.06 * H))
     bg = float(stripe[:top_band].mean())
     diff = np.abs(stripe - bg).max(axis=1)
@@ -108,20 +127,68 @@ def _edge_penalty(bgr: np.ndarray, x_center: int, y_cand: int) -> float:
     thr_g = max(8.0, float(g_abs[:top_band*2].mean() + 2*g_abs[:top_band*2].std()))
     ys = (diff > thr_d) | (g_abs > thr_g)
     idxs = np.nonzero(ys)[0]
-    if idxs.size == 0:
-        return 0.0
-    y_edge = int(idxs[0])
-    if y_cand < y_edge - 2:
-        return float((y_edge - y_cand) * 2.0)
-    if y_cand > y_edge + 20:
-        return float((y_cand - (y_edge + 20)) * 0.2)
-    return 0.0
+    return int(idxs[0]) if idxs.size else None
+
+
+def _edge_penalty_at(y_edge: int | None, ys: np.ndarray) -> np.ndarray:
+    """윤곽 행 y_edge 기준 후보 높이 배열 ys 의 패널티(벡터)."""
+    ys = np.asarray(ys, np.float64)
+    if y_edge is None:
+        return np.zeros_like(ys)
+    return np.where(ys < y_edge - 2, (y_edge - ys) * 2.0,
+                    np.where(ys > y_edge + 20, (ys - (y_edge + 20)) * 0.2, 0.0))
+
+
+def _edge_penalty_stripe(stripe: np.ndarray, y_cand: int) -> float:
+    """그레이(float32) 스트라이프 기준으로 후보 높이의 패널티를 계산한다."""
+    return float(_edge_penalty_at(_stripe_edge_y(stripe), np.array([y_cand]))[0])
+
+
+class _EdgeContext:
+    """이미지 1장의 정수리 에지 분석 캐시.
+
+    - 스트라이프(눈 중앙 x 기준 폭 8%)만 그레이 변환하고, 윤곽 행(그레이 + 세로 Sobel)은 x마다 1회 계산한다.
+    - penalty(x, ys)는 모든 후보 높이를 한 번에 평가한다. 같은 이미지를 쓰는 이후 단계(비율 변경 등)도 재사용한다.
+    - stripe_fn(x0, x1)을 주면 스트라이프를 직접 만든다(합성 워프에서 전체 프레임을 만들지 않기 위해).
+    """
+
+    def __init__(self, bgr: np.ndarray | None = None, *, size: Tuple[int, int] | None = None, stripe_fn=None):
+        self.W, self.H = size if size is not None else (bgr.shape[1], bgr.shape[0])
+        self._stripe_fn = stripe_fn if stripe_fn is not None else (lambda x0, x1: bgr[:, x0:x1])
+        self._edge_y: dict = {}
+
+    def edge_y(self, x_center: int) -> int | None:
+        if x_center not in self._edge_y and self._stripe_fn is not None:
+            x0, x1 = _edge_stripe_span(x_center, self.W)
+            y = None
+            if x1 > x0:
+                y = _stripe_edge_y(cv2.cvtColor(self._stripe_fn(x0, x1), cv2.COLOR_BGR2GRAY).astype('float32'))
+            self._edge_y[x_center] = y
+        return self._edge_y.get(x_center)
+
+    def penalty(self, x_center: int, ys: np.ndarray) -> np.ndarray:
+        return _edge_penalty_at(self.edge_y(x_center), ys)
+
+    def detach(self) -> "_EdgeContext":
+        """이미지 참조를 놓는다(이미 계산한 x만 유지, 새 x는 패널티 0). 캐시에 오래 둘 때 사용."""
+        self._stripe_fn = None
+        return self
 
 
 def _estimate_crown_chin(bgr: np.ndarray, *, ratio: object | None = None) -> Tuple[int, int, int]:
     """(?곸쓳?? ?뺤닔由??깅걹/?덉쨷?숈쓣 異붿젙?쒕떎."""
     H, W = bgr.shape[:2]
     lms = _mp_face_mesh(bgr)
+    pl = None if lms else _mp_pose(bgr)
+    return _crown_chin_from_landmarks(lms, pl, W, H, ratio=ratio, edge_fn=_EdgeContext(bgr).penalty)
+
+
+def _crown_chin_from_landmarks(lms, pl, W: int, H: int, *, ratio: object | None = None,
+                               edge_fn=None) -> Tuple[int, int, int]:
+    """랜드마크(정규화 좌표)로 정수리/턱/눈중앙 x를 추정한다.
+
+    - edge_fn(x, ys)는 선택: 후보 높이 배열 ys 전체의 에지 패널티 배열을 돌려준다(_EdgeContext.penalty).
+    """
     if lms:
         p10 = lms[10]; p152 = lms[152]; pL = lms[33]; pR = lms[263]
         x_eye = int(np.clip(0.5 * (pL.x + pR.x) * W, 0, W - 1))
@@ -131,22 +198,20 @@ def _estimate_crown_chin(bgr: np.ndarray, *, ratio: object | None = None) -> Tup
         head_mid = 0.5 * (head_lo + head_hi)
 
         # ?꾨낫 alpha 洹몃━??媛쒖씤蹂??곸쓳)
-        alphas = [0.16, 0.20, 0.24, 0.28, 0.32, 0.36, float(_CROWN_ALPHA)]
-        best = None; best_score = 1e9
-        for a in alphas:
-            y_c = int(np.clip((p10.y + a * (p10.y - p152.y)) * H, 0, H - 1))
-            head_pct = (y_chin - y_c) / max(1.0, float(H))
-            spec_cost = abs(head_pct - head_mid) * 100.0
-            edge_cost = _edge_penalty(bgr, x_eye, y_c)
-            score = spec_cost + edge_cost
-            if score < best_score:
-                best_score = score; best = (y_c, a)
-        y_crown, a_sel = best if best else (int(0.1*H), float(_CROWN_ALPHA))
+        alphas = np.array([0.16, 0.20, 0.24, 0.28, 0.32, 0.36, float(_CROWN_ALPHA)])
+        # 후보 전체를 한 번에 평가(동점이면 앞 후보 = 기존 순차 비교와 동일)
+        y_cs = np.clip((p10.y + alphas * (p10.y - p152.y)) * H, 0, H - 1).astype(np.int64)
+        head_pct = (y_chin - y_cs) / max(1.0, float(H))
+        scores = np.abs(head_pct - head_mid) * 100.0
+        if edge_fn is not None:
+            scores = scores + edge_fn(x_eye, y_cs)
+        i = int(np.argmin(scores))
+        best_score = float(scores[i])
+        y_crown, a_sel = (int(y_cs[i]), float(alphas[i])) if best_score < 1e9 else (int(0.1*H), float(_CROWN_ALPHA))
         logger.info("[crown] alpha_sel=%.3f score=%.2f y_crown=%d y_chin=%d x_eye_mid=%d", a_sel, best_score, y_crown, y_chin, x_eye)
         return y_crown, y_chin, x_eye
 
     # ?ъ쫰 湲곕컲 ??듭튂
-    pl = _mp_pose(bgr)
     if pl:
         nose = pl[0]; le = pl[7]; re = pl[8]
         x_eye = int(np.clip(0.5 * (le.x + re.x) * W, 0, W - 1))
@@ -154,7 +219,8 @@ def _estimate_crown_chin(bgr: np.ndarray, *, ratio: object | None = None) -> Tup
         y_chin = int(np.clip((nose.y + 0.22) * H, 0, H - 1))
         logger.info("[crown] pose-only y_crown=%d y_chin=%d x_eye_mid=%d", y_crown, y_chin, x_eye)
         return y_crown, y_chin, x_eye
-    # ?ㅽ뙣 ??以묒븰媛?    yc, yn, xe = int(0.1 * H), int(0.8 * H), int(0.5 * W)
+    # ?ㅽ뙣 ??以묒븰媛?
+    yc, yn, xe = int(0.1 * H), int(0.8 * H), int(0.5 * W)
     logger.info("[crown] fallback y_crown=%d y_chin=%d x_eye_mid=%d", yc, yn, xe)
     return yc, yn, xe
 
@@ -209,6 +275,11 @@ def _face_bbox_from_mesh(bgr: np.ndarray) -> Tuple[int,int,int,int] | None:
     lms = _mp_face_mesh(bgr)
     if not lms:
         return None
+    return _face_bbox_from_lms(lms, W, H)
+
+
+def _face_bbox_from_lms(lms, W: int, H: int) -> Tuple[int, int, int, int]:
+    """정규화 랜드마크의 바운딩 박스를 픽셀 단위로 반환한다."""
     xs = [int(p.x * W) for p in lms]
     ys = [int(p.y * H) for p in lms]
     x1, x2 = max(0, min(xs)), min(W - 1, max(xs))
@@ -225,26 +296,34 @@ def _rotate_v1(bgr: np.ndarray) -> np.ndarray:
     """
     H, W = bgr.shape[:2]
     lms = _mp_face_mesh(bgr)
+    M = _rotation_matrix_v1(lms, W, H)
+    if M is None:
+        return bgr
+    return cv2.warpAffine(bgr, M, (W, H), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+
+
+def _rotation_matrix_v1(lms, W: int, H: int) -> np.ndarray | None:
+    """v1 회전(+trans_dx) 2x3 행렬을 계산한다. 회전 스킵이면 None."""
     if not lms:
         logger.info("[v1] face landmarks none -> rotate skip")
-        return bgr
+        return None
     L, R = lms[33], lms[263]
     dx, dy = (R.x - L.x), (R.y - L.y)
     if abs(dx) < 1e-6:
         logger.info("[v1] dx?? -> ?ㅽ궢")
-        return bgr
+        return None
     ang_raw = -math.degrees(math.atan2(dy, dx))
     ang = max(-15.0, min(15.0, ang_raw))
     if abs(ang) < 0.8:
         logger.info("[v1] |angle|<0.8° -> skip")
-        return bgr
+        return None
 
     # ?뚯쟾 以묒떖: ???덉쓽 以묒젏
     cx = int(0.5 * (L.x + R.x) * W)
     cy = int(0.5 * (L.y + R.y) * H)
 
     # ?쇨뎬 bbox 諛??깅걹 ?꾩튂
-    fb = _face_bbox_from_mesh(bgr) or (0, 0, W, H)
+    fb = _face_bbox_from_lms(lms, W, H)
     fx, fy, fw, fh = fb
     chin = lms[152]
     chin_x, chin_y = float(chin.x * W), float(chin.y * H)
@@ -256,10 +335,8 @@ def _rotate_v1(bgr: np.ndarray) -> np.ndarray:
     desired_cx = float(fx + fw * 0.5)
     trans_dx = float(desired_cx - x_rot)
     M[0,2] = float(M[0,2] + trans_dx)
-
-    rot = cv2.warpAffine(bgr, M, (W, H), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
     logger.info("[v1] rotate(sign-flip) %.2f° center=(%d,%d) trans_dx=%.1f bbox_cx=%.1f", -ang, cx, cy, trans_dx, desired_cx)
-    return rot
+    return M
 
 
 def _rotate_global(bgr: np.ndarray, angle_deg: float, center: Tuple[int, int]) -> np.ndarray:
@@ -273,9 +350,45 @@ def _level_shoulders(bgr: np.ndarray) -> np.ndarray:
     """?닿묠 ?섑룊(媛꾩씠): Pose 11-12 湲곗슱湲곕쭔???꾨떒(shear), ???꾨옒留??곸슜."""
     H, W = bgr.shape[:2]
     pl = _mp_pose(bgr)
+    # 턱 y만 필요하므로 에지 분석 없이(정수리 후보 평가 생략) 같은 포즈 결과를 재사용
+    shear = _shoulder_shear(pl, W, H, lambda: _crown_chin_from_landmarks(_mp_face_mesh(bgr), pl, W, H)[1])
+    if shear is None:
+        return bgr
+    return _apply_shoulder_shear(bgr, shear)
+
+
+def _apply_shoulder_shear(bgr: np.ndarray, shear: Tuple[float, int, int]) -> np.ndarray:
+    """시어를 경계 아래 행에만 적용하고 밴드는 고정소수점(uint16, 8bit 가중치)으로 블렌드한다(제자리 기록).
+
+    - 밴드 위 행: 원본 유지 / 밴드: 행별 램프 블렌드 / 경계 아래: 시어 결과 복사.
+    - 전체 프레임 float 마스크를 만들지 않아 24MP에서도 추가 메모리는 (H - y0) 행 분량이다.
+    """
+    H, W = bgr.shape[:2]
+    m, y_seam, band = shear
+    y0 = max(0, y_seam - band)
+    if y0 >= H:
+        return bgr
+    # 경계 밴드 시작(y0)부터 아래만 워프: 출력 행 v = y - y0
+    M = np.array([[1.0, m, -m * y_seam], [0.0, 1.0, -float(y0)]], np.float32)
+    sh = cv2.warpAffine(bgr, M, (W, H - y0), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+    n = y_seam - y0
+    if n > 0:
+        w = np.rint(np.linspace(0.0, 256.0, n)).astype(np.uint16)[:, None, None]
+        acc = sh[:n].astype(np.uint16)
+        acc *= w
+        acc += bgr[y0:y_seam].astype(np.uint16) * (256 - w)
+        acc += 128
+        acc >>= 8
+        bgr[y0:y_seam] = acc
+    bgr[y_seam:] = sh[n:]
+    return bgr
+
+
+def _shoulder_shear(pl, W: int, H: int, chin_fn) -> Tuple[float, int, int] | None:
+    """어깨 시어 파라미터 (m, y_seam, band)를 계산한다. chin_fn()은 턱 y(px)를 반환. 스킵이면 None."""
     if not pl:
         logger.info("[shoulder] pose none -> skip")
-        return bgr
+        return None
     L, R = pl[11], pl[12]
     xL, yL = L.x * W, L.y * H
     xR, yR = R.x * W, R.y * H
@@ -283,25 +396,15 @@ def _level_shoulders(bgr: np.ndarray) -> np.ndarray:
     slope_deg = math.degrees(math.atan2((yR - yL), (xR - xL + 1e-6)))
     if abs(slope_deg) < 1.0:
         logger.info("[shoulder] 寃쎌궗 ?묒쓬 -> skip")
-        return bgr
+        return None
     m = -math.tan(math.radians(slope_deg))
     m = float(max(-0.14, min(0.14, m)))  # ?덉쟾 罹?    # ?깆꽑 洹쇱쿂瑜?寃쎄퀎濡??꾨옒留??꾨떒
-    y_crown, y_chin, _ = _estimate_crown_chin(bgr)
+    y_chin = int(chin_fn())
     y_seam = int(min(H - 1, max(y_chin + int(H * 0.01), int(max(yL, yR) + H * 0.02))))
-    M = np.array([[1.0, m, -m * y_seam], [0.0, 1.0, 0.0]], np.float32)
-    sh = cv2.warpAffine(bgr, M, (W, H), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
     # 寃쎄퀎 留덉뒪????0~??1)
     band = max(12, int(H * 0.05))
-    y0 = max(0, y_seam - band)
-    mask = np.zeros((H, 1), np.float32)
-    if y0 < y_seam:
-        ramp = np.linspace(0.0, 1.0, y_seam - y0, dtype=np.float32)
-        mask[y0:y_seam, 0] = ramp
-    mask[y_seam:, 0] = 1.0
-    mask = np.repeat(mask, W, axis=1)
-    out = (sh * mask[..., None] + bgr * (1.0 - mask[..., None])).astype("uint8")
     logger.info("[shoulder] slope_deg=%.2f m=%.4f y_seam=%d band=%d", slope_deg, m, y_seam, band)
-    return out
+    return m, y_seam, band
 
 
 def _draw_red_dots(bgr: np.ndarray, crown_y: int, chin_y: int, cx: int, r: int = 12) -> np.ndarray:
@@ -315,10 +418,14 @@ def _draw_red_dots(bgr: np.ndarray, crown_y: int, chin_y: int, cx: int, r: int =
 # ???ш린 議곗젅(?묒? ?덈쭔 ?뺣?)
 # -----------------------
 def _eyes_from_facemesh(bgr: np.ndarray):
-    lms = _mp_face_mesh(bgr)
+    H, W = bgr.shape[:2]
+    return _eyes_from_landmarks(_mp_face_mesh(bgr), W, H)
+
+
+def _eyes_from_landmarks(lms, W: int, H: int):
+    """이미 검출/변환한 얼굴 랜드마크로 _adjust_eyes 입력(L, R, (W, H))을 만든다. 없으면 None."""
     if not lms:
         return None
-    H, W = bgr.shape[:2]
     LIDX = [33, 133, 159, 145]
     RIDX = [263, 362, 386, 374]
     def box(idxs):
@@ -334,10 +441,14 @@ def _eyes_from_facemesh(bgr: np.ndarray):
     return L, R, (W, H)
 
 
-def _adjust_eyes(bgr: np.ndarray, *, strength: float = 0.45, enable: bool = True) -> np.ndarray:
+def _adjust_eyes(bgr: np.ndarray, *, strength: float = 0.45, enable: bool = True, eyes=None) -> np.ndarray:
+    """작은 눈만 소폭 확대한다. 워프/마스크/블러/블렌드는 대상 눈 ROI에서만 수행하고 bgr에 제자리 기록한다.
+
+    - eyes: _eyes_from_facemesh() 결과를 이미 알고 있으면 전달(검출 생략).
+    """
     if not enable:
         return bgr
-    res = _eyes_from_facemesh(bgr)
+    res = eyes if eyes is not None else _eyes_from_facemesh(bgr)
     if not res:
         return bgr
     (cxL, cyL, wL, hL), (cxR, cyR, wR, hR), (W, H) = res
@@ -362,14 +473,24 @@ def _adjust_eyes(bgr: np.ndarray, *, strength: float = 0.45, enable: bool = True
     rx, ry = int(max(8, w * W * 1.45)), int(max(8, h * H * 1.45))
     # ?뺣? ?됰젹(以묒떖 湲곗?)
     M = np.array([[grow, 0.0, (1 - grow) * cx_px], [0.0, grow, (1 - grow) * cy_px]], np.float32)
-    layer = cv2.warpAffine(bgr, M, (W, H), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REFLECT)
-    m = np.zeros((H, W), np.uint8)
-    # ???留덉뒪?щ줈 釉붾젋??    m = np.zeros((H, W), np.uint8)
-    cv2.ellipse(m, (cx_px, cy_px), (rx, ry), 0, 0, 360, 255, -1, cv2.LINE_AA)
-    m = cv2.GaussianBlur(m, (0, 0), max(2.0, min(rx, ry) * 0.30)).astype('float32') / 255.0
-    out = (layer * m[..., None] + bgr * (1.0 - m[..., None])).astype('uint8')
-    logger.info("[eyes] target=%s grow=%.3f center=(%d,%d) rx=%d ry=%d", tag, grow, cx_px, cy_px, rx, ry)
-    return out
+    sigma = max(2.0, min(rx, ry) * 0.30)
+    # ROI = 타원 bbox + 블러 반경(3σ) 여유. 밖은 마스크가 0이라 결과가 동일하다.
+    pad = int(math.ceil(3.0 * sigma)) + 2
+    x0, y0 = max(0, cx_px - rx - pad), max(0, cy_px - ry - pad)
+    x1, y1 = min(W, cx_px + rx + pad + 1), min(H, cy_px + ry + pad + 1)
+    if x1 <= x0 or y1 <= y0:
+        return bgr
+    Mr = M.copy()
+    Mr[0, 2] -= x0; Mr[1, 2] -= y0
+    layer = cv2.warpAffine(bgr, Mr, (x1 - x0, y1 - y0), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REFLECT)
+    m = np.zeros((y1 - y0, x1 - x0), np.uint8)
+    cv2.ellipse(m, (cx_px - x0, cy_px - y0), (rx, ry), 0, 0, 360, 255, -1, cv2.LINE_AA)
+    m = cv2.GaussianBlur(m, (0, 0), sigma).astype('float32') / 255.0
+    roi = bgr[y0:y1, x0:x1]
+    roi[...] = (layer * m[..., None] + roi * (1.0 - m[..., None])).astype('uint8')
+    logger.info("[eyes] target=%s grow=%.3f center=(%d,%d) rx=%d ry=%d roi=(%d,%d,%d,%d)",
+                tag, grow, cx_px, cy_px, rx, ry, x0, y0, x1 - x0, y1 - y0)
+    return bgr
 
 
 # -----------------------
@@ -402,16 +523,8 @@ def _profile_spec(ratio: object | None) -> Tuple[float, float, float, float, flo
 
 def _spec_crop(bgr: np.ndarray, *, ratio: object | None = '3545') -> np.ndarray:
     H, W = bgr.shape[:2]
-    head_lo, head_hi, top_lo, top_hi, aspect = _profile_spec(ratio)
     yc, yn, xeye = _estimate_crown_chin(bgr, ratio=ratio)
-    head_span = max(1, int(yn - yc))
-    head_target = 0.5 * (head_lo + head_hi)
-    crop_h = int(round(head_span / max(1e-6, head_target)))
-    crop_w = int(round(crop_h * aspect))
-    # top target 湲곗??쇰줈 y ?곗젙, x???덉쨷??湲곗? 以묒븰 諛곗튂
-    top_target = 0.5 * (top_lo + top_hi)
-    x_tgt = int(round(xeye - crop_w * 0.5))
-    y_tgt = int(round(yc - top_target * crop_h))
+    x_tgt, y_tgt, crop_w, crop_h = _spec_crop_rect(yc, yn, xeye, ratio=ratio)
     # ?⑤뵫(?곗깋) ?꾩슂 ??異붽?
     pad_top    = max(0, -y_tgt)
     pad_bottom = max(0, (y_tgt + crop_h) - H)
@@ -426,16 +539,207 @@ def _spec_crop(bgr: np.ndarray, *, ratio: object | None = '3545') -> np.ndarray:
     x = max(0, min(W - crop_w, x_tgt))
     y = max(0, min(H - crop_h, y_tgt))
     crop = np.ascontiguousarray(bgr[y:y+crop_h, x:x+crop_w])
+    return crop
+
+
+def _spec_crop_rect(yc: int, yn: int, xeye: int, *, ratio: object | None = '3545') -> Tuple[int, int, int, int]:
+    """정수리/턱/눈중앙으로 크롭 사각형 (x, y, w, h)를 계산한다. 이미지 밖으로 나갈 수 있다(흰색 패딩 대상)."""
+    head_lo, head_hi, top_lo, top_hi, aspect = _profile_spec(ratio)
+    head_span = max(1, int(yn - yc))
+    head_target = 0.5 * (head_lo + head_hi)
+    crop_h = int(round(head_span / max(1e-6, head_target)))
+    crop_w = int(round(crop_h * aspect))
+    # top target 湲곗??쇰줈 y ?곗젙, x???덉쨷??湲곗? 以묒븰 諛곗튂
+    top_target = 0.5 * (top_lo + top_hi)
+    x_tgt = int(round(xeye - crop_w * 0.5))
+    y_tgt = int(round(yc - top_target * crop_h))
     act_head = head_span / float(crop_h)
-    act_top  = (yc - y) / float(crop_h)
+    act_top  = (yc - y_tgt) / float(crop_h)
     logger.info("[crop] ratio=%s rect=(%d,%d,%d,%d) Head%%=%.3f target[%.2f,%.2f] Top%%=%.3f target[%.2f,%.2f]",
-                str(ratio), x, y, crop_w, crop_h, act_head, head_lo, head_hi, act_top, top_lo, top_hi)
-    return crop
+                str(ratio), x_tgt, y_tgt, crop_w, crop_h, act_head, head_lo, head_hi, act_top, top_lo, top_hi)
+    return x_tgt, y_tgt, crop_w, crop_h
+
+
+# -----------------------
+# 합성 워프(회전 + 어깨 시어 + 크롭을 1회 리샘플)
+# -----------------------
+class _Pt:
+    """정규화 좌표 점. 변환된 랜드마크를 mediapipe 랜드마크처럼 쓰기 위한 용도."""
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+def _map_landmarks(lms, M: np.ndarray | None, W: int, H: int):
+    """정규화 랜드마크를 2x3 아핀 M(픽셀 좌표계, 같은 캔버스 크기)으로 옮긴다."""
+    if not lms or M is None:
+        return lms
+    pts = np.array([[p.x * W, p.y * H] for p in lms], np.float64)
+    A = np.asarray(M, np.float64)
+    q = pts @ A[:, :2].T + A[:, 2]
+    return [_Pt(float(x) / W, float(y) / H) for x, y in q]
+
+
+def _affine3(M: np.ndarray | None) -> np.ndarray:
+    """2x3 아핀(None이면 항등)을 3x3 동차 행렬로 바꾼다."""
+    A = np.eye(3, dtype=np.float64)
+    if M is not None:
+        A[:2] = np.asarray(M, np.float64)
+    return A
+
+
+def _fused_warp(bgr: np.ndarray, M_rot: np.ndarray | None, shear: Tuple[float, int, int] | None,
+                rect: Tuple[int, int, int, int]) -> np.ndarray:
+    """회전 → 어깨 시어 → 크롭을 출력 크롭 영역에서만 1회 샘플링한다.
+
+    - rect는 워프 후 좌표계의 (x, y, w, h). 워프 이미지 밖은 흰색(_spec_crop 패딩과 동일).
+    - 시어 경계 밴드는 이미지 블렌드 대신 변위 램프로 처리한다(고스트 없음).
+    """
+    H, W = bgr.shape[:2]
+    rx, ry, rw, rh = (int(v) for v in rect)
+    out = np.empty((rh, rw) + bgr.shape[2:], np.uint8)
+    R_inv = np.linalg.inv(_affine3(M_rot))
+    if shear is not None:
+        m, y_seam, band = shear
+        y0 = max(0, y_seam - band)
+    else:
+        m, y_seam, y0 = 0.0, H, H
+    S_inv = np.array([[1.0, -m, m * y_seam], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    flags = cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP
+
+    # 경계 위(회전만) / 경계 아래(회전+시어 전체): 구간별 단일 아핀
+    for Ys, Ye, A in ((ry, min(ry + rh, y0), R_inv), (max(ry, y_seam), ry + rh, R_inv @ S_inv)):
+        if Ye <= Ys:
+            continue
+        T = np.array([[1.0, 0.0, rx], [0.0, 1.0, Ys], [0.0, 0.0, 1.0]])
+        v0 = Ys - ry
+        out[v0:v0 + (Ye - Ys)] = cv2.warpAffine(bgr, (A @ T)[:2], (rw, Ye - Ys), flags=flags,
+                                                borderMode=cv2.BORDER_REFLECT)
+
+    # 램프 밴드: 행마다 시어 변위가 달라 remap(밴드 행만)
+    Ys, Ye = max(ry, y0), min(ry + rh, y_seam)
+    if Ye > Ys:
+        Y = np.arange(Ys, Ye, dtype=np.float64)[:, None]
+        ramp = (Y - y0) / float(max(1, y_seam - y0 - 1))
+        X = np.arange(rx, rx + rw, dtype=np.float64)[None, :] - ramp * m * (Y - y_seam)
+        map_x = (R_inv[0, 0] * X + R_inv[0, 1] * Y + R_inv[0, 2]).astype(np.float32)
+        map_y = (R_inv[1, 0] * X + R_inv[1, 1] * Y + R_inv[1, 2]).astype(np.float32)
+        out[Ys - ry:Ye - ry] = cv2.remap(bgr, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+
+    # 워프 이미지 밖 → 흰색 패딩
+    white = 255
+    if ry < 0:
+        out[:min(rh, -ry)] = white
+    if ry + rh > H:
+        out[max(0, H - ry):] = white
+    if rx < 0:
+        out[:, :min(rw, -rx)] = white
+    if rx + rw > W:
+        out[:, max(0, W - rx):] = white
+    return out
+
+
+def _crop_eyes(eyes, rect: Tuple[int, int, int, int]):
+    """_eyes_from_landmarks 결과(워프 후 전체 프레임 정규화 좌표)를 크롭 rect 기준 정규화 좌표로 옮긴다."""
+    if not eyes:
+        return None
+    L, R, (W, H) = eyes
+    rx, ry, rw, rh = (int(v) for v in rect)
+    def move(box):
+        cx, cy, w, h = box
+        return ((cx * W - rx) / rw, (cy * H - ry) / rh, w * W / rw, h * H / rh)
+    return move(L), move(R), (rw, rh)
+
+
+def _fused_geometry(bgr: np.ndarray, *, ratio: object | None = '3545') -> np.ndarray:
+    """원본에서 랜드마크를 1회 검출하고 회전/어깨/크롭 파라미터를 계산한 뒤 합성 워프한다."""
+    return _fused_geometry_eyes(bgr, ratio=ratio)[0]
+
+
+def _fused_geometry_eyes(bgr: np.ndarray, *, ratio: object | None = '3545'):
+    """_fused_geometry + 크롭 좌표 눈 박스(_adjust_eyes 입력, 얼굴 없으면 None). 눈 보정용 재검출이 필요 없다."""
+    H, W = bgr.shape[:2]
+    rgb = _detect_rgb(bgr)  # 얼굴/포즈 검출이 같은 프록시를 공유
+    lms = _mp_face_mesh(bgr, rgb)
+    pl = _mp_pose(bgr, rgb)
+    M_rot = _rotation_matrix_v1(lms, W, H)
+    lms_r = _map_landmarks(lms, M_rot, W, H)
+    pl_r = _map_landmarks(pl, M_rot, W, H)
+    shear = _shoulder_shear(pl_r, W, H, lambda: _crown_chin_from_landmarks(lms_r, pl_r, W, H)[1])
+
+    # 얼굴/머리는 시어 경계 위에 있으므로 회전 좌표 랜드마크를 그대로 쓴다.
+    # 에지 패널티용 스트라이프만 합성 워프로 만든다(전체 프레임 워프 없음).
+    edges = _EdgeContext(size=(W, H), stripe_fn=lambda x0, x1: _fused_warp(bgr, M_rot, shear, (x0, 0, x1 - x0, H)))
+    yc, yn, xeye = _crown_chin_from_landmarks(lms_r, pl_r, W, H, ratio=ratio, edge_fn=edges.penalty)
+    rect = _spec_crop_rect(yc, yn, xeye, ratio=ratio)
+    return _fused_warp(bgr, M_rot, shear, rect), _crop_eyes(_eyes_from_landmarks(lms_r, W, H), rect)
 
 
 # -----------------------
 # Public API
 # -----------------------
+def _notify(progress, stage: str, pct: int) -> None:
+    """진행 콜백을 호출한다(콜백 예외는 무시)."""
+    if progress is None:
+        return
+    try:
+        progress(stage, int(pct))
+    except Exception:
+        pass
+
+
+def process_array(bgr: np.ndarray, *, ratio: object | None = None, eye_strength: float | None = None,
+                  progress=None) -> np.ndarray:
+    """BGR 배열에 리터치(회전/어깨/눈/크롭)를 적용한 결과 배열을 반환한다.
+
+    - eye_strength: 작은 눈 확대 강도(None = EYE_STRENGTH, 0 이하 = 생략).
+    - progress(stage: str, pct: int)가 주어지면 단계마다 호출한다(워커 진행 이벤트용).
+    - 입력 배열은 레거시 경로에서 제자리 수정될 수 있다.
+    """
+    strength = EYE_STRENGTH if eye_strength is None else float(eye_strength)
+    _notify(progress, "geometry", 10)
+    # v1 ?ㅽ????뚯쟾?쇰줈 蹂寃???以묒떖, 짹15째, 0.8째 ?ㅽ궢, ?깅걹 x ?뺣젹)
+    if _FUSED_WARP:
+        # 회전+어깨+크롭을 크롭 영역에서 1회 리샘플, 눈 보정은 크롭 결과에 적용
+        # 눈 박스는 기하 단계의 랜드마크를 크롭 좌표로 옮겨 쓴다(retouch_graph 와 같은 검출 1회)
+        out, eyes = _fused_geometry_eyes(bgr, ratio=ratio)
+        _notify(progress, "eyes", 70)
+        if eyes:
+            out = _adjust_eyes(out, strength=strength, enable=strength > 0, eyes=eyes)
+    else:
+        rot = _rotate_v1(bgr)
+        out = _level_shoulders(rot)
+        # ???ш린 洹좏삎(?묒? ?덈쭔 ?뺣?)
+        _notify(progress, "eyes", 50)
+        out = _adjust_eyes(out, strength=strength, enable=strength > 0)
+        # 鍮꾩쑉 ?щ∼
+        out = _spec_crop(out, ratio=ratio)
+    _notify(progress, "done", 90)
+    return out
+
+
+def _cache_params(ratio, eye_strength: float | None = None) -> dict:
+    """결과에 영향을 주는 파라미터/환경 튜닝값(캐시 키 구성용)."""
+    eye = EYE_STRENGTH if eye_strength is None else float(eye_strength)
+    return {"ratio": ratio, "eye_strength": eye, "fused": _FUSED_WARP, "max_roll": _MAX_ROLL_DEG,
+            "crown_alpha": _CROWN_ALPHA, "roll_flip": _ROLL_FLIP, "proxy": landmarker_pool.PROXY_EDGE}
+
+
+def _cache_key(in_path: str, ratio, eye_strength: float | None = None) -> str | None:
+    """process_file 디스크 캐시 키(캐시 꺼짐/입력 없음이면 None)."""
+    if not retouch_cache.enabled():
+        return None
+    return retouch_cache.make_key("ai_retouch", in_path, _cache_params(ratio, eye_strength), PIPELINE_VERSION)
+
+
+def fetch_cached(in_path: str, out_path: str, *, ratio: object | None = None,
+                 eye_strength: float | None = None) -> bool:
+    """같은 입력/파라미터의 process_file 결과가 디스크 캐시에 있으면 out_path 로 복사한다(계산 없음)."""
+    return retouch_cache.fetch(_cache_key(in_path, ratio, eye_strength), out_path)
+
+
 def process_file(
     in_path: str,
     out_path: str,
@@ -444,33 +748,37 @@ def process_file(
     face_align_mode: str = "global",
     shoulder_strength: float = 1.0,            # ?명솚???좎????꾩옱 誘몄꽭 ?곹뼢 ?놁쓬)
     eye_balance: bool = False,                 # ?명솚???좎???誘몄궗??
+    eye_strength: float | None = None,         # 작은 눈 확대 강도(None = EYE_STRENGTH)
+    progress=None,
     **kwargs,
 ) -> bool:
     """?ъ쭊 ?꾩껜 ?뚯쟾(??湲곗슱湲? 짹2째) ???닿묠 ?섑룊 蹂댁젙. ?뺤닔由??깅걹 鍮④컙???쒖떆.
 
     - ratio, eye_balance ??異붽? ?ㅼ썙?쒕뒗 怨쇨굅 ?명꽣?섏씠???명솚???꾪빐 諛쏄퀬 臾댁떆?쒕떎.
+    - progress(stage, pct): 선택 진행 콜백(load → geometry → eyes → done → saved).
+    - 같은 입력/파라미터/버전 결과는 디스크 캐시(retouch_cache)에서 바로 복사한다.
     """
     try:
+        _notify(progress, "load", 0)
+        t0 = time.perf_counter()
+        key = _cache_key(in_path, ratio, eye_strength)
+        if key and retouch_cache.fetch(key, out_path):
+            _notify(progress, "saved", 100)
+            return True
         bgr = _load_image(in_path)
         if bgr is None:
             logger.error("[retouch] 로드 실패: %s", in_path)
             return False
-        H, W = bgr.shape[:2]
-        # v1 ?ㅽ????뚯쟾?쇰줈 蹂寃???以묒떖, 짹15째, 0.8째 ?ㅽ궢, ?깅걹 x ?뺣젹)
-        rot = _rotate_v1(bgr)
-        out = _level_shoulders(rot)
-        # ???ш린 洹좏삎(?묒? ?덈쭔 ?뺣?)
-        out = _adjust_eyes(out, strength=0.45, enable=True)
-        # 鍮꾩쑉 ?щ∼
-        out = _spec_crop(out, ratio=ratio)
+        out = process_array(bgr, ratio=ratio, eye_strength=eye_strength, progress=progress)
         # ?щ∼???대?吏?먯꽌 ?뺤닔由????ъ텛???????쒖떆
         # 정수리/턱 점 오버레이 제거(표시 안 함)
         # yc, yn, xeye = _estimate_crown_chin(out, ratio=ratio)
         # out = _draw_red_dots(out, yc, yn, xeye, r=12)
         ok = save_jpg_bgr(out, out_path, 100)
+        if ok and key:
+            retouch_cache.store(key, out_path, time.perf_counter() - t0)
+        _notify(progress, "saved", 100)
         return bool(ok)
     except Exception as e:
         logger.error("[retouch] 예외 발생: %s", e)
         return False
-
-
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+attach_encoder: 메일 첨부 바이트 준비(용량 목표 JPEG 인코딩 + 메모리 캐시).
+- 이미지 첨부에 바이트 예산(max_bytes)을 주면 긴 변을 long_px 이하로 줄이고,
+  예산 안에 드는 가장 높은 JPEG 품질을 이분 탐색으로 찾는다(최적 허프만, 선택적 프로그레시브).
+  최저 품질로도 넘치면 해상도를 줄여 다시 찾는다.
+- 원본이 이미 예산/크기 안의 JPEG면 재인코딩 없이 그대로 쓴다.
+- 결과는 (원본 내용 sha1, 예산, long_px, 프로그레시브) 키로 메모리 LRU에 둔다.
+  원본 서명은 (경로, 크기, mtime) → 내용 sha1 로 기억하므로 같은 파일은 다시 읽지 않는다.
+  → 수신자별로 메시지를 여러 번 만들어도 읽기/인코딩은 한 번.
+- 예산이 없으면(None/0) 파일 바이트만 캐시해 그대로 첨부한다(PDF, 리터치 원본 등).
+
+환경 변수:
+    EMAIL_ATTACH_MAX_KB       고객 첨부 기본 예산(기본 1024KB)
+    EMAIL_ATTACH_LONG_PX      긴 변 상한(기본 1600px)
+    EMAIL_ATTACH_PROGRESSIVE  프로그레시브 JPEG(기본 1)
+    EMAIL_ATTACH_CACHE_MB     메모리 캐시 상한(기본 64MB)
+
+사용:
+    from app.utils import attach_encoder as AE
+    data, filename, maintype, subtype = AE.attachment("C:/PhotoBox/JPG/홍길동_1234.jpg", max_bytes=AE.DEFAULT_MAX_BYTES)
+    data, info = AE.encode_array(bgr, 800 * 1024)   # {"quality", "size", "bytes", "ms"}
+"""
+
+from __future__ import annotations
+import os, time, hashlib, logging, mimetypes, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("EMAIL_ATTACH_MAX_KB", "1024") or 1024) * 1024)
+LONG_PX = int(os.environ.get("EMAIL_ATTACH_LONG_PX", "1600") or 1600)
+PROGRESSIVE = str(os.environ.get("EMAIL_ATTACH_PROGRESSIVE", "1")).strip().lower() in ("1", "true", "yes")
+_CACHE_MAX_BYTES = int(float(os.environ.get("EMAIL_ATTACH_CACHE_MB", "64") or 64) * 1024 * 1024)
+
+Q_MAX, Q_MIN = 92, 55       # 품질 탐색 범위(상한은 기존 고정 품질)
+_MAX_ROUNDS = 4             # 최저 품질로도 넘칠 때 해상도 축소 반복 횟수
+_ENCODABLE = {"jpeg", "png", "bmp", "webp", "tiff"}
+
+_LOCK = threading.Lock()
+_DIGESTS: Dict[Tuple[str, int, int], str] = {}                    # (경로, 크기, mtime_ns) → 내용 sha1
+_CACHE: "OrderedDict[tuple, Tuple[bytes, str, str, str]]" = OrderedDict()
+_CACHE_BYTES = 0
+_STATS = {"hits": 0, "misses": 0, "encodes": 0, "passthrough": 0}
+
+
+# -----------------------
+# 원본 서명/캐시
+# -----------------------
+def _read(path: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """(내용 sha1, 읽었다면 바이트). stat 서명이 같으면 읽지 않고 기억한 sha1만 준다."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    sig = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _LOCK:
+        d = _DIGESTS.get(sig)
+    if d is not None:
+        return d, None
+    with open(path, "rb") as f:
+        data = f.read()
+    d = hashlib.sha1(data).hexdigest()
+    with _LOCK:
+        if len(_DIGESTS) > 1024:
+            _DIGESTS.clear()
+        _DIGESTS[sig] = d
+    return d, data
+
+
+def _cache_get(key: tuple):
+    with _LOCK:
+        v = _CACHE.get(key)
+        if v is not None:
+            _CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+        return v
+
+
+def _cache_put(key: tuple, value: Tuple[bytes, str, str, str]) -> None:
+    global _CACHE_BYTES
+    with _LOCK:
+        if key in _CACHE:
+            return
+        _CACHE[key] = value
+        _CACHE_BYTES += len(value[0])
+        while _CACHE_BYTES > _CACHE_MAX_BYTES and len(_CACHE) > 1:
+            _, old = _CACHE.popitem(last=False)
+            _CACHE_BYTES -= len(old[0])
+
+
+def _mime(path: str) -> Tuple[str, str]:
+    mtype, _ = mimetypes.guess_type(path)
+    if not mtype:
+        return "application", "octet-stream"
+    major, minor = mtype.split("/", 1)
+    return major, minor
+
+
+# -----------------------
+# 인코딩
+# -----------------------
+def _imencode(bgr, quality: int, progressive: bool) -> bytes:
+    import cv2
+    params = [cv2.IMWRITE_JPEG_QUALITY, int(quality), cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    if progressive:
+        params += [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]
+    ok, buf = cv2.imencode(".jpg", bgr, params)
+    if not ok:
+        raise RuntimeError("attach_encoder: JPEG encode failed")
+    return buf.tobytes()
+
+
+def _fit_long(bgr, long_px: int):
+    import cv2
+    h, w = bgr.shape[:2]
+    if long_px <= 0 or max(w, h) <= long_px:
+        return bgr
+    s = long_px / float(max(w, h))
+    return cv2.resize(bgr, (max(1, int(round(w * s))), max(1, int(round(h * s)))), interpolation=cv2.INTER_AREA)
+
+
+def encode_array(bgr, max_bytes: int, long_px: int = LONG_PX,
+                 progressive: bool = PROGRESSIVE) -> Tuple[bytes, Dict[str, Any]]:
+    """BGR 배열 → 예산 안의 JPEG. 예산을 못 맞추면 마지막(가장 작은) 결과를 준다."""
+    import cv2
+    t0 = time.perf_counter()
+    img = _fit_long(bgr, long_px)
+    n = 0
+    best, best_size = b"", (0, 0)
+    for _ in range(_MAX_ROUNDS):
+        data = _imencode(img, Q_MAX, progressive); n += 1
+        q = Q_MAX
+        if len(data) > max_bytes:
+            # 예산 안에 드는 가장 높은 품질(lo 는 항상 예산 안, hi 는 항상 초과)
+            lo_data = _imencode(img, Q_MIN, progressive); n += 1
+            if len(lo_data) > max_bytes:
+                h, w = img.shape[:2]
+                best, best_size = lo_data, (w, h)
+                s = max(0.5, min(0.95, (max_bytes / float(len(lo_data))) ** 0.5 * 0.95))
+                img = cv2.resize(img, (max(1, int(w * s)), max(1, int(h * s))), interpolation=cv2.INTER_AREA)
+                continue
+            lo, hi, data, q = Q_MIN, Q_MAX, lo_data, Q_MIN
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                cand = _imencode(img, mid, progressive); n += 1
+                if len(cand) <= max_bytes:
+                    lo, data, q = mid, cand, mid
+                else:
+                    hi = mid
+        h, w = img.shape[:2]
+        best, best_size = data, (w, h)
+        break
+    else:
+        q = Q_MIN
+        logger.warning("[attach] budget %d bytes not met; using %d bytes", max_bytes, len(best))
+    with _LOCK:
+        _STATS["encodes"] += n
+    info = {"quality": q, "size": best_size, "bytes": len(best), "encodes": n,
+            "ms": round((time.perf_counter() - t0) * 1000.0, 1)}
+    return best, info
+
+
+def encode_qimage(img, max_bytes: int, long_px: int = LONG_PX,
+                  progressive: bool = PROGRESSIVE) -> Tuple[bytes, Dict[str, Any]]:
+    from app.utils import qimage_bridge as QB
+    return encode_array(QB.to_ndarray(img, "BGR"), max_bytes, long_px, progressive)
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    try:
+        from app.utils import jpeg_pdf
+        info = jpeg_pdf.jpeg_info(data)
+        return (info[0], info[1]) if info else None
+    except Exception:
+        return None
+
+
+def attachment(path: str, max_bytes: Optional[int] = None, long_px: int = LONG_PX,
+               progressive: bool = PROGRESSIVE) -> Tuple[bytes, str, str, str]:
+    """첨부 한 개 → (바이트, 파일명, maintype, subtype). 예산이 있고 이미지면 예산 안의 JPEG로 바꾼다."""
+    name = os.path.basename(path)
+    major, minor = _mime(path)
+    budget = int(max_bytes or 0) if major == "image" and minor in _ENCODABLE else 0
+    digest, data = _read(path)
+    if digest is None:
+        raise FileNotFoundError(path)
+    key = (digest, budget, long_px if budget else 0, bool(progressive) if budget else False, name)
+    hit = _cache_get(key)
+    if hit is not None:
+        return hit
+    with _LOCK:
+        _STATS["misses"] += 1
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+
+    out = (data, name, major, minor)
+    if budget:
+        size = _jpeg_size(data) if minor == "jpeg" else None
+        if size and len(data) <= budget and max(size) <= long_px:
+            with _LOCK:
+                _STATS["passthrough"] += 1
+        else:
+            import cv2
+            import numpy as np
+            bgr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if bgr is None:
+                logger.warning("[attach] decode failed, attaching as-is: %s", path)
+            else:
+                enc, info = encode_array(bgr, budget, long_px, progressive)
+                stem = os.path.splitext(name)[0]
+                out = (enc, f"{stem}.jpg", "image", "jpeg")
+                logger.info("[attach] %s %d -> %d bytes q=%d %dx%d %.1fms", name, len(data), len(enc),
+                            info["quality"], info["size"][0], info["size"][1], info["ms"])
+    _cache_put(key, out)
+    return out
+
+
+def stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS, cached=len(_CACHE), cached_bytes=_CACHE_BYTES)
+
+
+def clear() -> None:
+    global _CACHE_BYTES
+    with _LOCK:
+        _CACHE.clear()
+        _DIGESTS.clear()
+        _CACHE_BYTES = 0
+
+
+__all__ = ["DEFAULT_MAX_BYTES", "LONG_PX", "attachment", "encode_array", "encode_qimage", "stats", "clear"]
@@ -39,7 +39,10 @@ from __future__ import annotations
 import os
 import json
 import ssl
+import time
+import hashlib
 import smtplib
+import threading
 import mimetypes
 import logging
 from pathlib import Path
@@ -256,6 +259,22 @@ def _guess_mime_type(path: Path) -> Tuple[str, str]:
     return (major, minor)
 
 
+def _attachment_part(path: Path, max_bytes: Optional[int]) -> Tuple[bytes, str, str, str]:
+    """(바이트, 파일명, maintype, subtype). attach_encoder(cv2)를 못 쓰면 파일을 그대로 읽는다."""
+    try:
+        from app.utils import attach_encoder
+    except Exception:
+        attach_encoder = None
+    if attach_encoder is not None:
+        try:
+            return attach_encoder.attachment(str(path), max_bytes=max_bytes)
+        except Exception as e:
+            logger.warning(f"[attach] encoder failed, attaching as-is: {path} ({e})")
+    major, minor = _guess_mime_type(path)
+    with path.open("rb") as f:
+        return f.read(), path.name, major, minor
+
+
 def build_message(
     from_email: str,
     from_name: Optional[str],
@@ -266,10 +285,16 @@ def build_message(
     cc_addrs: Optional[List[str]] = None,
     bcc_addrs: Optional[List[str]] = None,
     attachments: Optional[List[str]] = None,
+    message_id: Optional[str] = None,
+    attachment_max_bytes: Optional[int] = None,
 ) -> EmailMessage:
+    """
+    메시지 구성. 첨부는 attach_encoder 캐시 바이트로 붙인다(같은 파일은 다시 읽거나 인코딩하지 않음).
+    - attachment_max_bytes: 이미지 첨부 용량 예산(바이트). 주면 예산 안의 JPEG로 다시 인코딩, None이면 원본 그대로.
+    """
     msg = EmailMessage()
     msg["Date"] = formatdate(localtime=True)
-    msg["Message-ID"] = make_msgid()
+    msg["Message-ID"] = message_id or make_msgid()
     msg["From"] = formataddr((from_name or "", from_email))
     msg["To"] = ", ".join(to_addrs)
     if cc_addrs:
@@ -287,10 +312,8 @@ def build_message(
             if not path.is_file():
                 logger.warning(f"[attach] not found: {path}")
                 continue
-            major, minor = _guess_mime_type(path)
-            with path.open("rb") as f:
-                data = f.read()
-            msg.add_attachment(data, maintype=major, subtype=minor, filename=path.name)
+            data, filename, major, minor = _attachment_part(path, attachment_max_bytes)
+            msg.add_attachment(data, maintype=major, subtype=minor, filename=filename)
 
     return msg
 
@@ -309,6 +332,7 @@ def send_email(
     subtype: str = "plain",
     config_path: Optional[str] = None,
     config: Optional[Dict[str, Any]] = None,
+    attachment_max_bytes: Optional[int] = None,
 ) -> str:
     """
     실제 메일 전송 함수.
@@ -318,6 +342,7 @@ def send_email(
     - subtype: "plain" 또는 "html"
     - config_path: 특정 settings.json 경로를 강제하고 싶을 때
     - config: 이미 정규화된 설정 dict를 직접 전달할 때
+    - attachment_max_bytes: 이미지 첨부 용량 예산(바이트, 선택)
 
     Returns: Message-ID (simulate인 경우 'SIMULATED-...')
     Raises: ValueError / smtplib.SMTPException 등
@@ -335,19 +360,12 @@ def send_email(
         cfg = dict(config)
 
     simulate = _as_bool(cfg.get("simulate", False))
-    smtp = cfg.get("smtp", {})
     from_email = cfg.get("from_email")
     from_name = cfg.get("from_name")
 
     # 필수 체크
     if not from_email:
         raise ValueError("발신 주소(from_email)가 없습니다.")
-    host = smtp.get("host") or ""
-    port = _as_int(smtp.get("port", 587), 587)
-    use_ssl = _as_bool(smtp.get("use_ssl", False))
-    use_starttls = _as_bool(smtp.get("use_starttls", True))
-    username = smtp.get("username") or ""
-    password = smtp.get("password") or ""
 
     # 메시지 구성
     msg = build_message(
@@ -360,6 +378,7 @@ def send_email(
         cc_addrs=cc,
         bcc_addrs=bcc,
         attachments=attachments,
+        attachment_max_bytes=attachment_max_bytes,
     )
 
     # 시뮬레이션 모드
@@ -368,6 +387,256 @@ def send_email(
         logger.info(f"[SIMULATE] To={to_addrs} Subject={subject!r} Attach={attachments or []}")
         return sim_id
 
+    _smtp_send(cfg, from_email, to_addrs + list(cc or []) + list(bcc or []), message_bytes(msg), subject)
+    return msg["Message-ID"]
+
+
+def message_bytes(msg: EmailMessage) -> bytes:
+    """SMTP로 그대로 보낼 수 있는 바이트(CRLF 줄바꿈, send_message와 같은 직렬화)."""
+    return msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+
+
+def deliver(data: bytes, from_email: str, rcpt_addrs: List[str], *, config: Optional[Dict[str, Any]] = None,
+            config_path: Optional[str] = None, subject: str = "") -> None:
+    """
+    이미 구성된 메시지(RFC 5322 바이트)를 그대로 보낸다(아웃박스 발송용).
+    - rcpt_addrs: 봉투 수신자(To/Cc/Bcc 모두)
+    - simulate 설정이면 로그만 남긴다.
+    Raises: ValueError / smtplib.SMTPException 등
+    """
+    cfg = load_email_config(config_path) if config is None else dict(config)
+    if _as_bool(cfg.get("simulate", False)):
+        logger.info(f"[SIMULATE] To={rcpt_addrs} Subject={subject!r} bytes={len(data)}")
+        return
+    _smtp_send(cfg, from_email, list(rcpt_addrs), data, subject)
+
+
+# ----------------------------
+# SMTP 세션 풀(연결 재사용)
+# ----------------------------
+# 메시지마다 TCP + TLS + AUTH 를 새로 하지 않고, 설정(서버/계정)별로 로그인된 연결 하나를 재사용한다.
+# - 유휴 세션은 EMAIL_SMTP_NOOP_S 마다 NOOP 으로 살려 두고, EMAIL_SMTP_IDLE_S 동안 안 쓰면 QUIT.
+# - 재사용 연결이 끊겨 있으면(서버 타임아웃/421) 한 번 다시 연결해 보낸다.
+# - prewarm(): 고객이 이메일/마무리 화면에 들어올 때 백그라운드에서 미리 연결/로그인.
+SMTP_POOL_ENABLED = os.environ.get("EMAIL_SMTP_POOL", "1").strip().lower() not in ("0", "false", "no", "off")
+SMTP_IDLE_S = float(os.environ.get("EMAIL_SMTP_IDLE_S", "240") or 240)
+SMTP_NOOP_S = float(os.environ.get("EMAIL_SMTP_NOOP_S", "30") or 30)
+
+_AUTH_HINT = (
+    "SMTP 인증 실패입니다. Gmail이라면 '앱 비밀번호(16자리)'를 사용해야 합니다.\n"
+    "- settings.json의 email.auth.pass 또는 smtp.password가 올바른지 확인하세요.\n"
+    "- 2단계 인증이 켜져 있어야 앱 비밀번호를 발급받을 수 있습니다."
+)
+
+
+def _smtp_params(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    smtp = cfg.get("smtp", {})
+    return {
+        "host": smtp.get("host") or "",
+        "port": _as_int(smtp.get("port", 587), 587),
+        "use_ssl": _as_bool(smtp.get("use_ssl", False)),
+        "use_starttls": _as_bool(smtp.get("use_starttls", True)),
+        "username": smtp.get("username") or "",
+        "password": smtp.get("password") or "",
+    }
+
+
+def _smtp_open(p: Dict[str, Any]) -> smtplib.SMTP:
+    """연결 → EHLO → (STARTTLS) → (로그인)까지 마친 SMTP 객체."""
+    if p["use_ssl"]:
+        s: smtplib.SMTP = smtplib.SMTP_SSL(p["host"], p["port"], context=ssl.create_default_context(), timeout=30)
+    else:
+        s = smtplib.SMTP(p["host"], p["port"], timeout=30)
+    try:
+        s.ehlo()
+        if not p["use_ssl"] and p["use_starttls"]:
+            s.starttls(context=ssl.create_default_context())
+            s.ehlo()
+        if p["username"]:
+            s.login(p["username"], p["password"])
+    except Exception:
+        _smtp_close(s)
+        raise
+    return s
+
+
+def _smtp_close(s: Optional[smtplib.SMTP]) -> None:
+    if s is None:
+        return
+    try:
+        s.quit()
+    except Exception:
+        try:
+            s.close()
+        except Exception:
+            pass
+
+
+def _stale(e: Exception) -> bool:
+    """재사용 연결이 이미 끊겨 있었다는 신호(새 연결로 한 번 더 보내도 되는 오류)."""
+    if isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return True
+    return isinstance(e, smtplib.SMTPResponseException) and getattr(e, "smtp_code", 0) == 421
+
+
+class _SmtpSession:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.smtp: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0    # 마지막 발송(유휴 종료 기준)
+        self.last_check = 0.0   # 마지막 연결/NOOP 확인
+
+
+class _SmtpPool:
+    """설정별 SMTP 세션(스레드 안전). 세션 하나는 한 번에 한 스레드만 쓴다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[tuple, _SmtpSession] = {}
+        self._keeper: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(p: Dict[str, Any]) -> tuple:
+        pw = hashlib.sha1(p["password"].encode("utf-8")).hexdigest()  # 비밀번호가 바뀌면 다른 세션
+        return (p["host"].lower(), p["port"], p["use_ssl"], p["use_starttls"], p["username"], pw)
+
+    def _session(self, p: Dict[str, Any]) -> _SmtpSession:
+        with self._lock:
+            sess = self._sessions.setdefault(self._key(p), _SmtpSession())
+            if self._keeper is None or not self._keeper.is_alive():
+                self._keeper = threading.Thread(target=self._keep_loop, name="smtp-keepalive", daemon=True)
+                self._keeper.start()
+            return sess
+
+    @staticmethod
+    def _open_locked(sess: _SmtpSession, p: Dict[str, Any]) -> float:
+        t0 = time.perf_counter()
+        sess.smtp = _smtp_open(p)
+        sess.last_used = sess.last_check = time.monotonic()
+        return (time.perf_counter() - t0) * 1000.0
+
+    def send(self, p: Dict[str, Any], from_email: str, rcpt_addrs: List[str], data: bytes) -> Tuple[dict, bool, float]:
+        """(거부된 수신자, 재사용 여부, 연결에 쓴 ms)."""
+        sess = self._session(p)
+        with sess.lock:
+            connect_ms = 0.0
+            reused = sess.smtp is not None
+            if reused and time.monotonic() - sess.last_check > SMTP_NOOP_S and not self._noop_locked(sess):
+                reused = False
+            if sess.smtp is None:
+                connect_ms = self._open_locked(sess, p)
+            try:
+                refused = sess.smtp.sendmail(from_email, rcpt_addrs, data)
+            except Exception as e:
+                if not (reused and _stale(e)):
+                    if _stale(e) or not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)):
+                        self._drop_locked(sess)  # 연결 상태를 알 수 없으면 버린다
+                    raise
+                logger.info(f"[SMTP] pooled session to {p['host']}:{p['port']} was closed ({e}); reconnecting")
+                self._drop_locked(sess)
+                reused = False
+                connect_ms = self._open_locked(sess, p)
+                refused = sess.smtp.sendmail(from_email, rcpt_addrs, data)
+            sess.last_used = sess.last_check = time.monotonic()
+            return refused, reused, connect_ms
+
+    def prewarm(self, p: Dict[str, Any]) -> None:
+        sess = self._session(p)
+        if not sess.lock.acquire(blocking=False):
+            return  # 이미 발송/연결 중
+        try:
+            if sess.smtp is not None and self._noop_locked(sess):
+                return
+            ms = self._open_locked(sess, p)
+            logger.info(f"[SMTP] prewarmed {p['host']}:{p['port']} in {ms:.0f}ms")
+        except Exception as e:
+            logger.warning(f"[SMTP] prewarm {p['host']}:{p['port']} failed: {e}")
+        finally:
+            sess.lock.release()
+
+    @staticmethod
+    def _noop_locked(sess: _SmtpSession) -> bool:
+        try:
+            ok = sess.smtp.noop()[0] == 250
+        except Exception:
+            ok = False
+        if ok:
+            sess.last_check = time.monotonic()
+        else:
+            _SmtpPool._drop_locked(sess)
+        return ok
+
+    @staticmethod
+    def _drop_locked(sess: _SmtpSession) -> None:
+        _smtp_close(sess.smtp)
+        sess.smtp = None
+
+    def _keep_loop(self) -> None:
+        """유휴 세션 NOOP/종료. 열린 세션이 없으면 스레드 종료(다음 사용 때 다시 뜸)."""
+        while True:
+            time.sleep(max(1.0, min(SMTP_NOOP_S, SMTP_IDLE_S) / 2.0))
+            with self._lock:
+                sessions = list(self._sessions.values())
+            alive = 0
+            for sess in sessions:
+                if not sess.lock.acquire(blocking=False):
+                    alive += 1
+                    continue
+                try:
+                    if sess.smtp is None:
+                        continue
+                    now = time.monotonic()
+                    if now - sess.last_used > SMTP_IDLE_S:
+                        self._drop_locked(sess)
+                        continue
+                    if now - sess.last_check > SMTP_NOOP_S:
+                        self._noop_locked(sess)
+                    alive += sess.smtp is not None
+                finally:
+                    sess.lock.release()
+            if not alive:
+                with self._lock:
+                    self._keeper = None
+                return
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for sess in sessions:
+            with sess.lock:
+                self._drop_locked(sess)
+
+
+_POOL = _SmtpPool()
+
+
+def prewarm_smtp(config: Optional[Dict[str, Any]] = None, config_path: Optional[str] = None) -> None:
+    """백그라운드에서 SMTP 연결/로그인을 미리 해 둔다(바로 반환). simulate/풀 꺼짐/설정 오류면 아무것도 안 함."""
+    if not SMTP_POOL_ENABLED:
+        return
+    try:
+        cfg = load_email_config(config_path) if config is None else dict(config)
+    except Exception:
+        return
+    if _as_bool(cfg.get("simulate", False)):
+        return
+    p = _smtp_params(cfg)
+    if p["host"]:
+        threading.Thread(target=_POOL.prewarm, args=(p,), name="smtp-prewarm", daemon=True).start()
+
+
+def close_smtp_sessions() -> None:
+    """풀의 SMTP 연결을 모두 QUIT(앱 종료 시)."""
+    _POOL.close_all()
+
+
+def _smtp_send(cfg: Dict[str, Any], from_email: str, rcpt_addrs: List[str], data: bytes, subject: str) -> None:
+    """(풀의) SMTP 연결로 sendmail. 실패는 예외로 전달."""
+    p = _smtp_params(cfg)
+    host, port = p["host"], p["port"]
+    use_ssl, use_starttls, username = p["use_ssl"], p["use_starttls"], p["username"]
+
     # 실제 발송
     if not host:
         raise ValueError("SMTP host가 비어 있습니다.")
@@ -376,35 +645,26 @@ def send_email(
         logger.warning("경고: SSL/STARTTLS가 모두 비활성화되어 있습니다. 서버 정책을 확인하세요.")
 
     try:
-        if use_ssl:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(host, port, context=context, timeout=30) as s:
-                s.ehlo()
-                if username:
-                    s.login(username, password)
-                s.send_message(msg)
+        t0 = time.perf_counter()
+        if SMTP_POOL_ENABLED:
+            refused, reused, connect_ms = _POOL.send(p, from_email, rcpt_addrs, data)
         else:
-            with smtplib.SMTP(host, port, timeout=30) as s:
-                s.ehlo()
-                if use_starttls:
-                    context = ssl.create_default_context()
-                    s.starttls(context=context)
-                    s.ehlo()
-                if username:
-                    s.login(username, password)
-                s.send_message(msg)
-
-        logger.info(f"[SENT] To={to_addrs} Subject={subject!r} via {host}:{port} SSL={use_ssl} STARTTLS={use_starttls} user={username!r}")
-        return msg["Message-ID"]
+            s = _smtp_open(p)
+            connect_ms, reused = (time.perf_counter() - t0) * 1000.0, False
+            try:
+                refused = s.sendmail(from_email, rcpt_addrs, data)
+            finally:
+                _smtp_close(s)
+        total_ms = (time.perf_counter() - t0) * 1000.0
+
+        if refused:
+            logger.warning(f"[SENT] partially refused recipients: {refused}")
+        logger.info(f"[SENT] To={rcpt_addrs} Subject={subject!r} via {host}:{port} SSL={use_ssl} STARTTLS={use_starttls} "
+                    f"user={username!r} reused={reused} connect_ms={connect_ms:.0f} total_ms={total_ms:.0f}")
     except smtplib.SMTPAuthenticationError as e:
         # 자주 겪는 인증 문제의 친절한 설명
-        hint = (
-            "SMTP 인증 실패입니다. Gmail이라면 '앱 비밀번호(16자리)'를 사용해야 합니다.\n"
-            "- settings.json의 email.auth.pass 또는 smtp.password가 올바른지 확인하세요.\n"
-            "- 2단계 인증이 켜져 있어야 앱 비밀번호를 발급받을 수 있습니다."
-        )
         logger.error(f"Authentication failed: {e}")
-        raise ValueError(hint) from e
+        raise ValueError(_AUTH_HINT) from e
     except Exception as e:
         logger.error(f"SMTP error: {e}")
         raise
@@ -85,38 +85,19 @@ class FaceEngine(QObject):
     def _to_mp_image(self, frame: object):
         try:
             import mediapipe as mp
-            import numpy as np
-            from PySide6.QtGui import QImage
+            from app.utils import qimage_bridge as QB
         except Exception as e:
             print(f"[FaceEngine] helper import failed: {e}")
             return None
-        # QImage → SRGB np.array
+        # QImage/ndarray → SRGB view(세로 _target_height 고정, 추가 복사 없음)
         try:
-            if isinstance(frame, QImage):
-                img = frame.convertToFormat(QImage.Format.Format_RGB888)
-                w, h = img.width(), img.height()
-                tH = getattr(self, "_target_height", 0)
-                if tH and h != tH:
-                    from PySide6.QtCore import Qt
-                    scale = tH / float(h)
-                    nw = int(round(w * scale))
-                    img = img.scaled(nw, tH, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    w, h = img.width(), img.height()
-                ptr = img.constBits(); stride = img.bytesPerLine()
-                arr = np.frombuffer(ptr, dtype=np.uint8, count=stride*h).reshape((h, stride))
-                arr = arr[:, : w*3].reshape((h, w, 3))
-                return mp.Image(image_format=mp.ImageFormat.SRGB, data=arr)
+            arr, owner = QB.rgb_view(frame, getattr(self, "_target_height", 0))
+            if arr is None:
+                return None
+            self._frame_owner = owner  # view 버퍼 수명 유지(다음 프레임까지)
+            return mp.Image(image_format=mp.ImageFormat.SRGB, data=arr)
         except Exception as e:
             print(f"[FaceEngine] QImage→np failed: {e}")
-        # ndarray path
-        try:
-            arr = np.asarray(frame)
-            if arr.ndim == 3 and arr.shape[2] == 3:
-                return mp.Image(image_format=mp.ImageFormat.SRGB, data=arr)
-            if arr.ndim == 3 and arr.shape[2] == 4:
-                return mp.Image(image_format=mp.ImageFormat.SRGB, data=arr[..., :3])
-        except Exception:
-            pass
         return None
 
     # --- Payload mapping ----------------------------------------------------
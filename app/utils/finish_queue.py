@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+finish_queue: 촬영 마무리 작업(PDF 생성 → 인화 → 출력담당 메일 → 보정담당 메일)의 백그라운드 작업 큐.
+- 작업마다 저널 디렉터리(FINISH_QUEUE_DIR/<job_id>/)에 job.json(상태)과 입력 스냅숏을 둔다.
+  상태가 바뀔 때마다 job.json을 임시 파일 → os.replace로 원자적으로 다시 쓴다.
+- 앱 재시작 시 start()가 끝나지 않은 작업(queued/running)을 다시 대기열에 넣는다(실행 중이던 단계는 pending으로).
+  실행 중에도 유휴 시 저널을 다시 읽어 다른 프로세스(CLI --retry)가 되돌린 작업을 집어 든다.
+- 단계별 재시도(지수 백오프). 재시도 대기 중에도 다른 작업은 계속 진행한다(next_try 기준 선택).
+- 필수 선행 단계가 실패하면 뒤 단계는 skipped. 실패한 작업은 retry(job_id)로 실패 단계만 다시 돌린다.
+- 단계 함수는 fn(job, out) 형태. out은 단계 결과 dict로 실패해도 저널에 남는다(재시도 시 중복 방지에 사용).
+
+환경 변수:
+    FINISH_QUEUE_DIR     저널 디렉터리(기본 C:\\PhotoBox\\.jobs)
+    FINISH_WORKERS       워커 스레드 수(기본 1, 프린터/메일 순서 보장)
+    FINISH_RETRY_BASE_S  재시도 백오프 시작 간격(기본 5초, 2배씩 최대 300초)
+    FINISH_KEEP_DAYS     끝난 작업 저널 보관 일수(기본 7)
+
+사용:
+    from app.utils import finish_queue as FQ
+    FQ.register("finish", [FQ.Step("build_pdf", build_fn, attempts=3), FQ.Step("print", print_fn, requires=("build_pdf",))])
+    FQ.start()                                            # 앱 시작 시(저널 복구 + 워커 기동)
+    job_id = FQ.enqueue("finish", {"session": {...}}, files={"edited": "C:/PhotoBox/edited_photo.jpg"},
+                        steps=["build_pdf", "print"])
+    FQ.status()                                           # 직원용 상태/지연 요약
+    python -m app.utils.finish_queue [--all] [--retry JOB_ID]
+"""
+
+from __future__ import annotations
+import os, json, time, uuid, shutil, logging, threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DIR = Path(os.environ.get("FINISH_QUEUE_DIR", r"C:\PhotoBox\.jobs"))
+_WORKERS = max(1, int(os.environ.get("FINISH_WORKERS", "1") or 1))
+_RETRY_BASE_S = float(os.environ.get("FINISH_RETRY_BASE_S", "5") or 5)
+_RETRY_MAX_S = 300.0
+_RESCAN_S = 30.0  # 유휴 시 저널 재검사 주기(다른 프로세스의 --retry 반영)
+_KEEP_DAYS = float(os.environ.get("FINISH_KEEP_DAYS", "7") or 7)
+
+_QUEUED, _RUNNING, _DONE, _FAILED = "queued", "running", "done", "failed"
+_PENDING, _SKIPPED = "pending", "skipped"
+
+
+@dataclass
+class Step:
+    """작업 단계 정의. fn(job, out) 예외 = 실패(attempts 까지 재시도)."""
+    name: str
+    fn: Callable[[Dict[str, Any], Dict[str, Any]], None]
+    attempts: int = 3
+    requires: Tuple[str, ...] = ()
+
+
+# -----------------------
+# 저널
+# -----------------------
+def _job_dir(job_id: str) -> Path:
+    return QUEUE_DIR / job_id
+
+
+def _write_job(job: Dict[str, Any]) -> None:
+    d = _job_dir(job["id"])
+    d.mkdir(parents=True, exist_ok=True)
+    job["updated"] = time.time()
+    tmp = d / f"job.json.{uuid.uuid4().hex[:8]}.tmp"
+    tmp.write_text(json.dumps(job, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+    os.replace(tmp, d / "job.json")
+
+
+def _read_job(d: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((d / "job.json").read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    return min(_RETRY_MAX_S, _RETRY_BASE_S * (2 ** max(0, attempt - 1)))
+
+
+# -----------------------
+# 큐
+# -----------------------
+class _FinishQueue:
+    """저널 기반 작업 큐(스레드 안전)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._kinds: Dict[str, Dict[str, Step]] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}   # 진행 중(queued/running) 작업
+        self._threads: List[threading.Thread] = []
+        self._stop = False
+
+    # 등록/기동 -------------------------------------------
+    def register(self, kind: str, steps: Sequence[Step]) -> None:
+        with self._cv:
+            self._kinds[kind] = {s.name: s for s in steps}
+            self._cv.notify_all()
+
+    def start(self) -> int:
+        """저널을 복구하고 워커를 띄운다. 다시 대기열에 넣은 작업 수를 반환."""
+        self._prune()
+        with self._cv:
+            self._stop = False
+            n = self._recover_locked((_QUEUED, _RUNNING))
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), _WORKERS):
+                t = threading.Thread(target=self._loop, name=f"finish-queue-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            self._cv.notify_all()
+        if n:
+            logger.info("[finish] recovered %d job(s) from %s", n, QUEUE_DIR)
+        return n
+
+    def _recover_locked(self, states: Tuple[str, ...]) -> int:
+        """저널에서 states 상태인 작업을 대기열로 올린다(실행 중이던 단계는 pending). 잠금 안에서 호출."""
+        n = 0
+        if not QUEUE_DIR.is_dir():
+            return 0
+        for d in sorted(QUEUE_DIR.iterdir()):
+            if not d.is_dir() or d.name in self._jobs:
+                continue
+            job = _read_job(d)
+            if not job or job.get("state") not in states:
+                continue
+            job["state"] = _QUEUED
+            for st in job["steps"]:
+                if st["state"] == _RUNNING:
+                    st["state"] = _PENDING
+            job["next_try"] = 0.0
+            _write_job(job)
+            self._jobs[job["id"]] = job
+            n += 1
+        return n
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """워커를 멈춘다. 진행 중 단계는 끝까지 기다리지 않는다(저널에서 다음 기동 때 이어서 실행)."""
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        deadline = time.monotonic() + max(0.0, timeout)
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+    # 작업 투입 -------------------------------------------
+    def enqueue(self, kind: str, payload: Dict[str, Any], files: Optional[Dict[str, str]] = None,
+                steps: Optional[Sequence[str]] = None) -> str:
+        """입력 파일을 작업 디렉터리로 복사(스냅숏)하고 저널에 기록한 뒤 job_id를 반환."""
+        with self._lock:
+            names = list(steps if steps is not None else self._kinds.get(kind, {}).keys())
+        if not names:
+            raise ValueError(f"finish_queue: no steps for kind={kind!r}")
+        job_id = datetime.now().strftime("%y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        d = _job_dir(job_id)
+        d.mkdir(parents=True, exist_ok=True)
+        snap: Dict[str, str] = {}
+        for key, src in (files or {}).items():
+            if src and os.path.isfile(src):
+                dst = d / f"{key}{Path(src).suffix.lower()}"
+                shutil.copyfile(src, dst)
+                snap[key] = str(dst)
+        job = {
+            "id": job_id, "kind": kind, "state": _QUEUED, "created": time.time(), "started": None, "finished": None,
+            "next_try": 0.0, "payload": payload, "files": snap, "results": {},
+            "steps": [{"name": n, "state": _PENDING, "attempts": 0, "error": None, "ms": 0.0} for n in names],
+        }
+        with self._cv:
+            _write_job(job)
+            self._jobs[job_id] = job
+            self._cv.notify_all()
+        logger.info("[finish] enqueued %s kind=%s steps=%s files=%s", job_id, kind, names, list(snap))
+        return job_id
+
+    def retry(self, job_id: str) -> bool:
+        """실패한 작업의 실패/건너뛴 단계를 다시 대기열에 넣는다."""
+        with self._cv:
+            if job_id in self._jobs:
+                return False
+            job = _read_job(_job_dir(job_id))
+            if not job or job.get("state") != _FAILED:
+                return False
+            for st in job["steps"]:
+                if st["state"] in (_FAILED, _SKIPPED):
+                    st.update(state=_PENDING, attempts=0, error=None)
+            job.update(state=_QUEUED, next_try=0.0, finished=None)
+            _write_job(job)
+            self._jobs[job_id] = job
+            self._cv.notify_all()
+        logger.info("[finish] retry %s", job_id)
+        return True
+
+    # 실행 루프 -------------------------------------------
+    def _next(self) -> Optional[Tuple[Dict[str, Any], Dict[str, Any], Step]]:
+        """실행할 (작업, 단계 상태, 단계 정의). 없으면 대기 후 None(중지 시)."""
+        with self._cv:
+            while not self._stop:
+                now = time.time()
+                wait = None
+                for job in sorted(self._jobs.values(), key=lambda j: j["created"]):
+                    if job["state"] != _QUEUED:
+                        continue
+                    if job["next_try"] > now:
+                        wait = job["next_try"] - now if wait is None else min(wait, job["next_try"] - now)
+                        continue
+                    defs = self._kinds.get(job["kind"])
+                    if defs is None:
+                        continue  # 단계 등록 전(재시작 직후) → register 시 깨움
+                    nxt = self._pick_step(job, defs)
+                    if nxt is None:
+                        continue
+                    st, step = nxt
+                    job["state"] = _RUNNING
+                    job["started"] = job["started"] or now
+                    st["state"] = _RUNNING
+                    st["attempts"] += 1
+                    _write_job(job)
+                    return job, st, step
+                if not self._cv.wait(min(wait, _RESCAN_S) if wait is not None else _RESCAN_S) and not self._stop:
+                    self._recover_locked((_QUEUED,))
+            return None
+
+    def _pick_step(self, job: Dict[str, Any], defs: Dict[str, Step]) -> Optional[Tuple[Dict[str, Any], Step]]:
+        """다음 pending 단계. 선행 단계 실패/누락은 skipped 처리. 남은 단계가 없으면 작업을 마감한다."""
+        by_name = {st["name"]: st for st in job["steps"]}
+        for st in job["steps"]:
+            if st["state"] != _PENDING:
+                continue
+            step = defs.get(st["name"])
+            if step is None:
+                st.update(state=_FAILED, error="unknown step")
+                continue
+            bad = [r for r in step.requires if r in by_name and by_name[r]["state"] in (_FAILED, _SKIPPED)]
+            if bad:
+                st.update(state=_SKIPPED, error=f"requires {','.join(bad)}")
+                continue
+            return st, step
+        self._close(job)
+        return None
+
+    def _close(self, job: Dict[str, Any]) -> None:
+        failed = [st["name"] for st in job["steps"] if st["state"] == _FAILED]
+        job["state"] = _FAILED if failed else _DONE
+        job["finished"] = time.time()
+        _write_job(job)
+        self._jobs.pop(job["id"], None)
+        if not failed:
+            for p in job.get("files", {}).values():  # 입력 스냅숏은 성공 시 정리(실패 작업은 재시도용으로 보존)
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+        logger.info("[finish] %s %s latency=%.1fs steps=%s", job["id"], job["state"],
+                    job["finished"] - job["created"],
+                    ", ".join(f"{st['name']}={st['state']}/{st['attempts']}/{st['ms']:.0f}ms" for st in job["steps"]))
+
+    def _loop(self) -> None:
+        while True:
+            nxt = self._next()
+            if nxt is None:
+                return
+            job, st, step = nxt
+            out = job["results"].setdefault(st["name"], {})
+            t0 = time.perf_counter()
+            err = None
+            try:
+                step.fn(job, out)
+            except Exception as e:
+                err = f"{type(e).__name__}: {e}"
+            ms = (time.perf_counter() - t0) * 1000.0
+            with self._cv:
+                st["ms"] += ms
+                if err is None:
+                    st.update(state=_DONE, error=None)
+                    logger.info("[finish] %s step=%s ok %.0fms (attempt %d)", job["id"], st["name"], ms, st["attempts"])
+                elif st["attempts"] >= step.attempts:
+                    st.update(state=_FAILED, error=err)
+                    logger.error("[finish] %s step=%s failed after %d attempt(s): %s",
+                                 job["id"], st["name"], st["attempts"], err)
+                else:
+                    st.update(state=_PENDING, error=err)
+                    job["next_try"] = time.time() + _backoff(st["attempts"])
+                    logger.warning("[finish] %s step=%s attempt %d/%d failed: %s (retry in %.0fs)",
+                                   job["id"], st["name"], st["attempts"], step.attempts, err, _backoff(st["attempts"]))
+                if job["state"] == _RUNNING:
+                    job["state"] = _QUEUED
+                _write_job(job)
+                self._cv.notify_all()
+
+    # 조회/정리 -------------------------------------------
+    def status(self, limit: int = 20, active_only: bool = False) -> List[Dict[str, Any]]:
+        """최근 작업 요약(최신순): id/state/age_s/latency_s/steps[(name, state, attempts, ms, error)]."""
+        with self._lock:
+            live = {}
+            for k, v in self._jobs.items():
+                try:
+                    live[k] = json.loads(json.dumps(v, default=str))
+                except RuntimeError:  # 단계 결과가 갱신되는 중 → 저널 사본 사용
+                    pass
+        jobs: List[Dict[str, Any]] = list(live.values())
+        if QUEUE_DIR.is_dir():
+            for d in QUEUE_DIR.iterdir():
+                if d.is_dir() and d.name not in live:
+                    job = _read_job(d)
+                    if job:
+                        jobs.append(job)
+        if active_only:
+            jobs = [j for j in jobs if j.get("state") in (_QUEUED, _RUNNING)]
+        jobs.sort(key=lambda j: j.get("created", 0), reverse=True)
+        now = time.time()
+        return [{
+            "id": j["id"], "kind": j.get("kind"), "state": j.get("state"),
+            "age_s": round(now - j.get("created", now), 1),
+            "latency_s": round(j["finished"] - j["created"], 1) if j.get("finished") else None,
+            "steps": [(s["name"], s["state"], s["attempts"], round(s.get("ms", 0.0)), s.get("error"))
+                      for s in j.get("steps", [])],
+        } for j in jobs[:max(0, int(limit))]]
+
+    def _prune(self) -> int:
+        """보관 기간이 지난 끝난 작업 디렉터리를 지운다."""
+        if not QUEUE_DIR.is_dir():
+            return 0
+        cutoff = time.time() - _KEEP_DAYS * 86400.0
+        n = 0
+        for d in QUEUE_DIR.iterdir():
+            job = _read_job(d) if d.is_dir() else None
+            if job and job.get("state") in (_DONE, _FAILED) and (job.get("finished") or 0) < cutoff:
+                shutil.rmtree(d, ignore_errors=True)
+                n += 1
+        if n:
+            logger.info("[finish] pruned %d finished job(s)", n)
+        return n
+
+
+_FQ = _FinishQueue()
+
+
+def register(kind: str, steps: Sequence[Step]) -> None:
+    _FQ.register(kind, steps)
+
+
+def start() -> int:
+    return _FQ.start()
+
+
+def shutdown(timeout: float = 2.0) -> None:
+    _FQ.shutdown(timeout)
+
+
+def enqueue(kind: str, payload: Dict[str, Any], files: Optional[Dict[str, str]] = None,
+            steps: Optional[Sequence[str]] = None) -> str:
+    return _FQ.enqueue(kind, payload, files, steps)
+
+
+def retry(job_id: str) -> bool:
+    return _FQ.retry(job_id)
+
+
+def status(limit: int = 20, active_only: bool = False) -> List[Dict[str, Any]]:
+    return _FQ.status(limit, active_only)
+
+
+__all__ = ["Step", "register", "start", "shutdown", "enqueue", "retry", "status"]
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="마무리 작업 큐 상태/재시도")
+    ap.add_argument("--all", action="store_true", help="끝난 작업 포함(기본: 최근 20개)")
+    ap.add_argument("--active", action="store_true", help="대기/실행 중 작업만")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--retry", metavar="JOB_ID", help="실패한 작업을 다시 대기열에 넣는다(앱 실행 중 반영)")
+    args = ap.parse_args()
+    if args.retry:
+        # 저널만 되돌린다 → 실행 중인 앱이 유휴 재검사(_RESCAN_S) 때 집어 든다
+        print("requeued" if retry(args.retry) else "not a failed job")
+    for j in status(10 ** 6 if args.all else args.limit, args.active):
+        lat = f"{j['latency_s']:.1f}s" if j["latency_s"] is not None else "-"
+        print(f"{j['id']}  {j['kind']:<8} {j['state']:<8} age={j['age_s']:.0f}s latency={lat}")
+        for name, state, attempts, ms, error in j["steps"]:
+            print(f"    {name:<16} {state:<8} x{attempts} {ms}ms" + (f"  {error}" if error else ""))
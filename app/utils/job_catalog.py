@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+job_catalog: 세션 산출물 색인(로컬 SQLite, WAL).
+- 작업 폴더(_work/<yymmdd>/<name_number>)마다 jobs 한 행, 산출물 파일(PDF/인화 JPG/메일 JPG …)마다 artifacts 한 행,
+  메일 요청/결과마다 emails 한 행. 재인화 때 디렉터리를 뒤지지 않고 이름/번호/날짜/상태로 바로 찾는다.
+- storage.save_bundle / save_email_request / save_email_result / build_tiled_pdf 가 같은 시점에 기록한다.
+  색인은 보조 수단이라 기록 실패는 로그만 남기고 호출자에게 예외를 올리지 않는다(파일이 원본).
+- 스레드마다 연결 하나(WAL + synchronous=NORMAL + busy_timeout) → 백그라운드 작업 큐/GUI 스레드 동시 기록 가능.
+- 파일이 옮겨지거나(move_artifact: 임시 PDF → 최종 이름) 보관 기간 정리로 지워지면(forget_paths / purge_jobs_under,
+  retention이 호출) 행도 갱신/삭제 → 색인이 없는 파일을 가리키지 않는다. 정리된 작업 행은 status='purged'로 남긴다.
+- backfill(root): 기존 metadata.json 트리를 읽어 색인을 채운다(이미 있는 작업은 갱신).
+
+환경 변수:
+    JOB_CATALOG_DB  DB 경로(기본 C:\\PhotoBox\\catalog.sqlite3)
+
+사용:
+    from app.utils import job_catalog as JC
+    JC.record_job(job_dir, meta)                               # save_bundle
+    JC.record_artifact("pdf", pdf_path, name="홍길동", number="1234")
+    JC.find(name="홍길동", number="1234")                       # → [{"job_dir", "day", "status", "artifacts": [...]}, ...]
+    python -m app.utils.job_catalog find --name 홍길동 --number 1234
+    python -m app.utils.job_catalog backfill [C:\\PhotoBox\\_work]
+"""
+
+from __future__ import annotations
+import os, re, json, sqlite3, logging, threading, datetime as dt
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.environ.get("JOB_CATALOG_DB", r"C:\PhotoBox\catalog.sqlite3")
+WORK_ROOT = r"C:\PhotoBox\_work"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_dir     TEXT PRIMARY KEY,
+    day         TEXT,
+    name        TEXT,
+    number      TEXT,
+    size_key    TEXT,
+    ratio       TEXT,
+    status      TEXT NOT NULL DEFAULT 'saved',
+    created_at  TEXT,
+    updated_at  TEXT,
+    meta        TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_day ON jobs(day);
+CREATE INDEX IF NOT EXISTS jobs_name ON jobs(name);
+CREATE INDEX IF NOT EXISTS jobs_number ON jobs(number);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    path        TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    job_dir     TEXT,
+    day         TEXT,
+    name        TEXT,
+    number      TEXT,
+    bytes       INTEGER,
+    created_at  TEXT,
+    extra       TEXT
+);
+CREATE INDEX IF NOT EXISTS artifacts_day ON artifacts(day);
+CREATE INDEX IF NOT EXISTS artifacts_name_number ON artifacts(name, number);
+CREATE INDEX IF NOT EXISTS artifacts_job ON artifacts(job_dir);
+
+CREATE TABLE IF NOT EXISTS emails (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_dir      TEXT,
+    to_addr      TEXT,
+    subject      TEXT,
+    status       TEXT NOT NULL DEFAULT 'requested',
+    provider_id  TEXT,
+    error        TEXT,
+    requested_at TEXT,
+    finished_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS emails_job ON emails(job_dir);
+CREATE INDEX IF NOT EXISTS emails_status ON emails(status);
+"""
+
+_TLS = threading.local()
+_INIT_LOCK = threading.Lock()
+_INITIALIZED: set = set()
+_DAY_RE = re.compile(r"^\d{6}$")
+
+
+def _now() -> str:
+    return dt.datetime.now().isoformat(timespec="seconds")
+
+
+def _conn() -> sqlite3.Connection:
+    """스레드별 연결(DB_PATH가 바뀌면 다시 연다)."""
+    c = getattr(_TLS, "conn", None)
+    if c is not None and getattr(_TLS, "path", None) == DB_PATH:
+        return c
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    c = sqlite3.connect(DB_PATH, timeout=5.0, isolation_level=None)
+    c.row_factory = sqlite3.Row
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA busy_timeout=5000")
+    with _INIT_LOCK:
+        if DB_PATH not in _INITIALIZED:
+            c.executescript(_SCHEMA)
+            _INITIALIZED.add(DB_PATH)
+    _TLS.conn, _TLS.path = c, DB_PATH
+    return c
+
+
+def _safe(fn):
+    """기록 함수 래퍼: 실패는 로그만(색인은 보조)."""
+    def wrapper(*a, **kw):
+        try:
+            return fn(*a, **kw)
+        except Exception as e:
+            logger.warning("[catalog] %s failed: %s", fn.__name__, e)
+            return None
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+def _day_of(job_dir: Optional[str], created_at: Optional[str] = None) -> Optional[str]:
+    """작업 폴더의 날짜 버킷(yymmdd). 없으면 created_at에서."""
+    if job_dir:
+        parent = os.path.basename(os.path.dirname(os.path.normpath(job_dir)))
+        if _DAY_RE.match(parent):
+            return parent
+    if created_at:
+        try:
+            return dt.datetime.fromisoformat(created_at).strftime("%y%m%d")
+        except ValueError:
+            pass
+    return dt.datetime.now().strftime("%y%m%d")
+
+
+def session_keys(session: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """세션 → (이름, 번호). 번호가 없으면 전화번호 숫자(키오스크 파일명과 같은 값)."""
+    number = session.get("number") or re.sub(r"\D+", "", str(session.get("phone") or "")) or None
+    return session.get("name"), number
+
+
+def _size(path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+# -----------------------
+# 기록
+# -----------------------
+@_safe
+def record_job(job_dir: str, meta: Dict[str, Any], status: str = "saved") -> Optional[bool]:
+    """작업 한 건(metadata.json 내용)과 그 산출물 파일을 색인한다. 이미 있으면 갱신."""
+    job_dir = os.path.abspath(job_dir)
+    day = _day_of(job_dir, meta.get("created_at"))
+    name, number = meta.get("name"), meta.get("number")
+    now = _now()
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        c.execute(
+            "INSERT INTO jobs(job_dir, day, name, number, size_key, ratio, status, created_at, updated_at, meta) "
+            "VALUES(?,?,?,?,?,?,?,?,?,?) ON CONFLICT(job_dir) DO UPDATE SET day=excluded.day, name=excluded.name, "
+            "number=excluded.number, size_key=excluded.size_key, ratio=excluded.ratio, status=excluded.status, "
+            "updated_at=excluded.updated_at, meta=excluded.meta",
+            (job_dir, day, name, number, meta.get("size_key"), meta.get("ratio"), status,
+             meta.get("created_at") or now, now, json.dumps(meta, ensure_ascii=False)))
+        for kind, rel in (meta.get("files") or {}).items():
+            if not rel or kind == "final_jpg":
+                continue
+            path = os.path.join(job_dir, rel)
+            _upsert_artifact(c, kind, path, job_dir, day, name, number, meta.get("created_at") or now, None)
+    return True
+
+
+def _upsert_artifact(c: sqlite3.Connection, kind: str, path: str, job_dir: Optional[str], day: Optional[str],
+                     name: Optional[str], number: Optional[str], created_at: str, extra: Optional[dict]) -> None:
+    c.execute(
+        "INSERT INTO artifacts(path, kind, job_dir, day, name, number, bytes, created_at, extra) VALUES(?,?,?,?,?,?,?,?,?) "
+        "ON CONFLICT(path) DO UPDATE SET kind=excluded.kind, job_dir=COALESCE(excluded.job_dir, artifacts.job_dir), "
+        "day=excluded.day, name=excluded.name, number=excluded.number, bytes=excluded.bytes, "
+        "created_at=excluded.created_at, extra=excluded.extra",
+        (os.path.abspath(path), kind, job_dir, day, name, number, _size(path), created_at,
+         json.dumps(extra, ensure_ascii=False) if extra else None))
+
+
+@_safe
+def record_artifact(kind: str, path: str, *, name: Optional[str] = None, number: Optional[str] = None,
+                    job_dir: Optional[str] = None, extra: Optional[dict] = None) -> None:
+    """산출물 파일 한 개(PDF, 최종 JPG 등). 같은 경로면 갱신(재생성)."""
+    job_dir = os.path.abspath(job_dir) if job_dir else None
+    now = _now()
+    c = _conn()
+    with c:
+        _upsert_artifact(c, kind, path, job_dir, _day_of(job_dir, now), name, number, now, extra)
+
+
+@_safe
+def record_email_request(job_dir: str, to: str, subject: str) -> Optional[int]:
+    job_dir = os.path.abspath(job_dir)
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        cur = c.execute("INSERT INTO emails(job_dir, to_addr, subject, requested_at) VALUES(?,?,?,?)",
+                        (job_dir, to, subject, _now()))
+        c.execute("UPDATE jobs SET status='email_requested', updated_at=? WHERE job_dir=?", (_now(), job_dir))
+        return cur.lastrowid
+
+
+@_safe
+def record_email_result(job_dir: str, ok: bool, provider_id: Optional[str] = None, error: Optional[str] = None) -> None:
+    """가장 최근의 미완료 메일 요청에 결과를 적고 작업 상태를 emailed / email_failed 로."""
+    job_dir = os.path.abspath(job_dir)
+    status = "sent" if ok else "failed"
+    now = _now()
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        row = c.execute("SELECT id FROM emails WHERE job_dir=? AND finished_at IS NULL ORDER BY id DESC LIMIT 1",
+                        (job_dir,)).fetchone()
+        if row is None:
+            c.execute("INSERT INTO emails(job_dir, status, provider_id, error, requested_at, finished_at) "
+                      "VALUES(?,?,?,?,?,?)", (job_dir, status, provider_id, error, now, now))
+        else:
+            c.execute("UPDATE emails SET status=?, provider_id=?, error=?, finished_at=? WHERE id=?",
+                      (status, provider_id, error, now, row["id"]))
+        c.execute("UPDATE jobs SET status=?, updated_at=? WHERE job_dir=?",
+                  ("emailed" if ok else "email_failed", now, job_dir))
+
+
+@_safe
+def move_artifact(old_path: str, new_path: str) -> Optional[bool]:
+    """산출물 파일이 옮겨졌을 때 행의 경로/크기를 갱신(새 경로의 이전 행은 대체). 옮길 행이 없으면 False."""
+    old, new = os.path.abspath(old_path), os.path.abspath(new_path)
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        if old != new:
+            c.execute("DELETE FROM artifacts WHERE path=?", (new,))
+        cur = c.execute("UPDATE artifacts SET path=?, bytes=? WHERE path=?", (new, _size(new), old))
+        return cur.rowcount > 0
+
+
+@_safe
+def forget_paths(paths: Iterable[str]) -> int:
+    """지워진 파일들의 산출물 행을 지운다(보관 기간 정리). 지운 행 수."""
+    rows = [(os.path.abspath(p),) for p in paths]
+    if not rows:
+        return 0
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        n = c.total_changes
+        c.executemany("DELETE FROM artifacts WHERE path=?", rows)
+        return c.total_changes - n
+
+
+@_safe
+def purge_jobs_under(root: str) -> int:
+    """root(_work/YYMMDD 버킷) 아래 작업을 purged 로 표시하고 남은 산출물 행을 지운다. 표시한 작업 수."""
+    prefix = os.path.join(os.path.abspath(root), "")
+    c = _conn()
+    with c:
+        c.execute("BEGIN")
+        c.execute("DELETE FROM artifacts WHERE substr(job_dir, 1, ?)=?", (len(prefix), prefix))
+        cur = c.execute("UPDATE jobs SET status='purged', updated_at=? WHERE substr(job_dir, 1, ?)=? AND status!='purged'",
+                        (_now(), len(prefix), prefix))
+        return cur.rowcount
+
+
+# -----------------------
+# 조회
+# -----------------------
+def find(name: Optional[str] = None, number: Optional[str] = None, day: Optional[str] = None,
+         status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """조건에 맞는 작업(최근 순) + 산출물 목록. 작업 폴더 없이 기록된 산출물(PDF 등)도 이름/번호로 붙인다."""
+    where, args = [], []
+    for col, v in (("name", name), ("number", number), ("day", day), ("status", status)):
+        if v:
+            where.append(f"{col}=?")
+            args.append(v)
+    sql = "SELECT job_dir, day, name, number, size_key, ratio, status, created_at, updated_at FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC LIMIT ?"
+    c = _conn()
+    jobs = [dict(r) for r in c.execute(sql, args + [int(limit)])]
+    for j in jobs:
+        j["artifacts"] = [dict(r) for r in c.execute(
+            "SELECT kind, path, bytes, created_at FROM artifacts WHERE job_dir=? "
+            "OR (job_dir IS NULL AND name=? AND number=?) ORDER BY created_at", (j["job_dir"], j["name"], j["number"]))]
+        j["emails"] = [dict(r) for r in c.execute(
+            "SELECT to_addr, subject, status, provider_id, error, requested_at, finished_at FROM emails "
+            "WHERE job_dir=? ORDER BY id", (j["job_dir"],))]
+    return jobs
+
+
+def find_artifacts(kind: Optional[str] = None, name: Optional[str] = None, number: Optional[str] = None,
+                   day: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    where, args = [], []
+    for col, v in (("kind", kind), ("name", name), ("number", number), ("day", day)):
+        if v:
+            where.append(f"{col}=?")
+            args.append(v)
+    sql = "SELECT kind, path, job_dir, day, name, number, bytes, created_at FROM artifacts"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC LIMIT ?"
+    return [dict(r) for r in _conn().execute(sql, args + [int(limit)])]
+
+
+def summary() -> Dict[str, Any]:
+    c = _conn()
+    return {
+        "jobs": c.execute("SELECT COUNT(*) FROM jobs").fetchone()[0],
+        "artifacts": c.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0],
+        "emails": c.execute("SELECT COUNT(*) FROM emails").fetchone()[0],
+        "by_status": {r[0]: r[1] for r in c.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")},
+    }
+
+
+# -----------------------
+# 백필
+# -----------------------
+def _iter_meta(root: str) -> Iterable[str]:
+    """_work/<yymmdd>/<job>/metadata.json (날짜 버킷 → 작업 폴더 두 단계만 본다)."""
+    try:
+        days = [e for e in os.scandir(root) if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for d in sorted(days, key=lambda e: e.name):
+        try:
+            jobs = [e for e in os.scandir(d.path) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for j in jobs:
+            p = os.path.join(j.path, "metadata.json")
+            if os.path.isfile(p):
+                yield p
+
+
+def backfill(root: str = WORK_ROOT) -> Dict[str, int]:
+    """기존 metadata.json / email_result.json 트리로 색인을 채운다. {"jobs", "errors"}."""
+    n = err = 0
+    for p in _iter_meta(root):
+        job_dir = os.path.dirname(p)
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            status = "saved"
+            res_p = os.path.join(job_dir, "email_result.json")
+            if os.path.isfile(res_p):
+                with open(res_p, "r", encoding="utf-8") as f:
+                    status = "emailed" if json.load(f).get("ok") else "email_failed"
+            elif os.path.isfile(os.path.join(job_dir, "email_request.json")):
+                status = "email_requested"
+            if not record_job(job_dir, meta, status):
+                err += 1
+                continue
+            n += 1
+        except Exception as e:
+            err += 1
+            logger.warning("[catalog] backfill %s: %s", p, e)
+    logger.info("[catalog] backfill %s: %d jobs, %d errors", root, n, err)
+    return {"jobs": n, "errors": err}
+
+
+__all__ = ["DB_PATH", "session_keys", "record_job", "record_artifact", "record_email_request", "record_email_result",
+           "move_artifact", "forget_paths", "purge_jobs_under", "find", "find_artifacts", "summary", "backfill"]
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="작업 색인(SQLite) 조회/백필")
+    sub = ap.add_subparsers(dest="cmd")
+    f = sub.add_parser("find", help="작업 찾기(최근 순)")
+    f.add_argument("--name")
+    f.add_argument("--number")
+    f.add_argument("--day", help="yymmdd")
+    f.add_argument("--status", help="saved | email_requested | emailed | email_failed")
+    f.add_argument("--limit", type=int, default=20)
+    a = sub.add_parser("artifacts", help="산출물 찾기(PDF 재인화 등)")
+    a.add_argument("--kind", help="pdf | print | email | preview | raw | final_jpg")
+    a.add_argument("--name")
+    a.add_argument("--number")
+    a.add_argument("--day")
+    a.add_argument("--limit", type=int, default=20)
+    b = sub.add_parser("backfill", help="기존 metadata.json 트리 가져오기")
+    b.add_argument("root", nargs="?", default=WORK_ROOT)
+    sub.add_parser("summary")
+    args = ap.parse_args()
+
+    if args.cmd == "find":
+        for j in find(args.name, args.number, args.day, args.status, args.limit):
+            print(f"{j['day']}  {j['name']}_{j['number']}  {j['status']:<15} {j['job_dir']}")
+            for r in j["artifacts"]:
+                print(f"    {r['kind']:<9} {r['bytes'] or 0:>9}  {r['path']}")
+            for m in j["emails"]:
+                print(f"    mail → {m['to_addr']} {m['status']}" + (f"  {m['error']}" if m["error"] else ""))
+    elif args.cmd == "artifacts":
+        for r in find_artifacts(args.kind, args.name, args.number, args.day, args.limit):
+            print(f"{r['day']}  {r['kind']:<9} {r['name']}_{r['number']}  {r['bytes'] or 0:>9}  {r['path']}")
+    elif args.cmd == "backfill":
+        print(backfill(args.root))
+    else:
+        print(json.dumps(summary(), ensure_ascii=False, indent=1))
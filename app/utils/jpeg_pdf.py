@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+jpeg_pdf: JPEG 한 장을 이미지 XObject 하나로 넣고 여러 번 배치하는 최소 PDF 작성기.
+- JPEG 바이트를 DCTDecode 스트림으로 그대로 넣는다(재압축 없음).
+- 배치마다 클립 사각형 + 변환행렬(cm)로 같은 XObject를 그린다 → 파일 크기가 타일 수와 무관.
+- 좌표는 QPdfWriter와 같은 페이지 px(원점 좌상단, dpi 기준)로 받아 PDF pt(원점 좌하단)로 바꾼다.
+- 크롭/회전/스케일은 변환행렬로만 처리하므로 픽셀 리샘플은 뷰어/프린터 드라이버가 한 번만 한다.
+
+사용:
+    from app.utils import jpeg_pdf as JP
+    data = open(path, "rb").read()
+    if JP.jpeg_info(data):
+        JP.write_tiled_pdf(out_path, data, page_mm=(152.4, 101.6), dpi=300,
+                           crop=(cx, cy, cw, ch), tiles=[(x, y, w, h), ...], rotate=False)
+"""
+
+from __future__ import annotations
+import os, uuid, logging
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SOF 마커(허프만/산술, 기본/확장/프로그레시브). C4(DHT)/C8(JPG)/CC(DAC)는 제외.
+_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_COLORSPACE = {1: b"/DeviceGray", 3: b"/DeviceRGB"}
+
+
+def jpeg_info(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """JPEG 헤더에서 (width, height, components). 8비트 Gray/RGB가 아니거나 해석 실패 시 None."""
+    try:
+        if data[:2] != b"\xff\xd8":
+            return None
+        i, n = 2, len(data)
+        while i + 4 <= n:
+            if data[i] != 0xFF:
+                return None
+            m = data[i + 1]
+            if m == 0xFF:  # 채움 바이트
+                i += 1
+                continue
+            if m in (0xD8, 0x01) or 0xD0 <= m <= 0xD7:
+                i += 2
+                continue
+            seg = int.from_bytes(data[i + 2:i + 4], "big")
+            if m in _SOF:
+                bits = data[i + 4]
+                h = int.from_bytes(data[i + 5:i + 7], "big")
+                w = int.from_bytes(data[i + 7:i + 9], "big")
+                nc = data[i + 9]
+                if bits != 8 or nc not in _COLORSPACE or w <= 0 or h <= 0:
+                    return None
+                return w, h, nc
+            if m == 0xDA:  # SOS 전에 SOF가 없으면 잘못된 파일
+                return None
+            i += 2 + seg
+    except Exception:
+        pass
+    return None
+
+
+def _num(v: float) -> bytes:
+    s = f"{v:.4f}".rstrip("0").rstrip(".")
+    return (s if s not in ("", "-0") else "0").encode("ascii")
+
+
+def _mul(a: Sequence[float], b: Sequence[float]) -> Tuple[float, ...]:
+    """아핀 행렬 곱 a·b. 행렬은 (m00, m01, m02, m10, m11, m12) = [[m00 m01 m02], [m10 m11 m12], [0 0 1]]."""
+    return (a[0] * b[0] + a[1] * b[3], a[0] * b[1] + a[1] * b[4], a[0] * b[2] + a[1] * b[5] + a[2],
+            a[3] * b[0] + a[4] * b[3], a[3] * b[1] + a[4] * b[4], a[3] * b[2] + a[4] * b[5] + a[5])
+
+
+def _tile_matrix(iw: int, ih: int, rotate: bool, crop: Tuple[int, int, int, int],
+                 dst: Tuple[float, float, float, float], k: float, page_h_pt: float) -> Tuple[float, ...]:
+    """이미지 단위 정사각형(u, v; v 위쪽) → PDF pt 변환(cm 인자 a b c d e f)."""
+    cx, cy, cw, ch = crop
+    dx, dy, dw, dh = dst
+    m = (iw, 0.0, 0.0, 0.0, -ih, ih)                  # 단위 정사각형 → 원본 px(y 아래쪽)
+    if rotate:                                          # QTransform().rotate(90) 과 같은 시계 방향 90°
+        m = _mul((0.0, -1.0, ih, 1.0, 0.0, 0.0), m)
+    sx, sy = dw / float(cw), dh / float(ch)
+    m = _mul((sx, 0.0, dx - cx * sx, 0.0, sy, dy - cy * sy), m)   # 커버 크롭 + 타일 크기 스케일
+    m = _mul((k, 0.0, 0.0, 0.0, -k, page_h_pt), m)                # 페이지 px(y 아래) → pt(y 위)
+    return m[0], m[3], m[1], m[4], m[2], m[5]
+
+
+def _pdf(objects: List[bytes]) -> bytes:
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write_tiled_pdf(out_path: str, jpeg: bytes, *, page_mm: Tuple[float, float], dpi: int,
+                    crop: Tuple[int, int, int, int], tiles: Sequence[Tuple[float, float, float, float]],
+                    rotate: bool = False, separators: Sequence[Tuple[float, float, float, float]] = ()) -> int:
+    """한 페이지 PDF를 원자적으로 쓴다. 쓴 바이트 수를 반환.
+
+    - crop: (회전 적용 후) 원본 px 기준 커버 크롭 사각형. 모든 타일에 같은 크롭을 쓴다.
+    - tiles: 페이지 px 기준 그릴 사각형(블리드 포함). 사각형 밖은 클립된다.
+    - separators: 페이지 px 기준 1px 테두리 사각형.
+    """
+    info = jpeg_info(jpeg)
+    if info is None:
+        raise ValueError("jpeg_pdf: unsupported JPEG (8-bit Gray/RGB only)")
+    iw, ih, nc = info
+    k = 72.0 / float(dpi)
+    page_w_pt, page_h_pt = page_mm[0] * 72.0 / 25.4, page_mm[1] * 72.0 / 25.4
+
+    ops = []
+    for dst in tiles:
+        x, y, w, h = dst
+        a, b, c, d, e, f = _tile_matrix(iw, ih, rotate, crop, dst, k, page_h_pt)
+        ops.append(b"q %s %s %s %s re W n %s %s %s %s %s %s cm /Im0 Do Q" % (
+            _num(x * k), _num(page_h_pt - (y + h) * k), _num(w * k), _num(h * k),
+            _num(a), _num(b), _num(c), _num(d), _num(e), _num(f)))
+    for x, y, w, h in separators:
+        ops.append(b"q 0 G %s w %s %s %s %s re S Q" % (
+            _num(k), _num(x * k), _num(page_h_pt - (y + h) * k), _num(w * k), _num(h * k)))
+    content = b"\n".join(ops)
+
+    pdf = _pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] /Resources << /XObject << /Im0 4 0 R >> >> "
+        b"/Contents 5 0 R >>" % (_num(page_w_pt), _num(page_h_pt)),
+        b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 "
+        b"/Filter /DCTDecode /Length %d >>\nstream\n" % (iw, ih, _COLORSPACE[nc], len(jpeg)) + jpeg + b"\nendstream",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+    ])
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = f"{out_path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp, "wb") as fo:
+            fo.write(pdf)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    logger.info("[jpeg_pdf] %s tiles=%d image=%dx%d bytes=%d", out_path, len(tiles), iw, ih, len(pdf))
+    return len(pdf)
+
+
+__all__ = ["jpeg_info", "write_tiled_pdf"]
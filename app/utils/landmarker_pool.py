@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+landmarker_pool: 프로세스 전역 MediaPipe 랜드마커 풀.
+- 모델 바이트(.task)는 프로세스당 1회만 읽는다.
+- 인스턴스는 (kind, mode, options) 키로 보관하고 재사용한다(생성 비용 1회).
+- 한 인스턴스는 동시에 한 스레드만 사용한다(lease 동안 풀에서 빠짐).
+- 검출 입력은 detection_proxy()로 긴 변 AI_PROXY_EDGE(px)까지 축소한다(정규화 좌표는 원본과 동일).
+
+사용:
+    from app.utils import landmarker_pool as LP
+    with LP.lease("face_mesh", max_num_faces=1, refine_landmarks=True) as fm:
+        res = fm.process(LP.detection_proxy(rgb))
+"""
+
+from __future__ import annotations
+import os, time, logging, threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 키 하나당 보관할 최대 유휴 인스턴스 수(워커 스레드 수 이상이면 충분)
+_MAX_IDLE_PER_KEY = int(os.environ.get("AI_LANDMARKER_POOL_IDLE", "2") or 2)
+# 검출용 프록시 긴 변(px). 0이면 원본 해상도 그대로 검출
+PROXY_EDGE = int(os.environ.get("AI_PROXY_EDGE", "1280") or 0)
+
+_LOCK = threading.Lock()
+_IDLE: Dict[Tuple, List[Any]] = {}
+_MODEL_BYTES: Dict[str, bytes] = {}
+_STATS = {"created": 0, "reused": 0, "create_ms": 0.0}
+
+
+# -----------------------
+# 모델 파일
+# -----------------------
+def _model_candidates(name: str) -> List[str]:
+    """모델 파일 탐색 후보 경로를 반환한다."""
+    base = os.getcwd()
+    mod_dir = os.path.dirname(os.path.abspath(__file__))  # app/utils
+    return [
+        os.path.join(base, name),
+        os.path.join(base, "models", name),
+        os.path.join(base, "app", "utils", "models", name),
+        os.path.join(mod_dir, name),
+        os.path.join(mod_dir, "models", name),
+    ]
+
+
+def load_model_bytes(name: str = "face_landmarker.task") -> Optional[bytes]:
+    """모델 바이트를 1회 로드해 캐시한다. 실패 시 None(캐시하지 않음 → 파일이 생기면 다음 호출에서 다시 찾는다)."""
+    with _LOCK:
+        if name in _MODEL_BYTES:
+            return _MODEL_BYTES[name]
+    data: Optional[bytes] = None
+    for p in _model_candidates(name):
+        try:
+            if os.path.exists(p) and os.path.getsize(p) > 100 * 1024:
+                with open(p, "rb") as f:
+                    data = f.read()
+                logger.info("[pool] model loaded: %s (%d bytes)", p, len(data))
+                break
+        except Exception as e:
+            logger.error("[pool] model read failed: %s: %s", p, e)
+            continue
+    if data is None:
+        logger.warning("[pool] model not found: %s", name)
+        return None
+    with _LOCK:
+        _MODEL_BYTES[name] = data
+    return data
+
+
+# -----------------------
+# 팩토리
+# -----------------------
+def _make_face_mesh(*, static_image_mode: bool = True, max_num_faces: int = 1,
+                    refine_landmarks: bool = True, min_detection_confidence: float = 0.5) -> Any:
+    """solutions.FaceMesh 인스턴스를 만든다."""
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode,
+        max_num_faces=max_num_faces,
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=min_detection_confidence,
+    )
+
+
+def _make_pose(*, static_image_mode: bool = True, model_complexity: int = 1,
+               min_detection_confidence: float = 0.5) -> Any:
+    """solutions.Pose 인스턴스를 만든다."""
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
+        model_complexity=model_complexity,
+        min_detection_confidence=min_detection_confidence,
+    )
+
+
+def _make_face_landmarker(*, model: str = "face_landmarker.task", running_mode: str = "IMAGE",
+                          num_faces: int = 1) -> Any:
+    """Tasks FaceLandmarker 인스턴스를 만든다(모델 바이트 캐시 사용)."""
+    from mediapipe.tasks import python as mp_python
+    from mediapipe.tasks.python import vision as mp_vision
+    data = load_model_bytes(model)
+    if not data:
+        raise FileNotFoundError(f"model not found: {model}")
+    opts = mp_vision.FaceLandmarkerOptions(
+        base_options=mp_python.BaseOptions(model_asset_buffer=data),
+        num_faces=int(num_faces),
+        running_mode=getattr(mp_vision.RunningMode, str(running_mode).upper()),
+    )
+    return mp_vision.FaceLandmarker.create_from_options(opts)
+
+
+_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "face_mesh": _make_face_mesh,
+    "pose": _make_pose,
+    "face_landmarker": _make_face_landmarker,
+}
+
+
+def _key(kind: str, options: Dict[str, Any]) -> Tuple:
+    """(kind, 정렬된 옵션) 풀 키를 만든다."""
+    return (kind,) + tuple(sorted(options.items()))
+
+
+def _close(inst: Any) -> None:
+    """인스턴스의 네이티브 리소스를 해제한다."""
+    try:
+        fn = getattr(inst, "close", None)
+        if callable(fn):
+            fn()
+    except Exception:
+        pass
+
+
+# -----------------------
+# Public API
+# -----------------------
+@contextmanager
+def lease(kind: str, **options: Any) -> Iterator[Any]:
+    """풀에서 인스턴스를 빌려주고, 블록 종료 시 반납한다."""
+    if kind not in _FACTORIES:
+        raise KeyError(f"unknown landmarker kind: {kind}")
+    key = _key(kind, options)
+    inst = None
+    with _LOCK:
+        idle = _IDLE.get(key)
+        if idle:
+            inst = idle.pop()
+            _STATS["reused"] += 1
+    if inst is None:
+        t0 = time.perf_counter()
+        inst = _FACTORIES[kind](**options)
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        with _LOCK:
+            _STATS["created"] += 1
+            _STATS["create_ms"] += dt_ms
+        logger.info("[pool] create %s opts=%s %.1fms", kind, options, dt_ms)
+    broken = False
+    try:
+        yield inst
+    except Exception:
+        # 추론 중 예외가 난 인스턴스는 상태를 신뢰할 수 없으므로 폐기
+        broken = True
+        raise
+    finally:
+        keep = False
+        if not broken:
+            with _LOCK:
+                idle = _IDLE.setdefault(key, [])
+                if len(idle) < _MAX_IDLE_PER_KEY:
+                    idle.append(inst)
+                    keep = True
+        if not keep:
+            _close(inst)
+
+
+def detection_proxy(img, long_edge: Optional[int] = None):
+    """검출용 축소 이미지(채널 순서 유지). 이미 작으면 원본을 그대로 반환한다.
+
+    - 랜드마크는 정규화 좌표(0~1)이므로 원본 W/H를 곱하면 그대로 원본 픽셀 좌표가 된다.
+    - 축소 크기 반올림에 따른 종횡비 오차는 프록시 기준 0.5px 미만(원본 기준 수 px 이내)이다.
+    """
+    edge = PROXY_EDGE if long_edge is None else int(long_edge)
+    h, w = img.shape[:2]
+    if edge <= 0 or max(h, w) <= edge:
+        return img
+    import cv2
+    s = edge / float(max(h, w))
+    size = (max(1, int(round(w * s))), max(1, int(round(h * s))))
+    # 정수 배율 INTER_AREA(빠른 경로) → 나머지 배율만 선형 보간(비정수 INTER_AREA보다 약 2배 빠름)
+    k = int(max(h, w) // edge)
+    if k >= 2:
+        img = cv2.resize(img, (max(1, w // k), max(1, h // k)), interpolation=cv2.INTER_AREA)
+    return cv2.resize(img, size, interpolation=cv2.INTER_LINEAR)
+
+
+def warmup(kinds: Tuple[str, ...] = ("face_mesh", "pose")) -> None:
+    """기본 옵션 인스턴스를 미리 만들어 둔다(실패는 무시)."""
+    defaults = {
+        "face_mesh": {"max_num_faces": 1, "refine_landmarks": True},
+        "pose": {},
+        "face_landmarker": {"num_faces": 1, "running_mode": "IMAGE"},
+    }
+    for kind in kinds:
+        try:
+            with lease(kind, **defaults.get(kind, {})):
+                pass
+        except Exception as e:
+            logger.info("[pool] warmup skip %s: %s", kind, e)
+
+
+def clear() -> None:
+    """유휴 인스턴스를 모두 해제한다(모델 바이트 캐시는 유지)."""
+    with _LOCK:
+        items = [inst for lst in _IDLE.values() for inst in lst]
+        _IDLE.clear()
+    for inst in items:
+        _close(inst)
+
+
+def stats() -> Dict[str, float]:
+    """생성/재사용 횟수와 누적 생성 시간을 반환한다."""
+    with _LOCK:
+        return dict(_STATS)
+
+
+__all__ = ["PROXY_EDGE", "lease", "load_model_bytes", "detection_proxy", "warmup", "clear", "stats"]
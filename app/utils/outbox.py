@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+outbox: 이메일 아웃박스(오프라인 스풀) + 백그라운드 발송 스레드.
+- enqueue()는 메시지를 즉시 구성(첨부 포함)해 OUTBOX_DIR/pending/<key>.eml 로 쓰고 바로 반환한다(UI는 기다리지 않음).
+  메타(<key>.json)는 .eml 다음에 쓴다. 둘 다 임시 파일 → os.replace 원자적 교체, .json 이 있어야 커밋된 메시지.
+- 발송 스레드가 pending 메시지를 오래된 순으로 보낸다. 실패 시 지수 백오프(EMAIL_RETRY_BASE_S × 2^n, 최대 EMAIL_RETRY_MAX_S).
+  영구 오류(수신자/발신자 거부, 5xx 데이터 거부)나 EMAIL_MAX_ATTEMPTS 초과는 failed/ 로 옮긴다(retry_failed로 되돌림).
+- 중복 방지: 파일 키 = sha1(Message-ID). 같은 Message-ID(또는 같은 dedup_key)가 pending/sent/failed 에 있으면 다시 넣지 않는다.
+  dedup_key를 주면 Message-ID를 그 키에서 결정적으로 만든다(연속 터치/작업 재시도에도 한 통).
+- 발송 성공 기록은 sent/<key>.json 으로 EMAIL_SENT_KEEP_DAYS 동안 보관한다(중복 판정/상태 조회용).
+- SMTP 설정은 보낼 때마다 emailer.load_email_config()로 읽는다(스풀 중 설정을 고쳐도 반영, 비밀번호는 디스크에 남기지 않음).
+
+환경 변수:
+    EMAIL_OUTBOX_DIR     아웃박스 디렉터리(기본 C:\\PhotoBox\\outbox)
+    EMAIL_RETRY_BASE_S   재시도 시작 간격(기본 30초)
+    EMAIL_RETRY_MAX_S    재시도 최대 간격(기본 1800초)
+    EMAIL_MAX_ATTEMPTS   최대 시도 횟수(기본 20)
+    EMAIL_SENT_KEEP_DAYS 발송 기록 보관 일수(기본 7)
+
+사용:
+    from app.utils import outbox
+    outbox.start()                                           # 앱 시작 시(남은 스풀 발송)
+    mid = outbox.enqueue("a@b.com", "제목", "본문", ["C:/PhotoBox/JPG/x.jpg"], dedup_key="job1|customer|a@b.com")
+    outbox.status(mid)    # {"state": "pending"|"sent"|"failed", "attempts", "last_error", "next_try", ...}
+    outbox.summary()      # {"pending", "sent", "failed", "oldest_pending_s", "last_error"}
+"""
+
+from __future__ import annotations
+import os, json, time, uuid, hashlib, logging, smtplib, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DIR = Path(os.environ.get("EMAIL_OUTBOX_DIR", r"C:\PhotoBox\outbox"))
+_RETRY_BASE_S = float(os.environ.get("EMAIL_RETRY_BASE_S", "30") or 30)
+_RETRY_MAX_S = float(os.environ.get("EMAIL_RETRY_MAX_S", "1800") or 1800)
+_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "20") or 20)
+_SENT_KEEP_DAYS = float(os.environ.get("EMAIL_SENT_KEEP_DAYS", "7") or 7)
+
+_PENDING, _SENT, _FAILED = "pending", "sent", "failed"
+
+
+# -----------------------
+# 경로/원자적 쓰기
+# -----------------------
+def _key(message_id: str) -> str:
+    return hashlib.sha1(message_id.strip().encode("utf-8")).hexdigest()[:24]
+
+
+def _path(state: str, key: str, ext: str) -> Path:
+    return OUTBOX_DIR / state / f"{key}.{ext}"
+
+
+def _atomic_write(dst: Path, data: bytes) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+def _write_meta(state: str, meta: Dict[str, Any]) -> None:
+    _atomic_write(_path(state, meta["key"], "json"), json.dumps(meta, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+def _read_meta(p: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _unlink(*paths: Path) -> None:
+    for p in paths:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def _backoff(attempts: int) -> float:
+    return min(_RETRY_MAX_S, _RETRY_BASE_S * (2 ** max(0, attempts - 1)))
+
+
+def _permanent(e: Exception) -> bool:
+    """재시도해도 소용없는 오류(수신자/발신자 거부, 5xx 데이터 거부)."""
+    if isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    return isinstance(e, smtplib.SMTPDataError) and 500 <= int(getattr(e, "smtp_code", 0) or 0) < 600
+
+
+def message_id_for(dedup_key: str, from_email: str) -> str:
+    """dedup_key에서 결정적 Message-ID(<sha1@발신 도메인>)."""
+    domain = (from_email.rsplit("@", 1)[-1] if "@" in (from_email or "") else "") or "photostudio.local"
+    return f"<{hashlib.sha1(dedup_key.encode('utf-8')).hexdigest()[:32]}@{domain}>"
+
+
+# -----------------------
+# 아웃박스
+# -----------------------
+class _Outbox:
+    """스풀 디렉터리 + 발송 스레드(스레드 안전)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._busy = False
+        self._last_error: Optional[str] = None
+
+    # 기동/정지 -------------------------------------------
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        pdir = OUTBOX_DIR / _PENDING
+        if pdir.is_dir():
+            for p in pdir.glob("*.json"):
+                meta = _read_meta(p)
+                if meta and _path(_PENDING, meta["key"], "eml").exists():
+                    self._pending[meta["key"]] = meta
+        self._prune_sent()
+
+    def start(self) -> int:
+        """스풀을 읽고 발송 스레드를 띄운다. 대기 메시지 수를 반환."""
+        with self._cv:
+            self._stop = False
+            self._load_locked()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="email-outbox", daemon=True)
+                self._thread.start()
+            self._cv.notify_all()
+            n = len(self._pending)
+        if n:
+            logger.info("[outbox] %d pending message(s) in %s", n, OUTBOX_DIR)
+        return n
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """발송 스레드를 멈춘다. 남은 메시지는 스풀에 있다가 다음 start() 때 보낸다."""
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        if self._thread is not None:
+            self._thread.join(max(0.0, timeout))
+
+    # 투입 ------------------------------------------------
+    def enqueue(self, to, subject: str, body: str, attachments: Optional[List[str]] = None, *,
+                cc: Optional[List[str]] = None, bcc: Optional[List[str]] = None, subtype: str = "plain",
+                dedup_key: Optional[str] = None, tag: Optional[str] = None,
+                config: Optional[Dict[str, Any]] = None, attachment_max_bytes: Optional[int] = None) -> str:
+        """메시지를 스풀에 쓰고 Message-ID를 반환(발송은 백그라운드). 설정/첨부 오류는 즉시 예외.
+        attachment_max_bytes: 이미지 첨부 용량 예산(emailer.build_message 참고)."""
+        from app.utils import emailer
+        to_addrs = [to] if isinstance(to, str) else [t for t in (to or []) if t]
+        if not to_addrs:
+            raise ValueError("수신자(to)가 비었습니다.")
+        cfg = emailer.load_email_config() if config is None else dict(config)
+        from_email = cfg.get("from_email")
+        if not from_email:
+            raise ValueError("발신 주소(from_email)가 없습니다.")
+        mid = message_id_for(dedup_key, from_email) if dedup_key else None
+        if mid:
+            st = self.status(mid)
+            if st is not None:
+                logger.info("[outbox] dedup %s (%s) to=%s", mid, st["state"], to_addrs)
+                return mid
+        msg = emailer.build_message(
+            from_email=from_email, from_name=cfg.get("from_name"), to_addrs=to_addrs, subject=subject,
+            body=body, subtype=subtype, cc_addrs=cc, bcc_addrs=bcc, attachments=attachments, message_id=mid,
+            attachment_max_bytes=attachment_max_bytes,
+        )
+        mid = str(msg["Message-ID"])
+        key = _key(mid)
+        meta = {
+            "key": key, "message_id": mid, "from": from_email, "to": to_addrs,
+            "rcpt": to_addrs + list(cc or []) + list(bcc or []), "subject": subject, "tag": tag,
+            "created": time.time(), "attempts": 0, "next_try": 0.0, "last_error": None, "state": _PENDING,
+        }
+        with self._cv:
+            self._load_locked()
+            if key in self._pending:
+                return mid
+            _atomic_write(_path(_PENDING, key, "eml"), emailer.message_bytes(msg))
+            _write_meta(_PENDING, meta)
+            self._pending[key] = meta
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = False
+                self._thread = threading.Thread(target=self._loop, name="email-outbox", daemon=True)
+                self._thread.start()
+            self._cv.notify_all()
+        logger.info("[outbox] queued %s to=%s subj=%r tag=%s", mid, to_addrs, subject, tag)
+        return mid
+
+    def retry_failed(self, message_id: Optional[str] = None) -> int:
+        """failed/ 메시지(또는 지정 메시지)를 pending으로 되돌린다. 되돌린 개수를 반환."""
+        fdir = OUTBOX_DIR / _FAILED
+        keys = [_key(message_id)] if message_id else [p.stem for p in fdir.glob("*.json")] if fdir.is_dir() else []
+        n = 0
+        with self._cv:
+            self._load_locked()
+            for key in keys:
+                meta = _read_meta(_path(_FAILED, key, "json"))
+                eml = _path(_FAILED, key, "eml")
+                if not meta or not eml.exists():
+                    continue
+                meta.update(state=_PENDING, attempts=0, next_try=0.0)
+                _atomic_write(_path(_PENDING, key, "eml"), eml.read_bytes())
+                _write_meta(_PENDING, meta)
+                _unlink(eml, _path(_FAILED, key, "json"))
+                self._pending[key] = meta
+                n += 1
+            self._cv.notify_all()
+        return n
+
+    # 발송 루프 -------------------------------------------
+    def _next(self) -> Optional[Dict[str, Any]]:
+        with self._cv:
+            while not self._stop:
+                now = time.time()
+                due = [m for m in self._pending.values() if m["next_try"] <= now]
+                if due:
+                    self._busy = True
+                    return min(due, key=lambda m: m["created"])
+                wait = min((m["next_try"] - now for m in self._pending.values()), default=None)
+                self._cv.wait(wait)
+            return None
+
+    def _loop(self) -> None:
+        from app.utils import emailer
+        while True:
+            meta = self._next()
+            if meta is None:
+                return
+            key = meta["key"]
+            err: Optional[Exception] = None
+            try:
+                data = _path(_PENDING, key, "eml").read_bytes()
+                emailer.deliver(data, meta["from"], meta["rcpt"], subject=meta.get("subject", ""))
+            except Exception as e:
+                err = e
+            with self._cv:
+                self._busy = False
+                meta["attempts"] += 1
+                if err is None:
+                    meta.update(state=_SENT, sent_at=time.time(), last_error=None)
+                    _write_meta(_SENT, meta)
+                    _unlink(_path(_PENDING, key, "eml"), _path(_PENDING, key, "json"))
+                    self._pending.pop(key, None)
+                    logger.info("[outbox] sent %s to=%s attempts=%d latency=%.1fs", meta["message_id"], meta["to"],
+                                meta["attempts"], meta["sent_at"] - meta["created"])
+                else:
+                    msg = f"{type(err).__name__}: {err}"
+                    meta["last_error"] = self._last_error = msg
+                    if _permanent(err) or meta["attempts"] >= _MAX_ATTEMPTS:
+                        meta["state"] = _FAILED
+                        eml = _path(_PENDING, key, "eml")
+                        if eml.exists():
+                            _atomic_write(_path(_FAILED, key, "eml"), eml.read_bytes())
+                        _write_meta(_FAILED, meta)
+                        _unlink(eml, _path(_PENDING, key, "json"))
+                        self._pending.pop(key, None)
+                        logger.error("[outbox] failed %s to=%s after %d attempt(s): %s",
+                                     meta["message_id"], meta["to"], meta["attempts"], msg)
+                    else:
+                        meta["next_try"] = time.time() + _backoff(meta["attempts"])
+                        _write_meta(_PENDING, meta)
+                        logger.warning("[outbox] attempt %d for %s failed: %s (retry in %.0fs)",
+                                       meta["attempts"], meta["message_id"], msg, _backoff(meta["attempts"]))
+                self._cv.notify_all()
+
+    # 조회 ------------------------------------------------
+    def status(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """메시지 상태(pending/sent/failed 메타 사본). 모르는 Message-ID면 None."""
+        key = _key(message_id)
+        with self._lock:
+            self._load_locked()
+            meta = self._pending.get(key)
+            if meta is not None:
+                return dict(meta)
+        for state in (_SENT, _FAILED):
+            meta = _read_meta(_path(state, key, "json"))
+            if meta is not None:
+                return meta
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load_locked()
+            pend = list(self._pending.values())
+            last = self._last_error
+        count = lambda s: len(list((OUTBOX_DIR / s).glob("*.json"))) if (OUTBOX_DIR / s).is_dir() else 0
+        now = time.time()
+        return {
+            "pending": len(pend), "sent": count(_SENT), "failed": count(_FAILED),
+            "oldest_pending_s": round(max((now - m["created"] for m in pend), default=0.0), 1),
+            "last_error": last,
+        }
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """지금 보낼 수 있는 메시지를 모두 처리할 때까지 기다린다(백오프 대기 중인 것은 제외)."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cv:
+            while True:
+                now = time.time()
+                if not self._busy and not any(m["next_try"] <= now for m in self._pending.values()):
+                    return True
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cv.wait(min(left, 0.5))
+
+    def _prune_sent(self) -> None:
+        sdir = OUTBOX_DIR / _SENT
+        if not sdir.is_dir():
+            return
+        cutoff = time.time() - _SENT_KEEP_DAYS * 86400.0
+        for p in sdir.glob("*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                pass
+
+
+_OB = _Outbox()
+
+
+def start() -> int:
+    return _OB.start()
+
+
+def shutdown(timeout: float = 2.0) -> None:
+    _OB.shutdown(timeout)
+
+
+def enqueue(to, subject: str, body: str, attachments: Optional[List[str]] = None, **kw) -> str:
+    return _OB.enqueue(to, subject, body, attachments, **kw)
+
+
+def status(message_id: str) -> Optional[Dict[str, Any]]:
+    return _OB.status(message_id)
+
+
+def summary() -> Dict[str, Any]:
+    return _OB.summary()
+
+
+def retry_failed(message_id: Optional[str] = None) -> int:
+    return _OB.retry_failed(message_id)
+
+
+def flush(timeout: float = 30.0) -> bool:
+    return _OB.flush(timeout)
+
+
+__all__ = ["start", "shutdown", "enqueue", "status", "summary", "retry_failed", "flush", "message_id_for"]
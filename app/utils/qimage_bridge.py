@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+qimage_bridge: QImage ↔ numpy 무복사 브리지(모든 이미지 모듈 공용).
+- view(): QImage 메모리를 (H, W, C) strided ndarray 로 감싼다(복사 없음, 행 패딩 유지).
+- new_image(): QImage 가 소유한 버퍼 + 쓰기 가능 view. OpenCV dst 로 직접 기록하면 복사 1회로 끝난다.
+- wrap(): ndarray 를 빌려 쓰는 QImage(복사 없음). 원본 배열이 살아 있는 동안 같은 스레드에서만 사용.
+- to_qimage()/to_ndarray(): 소유권이 분리된 결과를 한 번의 패스(변환 또는 복사)로 만든다.
+- 채널 순서는 문자열("RGB", "BGR", "RGBA", "BGRA", "GRAY")로 지정한다. BGR 배열은 BGR888 로 바로 감싸 색변환이 없다.
+
+수명 규칙:
+    view(qi) 의 배열은 반환된 owner(QImage)가 살아 있는 동안만 유효하다(owner 를 함께 보관).
+    wrap(arr) 의 QImage 는 arr 가 살아 있는 동안만 유효하다(시그널로 다른 스레드에 넘기지 말 것).
+    new_image()/to_qimage() 의 QImage 는 자체 버퍼를 소유하므로 시그널/스레드 간 전달이 안전하다.
+
+사용:
+    from app.utils import qimage_bridge as QB
+    bgr = QB.to_ndarray(qimg, "BGR")                  # QImage → BGR(owned, 1패스)
+    qi = QB.to_qimage(bgr, "BGR")                     # BGR → QImage(owned, 복사 1회)
+    qi, dst = QB.new_image(w, h, "RGB"); cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=dst)
+    arr, owner = QB.view(qimg)                        # 읽기 전용 무복사 view
+"""
+
+from __future__ import annotations
+from typing import Optional, Tuple
+
+import numpy as np
+from PySide6.QtGui import QImage, QPixmap
+
+_F = QImage.Format
+# 포맷 → (채널 수, 메모리상 채널 순서). 32비트 ARGB 계열은 리틀엔디언에서 B,G,R,A 순서.
+_LAYOUT = {
+    _F.Format_RGB888: (3, "RGB"),
+    _F.Format_BGR888: (3, "BGR"),
+    _F.Format_RGBA8888: (4, "RGBA"),
+    _F.Format_RGBX8888: (4, "RGBA"),
+    _F.Format_RGBA8888_Premultiplied: (4, "RGBA"),
+    _F.Format_ARGB32: (4, "BGRA"),
+    _F.Format_RGB32: (4, "BGRA"),
+    _F.Format_ARGB32_Premultiplied: (4, "BGRA"),
+    _F.Format_Grayscale8: (1, "GRAY"),
+}
+# 채널 순서 → 새 이미지 생성 포맷
+_FORMAT_FOR = {
+    "RGB": _F.Format_RGB888,
+    "BGR": _F.Format_BGR888,
+    "RGBA": _F.Format_RGBA8888,
+    "BGRA": _F.Format_ARGB32,
+    "GRAY": _F.Format_Grayscale8,
+}
+
+
+def _as_qimage(img) -> Optional[QImage]:
+    """QImage/QPixmap → QImage. 그 외 None."""
+    if isinstance(img, QImage):
+        return img
+    if isinstance(img, QPixmap):
+        return img.toImage()
+    return None
+
+
+def _strided(buf, h: int, w: int, bpl: int, ch: int) -> np.ndarray:
+    """QImage 버퍼(memoryview)를 (H, W, C) 또는 (H, W) strided 배열로 해석한다."""
+    rows = np.frombuffer(buf, dtype=np.uint8, count=bpl * h).reshape((h, bpl))
+    arr = rows[:, : w * ch]
+    return arr if ch == 1 else arr.reshape((h, w, ch))
+
+
+def view(img, order: Optional[str] = None, *, writable: bool = False) -> Tuple[np.ndarray, QImage]:
+    """QImage 메모리를 가리키는 배열과 그 owner(QImage)를 반환한다.
+
+    - order 가 주어지고 메모리 순서와 다르면 convertToFormat 으로 1회 변환한 이미지를 감싼다.
+    - writable=True 는 bits()(공유 중이면 분리), 기본은 constBits()(분리 없음, 읽기 전용).
+    """
+    qi = _as_qimage(img)
+    if qi is None or qi.isNull():
+        raise ValueError("qimage_bridge.view: invalid image")
+    lay = _LAYOUT.get(qi.format())
+    if lay is None or (order is not None and lay[1] != order):
+        qi = qi.convertToFormat(_FORMAT_FOR[order or "RGB"])
+        lay = _LAYOUT[qi.format()]
+    ch = lay[0]
+    buf = qi.bits() if writable else qi.constBits()
+    return _strided(buf, qi.height(), qi.width(), qi.bytesPerLine(), ch), qi
+
+
+def layout(img) -> Optional[str]:
+    """QImage 메모리의 채널 순서 문자열(지원 외 포맷은 None)."""
+    qi = _as_qimage(img)
+    lay = _LAYOUT.get(qi.format()) if qi is not None else None
+    return lay[1] if lay else None
+
+
+def new_image(w: int, h: int, order: str = "RGB") -> Tuple[QImage, np.ndarray]:
+    """자체 버퍼를 소유한 QImage 와 그 버퍼의 쓰기 가능 view 를 만든다."""
+    qi = QImage(int(w), int(h), _FORMAT_FOR[order])
+    if qi.isNull():
+        raise MemoryError(f"qimage_bridge.new_image: alloc failed {w}x{h}")
+    return qi, _strided(qi.bits(), qi.height(), qi.width(), qi.bytesPerLine(), _LAYOUT[qi.format()][0])
+
+
+def _channels_order(arr: np.ndarray, order: str) -> str:
+    ch = 1 if arr.ndim == 2 else arr.shape[2]
+    if ch == 1:
+        return "GRAY"
+    if ch == 3 and order in ("RGB", "BGR"):
+        return order
+    if ch == 4 and order in ("RGBA", "BGRA"):
+        return order
+    if ch == 4 and order in ("RGB", "BGR"):
+        return order + "A"
+    raise ValueError(f"qimage_bridge: unsupported array {arr.shape} order={order}")
+
+
+def wrap(arr: np.ndarray, order: str = "BGR") -> QImage:
+    """ndarray 를 빌려 쓰는 QImage(복사 없음). arr 가 살아 있는 동안 같은 스레드에서만 사용한다."""
+    order = _channels_order(arr, order)
+    if arr.dtype != np.uint8:
+        raise ValueError("qimage_bridge.wrap: uint8 only")
+    ch = 1 if arr.ndim == 2 else arr.shape[2]
+    if arr.strides[-1] != 1 or (ch > 1 and arr.strides[1] != ch):
+        arr = np.ascontiguousarray(arr)
+    h, w = arr.shape[:2]
+    return QImage(arr.data, w, h, int(arr.strides[0]), _FORMAT_FOR[order])
+
+
+def to_qimage(arr: np.ndarray, order: str = "BGR") -> QImage:
+    """ndarray → 자체 버퍼를 소유한 QImage(색변환 없이 복사 1회)."""
+    order = _channels_order(arr, order)
+    h, w = arr.shape[:2]
+    qi, dst = new_image(w, h, order)
+    np.copyto(dst, arr, casting="unsafe")
+    return qi
+
+
+def to_ndarray(img, order: str = "BGR") -> np.ndarray:
+    """QImage/QPixmap → 소유권이 분리된 ndarray(변환 또는 복사 1패스)."""
+    src, owner = view(img)
+    src_order = _LAYOUT[owner.format()][1]
+    if src_order == order:
+        return src.copy()
+    import cv2
+    return cv2.cvtColor(src, getattr(cv2, f"COLOR_{src_order}2{order}"))
+
+
+def rgb_view(frame, target_height: int = 0) -> Tuple[Optional[np.ndarray], object]:
+    """검출 엔진 입력: QImage/ndarray 를 (H, W, 3) RGB 배열과 owner 로 반환한다.
+
+    - QImage 는 필요 시 RGB888 변환/세로 target_height 축소만 수행하고 무복사 view 를 돌려준다.
+    - ndarray 는 RGB(A) 로 가정하고 그대로(4채널은 앞 3채널 view) 돌려준다.
+    """
+    qi = _as_qimage(frame)
+    if qi is not None:
+        if qi.isNull():
+            return None, None
+        if qi.format() != _F.Format_RGB888:
+            qi = qi.convertToFormat(_F.Format_RGB888)
+        if target_height and qi.height() != target_height:
+            from PySide6.QtCore import Qt
+            nw = int(round(qi.width() * target_height / float(qi.height())))
+            qi = qi.scaled(nw, target_height, Qt.AspectRatioMode.KeepAspectRatio,
+                           Qt.TransformationMode.SmoothTransformation)
+        return view(qi, "RGB")
+    arr = np.asarray(frame)
+    if arr.ndim == 3 and arr.shape[2] in (3, 4):
+        return arr[..., :3], frame
+    return None, None
+
+
+__all__ = ["view", "layout", "new_image", "wrap", "to_qimage", "to_ndarray", "rgb_view"]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+raster_print: 4×6 페이지 래스터(QImage)를 QPrinter로 바로 보내는 인쇄 경로.
+- storage.render_print_page() 가 타일 배치에서 바로 그린 페이지를 받는다 → PDF 생성/디코드(SumatraPDF, QPdfDocument) 없음.
+- 용지는 래스터 크기/해상도에서 계산(1800×1200 @300dpi → 4×6inch 가로), 여백 0 + FullPage,
+  프린터 해상도를 래스터 dpi에 맞춰 드라이버 쪽 재스케일을 피한다.
+- QPainter → QPrinter 는 GUI 스레드가 아니어도 된다(후처리 큐 작업 스레드에서 호출).
+- 이름으로 찾은 프린터가 유효하지 않으면(없는 이름 → 기본 프린터로 바뀜) 인쇄하지 않고 False.
+- output_pdf 를 주면 QPrinter.PdfFormat 으로 파일에 쓴다(프린터 없는 환경/리눅스 검증용).
+
+사용:
+    from app.utils import storage, raster_print
+    page = storage.render_print_page(img, session, photo_mm=(30, 40), source_path=src)
+    ok = raster_print.print_image(page, "DS-RX1")
+    ok = raster_print.print_image(page, output_pdf="/tmp/page.pdf")
+    python -m app.utils.raster_print C:\\PhotoBox\\edited_photo.jpg --printer DS-RX1 [--ratio 3545]
+    python -m app.utils.raster_print edited.jpg --pdf out.pdf
+"""
+
+from __future__ import annotations
+import time, logging
+from typing import Optional
+
+from PySide6.QtCore import QMarginsF, QRectF, QSizeF
+from PySide6.QtGui import QImage, QPageLayout, QPageSize, QPainter
+from PySide6.QtPrintSupport import QPrinter
+
+logger = logging.getLogger(__name__)
+
+
+def _dpi_of(page: QImage, default: int = 300) -> int:
+    dpm = page.dotsPerMeterX()
+    return int(round(dpm * 0.0254)) if dpm > 0 else default
+
+
+def print_image(page: QImage, printer_name: str = "", *, output_pdf: Optional[str] = None,
+                dpi: Optional[int] = None, copies: int = 1) -> bool:
+    """페이지 래스터 한 장 인쇄. output_pdf가 있으면 프린터 대신 PDF 파일로. 실패는 로그 후 False."""
+    if page is None or page.isNull():
+        logger.error("[RasterPrint] null page")
+        return False
+    t0 = time.perf_counter()
+    dpi = int(dpi or _dpi_of(page))
+    try:
+        printer = QPrinter(QPrinter.HighResolution)
+        if output_pdf:
+            printer.setOutputFormat(QPrinter.PdfFormat)
+            printer.setOutputFileName(output_pdf)
+        else:
+            if not printer_name:
+                logger.error("[RasterPrint] no printer name")
+                return False
+            printer.setPrinterName(printer_name)
+            if not printer.isValid() or printer.printerName() != printer_name:
+                # 없는 이름이면 Qt가 기본 프린터로 조용히 바꿀 수 있다 → 실패로 돌려 상위 폴백(Sumatra 등)
+                logger.error("[RasterPrint] printer not found: %r", printer_name)
+                return False
+        printer.setResolution(dpi)
+        printer.setCopyCount(max(1, int(copies)))
+
+        # 용지: 세로 기준 크기 + 방향(프린터 드라이버의 4×6 용지 정의와 같은 방식)
+        w_mm, h_mm = page.width() * 25.4 / dpi, page.height() * 25.4 / dpi
+        landscape = w_mm > h_mm
+        size = QPageSize(QSizeF(min(w_mm, h_mm), max(w_mm, h_mm)), QPageSize.Millimeter)
+        layout = QPageLayout(size, QPageLayout.Landscape if landscape else QPageLayout.Portrait, QMarginsF(0, 0, 0, 0))
+        layout.setMode(QPageLayout.FullPageMode)
+        printer.setPageLayout(layout)
+        printer.setFullPage(True)
+
+        painter = QPainter()
+        if not painter.begin(printer):
+            logger.error("[RasterPrint] painter.begin failed printer=%r", printer_name or output_pdf)
+            return False
+        try:
+            vp = painter.viewport()
+            painter.drawImage(QRectF(0, 0, vp.width(), vp.height()), page)
+        finally:
+            painter.end()
+    except Exception as e:
+        logger.error("[RasterPrint] failed printer=%r: %s", printer_name or output_pdf, e)
+        return False
+    logger.info("[RasterPrint] %dx%d @%ddpi -> %s %.1fms", page.width(), page.height(), dpi,
+                output_pdf or printer_name, (time.perf_counter() - t0) * 1000.0)
+    return True
+
+
+__all__ = ["print_image"]
+
+
+if __name__ == "__main__":
+    import argparse, sys
+
+    from PySide6.QtGui import QGuiApplication
+
+    ap = argparse.ArgumentParser(prog="python -m app.utils.raster_print", description="편집본 → 4×6 페이지 래스터 직접 인쇄")
+    ap.add_argument("image")
+    dst = ap.add_mutually_exclusive_group(required=True)
+    dst.add_argument("--printer")
+    dst.add_argument("--pdf", help="프린터 대신 PDF 파일로 출력")
+    ap.add_argument("--ratio", default="3040", choices=["3040", "3545"])
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    from app.utils import storage
+
+    img = QImage(args.image)
+    if img.isNull():
+        sys.exit(f"image load failed: {args.image}")
+    page = storage.render_print_page(img, {"ratio": args.ratio}, source_path=args.image)
+    sys.exit(0 if print_image(page, args.printer or "", output_pdf=args.pdf) else 1)
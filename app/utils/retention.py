@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+retention: C:\\PhotoBox 산출물 보관 기간 정리(백그라운드, 점진적).
+- 트리별 레이아웃을 알고 필요한 만큼만 본다(os.scandir, 한 디렉터리씩 지연 순회).
+    PDF/   평면 {name}_{number}.pdf           → 파일 mtime
+    JPG/   평면 {name}_{number}[-n].jpg       → 파일 mtime
+    raw/   raw_NN.jpg                         → 파일 mtime
+    _work/YYMMDD/<job>/...                    → 날짜 버킷 이름으로 판정(보관 기간 안의 버킷은 열지도 않음)
+- 삭제는 CLEANUP_BATCH 개씩, 배치 사이에 CLEANUP_PAUSE_S 쉬고 초당 CLEANUP_MB_PER_S 예산을 넘으면 더 쉰다.
+- busy 프로브(촬영 중 등)가 True면 다음 배치 전에 멈춰 기다린다.
+- 스레드는 낮은 우선순위(Windows THREAD_PRIORITY_IDLE, 그 외 nice)로 돈다.
+- 회수한 파일/바이트는 로그와 stats()로 보고한다.
+- 지운 파일은 배치마다 job_catalog 색인에서도 지우고, 정리된 _work 버킷의 작업은 purged 로 표시한다.
+
+환경 변수:
+    CLEANUP_ROOT         정리 기준 루트(기본 C:\\PhotoBox)
+    CLEANUP_INTERVAL_S   정리 주기(기본 3600초, 첫 실행은 시작 후 CLEANUP_DELAY_S)
+    CLEANUP_DELAY_S      시작 후 첫 실행까지(기본 120초)
+    CLEANUP_BATCH        배치당 삭제 파일 수(기본 32)
+    CLEANUP_PAUSE_S      배치 사이 쉬는 시간(기본 0.05초)
+    CLEANUP_MB_PER_S     초당 삭제 바이트 예산(기본 64MB, 0 = 제한 없음)
+
+사용:
+    from app.utils import retention
+    retention.start(busy=lambda: win.router.current_name() == "capture")   # 앱 시작 시
+    retention.run_once(("pdf",), days=7)   # 즉시 한 번(호출 스레드) → {"files", "bytes", "dirs", ...}
+    retention.stats()
+"""
+
+from __future__ import annotations
+import os, re, sys, time, logging, threading, datetime as dt
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PHOTOBOX_ROOT = os.environ.get("CLEANUP_ROOT", r"C:\PhotoBox")
+TREES: Dict[str, str] = {
+    "pdf": os.path.join(PHOTOBOX_ROOT, "PDF"),
+    "jpg": os.path.join(PHOTOBOX_ROOT, "JPG"),
+    "raw": os.path.join(PHOTOBOX_ROOT, "raw"),
+    "work": os.path.join(PHOTOBOX_ROOT, "_work"),
+}
+_FLAT_EXT = {"pdf": (".pdf",), "jpg": (".jpg", ".jpeg"), "raw": (".jpg", ".jpeg", ".arw", ".cr2", ".cr3", ".nef")}
+
+_INTERVAL_S = float(os.environ.get("CLEANUP_INTERVAL_S", "3600") or 3600)
+_DELAY_S = float(os.environ.get("CLEANUP_DELAY_S", "120") or 120)
+_BATCH = max(1, int(os.environ.get("CLEANUP_BATCH", "32") or 32))
+_PAUSE_S = float(os.environ.get("CLEANUP_PAUSE_S", "0.05") or 0.05)
+_BYTES_PER_S = float(os.environ.get("CLEANUP_MB_PER_S", "64") or 0) * 1024 * 1024
+
+_BUCKET_RE = re.compile(r"^\d{6}$")   # _work/YYMMDD
+
+
+def _catalog(fn: str, arg) -> None:
+    """작업 색인 동기화(색인 실패는 정리에 영향 없음)."""
+    try:
+        from app.utils import job_catalog
+        getattr(job_catalog, fn)(arg)
+    except Exception as e:
+        logger.debug("[retention] catalog %s failed: %s", fn, e)
+
+
+# -----------------------
+# 후보 열거(지연)
+# -----------------------
+def _flat(root: str, exts: Tuple[str, ...], cutoff: float) -> Iterator[Tuple[str, int]]:
+    """평면 폴더: 확장자가 맞고 mtime < cutoff 인 파일."""
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    with it:
+        for e in it:
+            try:
+                if not e.is_file(follow_symlinks=False) or not e.name.lower().endswith(exts):
+                    continue
+                st = e.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_mtime < cutoff:
+                yield e.path, st.st_size
+
+
+def _tree_files(root: str) -> Iterator[Tuple[str, int]]:
+    """root 아래 모든 파일(깊이 우선, 하위 디렉터리는 그 파일 다음에 빈 디렉터리로 정리)."""
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    subdirs = []
+    with it:
+        for e in it:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.path)
+                else:
+                    yield e.path, e.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    for d in subdirs:
+        yield from _tree_files(d)
+
+
+def _work_buckets(root: str, cutoff_day: str) -> Iterator[str]:
+    """_work/YYMMDD 중 보관 기간이 지난 버킷(이름 비교만, 내부는 열지 않음)."""
+    try:
+        names = sorted(e.name for e in os.scandir(root) if e.is_dir(follow_symlinks=False))
+    except OSError:
+        return
+    for name in names:
+        if _BUCKET_RE.match(name) and name < cutoff_day:
+            yield os.path.join(root, name)
+
+
+def _remove_empty_dirs(root: str) -> int:
+    """root 포함 빈 디렉터리를 아래에서부터 지운다. 지운 수."""
+    n = 0
+    for cur, dirs, files in os.walk(root, topdown=False):
+        try:
+            os.rmdir(cur)
+            n += 1
+        except OSError:
+            pass
+    return n
+
+
+# -----------------------
+# 엔진
+# -----------------------
+class _Engine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._kick = False
+        self._busy: Optional[Callable[[], bool]] = None
+        self._days: Optional[int] = None
+        self._stats = {"runs": 0, "files": 0, "bytes": 0, "dirs": 0, "errors": 0, "busy_waits": 0,
+                       "last_run": None, "last_ms": 0.0, "last_files": 0, "last_bytes": 0}
+
+    # 설정 ------------------------------------------------
+    def set_busy_probe(self, fn: Optional[Callable[[], bool]]) -> None:
+        self._busy = fn
+
+    def _is_busy(self) -> bool:
+        fn = self._busy
+        if fn is None:
+            return False
+        try:
+            return bool(fn())
+        except Exception:
+            return False
+
+    def _retention_days(self, days: Optional[int]) -> int:
+        if days is not None:
+            return max(1, int(days))
+        if self._days is not None:
+            return self._days
+        try:
+            from app.utils.storage import get_retention_days
+            return max(1, int(get_retention_days()))
+        except Exception:
+            return 7
+
+    # 실행 ------------------------------------------------
+    def _wait_idle(self) -> bool:
+        """busy 동안 기다린다. stop 이면 False."""
+        waited = False
+        while self._is_busy():
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._stats["busy_waits"] += 1
+                logger.info("[retention] paused (busy)")
+            with self._cv:
+                if self._stop:
+                    return False
+                self._cv.wait(1.0)
+        return not self._stop
+
+    def run_once(self, trees: Sequence[str] = ("pdf", "jpg", "raw", "work"), days: Optional[int] = None,
+                 throttle: bool = True) -> Dict[str, int]:
+        """보관 기간이 지난 파일을 지운다. {"files", "bytes", "dirs", "errors"}."""
+        keep = self._retention_days(days)
+        now = time.time()
+        cutoff = now - keep * 86400.0
+        cutoff_day = (dt.date.today() - dt.timedelta(days=keep)).strftime("%y%m%d")
+        t0 = time.perf_counter()
+        res = {"files": 0, "bytes": 0, "dirs": 0, "errors": 0}
+        window_t, window_b = time.monotonic(), 0
+
+        def _delete(cands: Iterator[Tuple[str, int]]) -> bool:
+            nonlocal window_t, window_b
+            batch = 0
+            gone = []
+            for path, size in cands:
+                if batch == 0 and throttle and not self._wait_idle():
+                    _catalog("forget_paths", gone)
+                    return False
+                try:
+                    os.remove(path)
+                    res["files"] += 1
+                    res["bytes"] += size
+                    window_b += size
+                    gone.append(path)
+                except FileNotFoundError:
+                    gone.append(path)
+                except OSError as e:
+                    res["errors"] += 1
+                    logger.debug("[retention] remove failed %s: %s", path, e)
+                batch += 1
+                if batch >= _BATCH:
+                    batch = 0
+                    _catalog("forget_paths", gone)
+                    gone = []
+                    if throttle:
+                        pause = _PAUSE_S
+                        if _BYTES_PER_S > 0:
+                            ahead = window_b / _BYTES_PER_S - (time.monotonic() - window_t)
+                            pause = max(pause, ahead)
+                        time.sleep(pause)
+                        if time.monotonic() - window_t > 1.0:
+                            window_t, window_b = time.monotonic(), 0
+            _catalog("forget_paths", gone)
+            return True
+
+        ok = True
+        for name in trees:
+            root = TREES.get(name)
+            if not root or not os.path.isdir(root):
+                continue
+            if name == "work":
+                for bucket in _work_buckets(root, cutoff_day):
+                    ok = _delete(_tree_files(bucket))
+                    if not ok:
+                        break
+                    res["dirs"] += _remove_empty_dirs(bucket)
+                    _catalog("purge_jobs_under", bucket)
+            else:
+                ok = _delete(_flat(root, _FLAT_EXT[name], cutoff))
+            if not ok:
+                break
+
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            st = self._stats
+            st["runs"] += 1
+            for k in ("files", "bytes", "dirs", "errors"):
+                st[k] += res[k]
+            st.update(last_run=dt.datetime.now().isoformat(timespec="seconds"), last_ms=round(ms, 1),
+                      last_files=res["files"], last_bytes=res["bytes"])
+        if res["files"] or res["errors"]:
+            logger.info("[retention] days=%d trees=%s reclaimed %d files / %.1f MB, %d dirs, %d errors in %.0fms%s",
+                        keep, ",".join(trees), res["files"], res["bytes"] / 1048576.0, res["dirs"], res["errors"],
+                        ms, "" if ok else " (stopped)")
+        return res
+
+    # 스레드 ----------------------------------------------
+    def start(self, busy: Optional[Callable[[], bool]] = None, days: Optional[int] = None,
+              interval_s: Optional[float] = None, delay_s: Optional[float] = None) -> None:
+        if busy is not None:
+            self._busy = busy
+        if days is not None:
+            self._days = max(1, int(days))
+        interval = _INTERVAL_S if interval_s is None else float(interval_s)
+        delay = _DELAY_S if delay_s is None else float(delay_s)
+        with self._cv:
+            self._stop = False
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, args=(interval, delay), name="retention", daemon=True)
+            self._thread.start()
+
+    def _loop(self, interval: float, delay: float) -> None:
+        _lower_priority()
+        wait = delay
+        while True:
+            with self._cv:
+                end = time.monotonic() + max(0.0, wait)
+                while not self._stop and not self._kick and time.monotonic() < end:
+                    self._cv.wait(end - time.monotonic())
+                if self._stop:
+                    return
+                self._kick = False
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("[retention] run failed: %s", e)
+            wait = interval
+
+    def kick(self) -> None:
+        """다음 정리를 바로 실행(스레드가 돌고 있을 때)."""
+        with self._cv:
+            self._kick = True
+            self._cv.notify_all()
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        if self._thread is not None:
+            self._thread.join(max(0.0, timeout))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return dict(self._stats)
+
+
+def _lower_priority() -> None:
+    """현재 스레드를 낮은 우선순위로(가능한 경우만)."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            k32 = ctypes.windll.kernel32
+            k32.SetThreadPriority(k32.GetCurrentThread(), -15)   # THREAD_PRIORITY_IDLE
+            k32.SetThreadPriority(k32.GetCurrentThread(), 0x00010000)  # THREAD_MODE_BACKGROUND_BEGIN(I/O 우선순위도 낮춤)
+        elif sys.platform.startswith("linux"):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)   # Linux: 스레드 단위 nice
+    except Exception:
+        pass
+
+
+_ENGINE = _Engine()
+
+
+def start(busy: Optional[Callable[[], bool]] = None, days: Optional[int] = None,
+          interval_s: Optional[float] = None, delay_s: Optional[float] = None) -> None:
+    _ENGINE.start(busy, days, interval_s, delay_s)
+
+
+def shutdown(timeout: float = 2.0) -> None:
+    _ENGINE.shutdown(timeout)
+
+
+def kick() -> None:
+    _ENGINE.kick()
+
+
+def set_busy_probe(fn: Optional[Callable[[], bool]]) -> None:
+    _ENGINE.set_busy_probe(fn)
+
+
+def run_once(trees: Sequence[str] = ("pdf", "jpg", "raw", "work"), days: Optional[int] = None,
+             throttle: bool = True) -> Dict[str, int]:
+    return _ENGINE.run_once(trees, days, throttle)
+
+
+def stats() -> Dict[str, object]:
+    return _ENGINE.stats()
+
+
+__all__ = ["TREES", "start", "shutdown", "kick", "set_busy_probe", "run_once", "stats"]
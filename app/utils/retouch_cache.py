@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+retouch_cache: 리터치 결과의 내용 주소(content-addressed) 디스크 캐시.
+- 키 = sha1(입력 파일 내용) + 네임스페이스 + 파라미터 + 파이프라인 버전.
+- 저장은 임시 파일 → os.replace 원자적 교체(프로세스 간 동시 접근 안전).
+- 총 용량 상한을 넘으면 최근 사용(mtime) 기준 LRU로 축출한다.
+- 적중/미적중/절약 시간은 로그와 stats()로 보고한다.
+
+사용:
+    from app.utils import retouch_cache as RC
+    key = RC.make_key("ai_retouch", in_path, {"ratio": (3, 4)}, AIR.PIPELINE_VERSION)
+    if key and RC.fetch(key, out_path):
+        return True
+    ... 계산 후 ...
+    RC.store(key, out_path, compute_s)
+"""
+
+from __future__ import annotations
+import os, json, time, hashlib, logging, threading, uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.environ.get("AI_CACHE_DIR", r"C:\PhotoBox\.cache\retouch"))
+_ENABLED = str(os.environ.get("AI_CACHE", "1")).strip().lower() in ("1", "true", "yes")
+_MAX_BYTES = int(float(os.environ.get("AI_CACHE_MAX_MB", "512") or 512) * 1024 * 1024)
+
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0, "saved_s": 0.0}
+
+
+# -----------------------
+# 키
+# -----------------------
+def file_digest(path: str) -> Optional[str]:
+    """파일 내용 sha1(hex). 실패 시 None."""
+    try:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    except Exception:
+        return None
+
+
+def params_token(namespace: str, params: Dict[str, Any], version: str) -> str:
+    """네임스페이스/파라미터/버전의 정규화 직렬화."""
+    norm = {k: (list(v) if isinstance(v, tuple) else v) for k, v in sorted((params or {}).items())}
+    return json.dumps({"ns": namespace, "v": str(version), "p": norm}, sort_keys=True, ensure_ascii=True, default=str)
+
+
+def make_key(namespace: str, in_path: str, params: Dict[str, Any], version: str) -> Optional[str]:
+    """캐시 키. 입력 파일을 읽을 수 없으면 None."""
+    d = file_digest(in_path)
+    if d is None:
+        return None
+    return hashlib.sha1((d + "|" + params_token(namespace, params, version)).encode("ascii")).hexdigest()
+
+
+# -----------------------
+# 경로/원자적 쓰기
+# -----------------------
+def _entry_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.jpg"
+
+
+def _meta_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _atomic_copy(src: str, dst: str) -> None:
+    """src를 dst 옆 임시 파일로 복사한 뒤 os.replace로 교체한다."""
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(src, "rb") as fi, open(tmp, "wb") as fo:
+            while True:
+                buf = fi.read(1 << 20)
+                if not buf:
+                    break
+                fo.write(buf)
+            fo.flush()
+            os.fsync(fo.fileno())
+        os.replace(tmp, dst)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+
+
+def _atomic_write_text(dst: Path, text: str) -> None:
+    os.makedirs(dst.parent, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, dst)
+
+
+# -----------------------
+# Public API
+# -----------------------
+def enabled() -> bool:
+    """캐시 사용 여부(AI_CACHE)."""
+    return _ENABLED
+
+
+def fetch(key: Optional[str], out_path: str) -> bool:
+    """적중 시 out_path로 복사하고 True. 미적중/오류는 False."""
+    if not _ENABLED or not key:
+        return False
+    ent = _entry_path(key)
+    if not ent.exists():
+        with _LOCK:
+            _STATS["misses"] += 1
+        logger.info("[cache] miss key=%s", key[:10])
+        return False
+    try:
+        _atomic_copy(str(ent), out_path)
+        now = time.time()
+        os.utime(ent, (now, now))  # LRU 갱신
+        saved = 0.0
+        try:
+            saved = float(json.loads(_meta_path(key).read_text(encoding="utf-8")).get("compute_s", 0.0))
+        except Exception:
+            pass
+        with _LOCK:
+            _STATS["hits"] += 1
+            _STATS["saved_s"] += saved
+            total = _STATS["saved_s"]
+        logger.info("[cache] hit key=%s saved=%.2fs (total saved=%.1fs)", key[:10], saved, total)
+        return True
+    except Exception as e:
+        logger.error("[cache] fetch failed key=%s: %s", key[:10], e)
+        return False
+
+
+def store(key: Optional[str], result_path: str, compute_s: float = 0.0) -> bool:
+    """계산 결과 파일을 캐시에 원자적으로 저장하고 용량 상한을 맞춘다."""
+    if not _ENABLED or not key or not os.path.exists(result_path):
+        return False
+    try:
+        _atomic_copy(result_path, str(_entry_path(key)))
+        _atomic_write_text(_meta_path(key), json.dumps({"compute_s": round(float(compute_s), 3),
+                                                        "stored_at": time.time()}))
+        with _LOCK:
+            _STATS["stores"] += 1
+        logger.info("[cache] store key=%s compute=%.2fs", key[:10], compute_s)
+    except Exception as e:
+        logger.error("[cache] store failed key=%s: %s", key[:10], e)
+        return False
+    _evict_to_limit(keep=key)
+    return True
+
+
+def _evict_to_limit(max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+    """총 용량이 상한을 넘으면 오래 안 쓴 항목부터 지운다(keep 제외). 지운 개수를 반환."""
+    limit = _MAX_BYTES if max_bytes is None else int(max_bytes)
+    try:
+        items = []
+        total = 0
+        for p in CACHE_DIR.glob("*/*.jpg"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            items.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= limit:
+            return 0
+        items.sort(key=lambda t: t[0])
+        n = 0
+        for _, size, p in items:
+            if total <= limit:
+                break
+            if keep and p.stem == keep:
+                continue
+            try:
+                p.unlink()
+                meta = p.with_suffix(".json")
+                if meta.exists():
+                    meta.unlink()
+                total -= size
+                n += 1
+            except OSError:
+                continue
+        with _LOCK:
+            _STATS["evicted"] += n
+        logger.info("[cache] evicted %d entries (now %.1fMB / %.1fMB)", n, total / 1048576.0, limit / 1048576.0)
+        return n
+    except Exception as e:
+        logger.error("[cache] evict failed: %s", e)
+        return 0
+
+
+def clear() -> None:
+    """캐시 항목을 모두 지운다."""
+    _evict_to_limit(0)
+
+
+def stats() -> Dict[str, float]:
+    """적중/미적중/저장/축출 횟수와 누적 절약 시간(초)."""
+    with _LOCK:
+        return dict(_STATS)
+
+
+__all__ = ["CACHE_DIR", "enabled", "file_digest", "make_key", "fetch", "store", "clear", "stats"]
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+retouch_graph: 리터치 단계를 의존 그래프로 실행하고 노드별 중간 결과를 메모이즈한다(증분 재계산).
+- 노드: decode → analysis → warp → background → illumination → eye → crop → encode.
+- 노드 키 = sha1(노드 이름 + 자기 파라미터 + 상위 노드 키). 파라미터가 바뀌면 그 노드와 하위 노드 키만 바뀐다.
+  예) eye_strength 변경 → eye, crop, encode 만 재계산 / ratio 변경 → crop, encode 만 재계산.
+- 중간 결과는 프로세스 전역 LRU 메모(용량 상한 AI_GRAPH_MAX_MB)에 둔다. 상위 노드가 축출됐으면 필요한 만큼만 다시 계산한다.
+- warp 는 비율과 무관한 전체 프레임 워프(회전 + 어깨 시어)이고, 크롭은 마지막(crop)에서 흰색 패딩 포함으로 자른다.
+- ai_retouch.process_array(합성 워프)와 같은 랜드마크/눈 박스/강도를 쓰지만 눈 보정을 크롭 전 전체 프레임에 적용하므로
+  보간 반올림 차이(경계 1px 이동 등)가 남을 수 있다. 차이는 scripts/bench_retouch.py --parity 로 확인한다.
+- render_preview(): 같은 그래프를 화면 크기 프록시(긴 변 AI_PREVIEW_EDGE)로 실행한다. decode 는 DCT 축소 디코드
+  (IMREAD_REDUCED_*)라 원본 전체를 풀지 않는다. 프록시 노드는 키가 달라 원본 해상도 메모와 섞이지 않는다.
+
+파라미터(기본값):
+    ratio=None             크롭 비율((3, 4)/(7, 9)/"3040"/"3545")
+    eye_strength=AIR.EYE_STRENGTH  작은 눈 확대 강도(AI_EYE_STRENGTH, 0 이하 = 생략)
+    background_color=None  배경 단색 치환("white"/"light-gray"/"light-blue", None = 생략)
+    illumination=False     조명/색 보정(ddd.IlluminationNormalizer, 난반사 억제 포함)
+    quality=100            JPEG 품질
+    preview=0              decode 긴 변(0 = 원본 해상도, render_preview 가 채운다)
+
+환경 변수:
+    AI_GRAPH_MAX_MB  중간 결과 메모 용량 상한(기본 512MB, 0 = 메모 안 함)
+    AI_PREVIEW_EDGE  미리보기 프록시 긴 변(기본 1024px)
+
+사용:
+    from app.utils import retouch_graph as RG
+    RG.render_file(origin, ai_out, {"ratio": (3, 4)})                         # 최초: 전 단계 계산
+    RG.render_file(origin, ai_out, {"ratio": (3, 4), "eye_strength": 0.2})    # eye → crop → encode 만
+    bgr_small = RG.render_preview(origin, {"ratio": (3, 4)})                   # 미리보기(프록시)
+"""
+
+from __future__ import annotations
+import os, json, time, hashlib, logging, threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.utils import ai_retouch as AIR
+from app.utils import landmarker_pool
+
+logger = logging.getLogger(__name__)
+
+_MAX_BYTES = int(float(os.environ.get("AI_GRAPH_MAX_MB", "512") or 0) * 1024 * 1024)
+PREVIEW_EDGE = int(os.environ.get("AI_PREVIEW_EDGE", "1024") or 1024)
+_REDUCED = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+DEFAULTS: Dict[str, Any] = {
+    "ratio": None,
+    "eye_strength": AIR.EYE_STRENGTH,
+    "background_color": None,
+    "illumination": False,
+    "quality": 100,
+    "preview": 0,
+}
+
+# (노드, 상위 노드, 자기 파라미터, 진행률). 순서 = 위상 순서.
+_NODES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...], int], ...] = (
+    ("decode", (), ("preview",), 0),
+    ("analysis", ("decode",), (), 10),
+    ("warp", ("decode", "analysis"), (), 30),
+    ("background", ("warp",), ("background_color",), 45),
+    ("illumination", ("background",), ("illumination",), 60),
+    ("eye", ("illumination", "analysis"), ("eye_strength",), 70),
+    ("edges", ("warp", "analysis"), (), 80),
+    ("crop", ("eye", "analysis", "edges"), ("ratio",), 85),
+    ("encode", ("crop",), ("quality",), 95),
+)
+
+
+# -----------------------
+# 메모(LRU, 용량 상한)
+# -----------------------
+class _Memo:
+    """노드 키 → 결과. 바이트 합이 상한을 넘으면 오래 안 쓴 항목부터 버린다."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._items: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            ent = self._items.get(key)
+            if ent is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return ent[0]
+
+    def put(self, key: str, value: Any, nbytes: int) -> None:
+        with self._lock:
+            if nbytes > self.max_bytes:
+                return
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            while self._items and self._bytes + nbytes > self.max_bytes:
+                _, (_, b) = self._items.popitem(last=False)
+                self._bytes -= b
+                self.evicted += 1
+            self._items[key] = (value, nbytes)
+            self._bytes += nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "mb": round(self._bytes / 1048576.0, 1),
+                    "max_mb": round(self.max_bytes / 1048576.0, 1),
+                    "hits": self.hits, "misses": self.misses, "evicted": self.evicted}
+
+
+_MEMO = _Memo(_MAX_BYTES)
+
+
+def _nbytes(value: Any, deps: Tuple[Any, ...]) -> int:
+    """메모 용량 계산. 상위 결과를 그대로 넘긴 노드(패스스루)는 0으로 센다."""
+    if any(value is d for d in deps):
+        return 0
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 64 * 1024  # 랜드마크 등 작은 객체
+
+
+# -----------------------
+# 노드 구현
+# -----------------------
+def _image_size(path: str) -> Optional[Tuple[int, int]]:
+    """헤더만 읽어 (W, H). 실패 시 None."""
+    try:
+        from PySide6.QtGui import QImageReader
+        s = QImageReader(path).size()
+        return (s.width(), s.height()) if s.isValid() else None
+    except Exception:
+        return None
+
+
+def _run_decode(path: str, long_edge: int = 0) -> np.ndarray:
+    """원본 디코드. long_edge>0 이면 긴 변 long_edge 이상이 남는 가장 큰 DCT 축소 디코드 후 프록시 축소."""
+    if long_edge <= 0:
+        bgr = AIR._load_image(path)
+    else:
+        size = _image_size(path)
+        k = 1
+        for f in (2, 4, 8):
+            if size and max(size) / f >= long_edge:
+                k = f
+        bgr = cv2.imread(path, _REDUCED[k]) if k > 1 else AIR._load_image(path)
+        if bgr is not None:
+            bgr = landmarker_pool.detection_proxy(bgr, long_edge)
+    if bgr is None:
+        raise IOError(f"load failed: {path}")
+    return bgr
+
+
+def _run_analysis(bgr: np.ndarray) -> Dict[str, Any]:
+    """랜드마크 1회 검출 → 회전 행렬/어깨 시어/회전 좌표 랜드마크(비율 무관)."""
+    H, W = bgr.shape[:2]
+    rgb = AIR._detect_rgb(bgr)
+    lms = AIR._mp_face_mesh(bgr, rgb)
+    pl = AIR._mp_pose(bgr, rgb)
+    M_rot = AIR._rotation_matrix_v1(lms, W, H)
+    lms_r = AIR._map_landmarks(lms, M_rot, W, H)
+    pl_r = AIR._map_landmarks(pl, M_rot, W, H)
+    shear = AIR._shoulder_shear(pl_r, W, H, lambda: AIR._crown_chin_from_landmarks(lms_r, pl_r, W, H)[1])
+    return {"M_rot": M_rot, "shear": shear, "lms": lms_r, "pl": pl_r, "size": (W, H)}
+
+
+def _run_warp(bgr: np.ndarray, an: Dict[str, Any]) -> np.ndarray:
+    """회전 + 어깨 시어를 전체 프레임에 1회 리샘플(크롭은 crop 노드에서)."""
+    if an["M_rot"] is None and an["shear"] is None:
+        return bgr
+    H, W = bgr.shape[:2]
+    return AIR._fused_warp(bgr, an["M_rot"], an["shear"], (0, 0, W, H))
+
+
+def _run_background(bgr: np.ndarray, color: Optional[str]) -> np.ndarray:
+    if not color:
+        return bgr
+    from app.ddd import BackgroundCleaner
+    return BackgroundCleaner().clean_array(bgr, color=str(color), feather_px=10, shadow_reduction=0.35, tol=32)
+
+
+def _run_illumination(bgr: np.ndarray, enable: bool) -> np.ndarray:
+    if not enable:
+        return bgr
+    from app.ddd import IlluminationNormalizer
+    return IlluminationNormalizer().normalize_array(bgr, anti_glare=True, gamma=1.05, clip_limit=3.0,
+                                                    unsharp_amount=0.3)
+
+
+def _run_eye(bgr: np.ndarray, an: Dict[str, Any], strength: float) -> np.ndarray:
+    """_adjust_eyes 는 제자리 기록이라 메모된 상위 결과를 보호하기 위해 복사본에 적용한다."""
+    W, H = an["size"]
+    eyes = AIR._eyes_from_landmarks(an["lms"], W, H)
+    if strength <= 0 or not eyes:
+        return bgr
+    return AIR._adjust_eyes(bgr.copy(), strength=float(strength), eyes=eyes)
+
+
+def _run_edges(warped: np.ndarray, an: Dict[str, Any]):
+    """워프 결과의 정수리 에지 분석(눈 중앙 x 스트라이프 1개). x는 비율과 무관하므로 미리 계산하고 이미지 참조는 놓는다."""
+    W, H = an["size"]
+    edges = AIR._EdgeContext(warped)
+    AIR._crown_chin_from_landmarks(an["lms"], an["pl"], W, H, edge_fn=edges.penalty)
+    return edges.detach()
+
+
+def _run_crop(bgr: np.ndarray, an: Dict[str, Any], edges, ratio) -> np.ndarray:
+    """정수리/턱 추정(에지 패널티는 워프 결과 기준, edges 캐시) → 규격 크롭, 이미지 밖은 흰색."""
+    H, W = bgr.shape[:2]
+    yc, yn, xeye = AIR._crown_chin_from_landmarks(an["lms"], an["pl"], W, H, ratio=ratio, edge_fn=edges.penalty)
+    x, y, w, h = AIR._spec_crop_rect(yc, yn, xeye, ratio=ratio)
+    out = np.full((h, w) + bgr.shape[2:], 255, np.uint8)
+    sx0, sy0, sx1, sy1 = max(0, x), max(0, y), min(W, x + w), min(H, y + h)
+    if sx1 > sx0 and sy1 > sy0:
+        out[sy0 - y:sy1 - y, sx0 - x:sx1 - x] = bgr[sy0:sy1, sx0:sx1]
+    return out
+
+
+def _run_encode(bgr: np.ndarray, quality: int) -> bytes:
+    ok, buf = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
+    if not ok:
+        raise IOError("jpeg encode failed")
+    return buf.tobytes()
+
+
+# -----------------------
+# 그래프 실행
+# -----------------------
+def _source_token(path: str) -> str:
+    """입력 식별자(경로 + 크기 + 수정 시각) + 파이프라인 버전/튜닝값. 파일이 바뀌면 decode부터 다시."""
+    st = os.stat(path)
+    tune = {k: v for k, v in AIR._cache_params(None).items() if k not in ("ratio", "eye_strength")}
+    return json.dumps({"p": os.path.abspath(path), "s": st.st_size, "m": st.st_mtime_ns,
+                       "v": AIR.PIPELINE_VERSION, "t": tune}, sort_keys=True, default=str)
+
+
+def _node_keys(path: str, params: Dict[str, Any]) -> Dict[str, str]:
+    """노드별 메모 키(상위 키를 포함하므로 파라미터 변경은 하위로만 전파된다)."""
+    keys: Dict[str, str] = {}
+    for name, deps, own, _ in _NODES:
+        own_tok = json.dumps({k: (list(params[k]) if isinstance(params[k], tuple) else params[k]) for k in own},
+                             sort_keys=True, default=str)
+        base = _source_token(path) if name == "decode" else "|".join(keys[d] for d in deps)
+        keys[name] = hashlib.sha1(f"{name}|{own_tok}|{base}".encode("utf-8")).hexdigest()
+    return keys
+
+
+def _evaluate(path: str, params: Dict[str, Any], target: str, progress=None) -> Any:
+    """target 노드 결과를 반환한다. 메모에 없는 노드만 상위부터 계산한다."""
+    keys = _node_keys(path, params)
+    spec = {name: (deps, pct) for name, deps, _, pct in _NODES}
+    fns: Dict[str, Callable[..., Any]] = {
+        "decode": lambda: _run_decode(path, int(params["preview"] or 0)),
+        "analysis": lambda b: _run_analysis(b),
+        "warp": lambda b, an: _run_warp(b, an),
+        "background": lambda b: _run_background(b, params["background_color"]),
+        "illumination": lambda b: _run_illumination(b, bool(params["illumination"])),
+        "eye": lambda b, an: _run_eye(b, an, float(params["eye_strength"] or 0.0)),
+        "edges": lambda wp, an: _run_edges(wp, an),
+        "crop": lambda b, an, ed: _run_crop(b, an, ed, params["ratio"]),
+        "encode": lambda b: _run_encode(b, int(params["quality"])),
+    }
+    ran, reused = [], []
+    local: Dict[str, Any] = {}  # 이번 실행 중 결과(메모 축출과 무관하게 유지)
+
+    def get(name: str) -> Any:
+        if name in local:
+            return local[name]
+        val = _MEMO.get(keys[name]) if _MEMO.max_bytes > 0 else None
+        if val is not None:
+            reused.append(name)
+        else:
+            deps, pct = spec[name]
+            args = tuple(get(d) for d in deps)
+            AIR._notify(progress, name, pct)
+            t = time.perf_counter()
+            val = fns[name](*args)
+            ran.append(f"{name}:{(time.perf_counter() - t) * 1000.0:.0f}ms")
+            if _MEMO.max_bytes > 0:
+                _MEMO.put(keys[name], val, _nbytes(val, args))
+        local[name] = val
+        return val
+
+    t0 = time.perf_counter()
+    out = get(target)
+    logger.info("[graph] %s ran=[%s] reused=[%s] total=%.0fms memo=%s", target, ", ".join(ran),
+                ", ".join(reused), (time.perf_counter() - t0) * 1000.0, _MEMO.stats())
+    return out
+
+
+def _params(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    p = dict(DEFAULTS)
+    p.update({k: v for k, v in (params or {}).items() if k in DEFAULTS})
+    return p
+
+
+# -----------------------
+# Public API
+# -----------------------
+def render(in_path: str, params: Optional[Dict[str, Any]] = None, *, progress=None) -> Optional[np.ndarray]:
+    """크롭까지 적용한 BGR 결과(메모와 공유하므로 읽기 전용으로 쓸 것). 실패 시 None."""
+    try:
+        return _evaluate(in_path, _params(params), "crop", progress)
+    except Exception as e:
+        logger.error("[graph] render failed: %s", e)
+        return None
+
+
+def render_preview(in_path: str, params: Optional[Dict[str, Any]] = None, *,
+                   long_edge: Optional[int] = None) -> Optional[np.ndarray]:
+    """화면 크기 프록시로 크롭까지 적용한 BGR 결과(미리보기/파라미터 토글용). 실패 시 None."""
+    p = dict(params or {}, preview=int(long_edge or PREVIEW_EDGE))
+    return render(in_path, p)
+
+
+def render_file(in_path: str, out_path: str, params: Optional[Dict[str, Any]] = None, *, progress=None) -> bool:
+    """결과 JPEG 를 out_path 에 원자적으로 저장한다."""
+    try:
+        data = _evaluate(in_path, _params(params), "encode", progress)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        tmp = f"{out_path}.graph.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out_path)
+        AIR._notify(progress, "saved", 100)
+        return True
+    except Exception as e:
+        logger.error("[graph] render_file failed: %s", e)
+        return False
+
+
+def clear() -> None:
+    """메모된 중간 결과를 모두 버린다."""
+    _MEMO.clear()
+
+
+def stats() -> Dict[str, Any]:
+    """메모 항목 수/용량/적중/축출 횟수."""
+    return _MEMO.stats()
+
+
+__all__ = ["DEFAULTS", "PREVIEW_EDGE", "render", "render_preview", "render_file", "clear", "stats"]
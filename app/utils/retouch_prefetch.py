@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+retouch_prefetch: 촬영 직후 raw_XX.jpg 전체를 백그라운드에서 미리 리터치(추측 실행)한다.
+- 결과 키 = sha1(파일 내용) + 리터치 파라미터 + 파이프라인 버전. origin_photo.jpg는 raw 복사본이므로 같은 키가 된다.
+- 작업은 단일 백그라운드 스레드가 리터치 워커의 speculative 레인(저우선순위 프로세스)으로 순차 실행한다.
+- 고객이 사진을 고르면(claim) 나머지 대기 작업은 취소하고, 선택되지 않은 결과는 삭제한다.
+  실행 중인 다른 사진 작업도 RW.cancel 로 바로 중단한다(전경 렌더와 CPU 를 다투지 않도록).
+
+사용:
+    from app.utils import retouch_prefetch as RP
+    RP.schedule(["C:/PhotoBox/raw/raw_01.jpg", ...], {"ratio": (3, 4)})   # 촬영 종료 시
+    RP.promote("C:/PhotoBox/raw/raw_02.jpg")                              # 썸네일 선택 시
+    hit = RP.claim("C:/PhotoBox/origin_photo.jpg", {"ratio": (3, 4)}, timeout=60)  # 보정 화면 진입 시
+"""
+
+from __future__ import annotations
+import os, time, logging, threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_DIR = Path(os.environ.get("AI_PREFETCH_DIR", r"C:\PhotoBox\ai_prefetch"))
+
+_PENDING, _RUNNING, _DONE, _FAILED, _CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+
+@dataclass
+class _Entry:
+    key: str
+    src: str
+    params: Dict[str, Any]
+    out_path: str
+    state: str = _PENDING
+    event: threading.Event = field(default_factory=threading.Event)
+
+
+# -----------------------
+# 키
+# -----------------------
+def content_key(path: str, params: Dict[str, Any]) -> Optional[str]:
+    """(파일 내용, 파라미터, 버전) 키. 파일을 읽을 수 없으면 None."""
+    from app.utils import ai_retouch as AIR
+    from app.utils import retouch_cache as RC
+    return RC.make_key("prefetch", path, params, AIR.PIPELINE_VERSION)
+
+
+# -----------------------
+# 프리페처
+# -----------------------
+class _Prefetcher:
+    """추측 리터치 대기열/결과 관리(스레드 안전)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._entries: Dict[str, _Entry] = {}
+        self._queue: Deque[str] = deque()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="retouch-prefetch", daemon=True)
+        self._thread.start()
+
+    # 실행 루프 ---------------------------------------------
+    def _loop(self) -> None:
+        from app.utils import retouch_worker as RW
+        while True:
+            with self._cv:
+                while not self._queue:
+                    self._cv.wait()
+                key = self._queue.popleft()
+                ent = self._entries.get(key)
+                if ent is None or ent.state != _PENDING:
+                    continue
+                ent.state = _RUNNING
+            t0 = time.perf_counter()
+            tmp = ent.out_path[:-len(".jpg")] + ".part.jpg"  # 확장자로 인코더가 정해지므로 .jpg 유지
+            ok = False
+            try:
+                os.makedirs(os.path.dirname(ent.out_path), exist_ok=True)
+                with self._cv:
+                    evicted = self._entries.get(key) is not ent  # RUNNING 표시 직후 축출된 경우
+                res = RW.RetouchResult(False, "cancelled") if evicted else \
+                    RW.run_file(ent.src, tmp, params=ent.params, lane=RW.LANE_SPECULATIVE)
+                ok = bool(res.ok) and os.path.exists(tmp)
+                if ok:
+                    os.replace(tmp, ent.out_path)
+            except Exception as e:
+                logger.error("[prefetch] run failed %s: %s", ent.src, e)
+                ok = False
+            finally:
+                try:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                except Exception:
+                    pass
+            with self._cv:
+                if self._entries.get(key) is ent:
+                    ent.state = _DONE if ok else _FAILED
+                else:
+                    ent.state = _CANCELLED  # 실행 중 축출됨(취소되었거나 결과를 버린다)
+                    if ok:
+                        _remove_quiet(ent.out_path)
+                ent.event.set()
+            logger.info("[prefetch] %s %s key=%s (%.0fms)", ent.state,
+                        os.path.basename(ent.src), key[:10], (time.perf_counter() - t0) * 1000.0)
+
+    # Public ------------------------------------------------
+    def schedule(self, paths: List[str], params: Dict[str, Any]) -> int:
+        """이전 결과를 비우고 paths를 대기열에 넣는다. 등록 수를 반환."""
+        self.reset()
+        added = 0
+        for p in paths:
+            if not p or not os.path.exists(p):
+                continue
+            key = content_key(p, params)
+            if key is None:
+                continue
+            ent = _Entry(key, str(p), dict(params or {}), str(PREFETCH_DIR / f"{key}.jpg"))
+            with self._cv:
+                if key in self._entries:
+                    continue
+                self._entries[key] = ent
+                self._queue.append(key)
+                added += 1
+                self._cv.notify()
+        if added:
+            self._ensure_thread()
+        logger.info("[prefetch] scheduled %d/%d", added, len(paths))
+        return added
+
+    def _find_by_src(self, src: str) -> Optional[_Entry]:
+        s = os.path.normcase(os.path.abspath(src))
+        for ent in self._entries.values():
+            if os.path.normcase(os.path.abspath(ent.src)) == s:
+                return ent
+        return None
+
+    def promote(self, src: str) -> bool:
+        """src 작업을 대기열 맨 앞으로 올린다(썸네일 선택 시)."""
+        with self._cv:
+            ent = self._find_by_src(src)
+            if ent is None or ent.state != _PENDING:
+                return False
+            try:
+                self._queue.remove(ent.key)
+            except ValueError:
+                pass
+            self._queue.appendleft(ent.key)
+            return True
+
+    def claim(self, path: str, params: Dict[str, Any], timeout: float = 0.0) -> Optional[str]:
+        """path(내용 기준)에 맞는 결과를 반환한다. 진행 중이면 timeout까지 기다린다.
+
+        - 다른 대기 작업은 취소하고, 선택되지 않은 완료 결과는 삭제한다.
+        """
+        key = content_key(path, params)
+        if key is None:
+            return None
+        with self._cv:
+            ent = self._entries.get(key)
+            if ent is None:
+                logger.info("[prefetch] miss %s", os.path.basename(path))
+                return None
+            self._evict_others_locked(key)
+            if ent.state == _PENDING:
+                try:
+                    self._queue.remove(key)
+                except ValueError:
+                    pass
+                self._queue.appendleft(key)
+                self._cv.notify()
+        if not ent.event.wait(max(0.0, float(timeout))):
+            logger.info("[prefetch] claim timeout %s", os.path.basename(path))
+            return None
+        if ent.state == _DONE and os.path.exists(ent.out_path):
+            logger.info("[prefetch] hit %s key=%s", os.path.basename(path), key[:10])
+            return ent.out_path
+        return None
+
+    def _evict_others_locked(self, keep: str) -> None:
+        from app.utils import retouch_worker as RW
+        for k in list(self._entries.keys()):
+            if k == keep:
+                continue
+            ent = self._entries.pop(k)
+            if ent.state == _PENDING:
+                ent.state = _CANCELLED
+                ent.event.set()
+            elif ent.state in (_DONE, _FAILED):
+                _remove_quiet(ent.out_path)
+            elif ent.state == _RUNNING:
+                # speculative 레인은 이 루프의 작업만 실행하므로 실행 중인 작업 = ent. 워커를 멈춰 취소한다
+                # (루프가 "cancelled" 결과를 받고 event 를 세운다)
+                if RW.cancel(RW.LANE_SPECULATIVE):
+                    logger.info("[prefetch] cancel running %s", os.path.basename(ent.src))
+        self._queue = deque(k for k in self._queue if k == keep)
+
+    def reset(self) -> None:
+        """모든 대기 작업을 취소하고 결과 파일을 지운다."""
+        with self._cv:
+            self._evict_others_locked(keep="")
+        try:
+            if PREFETCH_DIR.exists():
+                for p in PREFETCH_DIR.glob("*.jpg*"):
+                    _remove_quiet(str(p))
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, int]:
+        """상태별 개수를 반환한다."""
+        with self._lock:
+            out: Dict[str, int] = {}
+            for ent in self._entries.values():
+                out[ent.state] = out.get(ent.state, 0) + 1
+            return out
+
+
+def _remove_quiet(path: str) -> None:
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except Exception:
+        pass
+
+
+# -----------------------
+# Public API (프로세스 전역)
+# -----------------------
+_PF = _Prefetcher()
+
+
+def schedule(paths: List[str], params: Dict[str, Any]) -> int:
+    """촬영 종료 시 raw 목록을 추측 리터치 대기열에 넣는다."""
+    return _PF.schedule(paths, params)
+
+
+def promote(src: str) -> bool:
+    """선택된 raw를 먼저 처리하도록 올린다."""
+    return _PF.promote(src)
+
+
+def claim(path: str, params: Dict[str, Any], timeout: float = 0.0) -> Optional[str]:
+    """결과 경로(적중) 또는 None(미적중)을 반환한다."""
+    return _PF.claim(path, params, timeout)
+
+
+def reset() -> None:
+    """대기열/결과를 모두 비운다(세션 종료 등)."""
+    _PF.reset()
+
+
+def status() -> Dict[str, int]:
+    """상태별 작업 수."""
+    return _PF.status()
+
+
+__all__ = ["PREFETCH_DIR", "content_key", "schedule", "promote", "claim", "reset", "status"]
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+retouch_worker: 리터치 전용 워커 프로세스.
+- 모델(MediaPipe)은 워커 프로세스에 상주해 고객이 바뀌어도 재사용한다.
+- 픽셀은 shared_memory 블록으로 주고받는다(큐에는 메타데이터만).
+- 진행 상황은 이벤트 큐로 돌려준다(stage, pct).
+- 워커가 죽거나(네이티브 크래시 포함) 시간 초과되면 해당 작업만 실패로 돌려주고 다음 요청에서 재시작한다.
+- 파라미터 조정 재렌더(run_graph)는 워커에 상주하는 retouch_graph 메모를 써서 바뀐 단계만 다시 계산한다.
+- 화면 크기 미리보기(run_preview)도 워커에서 랜드마크 검출까지 실행하고 BGR 프록시를 shared_memory 로 돌려준다
+  (GUI 프로세스에서 MediaPipe 를 돌리지 않는다).
+- 작업 종류별 레인 = 워커 프로세스 1개씩(레인 안에서는 순차, 레인끼리는 서로 기다리지 않는다).
+    render       원본 해상도 보정/조정 재렌더(보통 우선순위, 그래프 메모 상주)
+    preview      화면 크기 미리보기(보통 우선순위, 원본 해상도 렌더 뒤에 줄 서지 않는다)
+    speculative  추측 리터치(retouch_prefetch). 이 레인 프로세스만 우선순위를 낮추고,
+                 cancel() 로 실행 중인 작업을 즉시 취소한다(워커 종료 → 다음 요청 때 재시작).
+
+사용:
+    from app.utils import retouch_worker as RW
+    res = RW.run_file(origin, ai_out, params={"ratio": (3, 4)}, progress=lambda s, p: ...)
+    if not res.ok: ...
+    res = RW.run_graph(origin, ai_out, {"ratio": (3, 4), "eye_strength": 0.2})   # 조정 재렌더
+    res = RW.run_preview(origin, {"ratio": (3, 4)})                              # res.pixels = 프록시 BGR
+    res = RW.run_file(raw, out, params={"ratio": (3, 4)}, lane=RW.LANE_SPECULATIVE)  # 추측 실행
+    RW.cancel(RW.LANE_SPECULATIVE)                                               # 다른 스레드에서 취소
+"""
+
+from __future__ import annotations
+import os, time, queue, logging, threading, itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 작업당 최대 대기(초). 초과 시 워커를 종료하고 재시작한다.
+_JOB_TIMEOUT_S = float(os.environ.get("AI_WORKER_TIMEOUT", "120") or 120)
+# 워커 시작(모델 워밍업 포함) 대기(초)
+_START_TIMEOUT_S = float(os.environ.get("AI_WORKER_START_TIMEOUT", "60") or 60)
+_POLL_S = 0.25
+# 추측 리터치 레인 워커를 낮은 우선순위로 실행(GUI/전경 렌더와 경합하지 않도록)
+_LOW_PRIORITY = str(os.environ.get("AI_WORKER_LOW_PRIORITY", "1")).strip().lower() in ("1", "true", "yes")
+
+LANE_RENDER = "render"
+LANE_PREVIEW = "preview"
+LANE_SPECULATIVE = "speculative"
+# 레인 → 낮은 우선순위 여부. POSIX 는 nice 를 되돌릴 수 없어 작업 단위가 아니라 레인 프로세스 단위로 정한다.
+_LANES: Dict[str, bool] = {LANE_RENDER: False, LANE_PREVIEW: False, LANE_SPECULATIVE: True}
+
+ProgressFn = Callable[[str, int], None]
+
+
+@dataclass
+class RetouchResult:
+    """워커 작업 결과."""
+    ok: bool
+    message: str = ""
+    pixels: Optional[np.ndarray] = None  # want_pixels=True일 때 결과 BGR
+    elapsed_ms: float = 0.0
+
+
+# -----------------------
+# shared_memory 유틸
+# -----------------------
+def _shm_attach(name: str) -> shared_memory.SharedMemory:
+    """기존 블록에 연결한다(생성 측이 해제 책임을 가진다)."""
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)  # py>=3.13
+    except TypeError:
+        # py<3.13: spawn 자식은 부모의 resource_tracker를 공유하므로 중복 등록은 무해하다
+        return shared_memory.SharedMemory(name=name, create=False)
+
+
+def _shm_put(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """배열을 새 블록에 복사하고 (블록, 메타)를 반환한다."""
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    del view
+    return shm, {"name": shm.name, "shape": tuple(arr.shape), "dtype": str(arr.dtype)}
+
+
+def _shm_view(shm: shared_memory.SharedMemory, meta: Dict[str, Any]) -> np.ndarray:
+    """블록을 ndarray 뷰로 본다(블록 close 전까지만 유효)."""
+    return np.ndarray(tuple(meta["shape"]), dtype=np.dtype(meta["dtype"]), buffer=shm.buf)
+
+
+def _shm_release(shm: Optional[shared_memory.SharedMemory], unlink: bool) -> None:
+    """블록을 닫고 필요 시 해제한다."""
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except Exception:
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except Exception:
+            pass
+
+
+# -----------------------
+# 워커 프로세스 본체
+# -----------------------
+def _lower_priority() -> None:
+    """워커 프로세스 우선순위를 낮춘다(GUI/라이브뷰 우선). 실패는 무시."""
+    try:
+        if os.name == "nt":
+            import ctypes
+            BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+            k32 = ctypes.windll.kernel32
+            k32.SetPriorityClass(k32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS)
+        else:
+            os.nice(5)
+    except Exception:
+        pass
+
+
+def _worker_main(req_q, evt_q, lane: str = LANE_RENDER) -> None:
+    """워커 루프: 모델 워밍업 후 요청을 순차 처리한다."""
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [retouch-{lane}] %(name)s: %(message)s")
+    if _LOW_PRIORITY and _LANES.get(lane, False):
+        _lower_priority()
+    from app.utils import ai_retouch as AIR
+    from app.utils import landmarker_pool
+    from app.utils import retouch_graph as RG
+    try:
+        landmarker_pool.warmup(("face_mesh", "pose"))
+    except Exception as e:
+        logger.info("[worker] warmup skip: %s", e)
+    evt_q.put(("ready", os.getpid()))
+
+    held: Dict[str, shared_memory.SharedMemory] = {}  # 결과 블록(클라이언트 release까지 유지)
+    while True:
+        msg = req_q.get()
+        kind = msg[0]
+        if kind == "stop":
+            break
+        if kind == "release":
+            _shm_release(held.pop(msg[1], None), unlink=True)
+            continue
+        if kind != "job":
+            continue
+        _, job_id, job = msg
+        t0 = time.perf_counter()
+
+        def _progress(stage: str, pct: int, _id=job_id) -> None:
+            evt_q.put(("progress", _id, str(stage), int(pct)))
+
+        in_shm = None
+        try:
+            params = dict(job.get("params") or {})
+            if params.pop("proxy", False) and job.get("in_path"):
+                # 미리보기: 같은 그래프를 프록시 해상도로(메모 공유) → 결과는 shared_memory 로
+                out = RG.render_preview(job["in_path"], params)
+                out_meta = None
+                if out is not None:
+                    shm, out_meta = _shm_put(out)
+                    held[shm.name] = shm
+                dt = (time.perf_counter() - t0) * 1000.0
+                evt_q.put(("done", job_id, out is not None, f"ok {dt:.0f}ms" if out is not None else "preview failed",
+                           out_meta))
+                continue
+            if params.pop("graph", False) and job.get("in_path") and job.get("out_path"):
+                # 증분 그래프: 이전 요청과 달라진 파라미터의 하위 단계만 재계산
+                ok = RG.render_file(job["in_path"], job["out_path"], params, progress=_progress)
+                dt = (time.perf_counter() - t0) * 1000.0
+                evt_q.put(("done", job_id, bool(ok), f"ok {dt:.0f}ms" if ok else "graph render failed", None))
+                continue
+            if job.get("in_path") and job.get("out_path") and not job.get("want_pixels") \
+                    and int(params.get("quality", 100)) == 100:
+                # 파일→파일: process_file 경유(디스크 캐시 적중 시 계산 생략)
+                ok = AIR.process_file(job["in_path"], job["out_path"], ratio=params.get("ratio"),
+                                      eye_strength=params.get("eye_strength"), progress=_progress)
+                dt = (time.perf_counter() - t0) * 1000.0
+                evt_q.put(("done", job_id, bool(ok), f"ok {dt:.0f}ms" if ok else "retouch failed", None))
+                continue
+            if job.get("in_shm"):
+                in_shm = _shm_attach(job["in_shm"]["name"])
+                src = _shm_view(in_shm, job["in_shm"]).copy()
+                _progress("load", 0)
+            else:
+                src = AIR._load_image(job.get("in_path") or "")
+                _progress("load", 0)
+            if src is None:
+                evt_q.put(("done", job_id, False, "load failed", None))
+                continue
+            out = AIR.process_array(src, ratio=params.get("ratio"), eye_strength=params.get("eye_strength"),
+                                    progress=_progress)
+            ok = True
+            out_path = job.get("out_path")
+            if out_path:
+                ok = AIR.save_jpg_bgr(out, out_path, int(params.get("quality", 100)))
+                _progress("saved", 100)
+            out_meta = None
+            if ok and job.get("want_pixels"):
+                shm, out_meta = _shm_put(out)
+                held[shm.name] = shm
+            dt = (time.perf_counter() - t0) * 1000.0
+            evt_q.put(("done", job_id, bool(ok), f"ok {dt:.0f}ms" if ok else "save failed", out_meta))
+        except Exception as e:
+            evt_q.put(("done", job_id, False, f"error: {e}", None))
+        finally:
+            _shm_release(in_shm, unlink=False)
+
+    for shm in held.values():
+        _shm_release(shm, unlink=True)
+
+
+# -----------------------
+# 클라이언트(GUI 프로세스)
+# -----------------------
+class RetouchWorkerClient:
+    """워커 프로세스 수명/요청을 관리한다. run()은 블로킹이므로 QThread 등에서 호출한다."""
+
+    def __init__(self, lane: str = LANE_RENDER):
+        self.lane = lane
+        self._ctx = mp.get_context("spawn")
+        self._proc = None
+        self._req_q = None
+        self._evt_q = None
+        self._lock = threading.Lock()  # 한 번에 한 작업(워커는 단일 스레드)
+        self._ids = itertools.count(1)
+        self._restarts = 0
+        self._current: Optional[int] = None     # 실행 중인 작업 id(cancel 대상)
+        self._cancel_id: Optional[int] = None   # 취소 요청된 작업 id
+
+    # 수명 -------------------------------------------------
+    def alive(self) -> bool:
+        """워커 프로세스가 살아있는지."""
+        return bool(self._proc is not None and self._proc.is_alive())
+
+    def start(self) -> bool:
+        """워커를 (재)시작하고 ready를 기다린다."""
+        with self._lock:
+            return self._start_locked()
+
+    def _start_locked(self) -> bool:
+        if self.alive():
+            return True
+        self._kill_locked()
+        try:
+            self._req_q = self._ctx.Queue()
+            self._evt_q = self._ctx.Queue()
+            self._proc = self._ctx.Process(target=_worker_main, args=(self._req_q, self._evt_q, self.lane),
+                                           name=f"retouch-{self.lane}", daemon=True)
+            self._proc.start()
+        except Exception as e:
+            logger.error("[worker] start failed: %s", e)
+            self._proc = None
+            return False
+        deadline = time.monotonic() + _START_TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                evt = self._evt_q.get(timeout=_POLL_S)
+            except queue.Empty:
+                if not self.alive():
+                    break
+                continue
+            if evt and evt[0] == "ready":
+                logger.info("[worker] ready pid=%s", evt[1])
+                return True
+        logger.error("[worker] not ready (exitcode=%s)", getattr(self._proc, "exitcode", None))
+        self._kill_locked()
+        return False
+
+    def _kill_locked(self) -> None:
+        p = self._proc
+        self._proc = None
+        if p is None:
+            return
+        try:
+            if p.is_alive():
+                p.terminate()
+            p.join(timeout=3)
+        except Exception:
+            pass
+
+    def shutdown(self) -> None:
+        """워커를 정상 종료한다(실패 시 강제 종료)."""
+        with self._lock:
+            if self.alive():
+                try:
+                    self._req_q.put(("stop",))
+                    self._proc.join(timeout=3)
+                except Exception:
+                    pass
+            self._kill_locked()
+
+    # 요청 -------------------------------------------------
+    def run(self, *, in_path: Optional[str] = None, image: Optional[np.ndarray] = None,
+            out_path: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+            progress: Optional[ProgressFn] = None, want_pixels: bool = False,
+            timeout: Optional[float] = None) -> RetouchResult:
+        """작업 1건을 워커에서 실행하고 결과를 기다린다."""
+        t0 = time.perf_counter()
+        with self._lock:
+            if not self._start_locked():
+                return RetouchResult(False, "worker unavailable")
+            job_id = next(self._ids)
+            in_shm = None
+            job: Dict[str, Any] = {"in_path": in_path, "out_path": out_path,
+                                   "params": dict(params or {}), "want_pixels": bool(want_pixels)}
+            try:
+                if image is not None:
+                    in_shm, job["in_shm"] = _shm_put(image)
+                self._current = job_id
+                self._req_q.put(("job", job_id, job))
+                res = self._wait_locked(job_id, progress, timeout or _JOB_TIMEOUT_S)
+            finally:
+                self._current = None
+                _shm_release(in_shm, unlink=True)
+        res.elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        logger.info("[worker:%s] job=%d ok=%s %s (%.0fms)", self.lane, job_id, res.ok, res.message, res.elapsed_ms)
+        return res
+
+    def cancel(self) -> bool:
+        """실행 중인 작업을 취소한다(다른 스레드에서 호출). 대기 루프가 워커를 종료하고 run()은 "cancelled"."""
+        job_id = self._current
+        if job_id is None:
+            return False
+        self._cancel_id = job_id
+        return True
+
+    def _wait_locked(self, job_id: int, progress: Optional[ProgressFn], timeout: float) -> RetouchResult:
+        deadline = time.monotonic() + float(timeout)
+        while True:
+            if self._cancel_id == job_id:
+                # 단계 사이 협조 취소 대신 워커 종료: 진행 중인 네이티브 호출도 바로 멈춘다(다음 요청 때 재시작)
+                logger.info("[worker:%s] job=%d cancelled -> stop worker", self.lane, job_id)
+                self._kill_locked()
+                return RetouchResult(False, "cancelled")
+            if time.monotonic() > deadline:
+                logger.error("[worker] job=%d timeout -> restart", job_id)
+                self._kill_locked(); self._restarts += 1
+                return RetouchResult(False, "timeout")
+            try:
+                evt = self._evt_q.get(timeout=_POLL_S)
+            except queue.Empty:
+                if not self.alive():
+                    code = getattr(self._proc, "exitcode", None) if self._proc else None
+                    logger.error("[worker] crashed during job=%d exitcode=%s", job_id, code)
+                    self._kill_locked(); self._restarts += 1
+                    return RetouchResult(False, f"worker crashed ({code})")
+                continue
+            kind = evt[0]
+            if kind == "progress" and evt[1] == job_id:
+                if progress is not None:
+                    try:
+                        progress(evt[2], evt[3])
+                    except Exception:
+                        pass
+            elif kind == "done" and evt[1] == job_id:
+                _, _, ok, msg, meta = evt
+                pixels = None
+                if meta:
+                    shm = None
+                    try:
+                        shm = _shm_attach(meta["name"])
+                        pixels = _shm_view(shm, meta).copy()
+                    except Exception as e:
+                        logger.error("[worker] result attach failed: %s", e)
+                    finally:
+                        _shm_release(shm, unlink=False)
+                        self._req_q.put(("release", meta["name"]))
+                return RetouchResult(bool(ok), str(msg), pixels)
+            # 이전(시간 초과된) 작업의 늦은 이벤트는 버린다
+
+    def stats(self) -> Dict[str, Any]:
+        """레인/pid/재시작 횟수를 반환한다."""
+        return {"lane": self.lane, "alive": self.alive(), "pid": getattr(self._proc, "pid", None),
+                "restarts": self._restarts}
+
+
+# -----------------------
+# Public API (프로세스 전역 클라이언트)
+# -----------------------
+_CLIENTS: Dict[str, RetouchWorkerClient] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client(lane: str = LANE_RENDER) -> RetouchWorkerClient:
+    """레인별 전역 클라이언트를 반환한다(워커는 첫 요청 때 시작)."""
+    if lane not in _LANES:
+        raise ValueError(f"unknown lane: {lane}")
+    with _CLIENT_LOCK:
+        c = _CLIENTS.get(lane)
+        if c is None:
+            c = _CLIENTS[lane] = RetouchWorkerClient(lane)
+        return c
+
+
+def run_file(in_path: str, out_path: str, *, params: Optional[Dict[str, Any]] = None,
+             progress: Optional[ProgressFn] = None, timeout: Optional[float] = None,
+             lane: str = LANE_RENDER) -> RetouchResult:
+    """파일 입력 → 워커 리터치 → out_path(JPEG) 저장. 추측 실행은 lane=LANE_SPECULATIVE."""
+    return get_client(lane).run(in_path=in_path, out_path=out_path, params=params,
+                                progress=progress, timeout=timeout)
+
+
+def run_graph(in_path: str, out_path: str, params: Optional[Dict[str, Any]] = None, *,
+              progress: Optional[ProgressFn] = None, timeout: Optional[float] = None) -> RetouchResult:
+    """retouch_graph 로 재렌더한다(워커에 남은 중간 결과를 재사용, 바뀐 단계만 계산)."""
+    return get_client().run(in_path=in_path, out_path=out_path, params=dict(params or {}, graph=True),
+                            progress=progress, timeout=timeout)
+
+
+def run_preview(in_path: str, params: Optional[Dict[str, Any]] = None, *,
+                timeout: Optional[float] = None) -> RetouchResult:
+    """retouch_graph.render_preview 를 미리보기 레인에서 실행한다. 성공 시 res.pixels = 화면 크기 BGR."""
+    return get_client(LANE_PREVIEW).run(in_path=in_path, params=dict(params or {}, proxy=True), want_pixels=True,
+                                        timeout=timeout)
+
+
+def run_array(image: np.ndarray, *, params: Optional[Dict[str, Any]] = None,
+              progress: Optional[ProgressFn] = None, out_path: Optional[str] = None,
+              timeout: Optional[float] = None, lane: str = LANE_RENDER) -> RetouchResult:
+    """ndarray 입력(shared_memory 전달) → 워커 리터치 → 결과 픽셀 반환."""
+    return get_client(lane).run(image=image, out_path=out_path, params=params, progress=progress,
+                            want_pixels=True, timeout=timeout)
+
+
+def cancel(lane: str = LANE_SPECULATIVE) -> bool:
+    """레인에서 실행 중인 작업을 취소한다(실행 중인 작업이 없으면 False)."""
+    with _CLIENT_LOCK:
+        c = _CLIENTS.get(lane)
+    return bool(c is not None and c.cancel())
+
+
+def prestart(lanes: Tuple[str, ...] = (LANE_RENDER, LANE_PREVIEW)) -> None:
+    """레인 워커를 백그라운드에서 미리 띄운다(모델 워밍업)."""
+    def _start() -> None:
+        for lane in lanes:
+            get_client(lane).start()
+    threading.Thread(target=_start, name="retouch-worker-prestart", daemon=True).start()
+
+
+def shutdown() -> None:
+    """전역 워커를 모두 종료한다."""
+    with _CLIENT_LOCK:
+        clients = list(_CLIENTS.values())
+    for c in clients:
+        c.shutdown()
+
+
+__all__ = ["LANE_RENDER", "LANE_PREVIEW", "LANE_SPECULATIVE", "RetouchResult", "RetouchWorkerClient", "get_client",
+           "run_file", "run_graph", "run_preview", "run_array", "cancel", "prestart", "shutdown"]
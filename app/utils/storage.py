@@ -1,15 +1,20 @@
 ﻿# app/utils/storage.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import os, re, json, shutil, datetime as dt
+import os, re, json, shutil, time, uuid, hashlib, logging, threading, datetime as dt
+from collections import OrderedDict
 from typing import Dict, Tuple, Optional, List
 
-from PySide6.QtCore import Qt, QTimer, QObject, QSizeF, QMarginsF, QRectF, QPointF
+from PySide6.QtCore import Qt, QTimer, QObject, QSizeF, QMarginsF, QRectF, QPointF, QByteArray, QBuffer, QIODevice
 from PySide6.QtGui import (
     QImage, QImageWriter, QPainter, QPdfWriter, QPageSize, QPageLayout,
     QTransform, QPen
 )
 
+from app.utils import job_catalog
+
+logger = logging.getLogger(__name__)
+
 # ─────────────────────────────────────────────────────────────
 # 기본 경로/상수
 # ─────────────────────────────────────────────────────────────
@@ -31,6 +36,24 @@ SIZES_MM: Dict[str, Tuple[int, int]] = {
 EMAIL_LONG_PX = 1600
 THUMB_LONG_PX = 480
 
+# 타일 PDF 결과 캐시(같은 편집본 + 같은 레이아웃이면 재생성 생략)
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join(PHOTOBOX_ROOT, ".cache", "pdf"))
+PDF_CACHE_ENABLED = str(os.environ.get("PDF_CACHE", "1")).strip().lower() in ("1", "true", "yes")
+PDF_CACHE_MAX = int(os.environ.get("PDF_CACHE_MAX", "64") or 64)  # 보관 개수 상한(LRU)
+PDF_LAYOUT_VERSION = "2"  # 타일 렌더링 방식이 바뀌면 올려서 기존 캐시 무효화
+# 타일 PDF 작성기: "dct" = 타일 JPEG를 XObject 하나로 넣고 변환행렬로 6회 배치(jpeg_pdf), "qt" = QPdfWriter,
+#   "raster" = render_print_page()의 4×6 페이지 래스터를 JPEG 한 장으로 넣음(선택 사항: 보관 PDF가 dct의 약 10배 크기)
+PDF_WRITER = str(os.environ.get("PDF_WRITER", "dct")).strip().lower()
+# dct: 소스 JPEG가 타일보다 이 배율 이하로만 크면 재압축 없이 그대로 넣는다(그보다 크면 타일 크기로 1회 인코딩)
+PDF_DCT_PASSTHROUGH_SCALE = float(os.environ.get("PDF_DCT_PASSTHROUGH_SCALE", "1.05") or 1.05)
+PDF_JPEG_QUALITY = int(os.environ.get("PDF_JPEG_QUALITY", "95") or 95)
+PRINT_PAGE_MEMO = int(os.environ.get("PRINT_PAGE_MEMO", "2") or 2)  # 페이지 래스터 메모리 보관 개수(PDF 보관본 ↔ 인쇄 재사용)
+
+# save_bundle: 산출물 병렬 인코딩 스레드 수(0 = CPU 코어 수, 1 = 직렬), 원본 보관 포맷/PNG 압축 레벨(-1 = Qt 기본)
+BUNDLE_WORKERS = int(os.environ.get("BUNDLE_WORKERS", "0") or 0)
+BUNDLE_RAW_FORMAT = str(os.environ.get("BUNDLE_RAW_FORMAT", "png")).strip().lower()
+BUNDLE_RAW_PNG_LEVEL = int(os.environ.get("BUNDLE_RAW_PNG_LEVEL", "-1") or -1)
+
 # ─────────────────────────────────────────────────────────────
 # 내부 유틸
 # ─────────────────────────────────────────────────────────────
@@ -136,8 +159,85 @@ def cover_crop_rect(iw: int, ih: int, tw: int, th: int):
         want_h = int(iw / dst_ar); y = (ih - want_h) // 2
         return 0, y, iw, want_h
 
+# ── 타일 PDF 캐시
+def _image_signature(img: QImage) -> str:
+    """픽셀 내용 sha1(크기/포맷 포함). 같은 편집본이면 같은 값."""
+    h = hashlib.sha1(f"{img.width()}x{img.height()}:{img.format().value}".encode("ascii"))
+    h.update(img.constBits())
+    return h.hexdigest()
+
+def _pdf_cache_key(signature: str, layout: dict) -> str:
+    tok = json.dumps({"v": PDF_LAYOUT_VERSION, "img": signature, "layout": layout},
+                     sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha1(tok.encode("ascii")).hexdigest()
+
+def _dct_passthrough(img: QImage, path: Optional[str], crop_w: int, out_w: int) -> Optional[bytes]:
+    """img가 path의 JPEG를 디코드한 것이고 타일보다 충분히 크지 않으면 그 JPEG 바이트, 아니면 None."""
+    if not path or crop_w > out_w * PDF_DCT_PASSTHROUGH_SCALE or not os.path.isfile(path):
+        return None
+    from app.utils import jpeg_pdf
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    info = jpeg_pdf.jpeg_info(data)
+    if info is None or (info[0], info[1]) != (img.width(), img.height()):
+        return None
+    return data
+
+def _encode_jpeg(img: QImage, quality: int = PDF_JPEG_QUALITY) -> bytes:
+    ba = QByteArray()
+    buf = QBuffer(ba); buf.open(QIODevice.WriteOnly)
+    img.convertToFormat(QImage.Format_RGB888).save(buf, "JPG", quality)
+    buf.close()
+    return bytes(ba)
+
+def _copy_atomic(src: str, dst: str) -> None:
+    _ensure_dir(os.path.dirname(dst) or ".")
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            try: os.remove(tmp)
+            except OSError: pass
+
+def _pdf_cache_fetch(key: str, dst: str) -> bool:
+    ent = os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+    if not PDF_CACHE_ENABLED or not os.path.isfile(ent):
+        return False
+    try:
+        _copy_atomic(ent, dst)
+        now = time.time(); os.utime(ent, (now, now))  # LRU 갱신
+        return True
+    except Exception as e:
+        logger.error("[BuildPDF] cache fetch failed key=%s: %s", key[:10], e)
+        return False
+
+def _pdf_cache_store(key: str, src: str) -> None:
+    if not PDF_CACHE_ENABLED or not os.path.isfile(src):
+        return
+    try:
+        _copy_atomic(src, os.path.join(PDF_CACHE_DIR, f"{key}.pdf"))
+        ents = sorted((os.path.join(PDF_CACHE_DIR, n) for n in os.listdir(PDF_CACHE_DIR) if n.endswith(".pdf")),
+                      key=os.path.getmtime)
+        for old in ents[:max(0, len(ents) - PDF_CACHE_MAX)]:
+            os.remove(old)
+    except Exception as e:
+        logger.error("[BuildPDF] cache store failed key=%s: %s", key[:10], e)
+
 # ── retention_days 헬퍼
 def get_retention_days(default: int = 7) -> int:
+    """보관 일수: settings.json retention.days(설정 화면) → app/config/email.json retention_days → default."""
+    try:
+        from app.config.loader import config_load_json, config_user_settings_path
+        v = (config_load_json(config_user_settings_path()).get("retention") or {}).get("days")
+        if v:
+            return int(v)
+    except Exception:
+        pass
     try:
         app_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         cfg_path = os.path.join(app_dir, "config", "email.json")
@@ -174,40 +274,98 @@ def build_tiled_pdf(
     # ⬇️ 2×3(2행 × 3열, 가로 우선) 고정
     force_cols_rows: tuple = (3, 2),
     strict_cols_rows: bool = True,     # True면 2×3 고정(폴백으로 행/열 변경 금지)
+    source_path: Optional[str] = None,  # image의 원본 JPEG 경로(있으면 재압축 없이 PDF에 그대로 삽입)
+    writer: Optional[str] = None,       # "dct" | "qt" | "raster" (None = PDF_WRITER)
+    print_page: bool = False,           # True면 직접 인쇄용 페이지 래스터도 그려 메모리에 둔다(render_print_page)
 ) -> str:
     
     """
     이미지 타일을 **가로 4×6(최종 152.4×101.6mm)** PDF로 저장합니다.
     - session["ratio"]가 '3040'이면 30×40mm, '3545'이면 35×45mm로 자동 선택
-    - 소스 이미지는 C:\PhotoBox\edited_photo.jpg(300ppi) 고정 사용
+    - 소스 이미지는 호출자가 불러온 편집본(image) 사용, 없을 때만 C:\PhotoBox\edited_photo.jpg(300ppi) 로드
     - 페이지 마진 0, `FullPageMode`, 그리드 **2×3(2행×3열, 가로)**
     - 컷마크는 사용하지 않음
+    - 타일 이미지는 한 번만 크롭/리샘플한 뒤 모든 칸에 같은 이미지를 찍는다
+    - PDF_WRITER=dct(기본): 타일 JPEG 하나를 이미지 XObject로 넣고 클립+변환행렬로 6회 배치(jpeg_pdf).
+      source_path가 image의 JPEG이고 타일보다 크지 않으면 재압축 없이 그대로, 아니면 타일 크기로 1회 인코딩.
+      PDF_WRITER=qt 면 QPdfWriter 경로
+    - writer="raster": render_print_page()와 같은 4×6 페이지 래스터를 JPEG 한 장으로 보관(PDF가 훨씬 커짐)
+    - print_page=True: 보관 PDF 작성기와 별개로 같은 배치의 페이지 래스터를 그려 메모리에 둔다
+      (편집본 서명/배치 계산 공유 → 직접 인쇄가 PDF 디코드 없이 cached_print_page로 재사용)
+    - 결과는 (편집본 픽셀 서명, 사진 규격, 레이아웃 인자)로 캐시 → 재인화/재전송 시 생성 생략
+    - 생성 소요/캐시 적중 여부는 session["pdf_build"] = {"ms", "cache", "key"} 로 남긴다
     """
     # 출력 경로
     pdf_dir = pdf_date_dir(True)
     pdf_name = make_pdf_filename(session, size_key)
     save_path = os.path.join(pdf_dir, pdf_name)
 
-    # 1) 사진 규격: session["ratio"] 기반 자동 선택
-    ratio = str(session.get("ratio", "")).strip()
-    if ratio == "3040":
-        photo_mm = (30, 40)
-    elif ratio == "3545":
-        photo_mm = (35, 45)
-    # else: 호출 인자 photo_mm 그대로 사용(폴백)
-
-    # 2) 소스 이미지: 편집본 고정 경로 우선 사용
-    src_img = QImage(EDITED_PHOTO_PATH)
-    if src_img.isNull() and isinstance(image, QImage):
-        # 편집본이 없으면 전달받은 이미지 사용(폴백)
-        src_img = image
-
+    # 1) 사진 규격: session["ratio"] 기반 자동 선택(없으면 호출 인자 photo_mm)
+    photo_mm = _photo_mm_for(session, photo_mm)
+
+    # 2) 소스 이미지: 호출자가 이미 불러온 편집본 우선(디스크 재디코딩 생략)
+    t0 = time.perf_counter()
+    src_img, source_path = _print_source(image, source_path)
+    writer_kind = str(writer or PDF_WRITER).strip().lower()
+    if writer_kind not in ("dct", "raster"):
+        writer_kind = "qt"
+
+    # 타일 배치(px) — 인쇄 래스터(render_print_page)와 같은 계산
+    L = _tile_layout(src_img, photo_mm, paper_mm=paper_mm, orientation=orientation, dpi=dpi, margin_mm=margin_mm,
+                     gap_mm=gap_mm, outer_gutter_mm=outer_gutter_mm, bleed_mm=bleed_mm,
+                     force_cols_rows=force_cols_rows, strict_cols_rows=strict_cols_rows,
+                     draw_separators=draw_separators, draw_crop_marks=draw_crop_marks)
+    cells, bleed_px = L["cells"], L["bleed_px"]
+    cols, rows, tile_w, tile_h, out_w, out_h = L["cols"], L["rows"], L["tile_w"], L["tile_h"], L["out_w"], L["out_h"]
+
+    # 3) 결과 캐시: 같은 편집본 + 같은 레이아웃이면 캐시된 PDF 복사로 끝낸다
+    key = None
+    sig = (_image_signature(src_img) if not src_img.isNull() and (PDF_CACHE_ENABLED or print_page or writer_kind == "raster")
+           else None)
+    if print_page and writer_kind != "raster" and not src_img.isNull():
+        _print_page_for(src_img, sig, L, session)
+    if PDF_CACHE_ENABLED and sig:
+        key = _pdf_cache_key(sig, dict(L["token"], writer=writer_kind))
+        if _pdf_cache_fetch(key, save_path):
+            ms = (time.perf_counter() - t0) * 1000.0
+            session["pdf_build"] = {"ms": round(ms, 1), "cache": "hit", "key": key[:10], "writer": writer_kind,
+                                    "bytes": os.path.getsize(save_path)}
+            logger.info("[BuildPDF] cache hit key=%s %.1fms -> %s", key[:10], ms, save_path)
+            _catalog_pdf(session, save_path)
+            return save_path
+
+    if writer_kind == "raster":
+        # 인쇄용 페이지 래스터를 한 번 만들어(메모리 보관 → 직접 인쇄가 재사용) JPEG 한 장으로 보관
+        from app.utils import jpeg_pdf
+        page = _print_page_for(src_img, sig, L, session)
+        pw_px, ph_px = L["pw_px"], L["ph_px"]
+        nbytes = jpeg_pdf.write_tiled_pdf(
+            save_path, _encode_jpeg(page), page_mm=L["page_mm"], dpi=dpi,
+            crop=(0, 0, pw_px, ph_px), tiles=[(0, 0, pw_px, ph_px)], rotate=False,
+        )
+        return _finish_tiled_pdf(session, key, save_path, t0, writer_kind, nbytes, cols, rows, tile_w, tile_h)
+
+    if writer_kind == "dct":
+        # 소스 JPEG 패스스루: 회전/크롭/스케일은 변환행렬로만(픽셀 재인코딩 없음)
+        from app.utils import jpeg_pdf
+        crop = L["crop"]
+        jpeg = _dct_passthrough(src_img, source_path, crop[2], out_w)
+        rot = L["use_rot"]
+        if jpeg is None:
+            # 소스가 타일보다 크면 타일 크기로 한 번만 리샘플/인코딩(6칸 모두 같은 스트림 참조)
+            jpeg, crop, rot = _encode_jpeg(_make_tile(src_img, L["use_rot"], crop, out_w, out_h)), (0, 0, out_w, out_h), False
+            writer_kind = "dct-encoded"
+        nbytes = jpeg_pdf.write_tiled_pdf(
+            save_path, jpeg, page_mm=L["page_mm"], dpi=dpi, crop=crop,
+            tiles=[(x - bleed_px, y - bleed_px, out_w, out_h) for x, y in cells], rotate=rot,
+            separators=[(x, y, tile_w, tile_h) for x, y in cells] if draw_separators else (),
+        )
+        return _finish_tiled_pdf(session, key, save_path, t0, writer_kind, nbytes, cols, rows, tile_w, tile_h)
 
     # 페이지 레이아웃(mm 단위) — Orientation 적용 + FullPage
     #   - paper_mm는 (세로 기준) 4×6inch = (101.6, 152.4)
     #   - orientation=Landscape로 실제 출력은 152.4×101.6이 됨
-    base_w_mm, base_h_mm = paper_mm
-    page_size = QPageSize(QSizeF(base_w_mm, base_h_mm), QPageSize.Millimeter)
+    page_size = QPageSize(QSizeF(paper_mm[0], paper_mm[1]), QPageSize.Millimeter)
     page_layout = QPageLayout(page_size, orientation, QMarginsF(margin_mm, margin_mm, margin_mm, margin_mm))
     page_layout.setMode(QPageLayout.FullPageMode)
 
@@ -216,8 +374,53 @@ def build_tiled_pdf(
     writer.setResolution(dpi)
     writer.setPageLayout(page_layout)
 
-    # px 스케일 계산 (orientation 반영)
+    # 타일 이미지: 회전/커버 크롭/리샘플은 한 번만(타일 픽셀 크기 그대로 → 그리기 시 재스케일 없음)
+    tile = _make_tile(src_img, L["use_rot"], L["crop"], out_w, out_h)
+
+    painter = QPainter(writer)
+    try:
+        _paint_tiles(painter, tile, L, draw_separators)
+        # 컷마크 비활성화 (아무것도 그리지 않음)
+    finally:
+        painter.end()
+
+    nbytes = os.path.getsize(save_path) if os.path.exists(save_path) else 0
+    return _finish_tiled_pdf(session, key, save_path, t0, writer_kind, nbytes, cols, rows, tile_w, tile_h)
+
+def _photo_mm_for(session: dict, photo_mm: tuple) -> tuple:
+    """session["ratio"]가 '3040'/'3545'면 그 규격, 아니면 photo_mm 그대로."""
+    ratio = str(session.get("ratio", "")).strip()
+    if ratio == "3040":
+        return (30, 40)
+    if ratio == "3545":
+        return (35, 45)
+    return tuple(photo_mm)
+
+def _print_source(image: Optional[QImage], source_path: Optional[str]) -> Tuple[QImage, Optional[str]]:
+    """전달 이미지가 없으면 편집본 고정 경로에서 로드(폴백)."""
+    if isinstance(image, QImage) and not image.isNull():
+        return image, source_path
+    return QImage(EDITED_PHOTO_PATH), EDITED_PHOTO_PATH
+
+def _tile_layout(
+    src_img: QImage,
+    photo_mm: tuple,
+    *,
+    paper_mm: tuple = (101.6, 152.4),
+    orientation: QPageLayout.Orientation = QPageLayout.Landscape,
+    dpi: int = 300,
+    margin_mm: float = 0.0,
+    gap_mm: float = 3.0,
+    outer_gutter_mm: float = 2.0,
+    bleed_mm: float = 0.0,
+    force_cols_rows: tuple = (3, 2),
+    strict_cols_rows: bool = True,
+    draw_separators: bool = False,
+    draw_crop_marks: bool = False,
+) -> dict:
+    """타일 PDF/인쇄 래스터 공용 배치 계산(페이지 px, 칸 좌표, 타일 크기, 커버 크롭). 기본값은 build_tiled_pdf와 같다."""
     #   Landscape면 가로/세로를 스왑하여 실제 페이지 픽셀 계산
+    base_w_mm, base_h_mm = paper_mm
     if orientation == QPageLayout.Landscape:
         page_w_mm, page_h_mm = base_h_mm, base_w_mm  # 152.4, 101.6
     else:
@@ -274,35 +477,121 @@ def build_tiled_pdf(
     sx = outer_px + (usable_w - used_w) // 2
     sy = outer_px + (usable_h - used_h) // 2
 
-    painter = QPainter(writer)
-    try:
-        # 소스 이미지(필요 시 90도 회전)
-        src = src_img.transformed(QTransform().rotate(90)) if use_rot else src_img
-
-        for r in range(rows):
-            for c in range(cols):
-                x = sx + c * (tile_w + gap_px)
-                y = sy + r * (tile_h + gap_px)
-
-                # 사진을 타일 크기에 '꽉' 채우되 비율 커버(중앙 크롭)
-                crop_x, crop_y, crop_w, crop_h = cover_crop_rect(src.width(), src.height(), tile_w, tile_h)
-                tile = src.copy(crop_x, crop_y, crop_w, crop_h).scaled(
-                    tile_w + bleed_px * 2, tile_h + bleed_px * 2,
-                    Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                )
-                # 블리드가 있다면 바깥으로 밀어 그리기
-                painter.drawImage(x - bleed_px, y - bleed_px, tile)
-
-                # (선택) 구분선 — 기본 False(요청 시만 True)
-                if draw_separators:
-                    pen = QPen(); pen.setWidth(1); painter.setPen(pen)
-                    painter.drawRect(x, y, tile_w, tile_h)
-                # 컷마크 비활성화 (아무것도 그리지 않음)
-    finally:
-        painter.end()
+    cells = [(sx + c * (tile_w + gap_px), sy + r * (tile_h + gap_px)) for r in range(rows) for c in range(cols)]
+
+    iw, ih = (src_img.height(), src_img.width()) if use_rot else (src_img.width(), src_img.height())
+    return {
+        "page_mm": (page_w_mm, page_h_mm), "pw_px": pw_px, "ph_px": ph_px, "dpi": dpi,
+        "cols": cols, "rows": rows, "use_rot": use_rot, "tile_w": tile_w, "tile_h": tile_h,
+        "out_w": tile_w + bleed_px * 2, "out_h": tile_h + bleed_px * 2, "bleed_px": bleed_px, "cells": cells,
+        "crop": cover_crop_rect(iw, ih, tile_w, tile_h),
+        # 결과 캐시 키용 레이아웃 인자
+        "token": {
+            "photo_mm": list(photo_mm), "paper_mm": list(paper_mm), "orientation": orientation.name,
+            "dpi": dpi, "margin_mm": margin_mm, "gap_mm": gap_mm, "outer_gutter_mm": outer_gutter_mm,
+            "crop_marks": draw_crop_marks, "separators": draw_separators, "bleed_mm": bleed_mm,
+            "cols_rows": list(force_cols_rows), "strict": strict_cols_rows,
+        },
+    }
 
+def _paint_tiles(painter: QPainter, tile: QImage, L: dict, draw_separators: bool) -> None:
+    for x, y in L["cells"]:
+        # 같은 타일 이미지를 찍는다(블리드가 있다면 바깥으로 밀어 그리기)
+        painter.drawImage(x - L["bleed_px"], y - L["bleed_px"], tile)
+
+        # (선택) 구분선 — 기본 False(요청 시만 True)
+        if draw_separators:
+            pen = QPen(); pen.setWidth(1); painter.setPen(pen)
+            painter.drawRect(x, y, L["tile_w"], L["tile_h"])
+
+def _make_tile(src_img: QImage, use_rot: bool, crop: tuple, out_w: int, out_h: int) -> QImage:
+    """(필요 시 90도 회전) → 커버 크롭 → 타일 px 크기로 한 번 리샘플."""
+    src = src_img.transformed(QTransform().rotate(90)) if use_rot else src_img
+    crop_x, crop_y, crop_w, crop_h = crop
+    return src.copy(crop_x, crop_y, crop_w, crop_h).scaled(
+        out_w, out_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+    )
+
+# ── 인쇄 페이지 래스터(4×6 한 장) — 타일 배치에서 바로 그림, PDF 보관본(writer=raster)과 직접 인쇄가 공유
+_PAGE_MEMO: "OrderedDict[str, QImage]" = OrderedDict()
+_PAGE_LOCK = threading.Lock()
+
+def _print_page_for(src_img: QImage, sig: Optional[str], L: dict, session: dict) -> QImage:
+    """(편집본 서명, 레이아웃)당 한 번만 렌더링. 결과 키/소요는 session["print_page"]에 남긴다."""
+    t0 = time.perf_counter()
+    key = _pdf_cache_key(sig, dict(L["token"], writer="page")) if sig else None
+    with _PAGE_LOCK:
+        page = _PAGE_MEMO.get(key) if key else None
+        if page is not None:
+            _PAGE_MEMO.move_to_end(key)
+    memo = "hit" if page is not None else "miss"
+    if page is None:
+        page = QImage(L["pw_px"], L["ph_px"], QImage.Format_RGB32)
+        page.fill(Qt.white)
+        set_ppi_meta(page, L["dpi"])
+        painter = QPainter(page)
+        try:
+            tile = _make_tile(src_img, L["use_rot"], L["crop"], L["out_w"], L["out_h"])
+            _paint_tiles(painter, tile, L, L["token"]["separators"])
+        finally:
+            painter.end()
+        if key and PRINT_PAGE_MEMO > 0:
+            with _PAGE_LOCK:
+                _PAGE_MEMO[key] = page
+                while len(_PAGE_MEMO) > PRINT_PAGE_MEMO:
+                    _PAGE_MEMO.popitem(last=False)
+    ms = (time.perf_counter() - t0) * 1000.0
+    session["print_page"] = {"key": key, "memo": memo, "ms": round(ms, 1),
+                             "size": [page.width(), page.height()]}
+    logger.info("[PrintPage] %s %dx%d %.1fms", memo, page.width(), page.height(), ms)
+    return page
+
+def render_print_page(
+    image: Optional[QImage],
+    session: dict,
+    *,
+    photo_mm: tuple = (30, 40),
+    source_path: Optional[str] = None,
+    **layout,
+) -> QImage:
+    """
+    build_tiled_pdf와 같은 배치의 4×6 페이지 래스터(QImage, dpi 메타 포함)를 만든다.
+    - PDF를 디코드하지 않고 타일 배치에서 바로 그리므로 QPrinter에 그대로 보낼 수 있다(raster_print.print_image).
+    - (편집본 픽셀 서명, 레이아웃)으로 최근 PRINT_PAGE_MEMO장을 메모리에 두어
+      writer="raster" PDF 보관본과 인쇄가 같은 래스터를 한 번만 만든다.
+    - layout 인자는 build_tiled_pdf와 같다(paper_mm, orientation, dpi, gap_mm, ...).
+    """
+    src_img, _ = _print_source(image, source_path)
+    if src_img.isNull():
+        raise RuntimeError("render_print_page: source image is null")
+    L = _tile_layout(src_img, _photo_mm_for(session, photo_mm), **layout)
+    return _print_page_for(src_img, _image_signature(src_img), L, session)
+
+def cached_print_page(key: Optional[str]) -> Optional[QImage]:
+    """session["print_page"]["key"]로 메모리의 페이지 래스터 조회(없으면 None → render_print_page)."""
+    with _PAGE_LOCK:
+        return _PAGE_MEMO.get(key) if key else None
+
+def _finish_tiled_pdf(session: dict, key: Optional[str], save_path: str, t0: float, writer_kind: str,
+                      nbytes: int, cols: int, rows: int, tile_w: int, tile_h: int) -> str:
+    """생성 결과 캐시 저장 + 소요/크기 기록."""
+    if key:
+        _pdf_cache_store(key, save_path)
+    ms = (time.perf_counter() - t0) * 1000.0
+    session["pdf_build"] = {"ms": round(ms, 1), "cache": "miss" if key else "off", "key": (key or "")[:10],
+                            "writer": writer_kind, "bytes": int(nbytes)}
+    logger.info("[BuildPDF] rendered %dx%d tiles %dx%dpx writer=%s bytes=%d %.1fms -> %s",
+                cols, rows, tile_w, tile_h, writer_kind, nbytes, ms, save_path)
+    _catalog_pdf(session, save_path)
     return save_path
 
+def _catalog_pdf(session: dict, save_path: str) -> None:
+    """인화 PDF를 작업 색인에 기록(이름/번호로 찾는다. 세션에 job_dir가 있으면 작업에 연결).
+    호출자가 파일을 최종 이름으로 옮기면 job_catalog.move_artifact 로 행도 옮긴다."""
+    name, number = job_catalog.session_keys(session)
+    job_catalog.record_artifact("pdf", save_path, name=name, number=number,
+                                job_dir=session.get("job_dir"), extra=session.get("pdf_build"))
+
 # ─────────────────────────────────────────────────────────────
 # Job 경로/번들/메일 기록 (기존 그대로)
 # ─────────────────────────────────────────────────────────────
@@ -329,6 +618,25 @@ def make_jpg_filename(session: dict) -> str:
     number = str(session.get("number", "0000"))
     return f"{name}_{number}.jpg"
 
+def _raw_format(fmt: str) -> Tuple[str, str]:
+    """(QImageWriter 포맷, 확장자). 모르는 값은 PNG."""
+    fmt = (fmt or "png").strip().lower()
+    return {"tiff": ("TIFF", "tif"), "tif": ("TIFF", "tif"), "bmp": ("BMP", "bmp")}.get(fmt, ("PNG", "png"))
+
+def _png_quality(level: int) -> int:
+    """zlib 압축 레벨(0=무압축/빠름 ~ 9=최소 크기, -1=기본) → QImageWriter PNG quality(역매핑)."""
+    if level < 0:
+        return -1
+    return max(0, min(100, 100 - int(round(min(9, level) * 91 / 9.0))))
+
+def _scale_long(img: QImage, long_px: int) -> QImage:
+    w, h = img.width(), img.height()
+    if w >= h:
+        nh = int(round(h * (long_px / w)))
+        return img.scaled(long_px, nh, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    nw = int(round(w * (long_px / h)))
+    return img.scaled(nw, long_px, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
 def save_bundle(
     job: JobPaths,
     base_img: QImage,
@@ -339,40 +647,89 @@ def save_bundle(
     session_info: Optional[Dict] = None,
     email_long_px: int = EMAIL_LONG_PX,
     thumb_long_px: int = THUMB_LONG_PX,
+    email_max_bytes: Optional[int] = None,
+    raw_format: Optional[str] = None,
+    raw_png_level: Optional[int] = None,
 ) -> Dict[str, str]:
+    """작업 폴더에 원본/미리보기/메일용/인화용 파일을 병렬로 만들고, 모두 끝난 뒤 metadata.json을 쓴다.
+
+    - 인코딩은 서로 독립이라 스레드 풀(BUNDLE_WORKERS, 기본 코어 수)에서 동시에 돌린다(QImage 스케일/QImageWriter는 GIL 해제).
+    - raw_format: "png"(기본) | "tiff" | "bmp", raw_png_level: PNG zlib 레벨(0 빠름 ~ 9 작음, -1 Qt 기본).
+    - 단계별 소요(ms)는 metadata.json의 "timings_ms"와 로그에 남는다.
+    """
     now = dt.datetime.now()
     hhmmss = now.strftime("%H%M%S")
+    t_all = time.perf_counter()
 
-    qimage_save(base_img, job.raw, "PNG")
-
-    if base_img.width() >= base_img.height():
-        nh = int(round(base_img.height() * (thumb_long_px / base_img.width())))
-        thumb = base_img.scaled(thumb_long_px, nh, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    else:
-        nw = int(round(base_img.width() * (thumb_long_px / base_img.height())))
-        thumb = base_img.scaled(nw, thumb_long_px, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    qimage_save(thumb, job.preview, "JPG", 88)
-
-    eimg = enhanced_img
-    ew, eh = eimg.width(), eimg.height()
-    if max(ew, eh) > email_long_px:
-        if ew >= eh:
-            nh = int(round(eh * (email_long_px / ew)))
-            eimg = eimg.scaled(email_long_px, nh, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        else:
-            nw = int(round(ew * (email_long_px / eh)))
-            eimg = eimg.scaled(nw, email_long_px, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    qimage_save(eimg, job.email, "JPG", 92)
-
-    tw, th = mm_to_px(SIZES_MM[size_key], PRINT_PPI)
-    x, y, cw, ch = cover_crop_rect(enhanced_img.width(), enhanced_img.height(), tw, th)
-    cropped = enhanced_img.copy(x, y, cw, ch)
-    out_print = cropped.scaled(tw, th, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-    set_ppi_meta(out_print, PRINT_PPI)
+    raw_fmt, raw_ext = _raw_format(raw_format or BUNDLE_RAW_FORMAT)
+    if raw_ext != "png":
+        job.raw = os.path.splitext(job.raw)[0] + "." + raw_ext
+    raw_q = _png_quality(BUNDLE_RAW_PNG_LEVEL if raw_png_level is None else int(raw_png_level)) if raw_fmt == "PNG" else -1
     print_path = os.path.join(job.root, f"print_{size_key}_{PRINT_PPI}ppi.jpg")
-    qimage_save(out_print, print_path, "JPG", 95)
     job.print = print_path
 
+    def _save_raw():
+        if not qimage_save(base_img, job.raw, raw_fmt, raw_q):
+            raise IOError(f"raw save failed: {job.raw}")
+
+    def _save_preview():
+        thumb = _scale_long(base_img, thumb_long_px)
+        qimage_save(thumb, job.preview, "JPG", 88)
+
+    def _save_email():
+        # 메일용: 긴 변 email_long_px + 용량 예산(attach_encoder 품질 탐색). 예산 안이면 발송 때 재인코딩 없음
+        try:
+            from app.utils import attach_encoder
+            data, info = attach_encoder.encode_qimage(enhanced_img, email_max_bytes or attach_encoder.DEFAULT_MAX_BYTES,
+                                                      long_px=email_long_px)
+            _ensure_dir(os.path.dirname(job.email))
+            with open(job.email, "wb") as f:
+                f.write(data)
+            logger.info("[save_bundle] email jpg q=%d %dx%d bytes=%d", info["quality"], info["size"][0],
+                        info["size"][1], info["bytes"])
+        except Exception as e:
+            logger.warning("[save_bundle] budget encode failed, fixed quality: %s", e)
+            eimg = enhanced_img
+            if max(eimg.width(), eimg.height()) > email_long_px:
+                eimg = _scale_long(eimg, email_long_px)
+            qimage_save(eimg, job.email, "JPG", 92)
+
+    def _save_print():
+        tw, th = mm_to_px(SIZES_MM[size_key], PRINT_PPI)
+        x, y, cw, ch = cover_crop_rect(enhanced_img.width(), enhanced_img.height(), tw, th)
+        cropped = enhanced_img.copy(x, y, cw, ch)
+        out_print = cropped.scaled(tw, th, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        set_ppi_meta(out_print, PRINT_PPI)
+        qimage_save(out_print, print_path, "JPG", 95)
+
+    tasks = [("raw", _save_raw), ("preview", _save_preview), ("email", _save_email), ("print", _save_print)]
+    timings: Dict[str, float] = {}
+
+    def _timed(name, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        finally:
+            timings[name] = round((time.perf_counter() - t0) * 1000.0, 1)
+
+    workers = max(1, min(len(tasks), BUNDLE_WORKERS if BUNDLE_WORKERS > 0 else (os.cpu_count() or 1)))
+    if workers == 1:
+        for name, fn in tasks:
+            _timed(name, fn)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        err = None
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bundle") as ex:
+            futs = [ex.submit(_timed, name, fn) for name, fn in tasks]
+            for f in futs:
+                try:
+                    f.result()
+                except Exception as e:  # 나머지 작업이 끝난 뒤 전달
+                    err = err or e
+        if err is not None:
+            raise err
+
+    t0 = time.perf_counter()
     try:
         jpg_dir = jpg_date_dir(True)
         jpg_name = make_jpg_filename(session_info or {})
@@ -380,6 +737,8 @@ def save_bundle(
         shutil.copyfile(print_path, jpg_out)
     except Exception:
         jpg_out = None
+    timings["copy_jpg"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    timings["total"] = round((time.perf_counter() - t_all) * 1000.0, 1)
 
     meta = {
         "created_at": now.isoformat(timespec="seconds"),
@@ -399,10 +758,15 @@ def save_bundle(
             "final_jpg": (os.path.relpath(jpg_out, jpg_dir) if jpg_out else None),
         },
         "dpi": PRINT_PPI,
+        "timings_ms": timings,
         "app_version": "photostudio-1.0",
     }
     with open(job.meta, "w", encoding="utf-8") as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
+    logger.info("[save_bundle] workers=%d raw=%s %s", workers, raw_fmt, " ".join(f"{k}={v}ms" for k, v in timings.items()))
+    job_catalog.record_job(job.root, meta)
+    if jpg_out:
+        job_catalog.record_artifact("final_jpg", jpg_out, name=meta["name"], number=meta["number"], job_dir=job.root)
 
     return {
         "dir": job.root,
@@ -425,6 +789,7 @@ def save_email_request(job: JobPaths, to: str, subject: str, body: str, attachme
     }
     with open(job.email_req, "w", encoding="utf-8") as f:
         json.dump(rec, f, ensure_ascii=False, indent=2)
+    job_catalog.record_email_request(job.root, to, subject)
     return job.email_req
 
 def save_email_result(job: JobPaths, ok: bool, provider_id: Optional[str] = None, error: Optional[str] = None) -> str:
@@ -436,12 +801,29 @@ def save_email_result(job: JobPaths, ok: bool, provider_id: Optional[str] = None
     }
     with open(job.email_res, "w", encoding="utf-8") as f:
         json.dump(res, f, ensure_ascii=False, indent=2)
+    job_catalog.record_email_result(job.root, ok, provider_id, error)
     return job.email_res
 
-# ── 정리/청소 더미
-def start_pdf_cleanup_timer(*_, **__): return None
-def start_jpg_cleanup_timer(*_, **__): return None
-def start_cleanup_timer(*_, **__): return None
-def cleanup_pdf(*_, **__): return 0
-def cleanup_jpg(*_, **__): return 0
-def cleanup_jobs(*_, **__): return 0
\ No newline at end of file
+# ── 정리/청소(보관 기간 지난 PDF/JPG/_work/raw) → app.utils.retention 백그라운드 엔진
+def start_cleanup_timer(*_, busy=None, **__):
+    """백그라운드 정리 스레드 시작(주기 CLEANUP_INTERVAL_S). busy()가 True인 동안(촬영 중)은 삭제를 멈춘다."""
+    from app.utils import retention
+    retention.start(busy=busy)
+
+start_pdf_cleanup_timer = start_cleanup_timer
+start_jpg_cleanup_timer = start_cleanup_timer
+
+def _cleanup(trees: tuple, days: Optional[int]) -> int:
+    from app.utils import retention
+    return int(retention.run_once(trees, days=days, throttle=False).get("files", 0))
+
+def cleanup_pdf(days: Optional[int] = None, *_, **__) -> int:
+    """PDF 폴더에서 보관 기간 지난 파일 삭제(호출 스레드, 즉시). 지운 파일 수."""
+    return _cleanup(("pdf",), days)
+
+def cleanup_jpg(days: Optional[int] = None, *_, **__) -> int:
+    return _cleanup(("jpg",), days)
+
+def cleanup_jobs(days: Optional[int] = None, *_, **__) -> int:
+    """_work/YYMMDD 날짜 버킷 중 보관 기간 지난 것 삭제."""
+    return _cleanup(("work",), days)
\ No newline at end of file
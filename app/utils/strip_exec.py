@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+strip_exec: 가로 스트립 병렬 실행기(픽셀 단위 보정 단계용).
+- 이미지를 행 방향 스트립으로 나누고, 블러 커널 반경만큼 위/아래 halo 행을 붙여 스레드 풀에서 처리한다.
+- 각 스트립은 halo 포함 구간을 읽고 자기 행만 출력 버퍼에 쓴다(입력은 읽기 전용 → 결과가 직렬 실행과 비트 단위 동일).
+- 스트립 임시 버퍼는 스레드별로 재사용한다(scratch).
+- cv2/numpy 연산은 GIL을 풀기 때문에 스레드로 충분하다.
+
+환경 변수:
+    AI_STRIP_WORKERS  스레드 수(0 또는 미설정 = CPU 코어 수, 1 = 직렬)
+    AI_STRIP_ROWS     스트립 최소 행 수(기본 256, 이보다 작으면 스트립 수를 줄인다)
+
+사용:
+    from app.utils import strip_exec as SX
+    def body(y0, y1, e0, e1):
+        # 입력 rows [e0, e1) 을 읽어 출력 rows [y0, y1) 을 채운다(halo = y0-e0, e1-y1)
+        ...
+    SX.run_strips(H, body, halo=16)
+"""
+
+from __future__ import annotations
+import os, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORKERS = int(os.environ.get("AI_STRIP_WORKERS", "0") or 0)
+_MIN_ROWS = int(os.environ.get("AI_STRIP_ROWS", "256") or 256)
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+_TLS = threading.local()
+
+
+def workers() -> int:
+    """유효 스레드 수(AI_STRIP_WORKERS, 0이면 CPU 코어 수)."""
+    return max(1, _WORKERS if _WORKERS > 0 else (os.cpu_count() or 1))
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=workers(), thread_name_prefix="strip")
+        return _POOL
+
+
+def split_rows(H: int, n: Optional[int] = None, *, min_rows: Optional[int] = None) -> List[Tuple[int, int]]:
+    """[0, H) 를 최대 n 개의 연속 구간으로 나눈다(구간당 min_rows 이상)."""
+    n = workers() if n is None else max(1, int(n))
+    mr = _MIN_ROWS if min_rows is None else max(1, int(min_rows))
+    n = max(1, min(n, H // mr if H >= mr else 1))
+    step = -(-H // n)
+    return [(y, min(H, y + step)) for y in range(0, H, step)]
+
+
+def run_strips(H: int, body: Callable[[int, int, int, int], None], *, halo: int = 0,
+               n: Optional[int] = None, min_rows: Optional[int] = None) -> int:
+    """body(y0, y1, e0, e1) 를 스트립마다 호출한다(e0/e1 = halo 포함 구간). 스트립 수를 반환.
+
+    - 스트립이 1개면 호출 스레드에서 바로 실행한다(직렬 경로와 동일 코드).
+    - body 예외는 모든 스트립이 끝난 뒤 호출자에게 그대로 전달된다.
+    """
+    spans = split_rows(H, n, min_rows=min_rows)
+    h = max(0, int(halo))
+    jobs = [(y0, y1, max(0, y0 - h), min(H, y1 + h)) for y0, y1 in spans]
+    if len(jobs) == 1:
+        body(*jobs[0])
+        return 1
+    futs = [_pool().submit(body, *j) for j in jobs]
+    err = None
+    for f in futs:
+        try:
+            f.result()
+        except Exception as e:  # 나머지 스트립을 모두 기다린 뒤 전달
+            err = err or e
+    if err is not None:
+        logger.error("[strip] body failed: %s", err)
+        raise err
+    return len(jobs)
+
+
+def scratch(name: str, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+    """스레드별 재사용 임시 버퍼(내용은 정의되지 않음). 같은 이름/모양/형식이면 이전 버퍼를 돌려준다."""
+    bufs: Dict[str, np.ndarray] = getattr(_TLS, "bufs", None)
+    if bufs is None:
+        bufs = _TLS.bufs = {}
+    dt = np.dtype(dtype)
+    buf = bufs.get(name)
+    if buf is None or buf.dtype != dt or buf.size < int(np.prod(shape)):
+        buf = bufs[name] = np.empty(int(np.prod(shape)), dt)
+    return buf[: int(np.prod(shape))].reshape(shape)
+
+
+def gaussian_halo(sigma: float, ksize: int = 0, *, depth8u: bool = True) -> int:
+    """cv2.GaussianBlur 커널 반경(행). ksize=0 이면 OpenCV 규칙(8U: 6σ+1, 그 외 8σ+1)으로 계산."""
+    if ksize and ksize > 0:
+        return int(ksize) // 2
+    k = int(round(float(sigma) * (3 if depth8u else 4) * 2 + 1)) | 1
+    return k // 2
+
+
+__all__ = ["workers", "split_rows", "run_strips", "scratch", "gaussian_halo"]
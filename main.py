@@ -97,10 +97,57 @@ def main():
     win = MainWindow(theme, display=info)
     apply_window_mode(win, info)
 
-    return app.exec()
+    # 리터치 워커 프로세스 선기동(모델 워밍업, 실패는 무시 → 첫 요청 때 재시도)
+    try:
+        from app.utils import retouch_worker
+        retouch_worker.prestart()
+    except Exception:
+        retouch_worker = None
+
+    # 마무리 작업 큐(PDF/인화/메일): 저널 복구 + 워커 기동(단계는 페이지 모듈 import 시 등록됨)
+    try:
+        from app.utils import finish_queue
+        finish_queue.start()
+    except Exception:
+        finish_queue = None
+
+    # 이메일 아웃박스: 지난 실행에서 남은 스풀 발송 + 발송 스레드 기동
+    try:
+        from app.utils import outbox
+        outbox.start()
+    except Exception:
+        outbox = None
+
+    # 보관 기간 정리(PDF/JPG/_work/raw): 저우선 백그라운드, 촬영 화면에서는 멈춤
+    try:
+        from app.utils import storage
+        storage.start_cleanup_timer(busy=lambda: win.router.current_name() == "capture")
+    except Exception:
+        pass
+
+    rc = app.exec()
+    try:
+        from app.utils import retention
+        retention.shutdown()
+    except Exception:
+        pass
+    if finish_queue is not None:
+        finish_queue.shutdown()
+    if outbox is not None:
+        outbox.shutdown()
+        try:
+            from app.utils import emailer
+            emailer.close_smtp_sessions()
+        except Exception:
+            pass
+    if retouch_worker is not None:
+        retouch_worker.shutdown()
+    return rc
 
 # 모듈이 직접 실행될 때 애플리케이션을 구동한다
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # 리터치 워커(spawn) 지원
     sys.exit(main())
 # 테스22트하는중입니다.
 
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+리터치 벤치마크.
+
+1) 마이크로벤치마크(6000x4000 합성 입력, 기존 구현 대비):
+  - 워킹 디렉터리(레포 루트)에서: python scripts/bench_retouch.py [--repeat N]
+  - 각 항목은 기존(전체 프레임) 구현과 현재 구현의 시간/피크 메모리/결과 차이를 출력한다.
+  - 피크 메모리는 tracemalloc 기준(numpy/OpenCV 결과 버퍼 포함, 입력 프레임 제외).
+
+2) 단계별 스위트(2/6/24MP 인물 픽스처):
+  - python scripts/bench_retouch.py --suite [--sizes 2,6,24] [--repeat N] [--warmup N] [--fixtures DIR] [--only 이름]
+                                    [--json out.json] [--baseline base.json] [--tolerance 0.2]
+  - 단계: ai_retouch(_rotate_v1, _level_shoulders, _adjust_eyes, _spec_crop, _fused_geometry,
+          process_array, process_file), ddd(BackgroundCleaner.clean, IlluminationNormalizer.normalize,
+          RetouchPipeline.apply_array, process_file).
+  - 항목별 wall(최소/중앙값), CPU 시간(프로세스, 모든 스레드), 피크 RSS 증가분(Linux VmHWM 리셋),
+    tracemalloc 피크(별도 1회 실행)를 출력하고 --json 으로 저장한다.
+  - --fixtures 가 없으면 결정적 합성 인물(배경 벽/머리/얼굴/어깨)을 만들고, 있으면 폴더의 첫 이미지를 크기별로 리사이즈한다.
+  - --baseline 과 비교해 중앙값 wall 또는 피크 메모리가 tolerance 이상 늘어난 항목을 표시하고 종료 코드 1.
+    기준값은 같은 장비에서 --json 으로 저장한 파일을 쓴다(예: 키오스크에서 --json bench_baseline.json).
+  - 디스크 캐시(AI_CACHE)는 끈 상태로 측정한다.
+
+3) 그래프/합성 워프 결과 비교(retouch_graph.render vs ai_retouch.process_array):
+  - python scripts/bench_retouch.py --parity [--sizes 6]
+  - 같은 JPEG 입력, 같은 ratio/eye_strength(0 과 AI_EYE_STRENGTH)로 두 경로를 돌려 크기/최대 차이/1 초과 픽셀 비율을 출력한다.
+  - 랜드마크: detected = 실제 MediaPipe(없으면 랜드마크 없음 경로), fixed = 고정 합성 랜드마크(회전/어깨 시어/눈 보정 경로 확인).
+  - 크기가 다르거나 1 초과 차이 픽셀이 --parity-tolerance(기본 0.1%)를 넘으면 종료 코드 1.
+
+4) 미리보기 지연(print_view 프록시 미리보기와 같은 경로: retouch_worker.run_preview):
+  - python scripts/bench_retouch.py --preview [--sizes 6,24] [--repeat N]
+  - 워커 시작, 새 원본 첫 미리보기(DCT 축소 디코드 + 랜드마크 + 워프 + 크롭 + shared_memory 반환), 눈 강도 토글,
+    같은 그래프의 인프로세스 실행을 측정한다. 랜드마크가 검출되지 않으면 그 사실을 표시하고,
+    Tasks FaceLandmarker(모델 파일이 있을 때)를 검출 프록시에서 따로 재서 얼굴 랜드마크 비용을 보여준다.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("AI_CACHE", "0")  # 캐시 적중이 측정을 가리지 않도록(모듈 import 전)
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils import ai_retouch as AIR  # noqa: E402
+
+W, H = 4000, 6000
+
+
+def _make_frame(w: int = W, h: int = H) -> np.ndarray:
+    """질감이 있는 합성 프레임을 만든다(결정적)."""
+    rng = np.random.default_rng(1234)
+    small = rng.integers(0, 255, (h // 8, w // 8, 3), dtype=np.uint8)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    """최솟값(ms)과 마지막 결과를 반환한다."""
+    best = 1e18; out = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, (time.perf_counter() - t0) * 1000.0)
+    return best, out
+
+
+def _peak_mb(fn: Callable[[], object]) -> float:
+    """fn 1회 실행 동안의 추가 할당 피크(MB)를 반환한다."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024.0 * 1024.0)
+
+
+# -----------------------
+# 눈 보정: 기존 전체 프레임 구현(비교 기준)
+# -----------------------
+def _adjust_eyes_fullframe(bgr: np.ndarray, eyes, strength: float = 0.45) -> np.ndarray:
+    """ROI 적용 전 _adjust_eyes와 같은 연산(전체 프레임 워프/마스크/블러/블렌드)."""
+    (cxL, cyL, wL, hL), (cxR, cyR, wR, hR), (W_, H_) = eyes
+    if wL * hL < wR * hR:
+        grow = 1.0 + min(0.05, max(0.0, strength * ((wR * hR) / (wL * hL) - 1.0)))
+        cx, cy, w, h = cxL, cyL, wL, hL
+    else:
+        grow = 1.0 + min(0.05, max(0.0, strength * ((wL * hL) / (wR * hR) - 1.0)))
+        cx, cy, w, h = cxR, cyR, wR, hR
+    cx_px, cy_px = int(cx * W_), int(cy * H_)
+    rx, ry = int(max(8, w * W_ * 1.45)), int(max(8, h * H_ * 1.45))
+    M = np.array([[grow, 0.0, (1 - grow) * cx_px], [0.0, grow, (1 - grow) * cy_px]], np.float32)
+    layer = cv2.warpAffine(bgr, M, (W_, H_), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REFLECT)
+    m = np.zeros((H_, W_), np.uint8)
+    cv2.ellipse(m, (cx_px, cy_px), (rx, ry), 0, 0, 360, 255, -1, cv2.LINE_AA)
+    m = cv2.GaussianBlur(m, (0, 0), max(2.0, min(rx, ry) * 0.30)).astype('float32') / 255.0
+    return (layer * m[..., None] + bgr * (1.0 - m[..., None])).astype('uint8')
+
+
+def bench_eyes(frame: np.ndarray, repeat: int) -> None:
+    """_adjust_eyes ROI 구현 vs 전체 프레임 구현."""
+    h, w = frame.shape[:2]
+    # 왼눈이 약간 작은 정면 얼굴 배치(정규화 좌표)
+    eyes = ((0.42, 0.36, 0.050, 0.018), (0.58, 0.36, 0.052, 0.020), (w, h))
+    t_old, ref = _timeit(lambda: _adjust_eyes_fullframe(frame, eyes), repeat)
+    out = AIR._adjust_eyes(frame.copy(), eyes=eyes)
+    work = frame.copy()  # 제자리 기록이므로 시간 측정은 작업 버퍼에서
+    t_new, _ = _timeit(lambda: AIR._adjust_eyes(work, eyes=eyes), repeat)
+    diff = int(np.abs(out.astype(np.int16) - ref.astype(np.int16)).max())
+    m_old = _peak_mb(lambda: _adjust_eyes_fullframe(frame, eyes))
+    m_new = _peak_mb(lambda: AIR._adjust_eyes(work, eyes=eyes))
+    print(f"[eyes] full-frame={t_old:8.1f}ms/{m_old:7.1f}MB  roi={t_new:8.1f}ms/{m_new:7.1f}MB  "
+          f"speedup=x{t_old / max(1e-3, t_new):.0f}  max|diff|={diff}")
+    assert diff <= 1, "ROI 결과가 전체 프레임 결과와 다름"
+
+
+# -----------------------
+# 어깨 수평: 기존 float 마스크 블렌드(비교 기준)
+# -----------------------
+def _level_shoulders_float(bgr: np.ndarray, shear) -> np.ndarray:
+    """고정소수점 적용 전 _level_shoulders와 같은 연산(전체 시어 + (H,W) float 마스크 블렌드)."""
+    h, w = bgr.shape[:2]
+    m, y_seam, band = shear
+    M = np.array([[1.0, m, -m * y_seam], [0.0, 1.0, 0.0]], np.float32)
+    sh = cv2.warpAffine(bgr, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT)
+    y0 = max(0, y_seam - band)
+    mask = np.zeros((h, 1), np.float32)
+    if y0 < y_seam:
+        mask[y0:y_seam, 0] = np.linspace(0.0, 1.0, y_seam - y0, dtype=np.float32)
+    mask[y_seam:, 0] = 1.0
+    mask = np.repeat(mask, w, axis=1)
+    return (sh * mask[..., None] + bgr * (1.0 - mask[..., None])).astype("uint8")
+
+
+def bench_shoulders(frame: np.ndarray, repeat: int) -> None:
+    """_apply_shoulder_shear(행 단위 고정소수점) vs float 마스크 블렌드."""
+    h = frame.shape[0]
+    shear = (0.06, int(h * 0.62), max(12, int(h * 0.05)))
+    t_old, ref = _timeit(lambda: _level_shoulders_float(frame, shear), repeat)
+    out = AIR._apply_shoulder_shear(frame.copy(), shear)
+    work = frame.copy()
+    t_new, _ = _timeit(lambda: AIR._apply_shoulder_shear(work, shear), repeat)
+    diff = int(np.abs(out.astype(np.int16) - ref.astype(np.int16)).max())
+    m_old = _peak_mb(lambda: _level_shoulders_float(frame, shear))
+    m_new = _peak_mb(lambda: AIR._apply_shoulder_shear(work, shear))
+    print(f"[shoulder] float={t_old:8.1f}ms/{m_old:7.1f}MB  fixed={t_new:8.1f}ms/{m_new:7.1f}MB  "
+          f"speedup=x{t_old / max(1e-3, t_new):.1f}  max|diff|={diff}")
+    # float 버전은 astype 내림, 고정소수점은 반올림 → 최대 2 LSB 차이 허용
+    assert diff <= 2, "고정소수점 블렌드 결과가 float 블렌드와 다름"
+
+
+# -----------------------
+# 단계별 스위트
+# -----------------------
+def _portrait(mp: float, src: Optional[np.ndarray] = None) -> np.ndarray:
+    """mp 메가픽셀 2:3 세로 인물 픽스처. src 가 있으면 그 이미지를 리사이즈한다."""
+    w = int(round((mp * 1e6 * 2 / 3) ** 0.5)) // 2 * 2
+    h = w * 3 // 2
+    if src is not None:
+        return cv2.resize(src, (w, h), interpolation=cv2.INTER_AREA)
+    img = np.empty((h, w, 3), np.uint8)
+    img[:] = (236, 238, 240)  # 밝은 벽
+    ramp = np.linspace(-6, 6, h, dtype=np.float32)[:, None, None]
+    img = np.clip(img + ramp, 0, 255).astype(np.uint8)
+    cx = w // 2
+    # 어깨/상체
+    pts = np.array([[int(w * 0.08), h], [int(w * 0.22), int(h * 0.70)], [int(w * 0.78), int(h * 0.68)],
+                    [int(w * 0.92), h]], np.int32)
+    cv2.fillConvexPoly(img, pts, (60, 50, 45), cv2.LINE_AA)
+    cv2.rectangle(img, (int(cx - w * 0.07), int(h * 0.52)), (int(cx + w * 0.07), int(h * 0.72)), (150, 170, 205), -1)
+    # 머리카락/얼굴/눈
+    cv2.ellipse(img, (cx, int(h * 0.36)), (int(w * 0.21), int(h * 0.21)), 0, 0, 360, (30, 28, 25), -1, cv2.LINE_AA)
+    cv2.ellipse(img, (cx, int(h * 0.40)), (int(w * 0.16), int(h * 0.15)), 0, 0, 360, (150, 170, 205), -1, cv2.LINE_AA)
+    for ex in (cx - int(w * 0.06), cx + int(w * 0.06)):
+        cv2.ellipse(img, (ex, int(h * 0.37)), (int(w * 0.025), int(h * 0.008)), 0, 0, 360, (40, 35, 30), -1)
+    rng = np.random.default_rng(7)
+    noise = rng.integers(-4, 5, (h // 4, w // 4, 1), dtype=np.int16)
+    noise = cv2.resize(noise.astype(np.float32), (w, h), interpolation=cv2.INTER_LINEAR)[..., None]
+    return np.clip(img.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def _rss_reset() -> bool:
+    """피크 RSS(VmHWM)를 현재 값으로 리셋한다(Linux 4.0+). 실패 시 False."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except Exception:
+        return False
+
+
+def _rss_mb(key: str) -> Optional[float]:
+    """/proc/self/status 의 VmRSS/VmHWM(MB). 없으면 None."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) / 1024.0
+    except Exception:
+        pass
+    return None
+
+
+def _measure(fn: Callable[[Any], object], setup: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """setup() 결과를 인자로 fn 을 repeat 회 실행해 지표를 모은다(setup/warmup 은 측정 제외)."""
+    for _ in range(max(0, warmup)):
+        fn(setup())  # 랜드마커 풀/스레드 풀 생성 등 1회성 비용 제외
+    walls: List[float] = []
+    cpus: List[float] = []
+    rss_peak = None
+    for _ in range(max(1, repeat)):
+        arg = setup()
+        base = _rss_mb("VmRSS")
+        reset = _rss_reset()
+        w0, c0 = time.perf_counter(), time.process_time()
+        fn(arg)
+        walls.append((time.perf_counter() - w0) * 1000.0)
+        cpus.append((time.process_time() - c0) * 1000.0)
+        hwm = _rss_mb("VmHWM")
+        if reset and hwm is not None and base is not None:
+            rss_peak = max(rss_peak or 0.0, hwm - base)
+        del arg
+    arg = setup()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn(arg)
+        _, py_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_ms_min": round(min(walls), 2),
+        "wall_ms_med": round(statistics.median(walls), 2),
+        "cpu_ms_med": round(statistics.median(cpus), 2),
+        "rss_peak_mb": None if rss_peak is None else round(rss_peak, 1),
+        "py_peak_mb": round(py_peak / (1024.0 * 1024.0), 1),
+        "repeat": len(walls),
+    }
+
+
+def _suite_stages(frame: np.ndarray, tmpdir: str) -> List[Tuple[str, Callable[[Any], object], Callable[[], Any]]]:
+    """(이름, 실행 함수, 준비 함수) 목록. 제자리 수정 단계는 준비 함수에서 복사본을 만든다."""
+    from app import ddd
+    from app.utils import qimage_bridge as QB
+    in_path = os.path.join(tmpdir, f"in_{frame.shape[1]}x{frame.shape[0]}.jpg")
+    cv2.imwrite(in_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+    out_path = os.path.join(tmpdir, "out.jpg")
+    H, W = frame.shape[:2]
+    eyes = ((0.44, 0.37, 0.050, 0.016), (0.56, 0.37, 0.052, 0.018), (W, H))
+    shear = (0.03, int(H * 0.68), max(12, int(H * 0.05)))
+    qi = QB.to_qimage(frame, "BGR")
+    pipe = ddd.RetouchPipeline()
+    same = lambda: frame  # noqa: E731 — 입력을 수정하지 않는 단계
+    return [
+        ("air._rotate_v1", lambda a: AIR._rotate_v1(a), same),
+        ("air._level_shoulders", lambda a: AIR._level_shoulders(a), frame.copy),
+        ("air._apply_shoulder_shear", lambda a: AIR._apply_shoulder_shear(a, shear), frame.copy),
+        ("air._adjust_eyes", lambda a: AIR._adjust_eyes(a, eyes=eyes), frame.copy),
+        ("air._spec_crop", lambda a: AIR._spec_crop(a, ratio=(3, 4)), same),
+        ("air._fused_geometry", lambda a: AIR._fused_geometry(a, ratio=(3, 4)), same),
+        ("air.process_array", lambda a: AIR.process_array(a, ratio=(3, 4)), frame.copy),
+        ("air.process_file", lambda a: AIR.process_file(in_path, out_path, ratio=(3, 4)), lambda: None),
+        ("ddd.BackgroundCleaner.clean", lambda a: ddd.BackgroundCleaner().clean(a), lambda: qi),
+        ("ddd.IlluminationNormalizer.normalize", lambda a: ddd.IlluminationNormalizer().normalize(a), lambda: qi),
+        ("ddd.RetouchPipeline.apply_array", lambda a: pipe.apply_array(a), same),
+        ("ddd.process_file", lambda a: ddd.process_file(in_path, out_path), lambda: None),
+    ]
+
+
+# -----------------------
+# 그래프 vs process_array 비교
+# -----------------------
+def _fixed_landmarks():
+    """합성 인물(_portrait)에 맞춘 고정 랜드마크(정규화): 눈 선 약 4° 기울기, 왼눈이 작음, 어깨 기울기 약 5°."""
+    face = [AIR._Pt(0.5, 0.40) for _ in range(478)]
+    for i, (x, y) in {10: (0.50, 0.20), 152: (0.50, 0.55),
+                      33: (0.415, 0.367), 133: (0.465, 0.367), 159: (0.44, 0.359), 145: (0.44, 0.375),
+                      263: (0.586, 0.376), 362: (0.534, 0.376), 386: (0.56, 0.366), 374: (0.56, 0.386)}.items():
+        face[i] = AIR._Pt(x, y)
+    pose = [AIR._Pt(0.5, 0.62) for _ in range(33)]
+    pose[11], pose[12] = AIR._Pt(0.76, 0.69), AIR._Pt(0.24, 0.74)
+    return face, pose
+
+
+def _parity_case(path: str, strength: float) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    from app.utils import retouch_graph as RG
+    RG.clear()
+    a = RG.render(path, {"ratio": (3, 4), "eye_strength": strength})
+    b = AIR.process_array(AIR._load_image(path), ratio=(3, 4), eye_strength=strength)
+    return a, b
+
+
+def run_parity(args) -> int:
+    """retouch_graph.render 와 ai_retouch.process_array 결과 차이를 랜드마크 모드/눈 강도별로 출력한다."""
+    face, pose = _fixed_landmarks()
+    orig = (AIR._mp_face_mesh, AIR._mp_pose)
+    bad = 0
+    with tempfile.TemporaryDirectory(prefix="bench_parity_") as tmpdir:
+        for mp in args.sizes:
+            frame = _portrait(mp)
+            path = os.path.join(tmpdir, f"in_{mp:g}.jpg")
+            cv2.imwrite(path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+            detected = orig[0](frame) is not None
+            for mode in ("detected", "fixed"):
+                if mode == "fixed":
+                    AIR._mp_face_mesh = lambda bgr, rgb=None: face
+                    AIR._mp_pose = lambda bgr, rgb=None: pose
+                try:
+                    for strength in (0.0, AIR.EYE_STRENGTH):
+                        a, b = _parity_case(path, strength)
+                        label = f"[parity] {mp:g}MP {mode:8s} eye={strength:.2f}"
+                        if mode == "detected" and not detected:
+                            label += " (no landmarks)"
+                        if a is None or a.shape != b.shape:
+                            print(f"{label} shape graph={None if a is None else a.shape} array={b.shape}  FAIL")
+                            bad += 1
+                            continue
+                        d = np.abs(a.astype(np.int16) - b.astype(np.int16))
+                        over = float((d.max(axis=2) > 1).mean())
+                        ok = over <= args.parity_tolerance
+                        bad += not ok
+                        print(f"{label} {a.shape[1]}x{a.shape[0]} max|diff|={int(d.max())} "
+                              f"mean={float(d.mean()):.4f} >1: {over:.4%}  {'ok' if ok else 'FAIL'}")
+                finally:
+                    AIR._mp_face_mesh, AIR._mp_pose = orig
+    return 1 if bad else 0
+
+
+# -----------------------
+# 미리보기 지연
+# -----------------------
+def _face_landmarker_ms(frame: np.ndarray, repeat: int) -> Optional[float]:
+    """Tasks FaceLandmarker 1회 추론(검출 프록시, 중앙값 ms). 모델/모듈이 없으면 None."""
+    try:
+        import mediapipe as mp
+        from app.utils import landmarker_pool
+        rgb = cv2.cvtColor(landmarker_pool.detection_proxy(frame), cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        times = []
+        with landmarker_pool.lease("face_landmarker") as lm:
+            lm.detect(image)  # 첫 추론(그래프 초기화) 제외
+            for _ in range(max(1, repeat)):
+                t0 = time.perf_counter()
+                lm.detect(image)
+                times.append((time.perf_counter() - t0) * 1000.0)
+        return statistics.median(times)
+    except Exception as e:
+        print(f"  face_landmarker: unavailable ({e})")
+        return None
+
+
+def run_preview(args) -> int:
+    """워커 경유 프록시 미리보기 지연을 측정한다(랜드마크 포함 여부 표시)."""
+    import shutil
+    from app.utils import retouch_graph as RG
+    from app.utils import retouch_worker as RW
+    t0 = time.perf_counter()
+    if not RW.get_client(RW.LANE_PREVIEW).start():
+        print("worker unavailable")
+        return 1
+    print(f"[preview] worker start {(time.perf_counter() - t0) * 1000.0:.0f}ms (edge={RG.PREVIEW_EDGE})")
+    bad = 0
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_preview_") as tmpdir:
+            for mp in args.sizes:
+                frame = _portrait(mp)
+                base = os.path.join(tmpdir, f"in_{mp:g}.jpg")
+                cv2.imwrite(base, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+                landmarks = AIR._mp_face_mesh(frame) is not None
+                first, toggle, local = [], [], []
+                for i in range(max(1, args.repeat)):
+                    path = os.path.join(tmpdir, f"in_{mp:g}_{i}.jpg")  # 새 경로 = 메모 미적중(새 고객 원본과 같은 조건)
+                    shutil.copyfile(base, path)
+                    res = RW.run_preview(path, {"ratio": (3, 4)})
+                    bad += not res.ok
+                    first.append(res.elapsed_ms)
+                    res = RW.run_preview(path, {"ratio": (3, 4), "eye_strength": 0.0})
+                    bad += not res.ok
+                    toggle.append(res.elapsed_ms)
+                    RG.clear()
+                    w0 = time.perf_counter()
+                    RG.render_preview(path, {"ratio": (3, 4)})
+                    local.append((time.perf_counter() - w0) * 1000.0)
+                shape = None if res.pixels is None else res.pixels.shape[1::-1]
+                print(f"[preview] {mp:g}MP {frame.shape[1]}x{frame.shape[0]} -> {shape} landmarks="
+                      f"{'detected' if landmarks else 'none (mediapipe solutions unavailable)'}")
+                print(f"  worker first  median {statistics.median(first):7.1f}ms  max {max(first):7.1f}ms")
+                print(f"  worker toggle median {statistics.median(toggle):7.1f}ms")
+                print(f"  in-process    median {statistics.median(local):7.1f}ms (비교용, 앱은 워커를 쓴다)")
+                lm_ms = None if landmarks else _face_landmarker_ms(frame, args.repeat)
+                if lm_ms is not None:
+                    est = statistics.median(first) + lm_ms
+                    print(f"  + face landmarks (Tasks FaceLandmarker, detection proxy) {lm_ms:.1f}ms "
+                          f"-> first preview est. {est:.1f}ms (pose not included)")
+    finally:
+        RW.shutdown()
+    return 1 if bad else 0
+
+
+def _meta(args) -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=str(Path(__file__).resolve().parents[1]), timeout=10).stdout.strip()
+    except Exception:
+        rev = ""
+    return {
+        "git": rev, "python": platform.python_version(), "platform": platform.platform(),
+        "cpus": os.cpu_count(), "numpy": np.__version__, "opencv": cv2.__version__,
+        "cv2_threads": cv2.getNumThreads(), "sizes_mp": args.sizes, "repeat": args.repeat, "warmup": args.warmup,
+        "fixtures": args.fixtures or "synthetic", "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _diff_baseline(results: Dict[str, Dict[str, Any]], base_path: str, tol: float, partial: bool = False) -> int:
+    """기준 JSON 과 비교해 회귀 항목 수를 반환한다.
+
+    - wall 중앙값/tracemalloc 피크는 tol 비율 + 절대 하한 5ms/5MB, RSS 증가분은 할당기 재사용 잡음이 커서 하한 32MB.
+    """
+    base = json.loads(Path(base_path).read_text(encoding="utf-8")).get("results", {})
+    bad = 0
+    print(f"\n--- baseline diff ({base_path}, tolerance {tol:.0%}) ---")
+    for key, cur in results.items():
+        ref = base.get(key)
+        if not ref:
+            print(f"  {key:48s} (new)")
+            continue
+        marks = []
+        for field, floor in (("wall_ms_med", 5.0), ("rss_peak_mb", 32.0), ("py_peak_mb", 5.0)):
+            a, b = ref.get(field), cur.get(field)
+            if a is None or b is None:
+                continue
+            if b > a * (1.0 + tol) and b - a > floor:
+                marks.append(f"{field} {a} -> {b} (+{b - a:.1f})")
+        status = "REGRESSION " + "; ".join(marks) if marks else \
+            f"ok  wall {ref.get('wall_ms_med')} -> {cur.get('wall_ms_med')} ms"
+        print(f"  {key:48s} {status}")
+        bad += bool(marks)
+    for key in base:
+        if not partial and key not in results:
+            print(f"  {key:48s} (missing)")
+    return bad
+
+
+def run_suite(args) -> int:
+    """2/6/24MP 픽스처로 단계별 지표를 측정하고 JSON 저장/기준 비교를 수행한다."""
+    src = None
+    if args.fixtures:
+        files = sorted(p for p in Path(args.fixtures).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+        src = cv2.imread(str(files[0]), cv2.IMREAD_COLOR) if files else None
+        if src is None:
+            print(f"no readable fixture in {args.fixtures}")
+            return 2
+    results: Dict[str, Dict[str, Any]] = {}
+    only = [s for s in (args.only or "").split(",") if s]
+    with tempfile.TemporaryDirectory(prefix="bench_retouch_") as tmpdir:
+        for mp in args.sizes:
+            frame = _portrait(mp, src)
+            print(f"\n[{mp:g}MP] {frame.shape[1]}x{frame.shape[0]} repeat={args.repeat}")
+            print(f"  {'stage':40s} {'wall min':>9s} {'wall med':>9s} {'cpu med':>9s} {'rss pk':>8s} {'py pk':>8s}")
+            for name, fn, setup in _suite_stages(frame, tmpdir):
+                if only and not any(o in name for o in only):
+                    continue
+                try:
+                    r = _measure(fn, setup, args.repeat, args.warmup)
+                except Exception as e:
+                    print(f"  {name:40s} error: {e}")
+                    continue
+                results[f"{mp:g}MP/{name}"] = r
+                rss = "-" if r["rss_peak_mb"] is None else f"{r['rss_peak_mb']:.1f}"
+                print(f"  {name:40s} {r['wall_ms_min']:9.1f} {r['wall_ms_med']:9.1f} {r['cpu_ms_med']:9.1f} "
+                      f"{rss:>8s} {r['py_peak_mb']:8.1f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"meta": _meta(args), "results": results}, indent=2,
+                                              ensure_ascii=False), encoding="utf-8")
+        print(f"\nsaved: {args.json}")
+    if args.baseline:
+        bad = _diff_baseline(results, args.baseline, args.tolerance, partial=bool(only) or args.sizes != [2.0, 6.0, 24.0])
+        print(f"regressions: {bad}")
+        return 1 if bad else 0
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="retouch benchmarks")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--suite", action="store_true", help="2/6/24MP 단계별 스위트 실행")
+    ap.add_argument("--sizes", type=lambda s: [float(x) for x in s.split(",") if x], default=[2.0, 6.0, 24.0])
+    ap.add_argument("--fixtures", default="", help="인물 이미지 폴더(없으면 합성)")
+    ap.add_argument("--only", default="", help="단계 이름 부분 문자열(쉼표 구분)")
+    ap.add_argument("--json", default="", help="결과 JSON 저장 경로")
+    ap.add_argument("--baseline", default="", help="비교할 기준 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.20)
+    ap.add_argument("--warmup", type=int, default=1, help="단계별 측정 제외 사전 실행 횟수")
+    ap.add_argument("--parity", action="store_true", help="retouch_graph vs process_array 결과 비교")
+    ap.add_argument("--parity-tolerance", type=float, default=0.001, help="1 초과 차이 픽셀 비율 상한")
+    ap.add_argument("--preview", action="store_true", help="워커 경유 프록시 미리보기 지연 측정")
+    args = ap.parse_args()
+    if args.preview:
+        return run_preview(args)
+    if args.parity:
+        return run_parity(args)
+    if args.suite:
+        return run_suite(args)
+    frame = _make_frame()
+    print(f"frame={W}x{H} repeat={args.repeat}")
+    bench_eyes(frame, args.repeat)
+    bench_shoulders(frame, args.repeat)
+    print("OK: retouch benchmarks finished.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
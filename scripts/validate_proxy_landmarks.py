@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+프록시 해상도 랜드마크 검출 검증(원본 해상도 검출 대비).
+
+사용:
+  - 워킹 디렉터리(레포 루트)에서: python scripts/validate_proxy_landmarks.py <이미지 또는 폴더> ... [--edge 1280]
+  - 각 이미지마다 원본/프록시/축소 디코드(IMREAD_REDUCED) 검출의 주요 랜드마크 오차(원본 px),
+    회전각 차이, 크롭 사각형 차이, 검출 시간을 출력한다.
+  - --max-err 를 넘는 오차가 있으면 종료 코드 1.
+"""
+
+from __future__ import annotations
+
+import sys
+import math
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils import ai_retouch as AIR  # noqa: E402
+from app.utils import landmarker_pool as LP  # noqa: E402
+
+FACE_IDX = (10, 33, 152, 263)   # 이마 상단, 눈꼬리 L/R, 턱끝
+POSE_IDX = (11, 12)             # 어깨 L/R
+_REDUCED = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def _collect(paths: List[str]) -> List[Path]:
+    out: List[Path] = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            out += sorted(q for q in p.iterdir() if q.suffix.lower() in (".jpg", ".jpeg", ".png"))
+        elif p.exists():
+            out.append(p)
+    return out
+
+
+def _detect(bgr_for_detect: np.ndarray):
+    """주어진 해상도 그대로 검출한다(프록시 축소 없음). (face, pose, ms)."""
+    t0 = time.perf_counter()
+    rgb = cv2.cvtColor(bgr_for_detect, cv2.COLOR_BGR2RGB)
+    lms = AIR._mp_face_mesh(bgr_for_detect, rgb)
+    pl = AIR._mp_pose(bgr_for_detect, rgb)
+    return lms, pl, (time.perf_counter() - t0) * 1000.0
+
+
+def _max_err(a, b, idxs, W: int, H: int) -> Optional[float]:
+    if not a or not b:
+        return None
+    return max(math.hypot((a[i].x - b[i].x) * W, (a[i].y - b[i].y) * H) for i in idxs)
+
+
+def _geometry(lms, pl, W: int, H: int) -> Tuple[float, Tuple[int, int, int, int]]:
+    """(회전각 deg, 스펙 크롭 사각형). 에지 패널티는 제외(랜드마크 영향만 비교)."""
+    M = AIR._rotation_matrix_v1(lms, W, H)
+    ang = 0.0 if M is None else math.degrees(math.atan2(M[1, 0], M[0, 0]))
+    lms_r = AIR._map_landmarks(lms, M, W, H)
+    pl_r = AIR._map_landmarks(pl, M, W, H)
+    yc, yn, xeye = AIR._crown_chin_from_landmarks(lms_r, pl_r, W, H)
+    return ang, AIR._spec_crop_rect(yc, yn, xeye)
+
+
+def _reduced_factor(W: int, H: int, edge: int) -> int:
+    """긴 변이 edge 이상으로 남는 가장 큰 DCT 축소 배율(2/4/8), 없으면 1."""
+    f = 1
+    for k in (2, 4, 8):
+        if max(W, H) / k >= edge:
+            f = k
+    return f
+
+
+def validate(path: Path, edge: int) -> Optional[float]:
+    full = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if full is None:
+        print(f"{path.name}: load failed")
+        return None
+    H, W = full.shape[:2]
+    lf, pf, t_full = _detect(full)
+    lp, pp, t_proxy = _detect(LP.detection_proxy(full, edge))
+    k = _reduced_factor(W, H, edge)
+    t0 = time.perf_counter()
+    red = cv2.imread(str(path), _REDUCED[k]) if k > 1 else full
+    t_dec = (time.perf_counter() - t0) * 1000.0
+    lr, pr, t_red = _detect(LP.detection_proxy(red, edge))
+    if not lf:
+        print(f"{path.name}: {W}x{H} face not found at full resolution (proxy found={bool(lp)})")
+        return None
+    errs = [e for e in (_max_err(lf, lp, FACE_IDX, W, H), _max_err(pf, pp, POSE_IDX, W, H),
+                        _max_err(lf, lr, FACE_IDX, W, H), _max_err(pf, pr, POSE_IDX, W, H)) if e is not None]
+    ang_f, rect_f = _geometry(lf, pf, W, H)
+    ang_p, rect_p = _geometry(lp, pp, W, H) if lp else (float("nan"), (0, 0, 0, 0))
+    d_rect = max(abs(a - b) for a, b in zip(rect_f, rect_p))
+    print(f"{path.name}: {W}x{H}  det full={t_full:6.1f}ms proxy={t_proxy:6.1f}ms "
+          f"reduced(1/{k})={t_red:6.1f}ms+decode {t_dec:6.1f}ms  "
+          f"face err proxy={_max_err(lf, lp, FACE_IDX, W, H)} reduced={_max_err(lf, lr, FACE_IDX, W, H)}  "
+          f"|d angle|={abs(ang_f - ang_p):.3f}deg  |d rect|={d_rect}px")
+    return max(errs) if errs else float("inf")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="proxy landmark detection validation")
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--edge", type=int, default=LP.PROXY_EDGE or 1280)
+    ap.add_argument("--max-err", type=float, default=12.0, help="허용 최대 랜드마크 오차(원본 px)")
+    args = ap.parse_args()
+    files = _collect(args.paths)
+    if not files:
+        print("no images")
+        return 1
+    worst = [e for e in (validate(p, args.edge) for p in files) if e is not None]
+    if not worst:
+        print("no detections to compare")
+        return 1
+    print(f"images={len(files)} compared={len(worst)} worst landmark err={max(worst):.1f}px (limit {args.max_err})")
+    return 0 if max(worst) <= args.max_err else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+이메일 아웃박스 검증(로컬 SMTP 대역 서버 대상).
+
+사용:
+  - pip install -r requirements-dev.txt (aiosmtpd: 로컬 SMTP 대역 서버)
+  - 워킹 디렉터리(레포 루트)에서: python scripts/verify_outbox.py
+  - 127.0.0.1 임의 포트에 aiosmtpd 서버를 띄우고 임시 settings.json / 아웃박스 디렉터리로 다음을 확인한다.
+      1) enqueue 즉시 반환 + 백그라운드 발송, 수신 Message-ID 일치, 첨부 포함
+      2) dedup_key 중복 투입 시 한 통만 발송
+      3) 서버 중단 중 스풀 → 재시도(백오프) → 서버 복구 후 발송
+      4) 재시작 내구성: 스풀만 남긴 채 아웃박스를 새로 띄워도 발송
+      5) 영구 오류(550 수신자 거부) → failed/ 이동, retry_failed 로 되돌림
+  - 실패 항목이 있으면 종료 코드 1.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+from email import message_from_bytes
+from email.policy import default as default_policy
+from pathlib import Path
+from typing import List
+
+TMP = Path(tempfile.mkdtemp(prefix="verify_outbox_"))
+os.environ["EMAIL_OUTBOX_DIR"] = str(TMP / "outbox")  # 모듈 import 전
+os.environ["EMAIL_RETRY_BASE_S"] = "0.3"
+os.environ["EMAIL_RETRY_MAX_S"] = "1"
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    print("aiosmtpd 가 필요합니다: pip install -r requirements-dev.txt")
+    sys.exit(2)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+PORT = _free_port()
+SETTINGS = TMP / "settings.json"
+SETTINGS.write_text(json.dumps({"email": {
+    "smtp": {"host": "127.0.0.1", "port": PORT, "tls": False},
+    "from_email": "kiosk@photostudio.test", "from_name": "Photo Studio",
+}}), encoding="utf-8")
+os.environ["PHOTOSTUDIO_SETTINGS"] = str(SETTINGS)
+
+from app.utils import emailer  # noqa: E402
+from app.utils import outbox  # noqa: E402
+
+emailer.DEFAULT_SEARCH_PATHS[:] = [SETTINGS]
+
+
+class _Handler:
+    def __init__(self):
+        self.received: List = []
+        self.reject = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return "550 5.1.1 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.append(message_from_bytes(envelope.original_content or envelope.content, policy=default_policy))
+        return "250 Message accepted"
+
+
+HANDLER = _Handler()
+_server = None
+
+
+def server_up() -> None:
+    global _server
+    _server = Controller(HANDLER, hostname="127.0.0.1", port=PORT)
+    _server.start()
+
+
+def server_down() -> None:
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+
+def wait_for(pred, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.05)
+    return pred()
+
+
+RESULTS = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    RESULTS.append(ok)
+    print(f"[{'OK' if ok else 'FAIL'}] {name}" + (f"  ({detail})" if detail else ""))
+
+
+def main() -> int:
+    att = TMP / "photo.jpg"
+    att.write_bytes(b"\xff\xd8\xff\xe0" + os.urandom(2048) + b"\xff\xd9")
+    server_up()
+    outbox.start()
+
+    # 1) 기본 발송
+    t0 = time.perf_counter()
+    mids = [outbox.enqueue(f"user{i}@example.test", f"증명사진 {i}", "사진을 첨부합니다.", [str(att)]) for i in range(2)]
+    enqueue_ms = (time.perf_counter() - t0) * 1000.0 / 2
+    ok = outbox.flush(10) and wait_for(lambda: len(HANDLER.received) >= 2)
+    got = {str(m["Message-ID"]) for m in HANDLER.received}
+    check("send", ok and set(mids) <= got and all(outbox.status(m)["state"] == "sent" for m in mids),
+          f"enqueue {enqueue_ms:.1f}ms/msg")
+    check("attachment", any(p.get_filename() == "photo.jpg" for m in HANDLER.received for p in m.iter_attachments()))
+
+    # 2) 중복 투입
+    n0 = len(HANDLER.received)
+    a = outbox.enqueue("dup@example.test", "dup", "x", dedup_key="job-1|customer|dup@example.test")
+    b = outbox.enqueue("dup@example.test", "dup", "x", dedup_key="job-1|customer|dup@example.test")
+    outbox.flush(10)
+    c = outbox.enqueue("dup@example.test", "dup", "x", dedup_key="job-1|customer|dup@example.test")
+    outbox.flush(10)
+    time.sleep(0.3)
+    check("dedup", a == b == c and len(HANDLER.received) - n0 == 1, f"received {len(HANDLER.received) - n0}")
+
+    # 3) 오프라인 스풀 → 복구
+    server_down()
+    t0 = time.perf_counter()
+    mid = outbox.enqueue("offline@example.test", "offline", "x")
+    enqueue_ms = (time.perf_counter() - t0) * 1000.0
+    wait_for(lambda: (outbox.status(mid) or {}).get("attempts", 0) >= 2, 10)
+    st = outbox.status(mid) or {}
+    check("spool while offline", st.get("state") == "pending" and st.get("attempts", 0) >= 2 and bool(st.get("last_error")),
+          f"enqueue {enqueue_ms:.1f}ms, attempts={st.get('attempts')}")
+    server_up()
+    check("deliver after recovery", wait_for(lambda: (outbox.status(mid) or {}).get("state") == "sent", 10))
+
+    # 4) 재시작 내구성
+    server_down()
+    outbox.shutdown()
+    mid = outbox.enqueue("restart@example.test", "restart", "x")
+    outbox.shutdown()
+    spooled = (Path(os.environ["EMAIL_OUTBOX_DIR"]) / "pending").glob("*.eml")
+    check("spooled on disk", len(list(spooled)) == 1)
+    server_up()
+    outbox._OB = outbox._Outbox()  # 프로세스 재시작과 같은 상태(메모리 비움)
+    outbox.start()
+    check("deliver after restart", wait_for(lambda: (outbox.status(mid) or {}).get("state") == "sent", 10))
+
+    # 5) 영구 오류
+    HANDLER.reject.add("nobody@example.test")
+    mid = outbox.enqueue("nobody@example.test", "reject", "x")
+    ok = wait_for(lambda: (outbox.status(mid) or {}).get("state") == "failed", 10)
+    check("permanent failure", ok and outbox.status(mid)["attempts"] == 1, str((outbox.status(mid) or {}).get("last_error")))
+    HANDLER.reject.clear()
+    check("retry_failed", outbox.retry_failed(mid) == 1
+          and wait_for(lambda: (outbox.status(mid) or {}).get("state") == "sent", 10))
+
+    print("summary:", outbox.summary())
+    outbox.shutdown()
+    server_down()
+    return 0 if all(RESULTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
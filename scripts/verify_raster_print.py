@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+직접 래스터 인쇄 경로 검증/시간 비교(QPrinter PdfFormat 출력 대상 → 프린터 없이 리눅스에서 실행 가능).
+
+사용:
+  - 워킹 디렉터리(레포 루트)에서: python scripts/verify_raster_print.py [--runs 5]
+  - 합성 편집본(3000×4000 JPEG)으로 두 경로를 같은 스레드 구성(작업 스레드)에서 돌린다.
+      기존: build_tiled_pdf(dct) → QPdfDocument 로드/1800×1200 렌더 → QPrinter
+            (QtPdf 모듈이 없으면 디코드/인쇄 단계는 건너뛰고 표시)
+      신규: build_tiled_pdf(dct, print_page=True) → 메모리의 페이지 래스터(cached_print_page) → QPrinter (PDF 디코드 없음)
+  - 확인: 출력 PDF 용지 432×288pt(4×6inch 가로), 인쇄가 빌드 때 그린 래스터 재사용(memo hit),
+          GUI 스레드 밖 인쇄 성공, 없는 프린터 이름은 False(기본 프린터로 새지 않음),
+          보관 PDF 크기(dct 유지) vs writer="raster". 실패 항목이 있으면 종료 코드 1.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+TMP = Path(tempfile.mkdtemp(prefix="verify_raster_print_"))
+os.environ["PDF_CACHE"] = "0"                         # 모듈 import 전: 매 회 실제 생성 시간
+os.environ["JOB_CATALOG_DB"] = str(TMP / "catalog.sqlite3")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.chdir(TMP)                                         # C:\PhotoBox\... 경로가 임시 폴더 아래에 생기도록
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PySide6.QtCore import QRectF, QSizeF, QMarginsF  # noqa: E402
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QLinearGradient, QPageLayout, QPageSize, QPainter  # noqa: E402
+from PySide6.QtPrintSupport import QPrinter  # noqa: E402
+
+from app.utils import storage, raster_print  # noqa: E402
+
+RESULTS = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    RESULTS.append(ok)
+    print(f"[{'OK' if ok else 'FAIL'}] {name}" + (f"  ({detail})" if detail else ""))
+
+
+def _source() -> str:
+    img = QImage(3000, 4000, QImage.Format_RGB32)
+    p = QPainter(img)
+    g = QLinearGradient(0, 0, 3000, 4000)
+    g.setColorAt(0, QColor("#f0d0b0")); g.setColorAt(1, QColor("#304060"))
+    p.fillRect(img.rect(), g)
+    p.end()
+    path = str(TMP / "edited_photo.jpg")
+    img.save(path, "JPG", 92)
+    return path
+
+
+def _media_box(pdf: str):
+    m = re.search(rb"/MediaBox\s*\[\s*0\s+0\s+([\d.]+)\s+([\d.]+)", Path(pdf).read_bytes())
+    return (round(float(m.group(1))), round(float(m.group(2)))) if m else None
+
+
+def _old_print(pdf_path: str, out_pdf: str) -> bool:
+    """enhance_select._print_with_qt 와 같은 단계(프린터 대신 PDF 출력)."""
+    from PySide6.QtPdf import QPdfDocument
+    printer = QPrinter(QPrinter.PrinterResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setOutputFileName(out_pdf)
+    printer.setResolution(300)
+    printer.setPageLayout(QPageLayout(QPageSize(QSizeF(101.6, 152.4), QPageSize.Millimeter),
+                                      QPageLayout.Portrait, QMarginsF(0, 0, 0, 0)))
+    printer.setFullPage(True)
+    doc = QPdfDocument()
+    if doc.load(pdf_path) != QPdfDocument.NoError:
+        return False
+    painter = QPainter()
+    if not painter.begin(printer):
+        return False
+    try:
+        img = doc.render(0, QSizeF(1800, 1200))
+        painter.drawImage(QRectF(0, 0, printer.pageRect().width(), printer.pageRect().height()), img)
+    finally:
+        painter.end()
+    return True
+
+
+def _in_worker(fn):
+    """후처리 큐처럼 GUI 스레드가 아닌 작업 스레드에서 실행."""
+    box = {}
+    t = threading.Thread(target=lambda: box.update(v=fn()), name="finish-test")
+    t.start(); t.join()
+    return box.get("v")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])  # noqa: F841 (QPrinter 필요)
+
+    src = _source()
+    try:
+        import PySide6.QtPdf  # noqa: F401
+        has_qtpdf = True
+    except ImportError:
+        has_qtpdf = False
+
+    old_ms, new_ms, build_ms, print_ms = [], [], [], []
+    ok_old = ok_new = True
+    memo = []
+    for i in range(args.runs):
+        # 기존 경로
+        def old():
+            t0 = time.perf_counter()
+            pdf = storage.build_tiled_pdf(QImage(src), {"name": "t", "number": str(i), "ratio": "3040"},
+                                          size_key="ID_30x40", photo_mm=(30, 40), source_path=src, writer="dct")
+            ok = _old_print(pdf, str(TMP / f"old_{i}.pdf")) if has_qtpdf else True
+            return ok, (time.perf_counter() - t0) * 1000.0
+        ok, ms = _in_worker(old)
+        ok_old &= bool(ok); old_ms.append(ms)
+
+        # 신규 경로(후처리 큐의 build_pdf → print 단계와 같은 순서)
+        def new():
+            t0 = time.perf_counter()
+            session = {"name": "t", "number": str(i), "ratio": "3040"}
+            storage.build_tiled_pdf(QImage(src), session, size_key="ID_30x40", photo_mm=(30, 40),
+                                    source_path=src, writer="dct", print_page=True)
+            t1 = time.perf_counter()
+            page = storage.cached_print_page(session["print_page"]["key"])
+            memo.append("hit" if page is not None else "miss")
+            if page is None:
+                page = storage.render_print_page(QImage(src), session, source_path=src)
+            ok = raster_print.print_image(page, output_pdf=str(TMP / f"new_{i}.pdf"))
+            t2 = time.perf_counter()
+            return ok, (t1 - t0) * 1000.0, (t2 - t1) * 1000.0
+        ok, b, p = _in_worker(new)
+        ok_new &= bool(ok); build_ms.append(b); print_ms.append(p); new_ms.append(b + p)
+        storage._PAGE_MEMO.clear()  # 다음 회차도 래스터를 새로 그리도록
+
+    med = lambda xs: sorted(xs)[len(xs) // 2]  # noqa: E731
+    label = "build+decode+print" if has_qtpdf else "build only (QtPdf 없음: 디코드/인쇄 단계 제외)"
+    print(f"old  {label}: median {med(old_ms):.1f}ms")
+    print(f"new  build(dct+page)+print: median {med(new_ms):.1f}ms  (build {med(build_ms):.1f}ms, print {med(print_ms):.1f}ms)")
+
+    check("old path", ok_old)
+    check("raster print off GUI thread", ok_new)
+    check("print reuses build-time raster", all(m == "hit" for m in memo), ",".join(memo))
+    box = _media_box(str(TMP / "new_0.pdf"))
+    check("4x6 landscape page", box == (432, 288), str(box))
+
+    page = storage.render_print_page(QImage(src), {"ratio": "3040"}, source_path=src)
+    check("unknown printer rejected", _in_worker(lambda: raster_print.print_image(page, "No Such Printer 123")) is False)
+
+    sizes = {}
+    for w in ("dct", "raster"):
+        pdf = storage.build_tiled_pdf(QImage(src), {"name": w, "number": "0", "ratio": "3545"},
+                                      size_key="ID_35x45", photo_mm=(35, 45), source_path=src, writer=w)
+        sizes[w] = os.path.getsize(pdf)
+    print(f"archive PDF bytes: dct {sizes['dct']:,}  raster {sizes['raster']:,}")
+    return 0 if all(RESULTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
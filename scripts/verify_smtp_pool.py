@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+SMTP 세션 풀 검증/측정(로컬 SMTP 대역 서버 대상).
+
+사용:
+  - pip install -r requirements-dev.txt (aiosmtpd: 로컬 SMTP 대역 서버)
+  - 워킹 디렉터리(레포 루트)에서: python scripts/verify_smtp_pool.py [--messages 6] [--handshake-ms 150]
+  - 127.0.0.1 임의 포트에 aiosmtpd 서버를 띄우고, EHLO 응답을 --handshake-ms 만큼 늦춰 TLS/AUTH 왕복을 흉내 낸다.
+  - 측정: 메시지 N통 time-to-sent(풀 끔 / 풀 켬 / prewarm 후 첫 통).
+  - 확인: 연결 재사용(연결 수), 서버 재시작 후 재연결 발송, 수신자 여러 명 한 트랜잭션, 유휴 NOOP 확인.
+  - 실패 항목이 있으면 종료 코드 1.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import socket
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    print("aiosmtpd 가 필요합니다: pip install -r requirements-dev.txt")
+    sys.exit(2)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils import emailer  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Handler:
+    def __init__(self, handshake_s: float):
+        self.handshake_s = handshake_s
+        self.connections = 0
+        self.transactions: List[List[str]] = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.transactions.append(list(envelope.rcpt_tos))
+        return "250 Message accepted"
+
+
+RESULTS = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    RESULTS.append(ok)
+    print(f"[{'OK' if ok else 'FAIL'}] {name}" + (f"  ({detail})" if detail else ""))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--messages", type=int, default=6)
+    ap.add_argument("--handshake-ms", type=float, default=150.0)
+    args = ap.parse_args()
+
+    port = _free_port()
+    handler = _Handler(args.handshake_ms / 1000.0)
+    server = Controller(handler, hostname="127.0.0.1", port=port)
+    server.start()
+    cfg = {"smtp": {"host": "127.0.0.1", "port": port, "use_ssl": False, "use_starttls": False},
+           "from_email": "kiosk@photostudio.test"}
+    msg = emailer.build_message(from_email=cfg["from_email"], from_name=None, to_addrs=["print@example.test"],
+                                subject="인화 요청", body="x" * 2000)
+    data = emailer.message_bytes(msg)
+
+    def run(n: int) -> List[float]:
+        times = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            emailer.deliver(data, cfg["from_email"], ["print@example.test"], config=cfg)
+            times.append((time.perf_counter() - t0) * 1000.0)
+        return times
+
+    # 1) 풀 끔(이전 동작: 메시지마다 새 연결)
+    emailer.SMTP_POOL_ENABLED = False
+    c0 = handler.connections
+    off = run(args.messages)
+    off_conn = handler.connections - c0
+
+    # 2) 풀 켬(첫 통만 연결)
+    emailer.SMTP_POOL_ENABLED = True
+    emailer.close_smtp_sessions()
+    c0 = handler.connections
+    on = run(args.messages)
+    on_conn = handler.connections - c0
+
+    # 3) prewarm 후 첫 통
+    emailer.close_smtp_sessions()
+    emailer.prewarm_smtp(cfg)
+    time.sleep(args.handshake_ms / 1000.0 + 0.3)
+    warm = run(1)[0]
+
+    print(f"time-to-sent per message (ms), handshake {args.handshake_ms:.0f}ms, {args.messages} messages")
+    print(f"  pool off : total {sum(off):7.1f}  first {off[0]:6.1f}  rest avg {sum(off[1:]) / max(1, len(off) - 1):6.1f}"
+          f"  connections {off_conn}")
+    print(f"  pool on  : total {sum(on):7.1f}  first {on[0]:6.1f}  rest avg {sum(on[1:]) / max(1, len(on) - 1):6.1f}"
+          f"  connections {on_conn}")
+    print(f"  prewarmed: first {warm:6.1f}")
+    check("reuse", off_conn == args.messages and on_conn == 1, f"{off_conn} -> {on_conn} connections")
+    check("prewarm", warm < args.handshake_ms, f"{warm:.1f}ms")
+
+    # 4) 서버 재시작(풀 연결이 끊김) → 재연결 후 발송
+    server.stop()
+    server = Controller(handler, hostname="127.0.0.1", port=port)
+    server.start()
+    n0 = len(handler.transactions)
+    try:
+        run(1)
+        ok = len(handler.transactions) == n0 + 1
+    except Exception as e:
+        ok = False
+        print("  reconnect error:", e)
+    check("reconnect after server restart", ok)
+
+    # 5) 수신자 여러 명 → 한 트랜잭션
+    n0 = len(handler.transactions)
+    rcpts = ["a@example.test", "b@example.test", "c@example.test"]
+    emailer.deliver(data, cfg["from_email"], rcpts, config=cfg)
+    check("multi-recipient single transaction",
+          len(handler.transactions) == n0 + 1 and handler.transactions[-1] == rcpts)
+
+    # 6) 유휴 후 NOOP 확인 경로
+    emailer.SMTP_NOOP_S = 0.2
+    time.sleep(0.5)
+    c0 = handler.connections
+    run(1)
+    check("noop on idle session keeps connection", handler.connections == c0)
+
+    emailer.close_smtp_sessions()
+    server.stop()
+    return 0 if all(RESULTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
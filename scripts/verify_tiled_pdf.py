@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+타일 PDF 작성기 검증(QPdfWriter 경로 대비 JPEG XObject 경로).
+
+사용:
+  - 워킹 디렉터리(레포 루트)에서: python scripts/verify_tiled_pdf.py [이미지.jpg ...] [--dpi 150] [--max-mean 3] [--max-p99 24]
+  - 이미지가 없으면 결정적 합성 JPEG(타일 크기 / 카메라 크롭 크기)를 만든다.
+  - 각 이미지 × 레이아웃(3545, 3040, 회전 배치, 블리드+구분선)마다 storage.build_tiled_pdf 를
+    PDF_WRITER=qt / dct 로 각각 만들고 QPdfDocument 로 렌더링해 픽셀 차이(평균/p99, 0~255)를 비교한다.
+  - 파일 크기, 생성 시간, dct 경로 종류(패스스루/1회 인코딩)를 출력한다. 허용치를 넘으면 종료 코드 1.
+  - PDF 캐시는 끈 상태로 만든다.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+os.environ["PDF_CACHE"] = "0"  # 캐시 적중이 비교/시간을 가리지 않도록(모듈 import 전)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PySide6.QtCore import QSize  # noqa: E402
+from PySide6.QtGui import QGuiApplication, QImage  # noqa: E402
+from PySide6.QtPdf import QPdfDocument  # noqa: E402
+
+from app.utils import storage as S  # noqa: E402
+from app.utils import qimage_bridge as QB  # noqa: E402
+
+LAYOUTS: List[Tuple[str, str, dict]] = [
+    ("3545", "35x45", {}),
+    ("3040", "30x40", {}),
+    ("3545", "35x45 rotated", {"force_cols_rows": (2, 3)}),
+    ("3545", "35x45 bleed+sep", {"bleed_mm": 1.0, "draw_separators": True}),
+]
+
+
+def _synthetic(path: Path, w: int, h: int) -> None:
+    """그라디언트 + 원 + 글자(회전/크롭 오류가 눈에 띄도록 비대칭)."""
+    yy, xx = np.mgrid[0:h, 0:w]
+    im = np.dstack([xx * 255 // w, yy * 255 // h, ((xx + yy) % 97) * 2]).astype(np.uint8)
+    cv2.circle(im, (w // 4, h // 4), max(4, w // 8), (0, 0, 255), -1)
+    cv2.putText(im, "AB", (w // 3, h * 3 // 4), cv2.FONT_HERSHEY_SIMPLEX, w / 120.0, (255, 255, 255), max(1, w // 60))
+    cv2.imwrite(str(path), im, [cv2.IMWRITE_JPEG_QUALITY, 95])
+
+
+def _render(pdf_path: str, dpi: int) -> np.ndarray:
+    doc = QPdfDocument()
+    err = doc.load(pdf_path)
+    if err != QPdfDocument.Error.None_ or doc.pageCount() != 1:
+        raise RuntimeError(f"QPdfDocument load failed: {pdf_path} ({err})")
+    pt = doc.pagePointSize(0)
+    size = QSize(int(round(pt.width() * dpi / 72.0)), int(round(pt.height() * dpi / 72.0)))
+    img = doc.render(0, size)
+    doc.close()
+    return QB.to_ndarray(img.convertToFormat(QImage.Format_RGB888), "BGR").astype(np.int16)
+
+
+def _build(src: str, ratio: str, kw: dict, writer: str, out_dir: str) -> Tuple[str, dict]:
+    S.PDF_WRITER = writer
+    S.PDF_ROOT = out_dir
+    session = {"name": writer, "number": ratio, "ratio": ratio}
+    path = S.build_tiled_pdf(QImage(src), session, size_key="ID_35x45", photo_mm=(35, 45), source_path=src, **kw)
+    return path, dict(session.get("pdf_build") or {})
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("images", nargs="*")
+    ap.add_argument("--dpi", type=int, default=150, help="비교 렌더링 해상도")
+    ap.add_argument("--max-mean", type=float, default=3.0, help="평균 픽셀 차이 허용치(0~255)")
+    ap.add_argument("--max-p99", type=float, default=24.0, help="p99 픽셀 차이 허용치(구분선/경계 리샘플 차이 포함)")
+    args = ap.parse_args()
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)  # noqa: F841
+    tmp = tempfile.mkdtemp(prefix="verify_pdf_")
+    images = list(args.images)
+    if not images:
+        for w, h in ((413, 531), (1200, 1600)):  # 타일 크기(패스스루) / 카메라 크롭 크기(1회 인코딩)
+            p = Path(tmp) / f"synthetic_{w}x{h}.jpg"
+            _synthetic(p, w, h)
+            images.append(str(p))
+
+    failed = 0
+    print(f"{'image':<26} {'layout':<16} {'qt bytes':>9} {'dct bytes':>9} {'qt ms':>7} {'dct ms':>7} "
+          f"{'mean':>5} {'p99':>5}  dct")
+    for src in images:
+        for ratio, label, kw in LAYOUTS:
+            qt_pdf, qt_info = _build(src, ratio, kw, "qt", os.path.join(tmp, "qt"))
+            dct_pdf, dct_info = _build(src, ratio, kw, "dct", os.path.join(tmp, "dct"))
+            a, b = _render(qt_pdf, args.dpi), _render(dct_pdf, args.dpi)
+            if a.shape != b.shape:
+                print(f"{Path(src).name:<26} {label:<16} page size mismatch {a.shape} vs {b.shape}  FAIL")
+                failed += 1
+                continue
+            d = np.abs(a - b)
+            mean, p99 = float(d.mean()), float(np.percentile(d, 99))
+            ok = mean <= args.max_mean and p99 <= args.max_p99
+            failed += 0 if ok else 1
+            print(f"{Path(src).name:<26} {label:<16} {qt_info.get('bytes', 0):>9} {dct_info.get('bytes', 0):>9} "
+                  f"{qt_info.get('ms', 0):>7.1f} {dct_info.get('ms', 0):>7.1f} {mean:>5.2f} {p99:>5.1f}  "
+                  f"{dct_info.get('writer')}{'' if ok else '  FAIL'}")
+    print(f"output: {tmp}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())